@@ -5,7 +5,7 @@ from typing import Annotated
 
 from fastapi import Depends, Header, HTTPException, status
 
-from app.core.security import verify_supabase_jwt
+from app.core.security import verify_supabase_jwt_async
 from app.core.supabase_client import SupabaseClient
 from app.models.auth import UserResponse
 
@@ -45,7 +45,7 @@ async def get_current_user(
         )
 
     # Verify JWT token
-    payload = verify_supabase_jwt(token)
+    payload = await verify_supabase_jwt_async(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -7,8 +7,13 @@ from fastapi.responses import JSONResponse
 
 from app import __version__
 from app.core.config import get_config
+from app.core.security import SecurityManager
 from app.core.supabase_client import SupabaseClient
 from app.models.schemas import HealthCheckResponse
+from app.services.jobs import get_job_queue
+from app.services.payroll.calculator_registry import get_calculator_registry
+from app.services.payroll.result_cache import get_payroll_result_cache
+from app.services.payroll.tax_config_repository import get_tax_config_repository
 from app.utils.response import create_success_response
 
 logger = logging.getLogger(__name__)
@@ -36,3 +41,24 @@ async def health_check() -> JSONResponse:
     )
 
     return create_success_response(health_data.model_dump())
+
+
+@router.get("/metrics", response_model=None)
+async def cache_metrics() -> JSONResponse:
+    """Cache metrics endpoint
+
+    Returns:
+        Hit/miss and load counters for process-wide payroll caches, the
+        verified-token cache, Supabase connection pool usage, and the
+        background job queue
+    """
+    return create_success_response(
+        {
+            "calculator_registry": get_calculator_registry().stats(),
+            "result_cache": get_payroll_result_cache().stats(),
+            "tax_config": get_tax_config_repository().stats(),
+            "supabase_pool": SupabaseClient.pool_stats(),
+            "token_cache": SecurityManager.token_cache_stats(),
+            "jobs": get_job_queue().stats(),
+        }
+    )
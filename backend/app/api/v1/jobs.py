@@ -0,0 +1,49 @@
+"""
+Background Job API Endpoints
+
+GET  /api/v1/jobs/{job_id}        - Job status, progress and result
+POST /api/v1/jobs/{job_id}/cancel - Cancel a queued or running job
+
+Jobs are submitted by the operation's own endpoint, e.g.
+POST /api/v1/payroll/runs/{run_id}/approve/jobs.
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.api.deps import CurrentUser
+from app.models.jobs import Job
+from app.services.jobs import get_job_queue
+
+router = APIRouter()
+
+
+async def _get_own_job(job_id: str, user_id: str) -> Job:
+    job = await get_job_queue().get(job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=Job, summary="Get a background job")
+async def get_job(job_id: str, current_user: CurrentUser) -> Job:
+    """Get a background job's status, progress and (once finished) result or error."""
+    return await _get_own_job(job_id, current_user.id)
+
+
+@router.post("/{job_id}/cancel", response_model=Job, summary="Cancel a background job")
+async def cancel_job(job_id: str, current_user: CurrentUser) -> Job:
+    """
+    Cancel a background job.
+
+    A queued job is cancelled at once; a running one stops shortly after,
+    keeping whatever it already saved.
+    """
+    job = await _get_own_job(job_id, current_user.id)
+    if job.status.is_finished:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status.value}",
+        )
+    return await get_job_queue().cancel(job_id) or job
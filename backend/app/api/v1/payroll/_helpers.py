@@ -5,10 +5,13 @@ Shared helper functions for payroll API endpoints.
 from __future__ import annotations
 
 import logging
+from uuid import UUID
 
 from fastapi import HTTPException, status
 
 from app.core.supabase_client import get_supabase_client
+from app.models.jobs import Job
+from app.services.jobs import get_job_queue
 from app.services.payroll import (
     EmployeePayrollInput,
     PayrollCalculationResult,
@@ -71,6 +74,29 @@ async def get_user_company_id(
     return str(result.data[0]["id"])
 
 
+async def submit_run_job(
+    kind: str,
+    run_id: UUID,
+    user_id: str,
+    requested_company_id: str | None,
+    idempotency_key: str | None,
+) -> Job:
+    """Queue a background job operating on a payroll run.
+
+    Only one job per run is queued or running at a time: submitting while
+    one is active returns that job.
+    """
+    company_id = await get_user_company_id(user_id, requested_company_id)
+    return await get_job_queue().submit(
+        kind,
+        user_id,
+        company_id,
+        {"run_id": str(run_id)},
+        idempotency_key=idempotency_key,
+        concurrency_key=f"payroll_run:{run_id}",
+    )
+
+
 def result_to_response(
     result: PayrollCalculationResult, include_details: bool = False
 ) -> CalculationResponse:
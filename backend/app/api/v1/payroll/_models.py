@@ -277,6 +277,7 @@ class PayrollRunResponse(BaseModel):
     totalProvincialTax: float = Field(alias="total_provincial_tax")
     totalNetPay: float = Field(alias="total_net_pay")
     totalEmployerCost: float = Field(alias="total_employer_cost")
+    calculationTiming: dict[str, Any] | None = Field(default=None, alias="calculation_timing")
 
     model_config = {"populate_by_name": True}
 
@@ -375,6 +376,7 @@ class ApprovePayrollRunResponse(BaseModel):
     total_net_pay: float = Field(alias="totalNetPay")
     paystubs_generated: int = Field(alias="paystubsGenerated")
     paystub_errors: list[str] | None = Field(default=None, alias="paystubErrors")
+    paystub_timing: dict[str, Any] | None = Field(default=None, alias="paystubTiming")
 
     model_config = {"populate_by_name": True}
 
@@ -399,6 +401,31 @@ class UpdatePayDateResponse(BaseModel):
     model_config = {"populate_by_name": True}
 
 
+class YtdLedgerDriftResponse(BaseModel):
+    """One YTD ledger total that differs from the payroll records."""
+
+    employeeId: str = Field(alias="employee_id")
+    field: str
+    ledger: float
+    records: float
+    difference: float
+
+    model_config = {"populate_by_name": True}
+
+
+class YtdLedgerVerificationResponse(BaseModel):
+    """Response from verifying the YTD ledger against payroll records."""
+
+    taxYear: int = Field(alias="tax_year")
+    employeesChecked: int = Field(alias="employees_checked")
+    runsSynced: int = Field(alias="runs_synced")
+    repaired: int
+    hasDrift: bool = Field(alias="has_drift")
+    drifts: list[YtdLedgerDriftResponse]
+
+    model_config = {"populate_by_name": True}
+
+
 # =============================================================================
 # Paystub Models
 # =============================================================================
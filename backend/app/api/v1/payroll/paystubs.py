@@ -15,6 +15,8 @@ from fastapi.responses import StreamingResponse
 
 from app.api.deps import CurrentUser
 from app.core.supabase_client import get_supabase_client
+from app.models.jobs import Job
+from app.services.jobs import SEND_PAYSTUBS
 from app.services.payroll import PaystubDataBuilder, PaystubGenerator
 from app.services.payroll.paystub_storage import (
     PaystubStorageConfigError,
@@ -24,7 +26,7 @@ from app.services.payroll_run.model_builders import ModelBuilder
 from app.services.payroll_run.ytd_calculator import YtdCalculator
 from app.services.payroll_run_service import get_payroll_run_service
 
-from ._helpers import get_user_company_id
+from ._helpers import get_user_company_id, submit_run_job
 from ._models import PaystubUrlResponse, SendPaystubsResponse
 
 logger = logging.getLogger(__name__)
@@ -76,6 +78,30 @@ async def send_paystubs(
         )
 
 
+@router.post(
+    "/runs/{run_id}/send-paystubs/jobs",
+    response_model=Job,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Send paystub emails in the background",
+    description="Queue sending an approved run's paystub emails; poll GET /api/v1/jobs/{job_id}.",
+)
+async def start_sending_paystubs(
+    run_id: UUID,
+    current_user: CurrentUser,
+    x_company_id: str | None = Header(None, alias="X-Company-Id"),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+) -> Job:
+    """
+    Queue sending paystub emails as a background job.
+
+    The job's result has the 'sent' count and any 'errors'. It is not
+    retried on failure, as paystubs already emailed would be sent again.
+    """
+    return await submit_run_job(
+        SEND_PAYSTUBS, run_id, current_user.id, x_company_id, idempotency_key
+    )
+
+
 @router.get(
     "/records/{record_id}/paystub-url",
     response_model=PaystubUrlResponse,
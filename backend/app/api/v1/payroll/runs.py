@@ -13,9 +13,11 @@ from uuid import UUID
 from fastapi import APIRouter, Header, HTTPException, Query, status
 
 from app.api.deps import CurrentUser
+from app.models.jobs import Job
+from app.services.jobs import APPROVE_RUN, RECALCULATE_RUN
 from app.services.payroll_run_service import get_payroll_run_service
 
-from ._helpers import get_user_company_id
+from ._helpers import get_user_company_id, submit_run_job
 from ._models import (
     AddEmployeeRequest,
     AddEmployeeResponse,
@@ -31,6 +33,7 @@ from ._models import (
     UpdatePayDateRequest,
     UpdatePayDateResponse,
     UpdatePayrollRecordRequest,
+    YtdLedgerVerificationResponse,
 )
 
 logger = logging.getLogger(__name__)
@@ -190,29 +193,31 @@ async def update_payroll_record(
     "/runs/{run_id}/recalculate",
     response_model=PayrollRunResponse,
     summary="Recalculate payroll run",
-    description="Recalculate all records in a draft payroll run.",
+    description="Recalculate the records of a draft payroll run whose inputs changed.",
 )
 async def recalculate_payroll_run(
     run_id: UUID,
     current_user: CurrentUser,
     x_company_id: str | None = Header(None, alias="X-Company-Id"),
+    full: bool = Query(default=False, description="Recalculate every record"),
 ) -> PayrollRunResponse:
     """
-    Recalculate all payroll deductions for a draft run.
+    Recalculate payroll deductions for a draft run.
 
     This:
-    1. Reads input_data from all payroll_records
-    2. Recalculates CPP, EI, federal tax, and provincial tax
-    3. Updates all payroll_records with new values
+    1. Finds records that are modified or whose inputs changed since
+       their last calculation (all records if full=true)
+    2. Recalculates CPP, EI, federal tax, and provincial tax for them
+    3. Updates those payroll_records with new values
     4. Updates payroll_runs summary totals
-    5. Clears all is_modified flags
+    5. Clears their is_modified flags
 
     Only works on runs in 'draft' status.
     """
     try:
         company_id = await get_user_company_id(current_user.id, x_company_id)
         service = get_payroll_run_service(current_user.id, company_id)
-        result = await service.recalculate_run(run_id)
+        result = await service.recalculate_run(run_id, full=full)
 
         return PayrollRunResponse(
             id=result["id"],
@@ -228,6 +233,7 @@ async def recalculate_payroll_run(
             total_provincial_tax=float(result.get("total_provincial_tax", 0)),
             total_net_pay=float(result.get("total_net_pay", 0)),
             total_employer_cost=float(result.get("total_employer_cost", 0)),
+            calculation_timing=result.get("calculation_timing"),
         )
 
     except ValueError as e:
@@ -241,6 +247,30 @@ async def recalculate_payroll_run(
         )
 
 
+@router.post(
+    "/runs/{run_id}/recalculate/jobs",
+    response_model=Job,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Recalculate payroll run in the background",
+    description="Queue recalculation of a draft payroll run; poll GET /api/v1/jobs/{job_id}.",
+)
+async def start_payroll_run_recalculation(
+    run_id: UUID,
+    current_user: CurrentUser,
+    x_company_id: str | None = Header(None, alias="X-Company-Id"),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+) -> Job:
+    """
+    Queue recalculation of a draft run as a background job.
+
+    The job's result is the updated run. While a job for this run is
+    queued or running, it is returned instead of queueing another.
+    """
+    return await submit_run_job(
+        RECALCULATE_RUN, run_id, current_user.id, x_company_id, idempotency_key
+    )
+
+
 @router.post(
     "/runs/{run_id}/sync-employees",
     response_model=SyncEmployeesResponse,
@@ -628,6 +658,7 @@ async def approve_payroll_run(
             totalNetPay=float(result.get("total_net_pay", 0)),
             paystubsGenerated=result.get("paystubs_generated", 0),
             paystubErrors=result.get("paystub_errors"),
+            paystubTiming=result.get("paystub_timing"),
         )
 
     except ValueError as e:
@@ -639,3 +670,65 @@ async def approve_payroll_run(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal error approving payroll run",
         )
+
+
+@router.post(
+    "/runs/{run_id}/approve/jobs",
+    response_model=Job,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Approve payroll run in the background",
+    description="Queue approval of a pending_approval payroll run; poll GET /api/v1/jobs/{job_id}.",
+)
+async def start_payroll_run_approval(
+    run_id: UUID,
+    current_user: CurrentUser,
+    x_company_id: str | None = Header(None, alias="X-Company-Id"),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+) -> Job:
+    """
+    Queue approval (paystub generation included) as a background job.
+
+    The job's result is the approved run with paystubs_generated and
+    paystub_timing. While a job for this run is queued or running, it is
+    returned instead of queueing another.
+    """
+    return await submit_run_job(
+        APPROVE_RUN, run_id, current_user.id, x_company_id, idempotency_key
+    )
+
+
+@router.post(
+    "/ytd-ledger/verify",
+    response_model=YtdLedgerVerificationResponse,
+    summary="Verify YTD ledger",
+    description="Recompute a tax year's YTD ledger from payroll records and report drift.",
+)
+async def verify_ytd_ledger(
+    current_user: CurrentUser,
+    year: int = Query(..., ge=2000, le=2100, description="Tax year (pay date year)"),
+    repair: bool = Query(False, description="Overwrite drifted ledger rows"),
+    x_company_id: str | None = Header(None, alias="X-Company-Id"),
+) -> YtdLedgerVerificationResponse:
+    """
+    Verify the employee YTD ledger for a tax year.
+
+    Applies any approved/paid run missing from the ledger, then compares
+    every employee's ledger totals with the sum of their payroll records.
+    With repair=true, drifted rows are replaced by the recomputed totals.
+    """
+    try:
+        company_id = await get_user_company_id(current_user.id, x_company_id)
+        service = get_payroll_run_service(current_user.id, company_id)
+        result = await service.verify_ytd_ledger(year, repair=repair)
+
+        return YtdLedgerVerificationResponse.model_validate(result)
+
+    except ValueError as e:
+        logger.error(f"YTD ledger verification error: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
+        logger.exception("Unexpected error verifying YTD ledger")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal error verifying YTD ledger",
+        )
@@ -6,30 +6,39 @@ Provides REST API for T4 generation, storage, and download.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import tempfile
 from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
 from fastapi.responses import Response
 
 from app.api.deps import CurrentUser
 from app.core.security import mask_sin
 from app.core.supabase_client import get_supabase_client
+from app.models.jobs import Job
 from app.models.t4 import (
     RecordSubmissionRequest,
     T4GenerationRequest,
     T4GenerationResponse,
+    T4SlipData,
     T4SlipListResponse,
     T4SlipSummary,
     T4Status,
+    T4Summary,
     T4SummaryResponse,
     T4ValidationResponse,
+    T4ValidationResult,
 )
+from app.services.jobs import GENERATE_T4_SLIPS, get_job_queue
 from app.services.t4 import (
     T4AggregationService,
     T4PDFGenerator,
+    T4SlipGenerationService,
+    T4StorageService,
     T4XMLGenerator,
     T4XMLValidator,
     get_t4_storage,
@@ -39,6 +48,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Request bodies sent to the validate endpoint as an XML file
+XML_CONTENT_TYPES = ("application/xml", "text/xml")
+
 
 # =============================================================================
 # T4 Slip Endpoints
@@ -139,16 +151,24 @@ async def generate_t4_slips(
             detail="Company not found",
         )
 
-    # Generate T4 slips
-    employee_ids = request.employee_ids if request else None
-    regenerate = request.regenerate if request else False
-
-    slips = await aggregation.generate_all_t4_slips(
-        tax_year=tax_year,
-        employee_ids=employee_ids,
+    # Generate, store and save T4 slips
+    generator = T4SlipGenerationService(
+        supabase=supabase,
+        user_id=current_user.id,
+        company_id=str(company_id),
+        aggregation=aggregation,
+        storage=storage,
+        pdf_generator=pdf_generator,
+    )
+    progress = await generator.generate(
+        company,
+        tax_year,
+        employee_ids=request.employee_ids if request else None,
+        regenerate=request.regenerate if request else False,
+        resume_from=request.resume_from if request else None,
     )
 
-    if not slips:
+    if progress.slips == 0:
         return T4GenerationResponse(
             success=True,
             tax_year=tax_year,
@@ -156,93 +176,58 @@ async def generate_t4_slips(
             message="No payroll data found for the tax year",
         )
 
-    # Generate PDFs and save to database
-    slips_generated = 0
-    slips_skipped = 0
-    errors: list[dict[str, Any]] = []
-
-    for slip in slips:
-        try:
-            # Check if slip already exists
-            existing_result = (
-                supabase.table("t4_slips")
-                .select("id")
-                .eq("company_id", str(company_id))
-                .eq("user_id", current_user.id)
-                .eq("employee_id", str(slip.employee_id))
-                .eq("tax_year", tax_year)
-                .eq("amendment_number", 0)
-                .limit(1)
-                .execute()
-            )
-            existing_data = existing_result.data[0] if existing_result and existing_result.data else None
-
-            if existing_data and not regenerate:
-                slips_skipped += 1
-                continue
-
-            # Generate PDF
-            pdf_bytes = pdf_generator.generate_t4_slip_pdf(slip)
-
-            # Save to storage
-            pdf_storage_key = None
-            if storage:
-                pdf_storage_key = await storage.save_t4_slip(
-                    pdf_bytes=pdf_bytes,
-                    company_name=company.company_name,
-                    tax_year=tax_year,
-                    employee_id=slip.employee_id,
-                )
+    return T4GenerationResponse(
+        success=progress.failed == 0,
+        tax_year=tax_year,
+        slips_generated=progress.saved,
+        slips_skipped=progress.skipped,
+        errors=progress.errors,
+        message=progress.message,
+    )
 
-            # Build slip_data JSON - exclude computed fields
-            slip_data = slip.model_dump(
-                mode="json",
-                exclude={
-                    "employee_full_name",  # Computed field
-                    "sin_formatted",  # Computed field
-                },
-            )
 
-            # Upsert to database
-            now_utc = datetime.now(timezone.utc).isoformat()
-            if existing_data:
-                # Update existing
-                supabase.table("t4_slips").update({
-                    "slip_data": slip_data,
-                    "pdf_storage_key": pdf_storage_key,
-                    "pdf_generated_at": now_utc,
-                    "status": T4Status.GENERATED.value,
-                    "updated_at": now_utc,
-                }).eq("id", existing_data["id"]).execute()
-            else:
-                # Insert new
-                supabase.table("t4_slips").insert({
-                    "company_id": str(company_id),
-                    "user_id": current_user.id,
-                    "employee_id": str(slip.employee_id),
-                    "tax_year": tax_year,
-                    "slip_data": slip_data,
-                    "pdf_storage_key": pdf_storage_key,
-                    "pdf_generated_at": now_utc,
-                    "status": T4Status.GENERATED.value,
-                }).execute()
-
-            slips_generated += 1
+@router.post(
+    "/slips/{company_id}/{tax_year}/generate/jobs",
+    summary="Start T4 slip generation in the background",
+    response_model=Job,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_t4_slip_generation(
+    company_id: UUID,
+    tax_year: int,
+    current_user: CurrentUser,
+    request: T4GenerationRequest | None = None,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+) -> Job:
+    """
+    Queue T4 slip generation as a background job.
 
-        except Exception as e:
-            logger.error(f"Failed to generate T4 for employee {slip.employee_id}: {e}")
-            errors.append({
-                "employee_id": str(slip.employee_id),
-                "message": str(e),
-            })
+    Returns the queued job at once; poll GET /api/v1/jobs/{job_id}, whose
+    progress (and, once finished, result) is a T4GenerationProgress. A job
+    already queued or running for the company and tax year is returned
+    instead of starting another.
+    """
+    aggregation = T4AggregationService(
+        supabase=get_supabase_client(),
+        user_id=current_user.id,
+        company_id=str(company_id),
+    )
+    if not await aggregation.get_company():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found",
+        )
 
-    return T4GenerationResponse(
-        success=len(errors) == 0,
-        tax_year=tax_year,
-        slips_generated=slips_generated,
-        slips_skipped=slips_skipped,
-        errors=errors,
-        message=f"Generated {slips_generated} T4 slips" + (f", skipped {slips_skipped}" if slips_skipped else ""),
+    params: dict[str, Any] = {"tax_year": tax_year}
+    if request:
+        params.update(request.model_dump(mode="json", exclude={"tax_year"}, exclude_none=True))
+    return await get_job_queue().submit(
+        GENERATE_T4_SLIPS,
+        current_user.id,
+        str(company_id),
+        params,
+        idempotency_key=idempotency_key,
+        concurrency_key=f"t4_generation:{company_id}:{tax_year}",
     )
 
 
@@ -426,7 +411,8 @@ async def generate_t4_summary(
     """
     Generate T4 Summary from existing T4 slips.
 
-    Also generates the T619 XML file for CRA submission.
+    Also generates the T619 XML for CRA submission, split into one stored
+    file per submission when it exceeds T4_XML_MAX_BYTES.
     """
     supabase = get_supabase_client()
 
@@ -473,12 +459,9 @@ async def generate_t4_summary(
     # Generate PDF
     summary_pdf = pdf_generator.generate_t4_summary_pdf(summary, slips)
 
-    # Generate XML
-    summary_xml = xml_generator.generate_xml(summary, slips)
-
     # Save to storage
     pdf_storage_key = None
-    xml_storage_key = None
+    xml_storage_keys: list[str] = []
 
     if storage:
         try:
@@ -487,10 +470,12 @@ async def generate_t4_summary(
                 company_name=company.company_name,
                 tax_year=tax_year,
             )
-            xml_storage_key = await storage.save_t4_xml(
-                xml_content=summary_xml,
+            xml_storage_keys = await _save_t4_xml_submissions(
+                storage,
+                xml_generator,
+                summary,
+                slips,
                 company_name=company.company_name,
-                tax_year=tax_year,
                 payroll_account=company.payroll_account_number,
             )
         except Exception as e:
@@ -498,7 +483,8 @@ async def generate_t4_summary(
 
     # Update summary with storage keys
     summary.pdf_storage_key = pdf_storage_key
-    summary.xml_storage_key = xml_storage_key
+    summary.xml_storage_key = xml_storage_keys[0] if xml_storage_keys else None
+    summary.xml_storage_keys = xml_storage_keys
     summary.generated_at = datetime.now(timezone.utc)
     summary.status = T4Status.GENERATED
 
@@ -551,6 +537,68 @@ async def generate_t4_summary(
     )
 
 
+async def _save_t4_xml_submissions(
+    storage: T4StorageService,
+    xml_generator: T4XMLGenerator,
+    summary: T4Summary,
+    slips: list[T4SlipData],
+    company_name: str,
+    payroll_account: str,
+) -> list[str]:
+    """
+    Write the T619 XML and upload it, one storage object per submission.
+
+    The return is split at T4_XML_MAX_BYTES and each submission streamed to
+    a temporary file, then uploaded from disk, so the XML is never held in
+    memory whole.
+
+    Returns:
+        Storage keys, in slip order
+    """
+    with tempfile.TemporaryDirectory(prefix="t4-xml-") as directory:
+        paths = await asyncio.to_thread(
+            xml_generator.write_submissions, summary, slips, directory
+        )
+        keys = []
+        for part_num, path in enumerate(paths, start=1):
+            keys.append(
+                await storage.save_t4_xml_file(
+                    path,
+                    company_name=company_name,
+                    tax_year=summary.tax_year,
+                    payroll_account=payroll_account,
+                    part=part_num if len(paths) > 1 else None,
+                )
+            )
+    return keys
+
+
+def _xml_part_key(summary_row: Any, part: int) -> tuple[str, int]:
+    """
+    Storage key of one XML submission of a stored summary.
+
+    Returns:
+        (storage key, number of submissions)
+
+    Raises:
+        HTTPException: 404 if the summary has no XML or no such part
+    """
+    keys: list[str] = summary_row.get("xml_storage_keys") or []
+    if not keys and summary_row.get("xml_storage_key"):
+        keys = [summary_row["xml_storage_key"]]
+    if not keys:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="T4 XML not available. Regenerate the summary.",
+        )
+    if part > len(keys):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"T4 XML has {len(keys)} submission(s), part {part} not found",
+        )
+    return keys[part - 1], len(keys)
+
+
 @router.get(
     "/summary/{company_id}/{tax_year}/download-pdf",
     summary="Download T4 Summary PDF",
@@ -627,13 +675,14 @@ async def download_t4_xml(
     company_id: UUID,
     tax_year: int,
     current_user: CurrentUser,
+    part: int = Query(default=1, ge=1, description="Submission number of a split return"),
 ) -> Response:
     """Download T4 XML file for CRA electronic submission."""
     supabase = get_supabase_client()
 
     result = (
         supabase.table("t4_summaries")
-        .select("xml_storage_key")
+        .select("xml_storage_key, xml_storage_keys")
         .eq("company_id", str(company_id))
         .eq("user_id", current_user.id)
         .eq("tax_year", tax_year)
@@ -647,12 +696,7 @@ async def download_t4_xml(
             detail="T4 Summary not found",
         )
 
-    storage_key = result.data.get("xml_storage_key")
-    if not storage_key:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="T4 XML not available",
-        )
+    storage_key, part_count = _xml_part_key(result.data, part)
 
     try:
         storage = get_t4_storage()
@@ -675,6 +719,8 @@ async def download_t4_xml(
 
     account = company_result.data.get("payroll_account_number", "unknown") if company_result.data else "unknown"
     filename = f"T4_{account}_{tax_year}.xml"
+    if part_count > 1:
+        filename = f"T4_{account}_{tax_year}_{part}.xml"
 
     return Response(
         content=xml_bytes,
@@ -699,6 +745,8 @@ async def validate_t4_xml(
     company_id: UUID,
     tax_year: int,
     current_user: CurrentUser,
+    request: Request,
+    part: int = Query(default=1, ge=1, description="Submission number of a split return"),
 ) -> T4ValidationResponse:
     """
     Validate T4 XML structure and content before CRA submission.
@@ -712,14 +760,25 @@ async def validate_t4_xml(
     - TotalSlips matches actual slip count
     - Summary totals match slip totals
 
+    Validates the stored XML for the summary (one submission, by part, when
+    the return was split), or an XML file sent as the request body (Content-Type: application/xml, whole or chunked). The XML
+    is checked as it streams in, so memory does not grow with slip count.
+
     Returns validation result with CRA portal URL for submission.
     """
+    validator = T4XMLValidator()
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(XML_CONTENT_TYPES):
+        validation_result = await validator.validate_async(request.stream())
+        return _validation_response(validation_result)
+
     supabase = get_supabase_client()
 
     # Get XML storage key from summary
     result = (
         supabase.table("t4_summaries")
-        .select("xml_storage_key, status")
+        .select("xml_storage_key, xml_storage_keys, status")
         .eq("company_id", str(company_id))
         .eq("user_id", current_user.id)
         .eq("tax_year", tax_year)
@@ -733,18 +792,14 @@ async def validate_t4_xml(
             detail="T4 Summary not found. Generate the summary first.",
         )
 
-    xml_storage_key = result.data.get("xml_storage_key")
-    if not xml_storage_key:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="T4 XML not available. Regenerate the summary.",
-        )
+    xml_storage_key, _ = _xml_part_key(result.data, part)
 
-    # Get XML content from storage
+    # Validate XML as it downloads from storage
     try:
         storage = get_t4_storage()
-        xml_bytes = await storage.get_file_content(xml_storage_key)
-        xml_content = xml_bytes.decode("utf-8")
+        validation_result = await validator.validate_async(
+            storage.iter_file_content(xml_storage_key)
+        )
     except Exception as e:
         logger.error(f"Failed to retrieve T4 XML for validation: {e}")
         raise HTTPException(
@@ -752,10 +807,11 @@ async def validate_t4_xml(
             detail="Failed to retrieve T4 XML for validation",
         )
 
-    # Validate XML
-    validator = T4XMLValidator()
-    validation_result = validator.validate(xml_content)
+    return _validation_response(validation_result)
+
 
+def _validation_response(validation_result: T4ValidationResult) -> T4ValidationResponse:
+    """Wrap a validation result for the validate endpoint."""
     return T4ValidationResponse(
         success=True,
         validation=validation_result,
@@ -0,0 +1,81 @@
+"""
+Async Database Access - run supabase-py calls off the event loop.
+
+supabase-py's postgrest client is synchronous: ``query.execute()`` blocks the
+calling thread for the whole HTTP round-trip. Called from an ``async def``
+service that thread is the event loop, so one long payroll run stalls every
+other request on the worker. This module runs those calls on a dedicated,
+bounded thread pool instead:
+
+- ``execute(query)`` awaits a single built query
+- ``run_blocking(func, ...)`` awaits a synchronous helper that issues several
+  queries (YTD lookups, result persistence, holiday pay)
+
+The pool is separate from asyncio's default executor (used by PDF rendering
+and storage uploads) and its size caps how many queries are in flight at once
+per process (DB_MAX_CONCURRENCY); further calls queue for a free worker.
+
+Usage:
+    result = await execute(
+        supabase.table("payroll_runs").select("*").eq("id", run_id)
+    )
+    totals = await run_blocking(ytd_calculator.get_prior_ytd_for_employees, ids, run_id)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Get the process-wide database thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, get_config().db_max_concurrency)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+            logger.info("Database thread pool started (%d workers)", workers)
+        return _executor
+
+
+def shutdown_db_executor() -> None:
+    """Shut down the database thread pool (application shutdown)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_blocking(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function on the database thread pool and await its result.
+
+    The caller's context variables (e.g. the request's user token) are
+    visible to func, as with asyncio.to_thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_db_executor(), call)
+
+
+async def execute(query: Any) -> Any:
+    """Execute a supabase-py query builder off the event loop."""
+    return await run_blocking(query.execute)
@@ -48,11 +48,84 @@ class Config(BaseSettings):
     supabase_service_role_key: str | None = Field(
         default=None, validation_alias="SUPABASE_SERVICE_ROLE_KEY"
     )
+    # HTTP connection pool shared by every Supabase client: open connections,
+    # idle connections kept alive, and seconds an idle connection is kept
+    supabase_pool_max_connections: int = Field(
+        default=100, validation_alias="SUPABASE_POOL_MAX_CONNECTIONS"
+    )
+    supabase_pool_max_keepalive: int = Field(
+        default=20, validation_alias="SUPABASE_POOL_MAX_KEEPALIVE"
+    )
+    supabase_pool_keepalive_expiry: float = Field(
+        default=30.0, validation_alias="SUPABASE_POOL_KEEPALIVE_EXPIRY"
+    )
 
     # Encryption Key (for SIN encryption in Phase 1+)
-    # Optional - only needed when storing employee SIN numbers
+    # Optional - only needed when storing employee SIN numbers. To rotate,
+    # list the new key first: "new-key,old-key" (the first key encrypts)
     encryption_key: str | None = Field(default=None, validation_alias="ENCRYPTION_KEY")
 
+    # Threads for bulk SIN encryption/decryption (year-end T4s, key rotation)
+    crypto_max_workers: int = Field(default=4, validation_alias="CRYPTO_MAX_WORKERS")
+
+    # Tax tables: load every year under config/tax_tables/ at startup, or
+    # lazily per year on first use
+    tax_tables_lazy_load: bool = Field(default=False, validation_alias="TAX_TABLES_LAZY_LOAD")
+
+    # Payroll batches at least this large are sharded across worker processes
+    # (0 disables the pool); workers = 0 means one per CPU
+    payroll_parallel_threshold: int = Field(
+        default=500, validation_alias="PAYROLL_PARALLEL_THRESHOLD"
+    )
+    payroll_parallel_workers: int = Field(default=0, validation_alias="PAYROLL_PARALLEL_WORKERS")
+    payroll_parallel_prewarm: bool = Field(
+        default=False, validation_alias="PAYROLL_PARALLEL_PREWARM"
+    )
+    # Recalculated records are staged this many per request, then applied in
+    # one transaction (0 = one UPDATE per record)
+    payroll_persist_chunk_size: int = Field(
+        default=500, validation_alias="PAYROLL_PERSIST_CHUNK_SIZE"
+    )
+    # Calculation results memoized per process by input fingerprint and tax
+    # table version (0 disables the cache)
+    payroll_result_cache_size: int = Field(
+        default=10_000, validation_alias="PAYROLL_RESULT_CACHE_SIZE"
+    )
+    # Prior YTD totals are read from the employee YTD ledger instead of
+    # summing every completed payroll record
+    ytd_ledger_enabled: bool = Field(default=True, validation_alias="YTD_LEDGER_ENABLED")
+    # Paystubs: uploads/DB updates in flight at once, and the run size from
+    # which PDFs are rendered on the payroll process pool (0 = never)
+    paystub_concurrency: int = Field(default=8, validation_alias="PAYSTUB_CONCURRENCY")
+    paystub_render_pool_threshold: int = Field(
+        default=20, validation_alias="PAYSTUB_RENDER_POOL_THRESHOLD"
+    )
+    # T4 slips: uploads in flight at once, and the slip count from which PDFs
+    # are rendered on the payroll process pool (0 = never)
+    t4_concurrency: int = Field(default=8, validation_alias="T4_CONCURRENCY")
+    t4_render_pool_threshold: int = Field(
+        default=20, validation_alias="T4_RENDER_POOL_THRESHOLD"
+    )
+    # Largest T619 XML file written per submission; bigger returns are split
+    # (CRA Internet File Transfer accepts files up to 150 MB)
+    t4_xml_max_bytes: int = Field(
+        default=150 * 1024 * 1024, validation_alias="T4_XML_MAX_BYTES"
+    )
+    # Database calls from async services run on a thread pool of this size,
+    # which also caps the queries in flight per process
+    db_max_concurrency: int = Field(default=16, validation_alias="DB_MAX_CONCURRENCY")
+    # Background jobs: where they are kept ("memory", or "supabase" for the
+    # background_jobs table, which needs SUPABASE_SERVICE_ROLE_KEY), worker
+    # tasks per process, seconds between polls when idle, and retry backoff
+    # (the base delay doubles per attempt, up to the max)
+    job_backend: str = Field(default="memory", validation_alias="JOB_BACKEND")
+    job_workers: int = Field(default=4, validation_alias="JOB_WORKERS")
+    job_poll_interval: float = Field(default=1.0, validation_alias="JOB_POLL_INTERVAL")
+    job_retry_base_delay: float = Field(default=5.0, validation_alias="JOB_RETRY_BASE_DELAY")
+    job_retry_max_delay: float = Field(default=300.0, validation_alias="JOB_RETRY_MAX_DELAY")
+    # A running job not heartbeated for this long is reclaimed by another worker
+    job_lease_seconds: float = Field(default=300.0, validation_alias="JOB_LEASE_SECONDS")
+
     # Frontend URLs
     frontend_url: str = Field(
         default="http://localhost:5174", validation_alias="VITE_FRONTEND_URL"
@@ -1,11 +1,17 @@
 """Security utilities - JWT verification,  encryption"""
 
+import asyncio
+import hashlib
 import logging
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, cast
 
 import httpx
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from jose import JWTError, jwt
 
 from app.core.config import get_config
@@ -16,15 +22,46 @@ logger = logging.getLogger(__name__)
 class SecurityManager:
     """Security manager for JWT verification and encryption"""
 
-    _fernet: Fernet | None = None
+    _fernet: Fernet | MultiFernet | None = None
+    # Fernet for the first (current) key alone; tells rotated tokens apart
+    _primary_fernet: Fernet | None = None
     _jwks_cache: dict[str, Any] | None = None
     _jwks_cache_time: float = 0
     JWKS_CACHE_TTL: int = 3600  # 1 hour
+    JWKS_FETCH_TIMEOUT: float = 10.0
+    # An unknown kid starts a refresh (key rotation) at most this often
+    JWKS_MIN_REFRESH_INTERVAL: int = 30
+    # Longest an async verification waits for the fetch of a key it lacks
+    JWKS_WAIT_TIMEOUT: float = 5.0
+
+    # Single-flight JWKS fetch: the completion event of the fetch in progress
+    _jwks_lock = threading.Lock()
+    _jwks_inflight: threading.Event | None = None
+    _jwks_last_attempt: float = 0
+
+    # Verified token claims by SHA-256 of the token, LRU-bounded; entries
+    # expire at the token's exp or after TOKEN_CACHE_TTL, whichever is first
+    TOKEN_CACHE_TTL: int = 300
+    TOKEN_CACHE_MAX_SIZE: int = 1024
+    _token_cache: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+    _token_cache_lock = threading.Lock()
+    _token_cache_hits: int = 0
+    _token_cache_misses: int = 0
+
+    # Bulk encrypt/decrypt: lists at least this long are split into chunks
+    # run on the crypto thread pool
+    BULK_PARALLEL_THRESHOLD: int = 2000
+    BULK_CHUNK_SIZE: int = 500
+    _crypto_executor: ThreadPoolExecutor | None = None
+    _crypto_executor_lock = threading.Lock()
 
     @classmethod
-    def get_fernet(cls) -> Fernet | None:
+    def get_fernet(cls) -> Fernet | MultiFernet | None:
         """Get Fernet encryption instance (lazy initialization)
 
+        ENCRYPTION_KEY may list several comma-separated keys during key
+        rotation: the first encrypts, any of them decrypts (MultiFernet).
+
         Returns None if ENCRYPTION_KEY is not configured.
         This is expected in Phase 0 - encryption is only needed for SIN storage in Phase 1+.
         """
@@ -32,15 +69,23 @@ class SecurityManager:
             config = get_config()
             if config.encryption_key:
                 try:
-                    cls._fernet = Fernet(config.encryption_key.encode())
-                    logger.info("Fernet encryption initialized")
+                    keys = [k.strip() for k in config.encryption_key.split(",") if k.strip()]
+                    fernets = [Fernet(k.encode()) for k in keys]
+                    cls._primary_fernet = fernets[0]
+                    cls._fernet = fernets[0] if len(fernets) == 1 else MultiFernet(fernets)
+                    logger.info(f"Fernet encryption initialized ({len(fernets)} key(s))")
                 except Exception as e:
                     logger.warning(f"Failed to initialize Fernet: {e}")
         return cls._fernet
 
     @classmethod
     def get_jwks(cls, supabase_url: str) -> dict[str, Any]:
-        """Fetch and cache Supabase JWKS (JSON Web Key Set)
+        """Get cached Supabase JWKS (JSON Web Key Set)
+
+        Stale-while-revalidate: an expired cache is returned immediately while
+        one background fetch refreshes it. Never waits for a fetch: a cold
+        cache starts one fetch and returns no keys until it completes
+        (verify_supabase_jwt_async waits for it off the event loop).
 
         Args:
             supabase_url: Supabase project URL
@@ -48,25 +93,145 @@ class SecurityManager:
         Returns:
             JWKS dictionary with public keys
         """
-        current_time = time.time()
-        if cls._jwks_cache and (current_time - cls._jwks_cache_time) < cls.JWKS_CACHE_TTL:
-            return cls._jwks_cache
+        jwks = cls._jwks_cache
+        if jwks:
+            if (time.time() - cls._jwks_cache_time) >= cls.JWKS_CACHE_TTL:
+                cls.refresh_jwks_in_background(supabase_url)
+            return jwks
 
+        cls.refresh_jwks_in_background(supabase_url)
+        return {"keys": []}
+
+    @classmethod
+    def refresh_jwks_in_background(cls, supabase_url: str) -> threading.Event:
+        """Start a JWKS fetch unless one is already running
+
+        Args:
+            supabase_url: Supabase project URL
+
+        Returns:
+            Event set when the running fetch completes
+        """
+        with cls._jwks_lock:
+            if cls._jwks_inflight is None:
+                done = threading.Event()
+                cls._jwks_inflight = done
+                cls._jwks_last_attempt = time.time()
+                threading.Thread(
+                    target=cls._fetch_jwks,
+                    args=(supabase_url, done),
+                    name="jwks-refresh",
+                    daemon=True,
+                ).start()
+            return cls._jwks_inflight
+
+    @classmethod
+    def _fetch_jwks(cls, supabase_url: str, done: threading.Event) -> None:
+        """Fetch JWKS into the cache; on failure the previous cache is kept."""
         jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
         try:
-            response = httpx.get(jwks_url, timeout=10.0)
+            response = httpx.get(jwks_url, timeout=cls.JWKS_FETCH_TIMEOUT)
             response.raise_for_status()
             cls._jwks_cache = response.json()
-            cls._jwks_cache_time = current_time
+            cls._jwks_cache_time = time.time()
             logger.info(f"JWKS cache refreshed from {jwks_url}")
-            return cls._jwks_cache
         except Exception as e:
             logger.error(f"Failed to fetch JWKS: {e}")
-            # Return cached version if available, even if expired
             if cls._jwks_cache:
                 logger.warning("Using expired JWKS cache")
-                return cls._jwks_cache
-            return {"keys": []}
+        finally:
+            with cls._jwks_lock:
+                cls._jwks_inflight = None
+            done.set()
+
+    @classmethod
+    def _find_jwks_key(cls, supabase_url: str, kid: str | None) -> dict[str, Any] | None:
+        """JWKS key for kid from the cache, without waiting for a fetch.
+
+        An unknown kid (key rotation) starts a background refresh, at most
+        once per JWKS_MIN_REFRESH_INTERVAL, and returns None: the token is
+        rejected now and accepted once the client retries after the refresh
+        (verify_supabase_jwt_async waits for the refresh first).
+        """
+        for k in cls.get_jwks(supabase_url).get("keys", []):
+            if k.get("kid") == kid:
+                return cast(dict[str, Any], k)
+
+        if (time.time() - cls._jwks_last_attempt) >= cls.JWKS_MIN_REFRESH_INTERVAL:
+            cls.refresh_jwks_in_background(supabase_url)
+        return None
+
+    @classmethod
+    def _jwks_fetch_to_await(cls, supabase_url: str, kid: str | None) -> threading.Event | None:
+        """The JWKS fetch a token with this kid should wait for, if any.
+
+        None when the key is cached. A cold cache always gets a fetch; an
+        unknown kid on a warm cache joins a running fetch or starts one at
+        most once per JWKS_MIN_REFRESH_INTERVAL, so tokens with made-up kids
+        cannot force a fetch per request.
+        """
+        jwks = cls._jwks_cache
+        keys = jwks.get("keys", []) if jwks else []
+        if any(k.get("kid") == kid for k in keys):
+            return None
+
+        with cls._jwks_lock:
+            inflight = cls._jwks_inflight
+        if inflight is not None:
+            return inflight
+        if not keys or (time.time() - cls._jwks_last_attempt) >= cls.JWKS_MIN_REFRESH_INTERVAL:
+            return cls.refresh_jwks_in_background(supabase_url)
+        return None
+
+    @classmethod
+    def _cached_claims(cls, token_hash: str) -> dict[str, Any] | None:
+        """Verified claims for a token hash, if cached and not expired."""
+        with cls._token_cache_lock:
+            entry = cls._token_cache.get(token_hash)
+            if entry is not None:
+                payload, expires_at = entry
+                if time.time() < expires_at:
+                    cls._token_cache.move_to_end(token_hash)
+                    cls._token_cache_hits += 1
+                    return dict(payload)
+                del cls._token_cache[token_hash]
+            cls._token_cache_misses += 1
+            return None
+
+    @classmethod
+    def _cache_claims(cls, token_hash: str, payload: dict[str, Any]) -> None:
+        """Cache verified claims until exp (tokens without exp are not cached)."""
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        expires_at = min(float(exp), time.time() + cls.TOKEN_CACHE_TTL)
+        with cls._token_cache_lock:
+            cls._token_cache[token_hash] = (dict(payload), expires_at)
+            cls._token_cache.move_to_end(token_hash)
+            while len(cls._token_cache) > cls.TOKEN_CACHE_MAX_SIZE:
+                cls._token_cache.popitem(last=False)
+
+    @classmethod
+    def clear_token_cache(cls) -> None:
+        """Drop all cached token claims and reset counters."""
+        with cls._token_cache_lock:
+            cls._token_cache.clear()
+            cls._token_cache_hits = 0
+            cls._token_cache_misses = 0
+
+    @classmethod
+    def token_cache_stats(cls) -> dict[str, Any]:
+        """Snapshot of the verified-token cache for monitoring."""
+        with cls._token_cache_lock:
+            hits, misses = cls._token_cache_hits, cls._token_cache_misses
+            return {
+                "size": len(cls._token_cache),
+                "max_size": cls.TOKEN_CACHE_MAX_SIZE,
+                "ttl_seconds": cls.TOKEN_CACHE_TTL,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            }
 
     @classmethod
     def verify_supabase_jwt(cls, token: str) -> dict[str, Any] | None:
@@ -75,12 +240,20 @@ class SecurityManager:
         Supports both HS256 (symmetric, using JWT secret) and ES256/RS256
         (asymmetric, using JWKS public keys).
 
+        Verified claims are cached by token hash until the token expires, so
+        repeated requests with the same session token skip verification.
+
         Args:
             token: JWT access token from Supabase Auth
 
         Returns:
             Decoded token payload or None if invalid
         """
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        cached = cls._cached_claims(token_hash)
+        if cached is not None:
+            return cached
+
         config = get_config()
 
         try:
@@ -99,14 +272,7 @@ class SecurityManager:
             elif alg in ("ES256", "RS256"):
                 # Use JWKS public key for asymmetric verification
                 kid = unverified_header.get("kid")
-                jwks = cls.get_jwks(config.supabase_url)
-
-                # Find matching key by kid
-                key = None
-                for k in jwks.get("keys", []):
-                    if k.get("kid") == kid:
-                        key = k
-                        break
+                key = cls._find_jwks_key(config.supabase_url, kid)
 
                 if not key:
                     logger.warning(f"No matching JWKS key found for kid: {kid}")
@@ -122,11 +288,39 @@ class SecurityManager:
                 logger.warning(f"Unsupported JWT algorithm: {alg}")
                 return None
 
+            cls._cache_claims(token_hash, payload)
             return cast(dict[str, Any], payload)
         except JWTError as e:
             logger.warning(f"JWT verification failed: {e}")
             return None
 
+    @classmethod
+    async def verify_supabase_jwt_async(cls, token: str) -> dict[str, Any] | None:
+        """Verify a Supabase JWT token from the event loop
+
+        Same as verify_supabase_jwt, except that an ES256/RS256 token whose
+        key is not cached yet (the startup warm-up has not finished, or the
+        key was rotated) waits up to JWKS_WAIT_TIMEOUT for the single-flight
+        JWKS fetch, in a worker thread, instead of being rejected.
+
+        Args:
+            token: JWT access token from Supabase Auth
+
+        Returns:
+            Decoded token payload or None if invalid
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            header = {}
+
+        if header.get("alg") in ("ES256", "RS256"):
+            fetch = cls._jwks_fetch_to_await(get_config().supabase_url, header.get("kid"))
+            if fetch is not None:
+                await asyncio.to_thread(fetch.wait, cls.JWKS_WAIT_TIMEOUT)
+
+        return cls.verify_supabase_jwt(token)
+
     @classmethod
     def encrypt(cls, data: str) -> str | None:
         """Encrypt sensitive data using Fernet
@@ -169,6 +363,144 @@ class SecurityManager:
             logger.error(f"Decryption failed: {e}")
             return None
 
+    @classmethod
+    def encrypt_many(cls, values: Sequence[str]) -> list[str | None]:
+        """Encrypt a list of values (bulk counterpart of encrypt)
+
+        Args:
+            values: Plain text values
+
+        Returns:
+            Encrypted values in input order; None for values that failed, or
+            for all of them if encryption is not configured
+        """
+        fernet = cls.get_fernet()
+        if fernet is None:
+            logger.warning("Encryption key not configured")
+            return [None] * len(values)
+
+        def encrypt_chunk(chunk: Sequence[str]) -> list[str | None]:
+            out: list[str | None] = []
+            for value in chunk:
+                try:
+                    out.append(fernet.encrypt(value.encode()).decode())
+                except Exception:
+                    out.append(None)
+            return out
+
+        return cls._run_bulk("Encrypted", encrypt_chunk, values)
+
+    @classmethod
+    def decrypt_many(cls, values: Sequence[str | None]) -> list[str | None]:
+        """Decrypt a list of Fernet tokens (bulk counterpart of decrypt)
+
+        Args:
+            values: Encrypted strings; empty values are skipped
+
+        Returns:
+            Decrypted values in input order; None for values that are empty
+            or fail to decrypt
+        """
+        fernet = cls.get_fernet()
+        if fernet is None:
+            logger.warning("Encryption key not configured")
+            return [None] * len(values)
+
+        def decrypt_chunk(chunk: Sequence[str | None]) -> list[str | None]:
+            out: list[str | None] = []
+            for value in chunk:
+                try:
+                    out.append(fernet.decrypt(value.encode()).decode() if value else None)
+                except Exception:
+                    out.append(None)
+            return out
+
+        return cls._run_bulk("Decrypted", decrypt_chunk, values)
+
+    @classmethod
+    def rotate_many(cls, values: Sequence[str]) -> list[str | None]:
+        """Re-encrypt tokens under the current (first) key
+
+        Args:
+            values: Encrypted strings under any configured key
+
+        Returns:
+            Per input: a new token if it was encrypted under an older key,
+            the input itself if already under the current key, or None if
+            it does not decrypt under any key
+        """
+        fernet = cls.get_fernet()
+        primary = cls._primary_fernet
+        if fernet is None or primary is None:
+            logger.warning("Encryption key not configured")
+            return [None] * len(values)
+
+        def rotate_chunk(chunk: Sequence[str]) -> list[str | None]:
+            out: list[str | None] = []
+            for value in chunk:
+                token = value.encode()
+                try:
+                    primary.decrypt(token)
+                    out.append(value)
+                    continue
+                except InvalidToken:
+                    pass
+                try:
+                    # MultiFernet.rotate; a single Fernet has no older key
+                    rotated = fernet.rotate(token) if isinstance(fernet, MultiFernet) else None
+                    out.append(rotated.decode() if rotated else None)
+                except InvalidToken:
+                    out.append(None)
+            return out
+
+        return cls._run_bulk("Rotated", rotate_chunk, values)
+
+    @classmethod
+    def _run_bulk(
+        cls,
+        action: str,
+        func: Callable[[Sequence[Any]], list[str | None]],
+        values: Sequence[Any],
+    ) -> list[str | None]:
+        """Apply a per-chunk crypto function, across the thread pool if large."""
+        started = time.perf_counter()
+        if len(values) < cls.BULK_PARALLEL_THRESHOLD:
+            results = func(values)
+        else:
+            size = cls.BULK_CHUNK_SIZE
+            chunks = [values[i : i + size] for i in range(0, len(values), size)]
+            results = [v for part in cls.get_crypto_executor().map(func, chunks) for v in part]
+
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for r, v in zip(results, values, strict=True) if r is None and v)
+        if failed:
+            logger.error(f"{action} {len(values)} values: {failed} failed")
+        if len(values) >= cls.BULK_PARALLEL_THRESHOLD:
+            logger.info(
+                f"{action} {len(values)} values in {elapsed:.2f}s "
+                f"({len(values) / max(elapsed, 1e-9):,.0f}/s)"
+            )
+        return results
+
+    @classmethod
+    def get_crypto_executor(cls) -> ThreadPoolExecutor:
+        """Get the bulk crypto thread pool, creating it on first use."""
+        with cls._crypto_executor_lock:
+            if cls._crypto_executor is None:
+                workers = max(1, get_config().crypto_max_workers)
+                cls._crypto_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="crypto"
+                )
+            return cls._crypto_executor
+
+    @classmethod
+    def shutdown_crypto_executor(cls) -> None:
+        """Shut down the bulk crypto thread pool (application shutdown)."""
+        with cls._crypto_executor_lock:
+            executor, cls._crypto_executor = cls._crypto_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
 
 # Convenience functions
 def verify_supabase_jwt(token: str) -> dict[str, Any] | None:
@@ -176,6 +508,11 @@ def verify_supabase_jwt(token: str) -> dict[str, Any] | None:
     return SecurityManager.verify_supabase_jwt(token)
 
 
+async def verify_supabase_jwt_async(token: str) -> dict[str, Any] | None:
+    """Verify a Supabase JWT token, waiting briefly for an uncached JWKS key"""
+    return await SecurityManager.verify_supabase_jwt_async(token)
+
+
 def encrypt_sin(sin: str) -> str | None:
     """Encrypt a SIN number"""
     return SecurityManager.encrypt(sin)
@@ -191,11 +528,33 @@ def decrypt_sin(encrypted_sin: str) -> str | None:
     if decrypted:
         return decrypted
 
-    # If decryption fails, check if it's already a plain-text SIN (9 digits)
+    return _plain_text_sin(encrypted_sin)
+
+
+def encrypt_sins(sins: Sequence[str]) -> list[str | None]:
+    """Encrypt a list of SIN numbers"""
+    return SecurityManager.encrypt_many(sins)
+
+
+def decrypt_sins(encrypted_sins: Sequence[str | None]) -> list[str | None]:
+    """Decrypt a list of SIN numbers, in input order.
+
+    Bulk counterpart of decrypt_sin for year-end workloads, with the same
+    plain-text fallback in debug/dev environments.
+    """
+    decrypted = SecurityManager.decrypt_many(encrypted_sins)
+    return [
+        sin if sin or not value else _plain_text_sin(value)
+        for sin, value in zip(decrypted, encrypted_sins, strict=True)
+    ]
+
+
+def _plain_text_sin(value: str) -> str | None:
+    """A plain-text SIN (9 digits) stored unencrypted, accepted in debug mode only."""
     # Only allow this fallback in debug/development environments for safety
     config = get_config()
     if config.debug:
-        clean_sin = encrypted_sin.replace("-", "").replace(" ", "")
+        clean_sin = value.replace("-", "").replace(" ", "")
         if len(clean_sin) == 9 and clean_sin.isdigit():
             logger.warning("Using plain-text SIN - only allowed in debug mode")
             return clean_sin
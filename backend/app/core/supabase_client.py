@@ -1,15 +1,22 @@
 """Supabase Client Singleton"""
 
 import logging
+import threading
 from contextvars import ContextVar
+from typing import Any
+
+import httpx
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
 
 from app.core.config import get_config
-from supabase import Client, create_client
+from supabase import Client, ClientOptions, create_client
 
 logger = logging.getLogger(__name__)
 
 # Context variable to store the current user's JWT token per request
 _current_user_token: ContextVar[str | None] = ContextVar("current_user_token", default=None)
+# Set by background job workers that act for a user without their JWT
+_service_role_context: ContextVar[bool] = ContextVar("service_role_context", default=False)
 
 
 class SupabaseClient:
@@ -18,12 +25,84 @@ class SupabaseClient:
     _instance: Client | None = None
     _admin_instance: Client | None = None
 
+    # One HTTP connection pool behind every client; auth headers are set per
+    # client instance and sent per request, never on the shared pool
+    _http_client: httpx.Client | None = None
+    _http_lock = threading.Lock()
+    _requests_sent = 0
+    _authenticated_clients_created = 0
+
+    @classmethod
+    def get_http_client(cls) -> httpx.Client:
+        """Get or create the shared HTTP client (connection pool)."""
+        with cls._http_lock:
+            if cls._http_client is None:
+                config = get_config()
+                cls._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=config.supabase_pool_max_connections,
+                        max_keepalive_connections=config.supabase_pool_max_keepalive,
+                        keepalive_expiry=config.supabase_pool_keepalive_expiry,
+                    ),
+                    timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+                    follow_redirects=True,
+                    http2=True,
+                    event_hooks={"request": [cls._count_request]},
+                )
+                logger.info(
+                    "Supabase connection pool initialized (max %d, keepalive %d)",
+                    config.supabase_pool_max_connections,
+                    config.supabase_pool_max_keepalive,
+                )
+            return cls._http_client
+
+    @classmethod
+    def _count_request(cls, _request: httpx.Request) -> None:
+        with cls._http_lock:
+            cls._requests_sent += 1
+
+    @classmethod
+    def _client_options(cls) -> ClientOptions:
+        return ClientOptions(httpx_client=cls.get_http_client())
+
+    @classmethod
+    def close_http_client(cls) -> None:
+        """Close the shared connection pool (application shutdown)."""
+        with cls._http_lock:
+            http_client, cls._http_client = cls._http_client, None
+        if http_client is not None:
+            http_client.close()
+
+    @classmethod
+    def pool_stats(cls) -> dict[str, Any]:
+        """Snapshot of the shared connection pool for monitoring."""
+        config = get_config()
+        with cls._http_lock:
+            http_client = cls._http_client
+            stats: dict[str, Any] = {
+                "max_connections": config.supabase_pool_max_connections,
+                "max_keepalive_connections": config.supabase_pool_max_keepalive,
+                "keepalive_expiry": config.supabase_pool_keepalive_expiry,
+                "requests": cls._requests_sent,
+                "authenticated_clients_created": cls._authenticated_clients_created,
+            }
+        connections = _pool_connections(http_client) if http_client is not None else []
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            **stats,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+        }
+
     @classmethod
     def get_client(cls) -> Client:
         """Get or create Supabase client singleton"""
         if cls._instance is None:
             config = get_config()
-            cls._instance = create_client(config.supabase_url, config.supabase_key)
+            cls._instance = create_client(
+                config.supabase_url, config.supabase_key, options=cls._client_options()
+            )
             logger.info("Supabase client initialized")
         return cls._instance
 
@@ -60,6 +139,15 @@ class SupabaseClient:
         """Get the current user's JWT token from request context."""
         return _current_user_token.get()
 
+    @classmethod
+    def use_service_role(cls) -> None:
+        """Use the service role client when no user token is set in this context.
+
+        For background jobs, which run outside any request: their services
+        filter by user_id and company_id themselves, as RLS cannot.
+        """
+        _service_role_context.set(True)
+
     @classmethod
     def get_authenticated_client(cls) -> Client:
         """Get Supabase client with user authentication headers set.
@@ -69,7 +157,9 @@ class SupabaseClient:
 
         IMPORTANT: We create a new client for each authenticated request to avoid
         race conditions where concurrent requests could overwrite each other's
-        auth headers on a shared singleton.
+        auth headers on a shared singleton. The client's headers are its own;
+        only the underlying connection pool (get_http_client) is shared, so
+        requests reuse open TLS connections.
         """
         token = cls.get_user_token()
 
@@ -77,10 +167,16 @@ class SupabaseClient:
             # Create a new client instance for this request to ensure isolation
             # This prevents JWT leaks across concurrent async requests
             config = get_config()
-            authenticated_client = create_client(config.supabase_url, config.supabase_key)
+            authenticated_client = create_client(
+                config.supabase_url, config.supabase_key, options=cls._client_options()
+            )
             authenticated_client.postgrest.auth(token)
+            with cls._http_lock:
+                cls._authenticated_clients_created += 1
             logger.debug("Created isolated authenticated client for request")
             return authenticated_client
+        elif _service_role_context.get() and (admin := cls.get_admin_client()) is not None:
+            return admin
         else:
             # No token - fall back to shared unauthenticated client
             logger.warning("No user token available, using unauthenticated client")
@@ -116,6 +212,12 @@ class SupabaseClient:
             return True
 
 
+def _pool_connections(http_client: httpx.Client) -> list[Any]:
+    """Connections held by an httpx client's pool (empty if not inspectable)."""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    return list(getattr(pool, "connections", []))
+
+
 def get_supabase_client() -> Client:
     """Get Supabase client with user authentication (convenience function)"""
     return SupabaseClient.get_authenticated_client()
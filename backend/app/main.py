@@ -1,5 +1,6 @@
 """FastAPI Application Entry Point"""
 
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -9,8 +10,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app import __version__
-from app.api.v1 import auth, employee_portal, employees, health, overtime, payroll, remittance, t4
+from app.api.v1 import (
+    auth,
+    employee_portal,
+    employees,
+    health,
+    jobs,
+    overtime,
+    payroll,
+    remittance,
+    t4,
+)
 from app.api.v1 import config as config_api
+from app.core.async_db import shutdown_db_executor
 from app.core.config import get_config
 from app.core.exceptions import (
     AuthenticationError,
@@ -19,7 +31,14 @@ from app.core.exceptions import (
     PayrollError,
     ValidationError,
 )
+from app.core.security import SecurityManager
 from app.core.supabase_client import SupabaseClient
+from app.services.jobs import get_job_queue, shutdown_job_queue
+from app.services.payroll.parallel_engine import (
+    shutdown_payroll_process_pool,
+    warm_payroll_process_pool,
+)
+from app.services.payroll.tax_config_repository import get_tax_config_repository
 
 # Get config first to set log level
 _config = get_config()
@@ -50,10 +69,36 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     SupabaseClient.get_client()
     logger.info("Supabase client initialized")
 
+    # Warm the JWKS cache so asymmetric-token requests rarely wait for the fetch
+    SecurityManager.refresh_jwks_in_background(_config.supabase_url)
+
+    # Load tax tables (parallel, off the event loop)
+    if _config.tax_tables_lazy_load:
+        logger.info("Tax tables will load lazily per year")
+    else:
+        stats = await asyncio.to_thread(get_tax_config_repository().preload)
+        logger.info(
+            f"Tax tables loaded for {stats['loaded_years']} "
+            f"in {stats['last_load_seconds'] * 1000:.1f}ms"
+        )
+
+    # Start payroll worker processes now instead of on the first large run
+    if _config.payroll_parallel_prewarm:
+        pids = await asyncio.to_thread(warm_payroll_process_pool)
+        logger.info(f"Payroll process pool warmed ({len(pids)} workers)")
+
+    # Background job workers (approve, recalculate, paystubs, T4 generation)
+    await get_job_queue().start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    await shutdown_job_queue()
+    await asyncio.to_thread(shutdown_payroll_process_pool)
+    await asyncio.to_thread(shutdown_db_executor)
+    await asyncio.to_thread(SecurityManager.shutdown_crypto_executor)
+    SupabaseClient.close_http_client()
 
 
 def create_app() -> FastAPI:
@@ -137,6 +182,7 @@ def create_app() -> FastAPI:
     app.include_router(remittance.router, prefix="/api/v1/remittance", tags=["Remittance"])
     app.include_router(t4.router, prefix="/api/v1/t4", tags=["T4 Year-End"])
     app.include_router(overtime.router, prefix="/api/v1/overtime", tags=["Overtime"])
+    app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Background Jobs"])
 
     return app
 
@@ -6,6 +6,7 @@ from app.models.compensation import (
     CompensationHistoryCreate,
     CompensationHistoryResponse,
 )
+from app.models.jobs import Job, JobStatus
 from app.models.payroll import (
     CppConfig,
     EiConfig,
@@ -58,6 +59,9 @@ __all__ = [
     "CompensationHistory",
     "CompensationHistoryCreate",
     "CompensationHistoryResponse",
+    # Background job models
+    "Job",
+    "JobStatus",
     # T4 models
     "T4GenerationRequest",
     "T4GenerationResponse",
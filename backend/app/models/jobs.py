@@ -0,0 +1,55 @@
+"""
+Background Job Models
+
+Pydantic models for long-running operations (payroll approval and
+recalculation, paystub sending, T4 generation) run on the job queue.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class JobStatus(str, Enum):
+    """Background job status."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def is_finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class Job(BaseModel):
+    """A queued, running or finished background job."""
+    id: str
+    kind: str = Field(description="Operation, e.g. payroll.approve_run")
+    user_id: str = Field(exclude=True)
+    company_id: str | None = None
+    params: dict[str, Any] = Field(default_factory=dict)
+    idempotency_key: str | None = Field(
+        default=None,
+        description="Client key: submitting it again returns this job",
+    )
+    concurrency_key: str | None = Field(
+        default=None,
+        description="Only one queued or running job may hold this key",
+    )
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int = 1
+    run_after: datetime = Field(description="Not started (or retried) before this time")
+    progress: dict[str, Any] | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
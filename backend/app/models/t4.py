@@ -226,6 +226,8 @@ class T4Summary(BaseModel):
     # Storage locations
     pdf_storage_key: str | None = None
     xml_storage_key: str | None = None
+    # One key per submission when the XML was split; the first is xml_storage_key
+    xml_storage_keys: list[str] = Field(default_factory=list)
     generated_at: datetime | None = None
 
     # CRA Submission tracking
@@ -276,6 +278,13 @@ class T4GenerationRequest(BaseModel):
         default=False,
         description="Whether to regenerate existing T4s"
     )
+    resume_from: datetime | None = Field(
+        default=None,
+        description=(
+            "Resume an interrupted regeneration: slips generated at or after this "
+            "time (the interrupted job's started_at) are skipped"
+        ),
+    )
 
 
 class T4GenerationResponse(BaseModel):
@@ -288,6 +297,35 @@ class T4GenerationResponse(BaseModel):
     message: str | None = None
 
 
+class T4GenerationJobStatus(str, Enum):
+    """Background T4 generation job status."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class T4GenerationProgress(BaseModel):
+    """Progress of a T4 slip generation job (background or in-request)."""
+    job_id: str
+    company_id: UUID
+    user_id: str = Field(exclude=True)
+    tax_year: int
+    status: T4GenerationJobStatus = T4GenerationJobStatus.PENDING
+    render_mode: str = "in_process"  # or "process_pool"
+    slips: int = Field(default=0, description="Slips with payroll data for the year")
+    total: int = Field(default=0, description="Slips to generate after skips")
+    skipped: int = 0
+    rendered: int = 0
+    uploaded: int = 0
+    saved: int = 0
+    failed: int = 0
+    errors: list[dict[str, Any]] = Field(default_factory=list)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    message: str | None = None
+
+
 class T4SlipListResponse(BaseModel):
     """Response for listing T4 slips."""
     tax_year: int
@@ -0,0 +1,29 @@
+"""Background Job Queue Services"""
+
+from app.services.jobs.backends import InMemoryJobBackend, JobBackend, SupabaseJobBackend
+from app.services.jobs.handlers import (
+    APPROVE_RUN,
+    GENERATE_T4_SLIPS,
+    RECALCULATE_RUN,
+    SEND_PAYSTUBS,
+)
+from app.services.jobs.queue import (
+    JobContext,
+    JobQueue,
+    get_job_queue,
+    shutdown_job_queue,
+)
+
+__all__ = [
+    "APPROVE_RUN",
+    "GENERATE_T4_SLIPS",
+    "InMemoryJobBackend",
+    "JobBackend",
+    "JobContext",
+    "JobQueue",
+    "RECALCULATE_RUN",
+    "SEND_PAYSTUBS",
+    "SupabaseJobBackend",
+    "get_job_queue",
+    "shutdown_job_queue",
+]
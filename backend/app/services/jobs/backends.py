@@ -0,0 +1,255 @@
+"""
+Job Queue Backends
+
+Where background jobs are stored and claimed from:
+- InMemoryJobBackend keeps jobs in the process (tests, single instance)
+- SupabaseJobBackend keeps them in the background_jobs table, so queued
+  jobs survive a restart and any instance's workers can claim them
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any, Protocol
+
+from postgrest.exceptions import APIError
+
+from app.core.async_db import execute
+from app.models.jobs import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept by the in-memory backend before the oldest are dropped
+MAX_FINISHED_JOBS = 1000
+
+# Postgres unique_violation
+UNIQUE_VIOLATION = "23505"
+
+
+class JobBackend(Protocol):
+    """Storage for background jobs."""
+
+    async def create(self, job: Job) -> tuple[Job, bool]:
+        """Store a new job.
+
+        Returns the stored job and True, or - when the user already has a job
+        with the same idempotency key, or an unfinished job with the same
+        concurrency key - that job and False.
+        """
+        ...
+
+    async def get(self, job_id: str) -> Job | None:
+        """Get a job by ID."""
+        ...
+
+    async def claim(
+        self, kinds: Sequence[str], worker_id: str, lease_seconds: float
+    ) -> Job | None:
+        """Mark the next due queued job of one of these kinds running and return it.
+
+        A running job whose worker has not touched it for lease_seconds is
+        considered abandoned and may be claimed again.
+        """
+        ...
+
+    async def save(self, job: Job) -> None:
+        """Write a job's status, attempts, progress, result and error."""
+        ...
+
+    async def touch(self, job_id: str, worker_id: str) -> bool:
+        """Renew a running job's lease; returns whether cancellation was requested."""
+        ...
+
+    async def request_cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job, or flag a running one for its worker to stop."""
+        ...
+
+
+class InMemoryJobBackend:
+    """Jobs held in this process; lost on restart."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs: dict[str, Job] = {}
+        self._lock = asyncio.Lock()
+
+    async def create(self, job: Job) -> tuple[Job, bool]:
+        async with self._lock:
+            for existing in self._jobs.values():
+                if existing.user_id != job.user_id:
+                    continue
+                if job.idempotency_key and existing.idempotency_key == job.idempotency_key:
+                    return existing.model_copy(deep=True), False
+                if (
+                    job.concurrency_key
+                    and existing.concurrency_key == job.concurrency_key
+                    and not existing.status.is_finished
+                ):
+                    return existing.model_copy(deep=True), False
+            self._jobs[job.id] = job.model_copy(deep=True)
+            self._prune()
+            return job, True
+
+    async def get(self, job_id: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        return job.model_copy(deep=True) if job else None
+
+    async def claim(
+        self, kinds: Sequence[str], worker_id: str, lease_seconds: float
+    ) -> Job | None:
+        # Workers live in this process, so no running job is ever abandoned
+        # and there are no leases to reclaim
+        now = datetime.now(timezone.utc)
+        async with self._lock:
+            due = [
+                job for job in self._jobs.values()
+                if job.status == JobStatus.QUEUED and job.kind in kinds and job.run_after <= now
+            ]
+            if not due:
+                return None
+            job = min(due, key=lambda j: (j.run_after, j.created_at))
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.started_at = job.started_at or now
+            return job.model_copy(deep=True)
+
+    async def save(self, job: Job) -> None:
+        async with self._lock:
+            stored = self._jobs.get(job.id)
+            cancel_requested = stored.cancel_requested if stored else False
+            self._jobs[job.id] = job.model_copy(
+                deep=True, update={"cancel_requested": cancel_requested}
+            )
+
+    async def touch(self, job_id: str, worker_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        return bool(job and job.cancel_requested)
+
+    async def request_cancel(self, job_id: str) -> Job | None:
+        async with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == JobStatus.QUEUED:
+                job.status = JobStatus.CANCELLED
+                job.finished_at = datetime.now(timezone.utc)
+            elif job.status == JobStatus.RUNNING:
+                job.cancel_requested = True
+            return job.model_copy(deep=True)
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status.is_finished]
+        excess = len(finished) - self.max_finished
+        if excess > 0:
+            finished.sort(key=lambda j: j.finished_at or j.created_at)
+            for job in finished[:excess]:
+                del self._jobs[job.id]
+
+
+class SupabaseJobBackend:
+    """Jobs in the background_jobs table, claimed with FOR UPDATE SKIP LOCKED.
+
+    Uses the service role client: workers read and write jobs of every user.
+    """
+
+    TABLE = "background_jobs"
+
+    # Columns written by save(); cancel_requested is only set by request_cancel
+    SAVED_FIELDS = (
+        "status", "attempts", "run_after", "progress", "result", "error",
+        "started_at", "finished_at",
+    )
+
+    def __init__(self, supabase: Any):
+        self.supabase = supabase
+
+    async def create(self, job: Job) -> tuple[Job, bool]:
+        # user_id is excluded from API output, so add it back for storage
+        row = {**job.model_dump(mode="json"), "user_id": job.user_id}
+        try:
+            result = await execute(self.supabase.table(self.TABLE).insert(row))
+            return self._to_job(result.data[0]), True
+        except APIError as e:
+            if e.code != UNIQUE_VIOLATION:
+                raise
+        # Lost to an existing job holding the idempotency or concurrency key
+        existing = await self._find_existing(job)
+        if existing is None:
+            raise ValueError("Job conflicts with one that no longer exists; retry")
+        return existing, False
+
+    async def get(self, job_id: str) -> Job | None:
+        result = await execute(
+            self.supabase.table(self.TABLE).select("*").eq("id", job_id).maybe_single()
+        )
+        return self._to_job(result.data) if result and result.data else None
+
+    async def claim(
+        self, kinds: Sequence[str], worker_id: str, lease_seconds: float
+    ) -> Job | None:
+        result = await execute(
+            self.supabase.rpc(
+                "claim_background_job",
+                {
+                    "p_kinds": list(kinds),
+                    "p_worker": worker_id,
+                    "p_lease_seconds": int(lease_seconds),
+                },
+            )
+        )
+        rows = result.data or []
+        return self._to_job(rows[0]) if rows else None
+
+    async def save(self, job: Job) -> None:
+        row = job.model_dump(mode="json", include=set(self.SAVED_FIELDS))
+        if job.status.is_finished or job.status == JobStatus.QUEUED:
+            row["locked_by"] = None
+            row["locked_at"] = None
+        await execute(self.supabase.table(self.TABLE).update(row).eq("id", job.id))
+
+    async def touch(self, job_id: str, worker_id: str) -> bool:
+        result = await execute(
+            self.supabase.table(self.TABLE)
+            .update({"locked_at": datetime.now(timezone.utc).isoformat()})
+            .eq("id", job_id)
+            .eq("locked_by", worker_id)
+        )
+        rows = result.data or []
+        return bool(rows and rows[0].get("cancel_requested"))
+
+    async def request_cancel(self, job_id: str) -> Job | None:
+        table = self.supabase.table(self.TABLE)
+        await execute(
+            table.update({
+                "status": JobStatus.CANCELLED.value,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            }).eq("id", job_id).eq("status", JobStatus.QUEUED.value)
+        )
+        await execute(
+            table.update({"cancel_requested": True})
+            .eq("id", job_id)
+            .eq("status", JobStatus.RUNNING.value)
+        )
+        return await self.get(job_id)
+
+    async def _find_existing(self, job: Job) -> Job | None:
+        query = self.supabase.table(self.TABLE).select("*").eq("user_id", job.user_id)
+        if job.idempotency_key:
+            query = query.eq("idempotency_key", job.idempotency_key)
+        else:
+            query = query.eq("concurrency_key", job.concurrency_key).in_(
+                "status", [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+            )
+        result = await execute(query.limit(1))
+        rows = result.data or []
+        if not rows and job.idempotency_key and job.concurrency_key:
+            # The key collision was on the concurrency key
+            return await self._find_existing(job.model_copy(update={"idempotency_key": None}))
+        return self._to_job(rows[0]) if rows else None
+
+    def _to_job(self, row: dict[str, Any]) -> Job:
+        return Job.model_validate(row)
+
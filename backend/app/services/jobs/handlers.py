@@ -0,0 +1,98 @@
+"""
+Background Job Handlers
+
+The operations exposed as background jobs. Each handler takes a JobContext
+and returns the operation's result as a JSON-serializable dict.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from app.core.supabase_client import get_supabase_client
+from app.services.payroll_run_service import get_payroll_run_service
+from app.services.t4.aggregation_service import T4AggregationService
+from app.services.t4.slip_generation_service import T4SlipGenerationService
+from app.services.t4.storage_service import get_t4_storage
+
+if TYPE_CHECKING:
+    from app.services.jobs.queue import JobContext, JobQueue
+
+logger = logging.getLogger(__name__)
+
+RECALCULATE_RUN = "payroll.recalculate_run"
+APPROVE_RUN = "payroll.approve_run"
+SEND_PAYSTUBS = "payroll.send_paystubs"
+GENERATE_T4_SLIPS = "t4.generate_slips"
+
+
+def register_default_handlers(queue: JobQueue) -> None:
+    """Register every built-in job kind."""
+    queue.register(RECALCULATE_RUN, recalculate_run, max_attempts=3)
+    queue.register(APPROVE_RUN, approve_run, max_attempts=3)
+    # Emails already sent would go out again on a retry
+    queue.register(SEND_PAYSTUBS, send_paystubs, max_attempts=1)
+    queue.register(GENERATE_T4_SLIPS, generate_t4_slips, max_attempts=3)
+
+
+async def recalculate_run(ctx: JobContext) -> dict[str, Any]:
+    """Recalculate the changed records of a draft payroll run."""
+    service = get_payroll_run_service(ctx.job.user_id, ctx.job.company_id or "")
+    return await service.recalculate_run(UUID(ctx.params["run_id"]))
+
+
+async def approve_run(ctx: JobContext) -> dict[str, Any]:
+    """Approve a payroll run, generating and storing its paystubs."""
+    service = get_payroll_run_service(ctx.job.user_id, ctx.job.company_id or "")
+    return await service.approve_run(UUID(ctx.params["run_id"]), approved_by=ctx.job.user_id)
+
+
+async def send_paystubs(ctx: JobContext) -> dict[str, Any]:
+    """Email an approved payroll run's paystubs."""
+    service = get_payroll_run_service(ctx.job.user_id, ctx.job.company_id or "")
+    return await service.send_paystubs(UUID(ctx.params["run_id"]))
+
+
+async def generate_t4_slips(ctx: JobContext) -> dict[str, Any]:
+    """Render, upload and save a tax year's T4 slips, reporting progress."""
+    user_id = ctx.job.user_id
+    company_id = ctx.job.company_id or ""
+    params = ctx.params
+    supabase = get_supabase_client()
+    aggregation = T4AggregationService(supabase=supabase, user_id=user_id, company_id=company_id)
+
+    company = await aggregation.get_company()
+    if not company:
+        raise ValueError("Company not found")
+
+    try:
+        storage = get_t4_storage()
+    except Exception as e:
+        logger.warning(f"Storage not configured: {e}")
+        storage = None
+
+    service = T4SlipGenerationService(
+        supabase=supabase,
+        user_id=user_id,
+        company_id=company_id,
+        aggregation=aggregation,
+        storage=storage,
+    )
+
+    regenerate = bool(params.get("regenerate"))
+    resume_from = datetime.fromisoformat(params["resume_from"]) if params.get("resume_from") else None
+    if regenerate and resume_from is None and ctx.job.attempts > 1:
+        # A retried regeneration keeps the slips its earlier attempts saved
+        resume_from = ctx.job.started_at
+    employee_ids = [UUID(e) for e in params["employee_ids"]] if params.get("employee_ids") else None
+
+    tax_year = int(params["tax_year"])
+    progress = service.new_progress(tax_year)
+    await ctx.track(
+        service.generate(company, tax_year, employee_ids, regenerate, resume_from, progress),
+        lambda: progress.model_dump(mode="json"),
+    )
+    return progress.model_dump(mode="json")
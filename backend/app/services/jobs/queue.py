@@ -0,0 +1,408 @@
+"""
+Background Job Queue
+
+Runs long operations (payroll approval and recalculation, paystub sending,
+T4 generation) on worker tasks in the API process instead of inside the HTTP
+request, which returns 202 with the queued job at once.
+
+- Jobs are stored by a JobBackend: in memory, or the background_jobs table
+  (JOB_BACKEND=supabase) so they survive a restart
+- Submitting the same idempotency key again returns the existing job; an
+  unfinished job holding the same concurrency key is returned instead of
+  queueing a second one
+- A handler raising ValueError (a business rule, e.g. the run is not in
+  draft) fails the job; any other error is retried after
+  JOB_RETRY_BASE_DELAY * 2^(attempt - 1) seconds, up to the kind's max_attempts
+- Cancelling a queued job drops it; a running one has its task cancelled
+  (via the lease heartbeat when another instance runs it)
+
+Handlers run with the submitting user's JWT when it was captured at submit
+(kept in memory only, never stored) and has not expired by the time the
+attempt starts, else with the service role client; handlers filter by the
+job's user_id and company_id either way.
+
+Usage:
+    queue = get_job_queue()
+    await queue.start()                                   # app startup
+    job = await queue.submit(
+        "payroll.approve_run", user_id, company_id, {"run_id": str(run_id)},
+        idempotency_key=key,
+    )
+    job = await queue.get(job.id)
+    await shutdown_job_queue()                            # app shutdown
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+
+from jose import JWTError, jwt
+
+from app.core.config import get_config
+from app.core.exceptions import ConfigurationError
+from app.core.supabase_client import SupabaseClient, get_supabase_admin_client
+from app.models.jobs import Job, JobStatus
+from app.services.jobs.backends import InMemoryJobBackend, JobBackend, SupabaseJobBackend
+from app.services.jobs.handlers import register_default_handlers
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress snapshots published by JobContext.track
+PROGRESS_INTERVAL = 1.0
+
+# A captured JWT is used only while it has this many seconds left, so it
+# does not expire part-way through an attempt
+TOKEN_EXPIRY_MARGIN = 60.0
+
+JobHandler = Callable[["JobContext"], Awaitable[dict[str, Any] | None]]
+
+
+@dataclass
+class JobKind:
+    """A registered job kind."""
+    handler: JobHandler
+    max_attempts: int
+
+
+class JobContext:
+    """The running job as seen by its handler."""
+
+    def __init__(self, job: Job, backend: JobBackend):
+        self.job = job
+        self._backend = backend
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return self.job.params
+
+    async def report(self, progress: dict[str, Any]) -> None:
+        """Publish the job's progress."""
+        self.job.progress = progress
+        try:
+            await self._backend.save(self.job)
+        except Exception as e:
+            logger.warning(f"Could not save progress of job {self.job.id}: {e}")
+
+    async def track(
+        self,
+        awaitable: Awaitable[Any],
+        snapshot: Callable[[], dict[str, Any]],
+        interval: float = PROGRESS_INTERVAL,
+    ) -> Any:
+        """Await an operation, publishing snapshot() every interval until it ends."""
+        task = asyncio.ensure_future(awaitable)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=interval)
+                if done:
+                    return task.result()
+                await self.report(snapshot())
+        finally:
+            task.cancel()
+
+
+class JobQueue:
+    """Job submission, lookup and cancellation, plus the worker tasks."""
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        retry_base_delay: float = 5.0,
+        retry_max_delay: float = 300.0,
+        lease_seconds: float = 300.0,
+    ):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.lease_seconds = lease_seconds
+        # Leases are renewed (and cancel requests picked up) this often
+        self.heartbeat_interval = min(lease_seconds / 3, poll_interval * 5)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+        self._kinds: dict[str, JobKind] = {}
+        self._workers: list[asyncio.Task[None]] = []
+        self._running: dict[str, asyncio.Task[Any]] = {}
+        # Submitting users' JWTs by job ID; in memory only, never stored
+        self._tokens: dict[str, str] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+        self._counts = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retried": 0,
+            "cancelled": 0,
+        }
+
+    def register(self, kind: str, handler: JobHandler, max_attempts: int = 3) -> None:
+        """Register the handler of a job kind.
+
+        Args:
+            kind: Job kind, e.g. payroll.approve_run
+            handler: Coroutine taking a JobContext; its dict return is the result
+            max_attempts: Runs before a failing job is given up (1 = no retry)
+        """
+        self._kinds[kind] = JobKind(handler=handler, max_attempts=max(1, max_attempts))
+
+    async def submit(
+        self,
+        kind: str,
+        user_id: str,
+        company_id: str | None = None,
+        params: dict[str, Any] | None = None,
+        idempotency_key: str | None = None,
+        concurrency_key: str | None = None,
+    ) -> Job:
+        """Queue a job.
+
+        Returns:
+            The new job, or the existing one holding the idempotency key or
+            (while unfinished) the concurrency key
+
+        Raises:
+            ValueError: If the kind is not registered
+        """
+        if kind not in self._kinds:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        now = datetime.now(timezone.utc)
+        job = Job(
+            id=str(uuid4()),
+            kind=kind,
+            user_id=user_id,
+            company_id=company_id,
+            params=params or {},
+            idempotency_key=idempotency_key,
+            concurrency_key=concurrency_key,
+            max_attempts=self._kinds[kind].max_attempts,
+            run_after=now,
+            created_at=now,
+        )
+        job, created = await self.backend.create(job)
+        if not created:
+            self._counts["deduplicated"] += 1
+            return job
+
+        self._counts["submitted"] += 1
+        token = SupabaseClient.get_user_token()
+        if token:
+            self._tokens[job.id] = token
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        """Get a job by ID."""
+        return await self.backend.get(job_id)
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job, or stop a running one.
+
+        Returns:
+            The job (a running one is cancelled shortly after), or None
+        """
+        job = await self.backend.request_cancel(job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    async def start(self) -> None:
+        """Start the worker tasks (application startup)."""
+        if self._workers:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        logger.info(f"Job queue started: {self.workers} workers ({self.worker_id})")
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are queued again."""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeup = None
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of the queue for monitoring."""
+        return {
+            "backend": type(self.backend).__name__,
+            "workers": len(self._workers),
+            "running": len(self._running),
+            "kinds": sorted(self._kinds),
+            **self._counts,
+        }
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds before retrying a job that has failed attempts times."""
+        return float(min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1)))
+
+    async def _work(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            # Cleared before claiming, so a submit during the claim is not missed
+            self._wakeup.clear()
+            try:
+                job = await self.backend.claim(list(self._kinds), self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Failed to claim a job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        kind = self._kinds[job.kind]
+        task = asyncio.create_task(self._call(kind.handler, JobContext(job, self.backend)))
+        self._running[job.id] = task
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, task))
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                # Shutdown: hand the job back without using up an attempt
+                job.status = JobStatus.QUEUED
+                job.attempts -= 1
+                job.run_after = datetime.now(timezone.utc)
+                await self._save(job)
+                raise
+            job.status = JobStatus.CANCELLED
+            self._counts["cancelled"] += 1
+        except ValueError as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            self._counts["failed"] += 1
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {e}")
+            job.error = str(e) or type(e).__name__
+            if job.attempts < job.max_attempts:
+                job.status = JobStatus.QUEUED
+                job.run_after = datetime.now(timezone.utc) + timedelta(
+                    seconds=self.retry_delay(job.attempts)
+                )
+                self._counts["retried"] += 1
+            else:
+                job.status = JobStatus.FAILED
+                self._counts["failed"] += 1
+        else:
+            job.status = JobStatus.SUCCEEDED
+            job.result = result
+            job.error = None
+            self._counts["succeeded"] += 1
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job.id, None)
+
+        if job.status.is_finished:
+            job.finished_at = datetime.now(timezone.utc)
+            self._tokens.pop(job.id, None)
+        await self._save(job)
+
+    async def _call(self, handler: JobHandler, context: JobContext) -> dict[str, Any] | None:
+        # Runs in its own task, so the auth context stays with this job
+        token = self._tokens.get(context.job.id)
+        if token and not _token_usable(token):
+            # Expired since submit (a late retry or a long queue): PostgREST
+            # would answer 401, so this and later attempts use the service role
+            logger.info(f"Job {context.job.id}: submitter's token expired, using service role")
+            self._tokens.pop(context.job.id, None)
+            token = None
+        if token:
+            SupabaseClient.set_user_token(token)
+        else:
+            SupabaseClient.use_service_role()
+        return await handler(context)
+
+    async def _heartbeat(self, job_id: str, task: asyncio.Task[Any]) -> None:
+        while not task.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if await self.backend.touch(job_id, self.worker_id):
+                    task.cancel()
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew the lease of job {job_id}: {e}")
+
+    async def _save(self, job: Job) -> None:
+        try:
+            await self.backend.save(job)
+        except Exception as e:
+            logger.error(f"Could not save job {job.id} ({job.status.value}): {e}")
+
+
+def _token_usable(token: str) -> bool:
+    """Whether a captured JWT has more than TOKEN_EXPIRY_MARGIN seconds left.
+
+    The token was verified when the job was submitted, so only its exp
+    claim is read here.
+    """
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return False
+    return isinstance(exp, (int, float)) and exp - time.time() > TOKEN_EXPIRY_MARGIN
+
+
+def _create_backend() -> JobBackend:
+    config = get_config()
+    if config.job_backend == "memory":
+        return InMemoryJobBackend()
+    if config.job_backend == "supabase":
+        admin = get_supabase_admin_client()
+        if admin is None:
+            raise ConfigurationError("JOB_BACKEND=supabase requires SUPABASE_SERVICE_ROLE_KEY")
+        return SupabaseJobBackend(admin)
+    raise ConfigurationError(f"Unknown JOB_BACKEND: {config.job_backend}")
+
+
+# Process-wide queue, created on first use
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue with the default handlers registered."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            config = get_config()
+            _queue = JobQueue(
+                _create_backend(),
+                workers=config.job_workers,
+                poll_interval=config.job_poll_interval,
+                retry_base_delay=config.job_retry_base_delay,
+                retry_max_delay=config.job_retry_max_delay,
+                lease_seconds=config.job_lease_seconds,
+            )
+            register_default_handlers(_queue)
+        return _queue
+
+
+async def shutdown_job_queue() -> None:
+    """Stop the job queue's workers (application shutdown)."""
+    global _queue
+    with _queue_lock:
+        queue, _queue = _queue, None
+    if queue is not None:
+        await queue.stop()
@@ -4,9 +4,14 @@ Payroll Services Module
 Contains tax calculation services, payroll processing, and related utilities.
 """
 
+from app.services.payroll.calculator_registry import (
+    CalculatorRegistry,
+    get_calculator_registry,
+)
 from app.services.payroll.cpp_calculator import CPPCalculator, CppContribution
 from app.services.payroll.ei_calculator import EICalculator, EiPremium
 from app.services.payroll.federal_tax_calculator import FederalTaxCalculator, FederalTaxResult
+from app.services.payroll.parallel_engine import ParallelPayrollEngine
 from app.services.payroll.payroll_engine import (
     EmployeePayrollInput,
     PayrollCalculationResult,
@@ -18,6 +23,10 @@ from app.services.payroll.provincial_tax_calculator import (
     ProvincialTaxCalculator,
     ProvincialTaxResult,
 )
+from app.services.payroll.result_cache import (
+    PayrollResultCache,
+    get_payroll_result_cache,
+)
 from app.services.payroll.sick_leave_config_loader import (
     SickLeaveConfigLoader,
     get_provinces_with_paid_sick_leave,
@@ -39,7 +48,12 @@ from app.services.payroll.sick_leave_service import (
     SickLeaveService,
     SickPayResult,
 )
+from app.services.payroll.tax_config_repository import (
+    TaxConfigRepository,
+    get_tax_config_repository,
+)
 from app.services.payroll.tax_tables import (
+    TaxTableSnapshot,
     calculate_dynamic_bpa,
     find_tax_bracket,
     get_all_provinces,
@@ -47,6 +61,7 @@ from app.services.payroll.tax_tables import (
     get_ei_config,
     get_federal_config,
     get_province_config,
+    get_tax_snapshot,
     validate_tax_tables,
 )
 
@@ -60,6 +75,10 @@ __all__ = [
     "find_tax_bracket",
     "calculate_dynamic_bpa",
     "validate_tax_tables",
+    "get_tax_snapshot",
+    "TaxTableSnapshot",
+    "TaxConfigRepository",
+    "get_tax_config_repository",
     # Calculators
     "CPPCalculator",
     "CppContribution",
@@ -71,6 +90,11 @@ __all__ = [
     "ProvincialTaxResult",
     # Engine
     "PayrollEngine",
+    "ParallelPayrollEngine",
+    "CalculatorRegistry",
+    "get_calculator_registry",
+    "PayrollResultCache",
+    "get_payroll_result_cache",
     "EmployeePayrollInput",
     "PayrollCalculationResult",
     # Paystub
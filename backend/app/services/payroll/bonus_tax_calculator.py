@@ -19,7 +19,6 @@ from decimal import ROUND_HALF_UP, Decimal
 
 from app.services.payroll.federal_tax_calculator import FederalTaxCalculator
 from app.services.payroll.provincial_tax_calculator import ProvincialTaxCalculator
-from app.services.payroll.tax_tables import find_tax_bracket
 
 logger = logging.getLogger(__name__)
 
@@ -144,7 +143,7 @@ class BonusTaxCalculator:
         """
         Calculate annual federal tax (raw, unrounded T1) with K2 override.
         """
-        rate, constant = find_tax_bracket(annual_taxable_income, self.federal_calc.brackets)
+        rate, constant = self.federal_calc.table.find_bracket(annual_taxable_income)
         k1 = self.federal_calc.calculate_k1(total_claim_amount)
         k4 = self.federal_calc.calculate_k4(annual_taxable_income)
 
@@ -161,7 +160,7 @@ class BonusTaxCalculator:
         """
         Calculate annual provincial tax (raw, unrounded T2) with K2 override.
         """
-        rate, constant = find_tax_bracket(annual_taxable_income, self.provincial_calc.brackets)
+        rate, constant = self.provincial_calc.table.find_bracket(annual_taxable_income)
         k1p = self.provincial_calc.calculate_k1p(total_claim_amount)
         k4p = self.provincial_calc.calculate_k4p(annual_taxable_income)
         k5p = self.provincial_calc.calculate_k5p_alberta(k1p, k2_override)
@@ -205,22 +204,21 @@ class BonusTaxCalculator:
         accounting for CPP/EI credits, F5 deductions, RRSP, and union dues.
         """
         calc = self.federal_calc if is_federal else self.provincial_calc
-        cpp_config = calc._cpp_config
-        ei_config = calc._ei_config
+        cpp_table = calc.cpp_table
 
         # 1. Calculate expected annual CPP
-        exemption = Decimal(str(cpp_config["basic_exemption"]))
-        base_rate = Decimal(str(cpp_config["base_rate"]))
+        exemption = cpp_table.basic_exemption
+        base_rate = cpp_table.base_rate
         max_base = calc.max_cpp_credit
 
         annual_cpp_base = max((annual_gross - exemption) * base_rate, Decimal("0"))
         annual_cpp_base = min(annual_cpp_base, max_base)
 
         # 2. Calculate expected annual CPP2
-        ympe = Decimal(str(cpp_config["ympe"]))
-        yampe = Decimal(str(cpp_config["yampe"]))
-        cpp2_rate = Decimal(str(cpp_config["additional_rate"]))
-        max_cpp2 = Decimal(str(cpp_config.get("max_additional_contribution", "396.00")))
+        ympe = cpp_table.ympe
+        yampe = cpp_table.yampe
+        cpp2_rate = cpp_table.additional_rate
+        max_cpp2 = cpp_table.max_additional_contribution
 
         if annual_gross > ympe:
             annual_cpp2 = (min(annual_gross, yampe) - ympe) * cpp2_rate
@@ -234,7 +232,7 @@ class BonusTaxCalculator:
         f5 = f2 + annual_cpp2
 
         # 4. Calculate expected annual EI
-        ei_rate = Decimal(str(ei_config["employee_rate"]))
+        ei_rate = calc.ei_table.employee_rate
         max_ei = calc.max_ei_credit
         annual_ei = min(annual_gross * ei_rate, max_ei)
 
@@ -358,8 +356,8 @@ class BonusTaxCalculator:
                 Decimal("0"),
             )
 
-            cpp_base_rate = Decimal(str(self._cpp_config["base_rate"]))
-            ei_rate = Decimal(str(self._ei_config["employee_rate"]))
+            cpp_base_rate = self.federal_calc.cpp_table.base_rate
+            ei_rate = self.federal_calc.ei_table.employee_rate
             ytd_bonus_cpp = self._round(cpp_base_rate * ytd_bonus_earnings)
             ytd_bonus_ei = self._round(ei_rate * ytd_bonus_earnings)
 
@@ -0,0 +1,195 @@
+"""
+Calculator Registry - process-wide cache of payroll calculators.
+
+PayrollEngine instances are short-lived (one per HTTP request or payroll run),
+so per-instance calculator dicts were rebuilt constantly. The registry keeps
+one bounded LRU per process, keyed by (kind, year, edition, province,
+pay_periods), and every engine draws from it.
+
+Calculators are read-only after construction, so sharing them between
+engines and threads is safe.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, TypeVar
+
+from app.services.payroll.bonus_tax_calculator import BonusTaxCalculator
+from app.services.payroll.cpp_calculator import CPPCalculator
+from app.services.payroll.ei_calculator import EICalculator
+from app.services.payroll.federal_tax_calculator import FederalTaxCalculator
+from app.services.payroll.provincial_tax_calculator import ProvincialTaxCalculator
+from app.services.payroll.retroactive_tax_calculator import RetroactiveTaxCalculator
+from app.services.payroll.tax_tables import _resolve_edition
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (kind, year, edition, province, pay_periods)
+RegistryKey = tuple[str, int, str, str, int]
+
+DEFAULT_MAX_SIZE = 1024
+
+
+@dataclass
+class RegistryStats:
+    """Hit/miss counters for one calculator kind."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CalculatorRegistry:
+    """
+    Bounded LRU registry of calculators shared across PayrollEngine instances.
+
+    Tax calculators depend on the pay date only through the T4127 edition
+    (January vs July), so entries are keyed by edition rather than by date.
+
+    Usage:
+        registry = get_calculator_registry()
+        federal = registry.get_federal(2025, 26, pay_date)
+    """
+
+    KINDS = ("cpp", "ei", "federal", "provincial", "bonus", "retroactive")
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initialize registry.
+
+        Args:
+            max_size: Maximum number of calculators kept across all kinds
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._entries: OrderedDict[RegistryKey, Any] = OrderedDict()
+        self._stats: dict[str, RegistryStats] = {kind: RegistryStats() for kind in self.KINDS}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, key: RegistryKey, factory: Callable[[], T]) -> T:
+        """Return cached calculator for key, building it with factory on a miss."""
+        stats = self._stats[key[0]]
+        with self._lock:
+            calculator = self._entries.get(key)
+            if calculator is not None:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return calculator  # type: ignore[no-any-return]
+            stats.misses += 1
+
+        # Build outside the lock; a concurrent miss on the same key just
+        # builds an equivalent calculator and the first insert wins.
+        created = factory()
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing  # type: ignore[no-any-return]
+            self._entries[key] = created
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._stats[evicted_key[0]].evictions += 1
+        return created
+
+    def get_cpp(self, year: int, pay_periods: int) -> CPPCalculator:
+        """Get CPP calculator for year and pay frequency."""
+        return self._get_or_create(
+            ("cpp", year, "", "", pay_periods),
+            lambda: CPPCalculator(pay_periods, year),
+        )
+
+    def get_ei(self, year: int, pay_periods: int) -> EICalculator:
+        """Get EI calculator for year and pay frequency."""
+        return self._get_or_create(
+            ("ei", year, "", "", pay_periods),
+            lambda: EICalculator(pay_periods, year),
+        )
+
+    def get_federal(
+        self, year: int, pay_periods: int, pay_date: date | None = None
+    ) -> FederalTaxCalculator:
+        """Get federal tax calculator for year, pay frequency and edition of pay_date."""
+        return self._get_or_create(
+            ("federal", year, _resolve_edition(year, pay_date), "", pay_periods),
+            lambda: FederalTaxCalculator(pay_periods, year, pay_date),
+        )
+
+    def get_provincial(
+        self, province: str, year: int, pay_periods: int, pay_date: date | None = None
+    ) -> ProvincialTaxCalculator:
+        """Get provincial tax calculator for province, year, pay frequency and edition."""
+        return self._get_or_create(
+            ("provincial", year, _resolve_edition(year, pay_date), province.upper(), pay_periods),
+            lambda: ProvincialTaxCalculator(province, pay_periods, year, pay_date),
+        )
+
+    def get_bonus(
+        self, province: str, year: int, pay_periods: int, pay_date: date | None = None
+    ) -> BonusTaxCalculator:
+        """Get bonus tax calculator for province, year, pay frequency and edition."""
+        return self._get_or_create(
+            ("bonus", year, _resolve_edition(year, pay_date), province.upper(), pay_periods),
+            lambda: BonusTaxCalculator(province, pay_periods, year, pay_date),
+        )
+
+    def get_retroactive(
+        self, province: str, year: int, pay_periods: int, pay_date: date | None = None
+    ) -> RetroactiveTaxCalculator:
+        """Get retroactive pay tax calculator for province, year, pay frequency and edition."""
+        return self._get_or_create(
+            ("retroactive", year, _resolve_edition(year, pay_date), province.upper(), pay_periods),
+            lambda: RetroactiveTaxCalculator(province, pay_periods, year, pay_date),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of size and per-kind hit/miss/eviction counters for monitoring."""
+        with self._lock:
+            by_kind = {
+                kind: {**asdict(s), "hit_rate": round(s.hit_rate, 4)}
+                for kind, s in self._stats.items()
+            }
+            size = len(self._entries)
+        hits = sum(s["hits"] for s in by_kind.values())
+        misses = sum(s["misses"] for s in by_kind.values())
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "by_kind": by_kind,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached calculators and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = {kind: RegistryStats() for kind in self.KINDS}
+
+
+# Singleton pattern for the process-wide registry
+_registry: CalculatorRegistry | None = None
+
+
+def get_calculator_registry() -> CalculatorRegistry:
+    """Get the process-wide calculator registry singleton."""
+    global _registry
+    if _registry is None:
+        _registry = CalculatorRegistry()
+        logger.info(f"Calculator registry created (max_size={_registry.max_size})")
+    return _registry
@@ -0,0 +1,731 @@
+"""
+Columnar Batch Calculator - NumPy integer-cents path for PayrollEngine.calculate_batch.
+
+The per-employee Decimal path does dozens of quantize operations per
+calculation. This module groups inputs by (province, pay_periods, edition)
+and evaluates CPP, CPP2, EI, annual taxable income, bracket lookup, K1-K5P
+and provincial surtaxes as int64 NumPy arrays.
+
+Exactness:
+    Every money value is carried as an exact integer numerator over a known
+    denominator (cents, 1e-6 dollars, or a rational such as twelfths), and
+    each quantize is reproduced as round-half-up of that exact value. This
+    matches the Decimal path whenever the Decimal computation is exact or
+    lands away from a half cent. A few Decimal steps are inexact (the
+    0.0495/0.0595 CPP credit ratio, YTD EI / rate, prorated CPP2 maxima, the
+    2025 Alberta K5P factor); rows whose exact value falls on a half cent
+    after one of those steps are recalculated with the Decimal path, so
+    results are identical to PayrollEngine.calculate.
+
+Scope:
+    Regular pay only. Rows with bonus or retroactive pay, negative amounts,
+    sub-cent amounts, pensionable_months outside 1-12 or amounts above
+    MAX_CENTS use the Decimal path. calculation_details for columnar rows
+    only carries the method and grouping keys; use calculate() when the full
+    audit trail is needed.
+
+numpy is an optional dependency (``pip install .[fast]``).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from fractions import Fraction
+from operator import attrgetter
+from typing import TYPE_CHECKING
+
+from app.services.payroll.tax_tables import (
+    CompiledCppTable,
+    CompiledEiTable,
+    CompiledFederalTable,
+    CompiledProvincialTable,
+    _resolve_edition,
+)
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+    NUMPY_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+    from app.services.payroll.payroll_engine import (
+        EmployeePayrollInput,
+        PayrollCalculationResult,
+        PayrollEngine,
+    )
+
+logger = logging.getLogger(__name__)
+
+# Per-field bound that keeps every intermediate product inside int64
+MAX_CENTS = 10**9
+
+# 1e-6 dollar units used for T3/T4 (rates have at most 4 decimals)
+MICRO_PER_CENT = 10**4
+RATE_SCALE = 10**4
+
+
+# F2 enhancement ratio hard-coded by CppCalculator._calculate_f5
+_F5_RATIO = Fraction(Decimal("0.01")) / Fraction(Decimal("0.0595"))
+
+# Money fields read from EmployeePayrollInput, in column order
+_MONEY_FIELDS = (
+    "gross_regular",
+    "gross_overtime",
+    "holiday_pay",
+    "holiday_premium_pay",
+    "vacation_pay",
+    "other_earnings",
+    "taxable_benefits_pensionable",
+    "taxable_benefits_insurable",
+    "federal_claim_amount",
+    "provincial_claim_amount",
+    "rrsp_per_period",
+    "union_dues_per_period",
+    "garnishments",
+    "other_deductions",
+    "ytd_pensionable_earnings",
+    "ytd_insurable_earnings",
+    "ytd_cpp_base",
+    "ytd_cpp_additional",
+    "ytd_ei",
+)
+_COL = {name: i for i, name in enumerate(_MONEY_FIELDS)}
+_money_getter = attrgetter(*_MONEY_FIELDS)
+
+# Kernel output columns and their decimal exponent, in _build_results order
+_OUTPUT_COLUMNS = (
+    ("total_gross", -2),
+    ("cpp_base", -2),
+    ("cpp_additional", -2),
+    ("cpp_total", -2),
+    ("ei", -2),
+    ("ei_employer_mills", -3),
+    ("federal_tax", -2),
+    ("provincial_tax", -2),
+    ("deductions", -2),
+    ("employer_costs", -2),
+    ("net_pay", -2),
+)
+
+
+class _Unsupported(Exception):
+    """A row or table cannot be represented exactly in the integer kernel."""
+
+
+def _scaled(value: Decimal, scale: int) -> int:
+    """Exact integer value * scale, or raise _Unsupported."""
+    exact = Fraction(value) * scale
+    if exact.denominator != 1:
+        raise _Unsupported
+    return exact.numerator
+
+
+def _fraction(value: Decimal) -> Fraction:
+    """
+    Exact rational for value.
+
+    Decimal quotients such as 0.04/0.06 are stored rounded to 28 digits;
+    recover the small-denominator ratio they came from.
+    """
+    exact = Fraction(value)
+    if exact.denominator <= 10**12:
+        return exact
+    approx = exact.limit_denominator(10**6)
+    if abs(approx - exact) > Fraction(1, 10**24):
+        raise _Unsupported
+    return approx
+
+
+def _round_half_up(num: NDArray[np.int64], den: int) -> tuple[NDArray[np.int64], NDArray[np.bool_]]:
+    """
+    Round num/den to an integer (ROUND_HALF_UP, ties away from zero).
+
+    Returns the rounded values and a mask of exact ties.
+    """
+    magnitude = np.abs(num)
+    rounded = (2 * magnitude + den) // (2 * den)
+    tie = (2 * (magnitude % den)) == den
+    return np.where(num < 0, -rounded, rounded), tie
+
+
+@dataclass(frozen=True, slots=True)
+class _Brackets:
+    """Bracket thresholds (cents), rates (1e-4) and constants (1e-6 dollars)."""
+
+    thresholds: NDArray[np.int64]
+    rates: NDArray[np.int64]
+    constants: NDArray[np.int64]
+
+    @classmethod
+    def from_table(cls, table: CompiledFederalTable | CompiledProvincialTable) -> _Brackets:
+        index = table.bracket_index
+        return cls(
+            thresholds=np.array([_scaled(t, 100) for t in index.thresholds], dtype=np.int64),
+            rates=np.array([_scaled(r, RATE_SCALE) for r in index.rates], dtype=np.int64),
+            constants=np.array([_scaled(k, 10**6) for k in index.constants], dtype=np.int64),
+        )
+
+    def lookup(self, annual: NDArray[np.int64]) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        idx = np.searchsorted(self.thresholds, annual, side="right") - 1
+        below = idx < 0
+        idx = np.maximum(idx, 0)
+        return (
+            np.where(below, 0, self.rates[idx]),
+            np.where(below, 0, self.constants[idx]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _GroupConstants:
+    """Integer constants for one (province, pay_periods, edition) group."""
+
+    P: int
+    province_code: str
+    # CPP
+    basic_exemption_per_period: int
+    cpp_rate: Fraction
+    cpp2_rate: Fraction
+    max_cpp: int
+    max_cpp2: int
+    ympe: int
+    credit_ratio: Fraction
+    capped_credit_exact: bool
+    # EI
+    ei_rate: Fraction
+    mie: int
+    max_ei: int
+    # Federal
+    federal: _Brackets
+    k1_rate: Fraction
+    k2_rate: Fraction
+    k4_rate: Fraction
+    federal_cea: int
+    # Provincial
+    provincial: _Brackets
+    lowest_rate: Fraction
+    k4p_cea: int
+    k5p_applies: bool
+    k5p_threshold: int
+    k5p_factor: Fraction
+    table: CompiledProvincialTable
+
+    @classmethod
+    def build(
+        cls,
+        P: int,
+        year: int,
+        edition: str,
+        cpp: CompiledCppTable,
+        ei: CompiledEiTable,
+        federal: CompiledFederalTable,
+        provincial: CompiledProvincialTable,
+    ) -> _GroupConstants:
+        cpp_rate = _fraction(cpp.base_rate)
+        ei_rate = _fraction(ei.employee_rate)
+        if cpp_rate <= 0 or ei_rate <= 0:
+            raise _Unsupported
+        code = provincial.province_code
+        credit_ratio = Fraction(Decimal("0.0495")) / cpp_rate
+        # Decimal rounds 0.0495 / base_rate; check whether max x ratio still comes out exact
+        decimal_credit = cpp.max_base_contribution * (Decimal("0.0495") / cpp.base_rate)
+        return cls(
+            P=P,
+            province_code=code,
+            # T4127: basic exemption per period drops the third decimal
+            basic_exemption_per_period=_scaled(cpp.basic_exemption, 100) // P,
+            cpp_rate=cpp_rate,
+            cpp2_rate=_fraction(cpp.additional_rate),
+            max_cpp=_scaled(cpp.max_base_contribution, 100),
+            max_cpp2=_scaled(cpp.max_additional_contribution, 100),
+            ympe=_scaled(cpp.ympe, 100),
+            credit_ratio=credit_ratio,
+            capped_credit_exact=(
+                Fraction(decimal_credit) == Fraction(cpp.max_base_contribution) * credit_ratio
+            ),
+            ei_rate=ei_rate,
+            mie=_scaled(ei.mie, 100),
+            max_ei=_scaled(ei.max_employee_premium, 100),
+            federal=_Brackets.from_table(federal),
+            k1_rate=_fraction(federal.k1_rate),
+            k2_rate=_fraction(federal.k2_rate),
+            k4_rate=_fraction(federal.k4_rate),
+            federal_cea=_scaled(federal.cea, 100),
+            provincial=_Brackets.from_table(provincial),
+            lowest_rate=_fraction(provincial.lowest_rate),
+            k4p_cea=(
+                _scaled(provincial.cea, 100) if provincial.has_k4p and provincial.cea != 0 else 0
+            ),
+            # Mirrors ProvincialTaxCalculator.calculate_k5p_alberta
+            k5p_applies=code == "AB" and not (year == 2025 and edition == "jan"),
+            k5p_threshold=_scaled(provincial.k5p.threshold, 100),
+            k5p_factor=_fraction(provincial.k5p.factor),
+            table=provincial,
+        )
+
+
+class _Columns:
+    """Integer columns for one group plus a per-row fallback mask."""
+
+    def __init__(self, rows: list[list[int]], flags: list[tuple[bool, bool, bool, int]]):
+        data = np.array(rows, dtype=np.int64).reshape(len(rows), len(_MONEY_FIELDS))
+        self.money = data.T
+        flag_data = np.array(flags, dtype=np.int64).reshape(len(flags), 4).T
+        self.cpp_exempt = flag_data[0].astype(bool)
+        self.ei_exempt = flag_data[1].astype(bool)
+        self.cpp2_exempt = flag_data[2].astype(bool)
+        self.pm = flag_data[3]
+        self.fallback = np.zeros(len(rows), dtype=bool)
+
+    def __getitem__(self, name: str) -> NDArray[np.int64]:
+        return self.money[_COL[name]]  # type: ignore[no-any-return]
+
+
+def _credit_k2(
+    c: _GroupConstants,
+    rate: Fraction,
+    cpp: NDArray[np.int64],
+    ei: NDArray[np.int64],
+    cols: _Columns,
+) -> NDArray[np.int64]:
+    """K2 / K2P: rate x (capped annual CPP x credit ratio + capped annual EI)."""
+    ytd_cpp = cols["ytd_cpp_base"]
+    ytd_ei = cols["ytd_ei"]
+
+    reaches_cpp = (ytd_cpp > 0) & (cpp > 0) & (ytd_cpp + cpp >= c.max_cpp)
+    reaches_ei = (ytd_ei > 0) & (ei > 0) & (ytd_ei + ei >= c.max_ei)
+    effective = np.where(reaches_cpp | reaches_ei, max(1, c.P - 1), c.P)
+
+    # CPP in twelfths of a cent (prorated max = max x PM / 12)
+    prorated12 = c.max_cpp * cols.pm
+    at_max = (12 * ytd_cpp >= prorated12) | ((ytd_cpp > 0) & (12 * (ytd_cpp + cpp) >= prorated12))
+    raw = np.maximum(ytd_cpp + cpp, effective * cpp)
+    cpp12 = np.where(at_max, prorated12, np.minimum(12 * raw, prorated12))
+
+    annual_ei = np.where(
+        (ytd_ei >= c.max_ei) | ((ytd_ei > 0) & (ytd_ei + ei >= c.max_ei)),
+        c.max_ei,
+        np.minimum(effective * ei, c.max_ei),
+    )
+
+    # rate * (cpp12 / 12 * ratio + annual_ei)
+    ratio = c.credit_ratio
+    den = rate.denominator * 12 * ratio.denominator
+    num = rate.numerator * (cpp12 * ratio.numerator + annual_ei * (12 * ratio.denominator))
+    k2, tie = _round_half_up(num, den)
+    # Decimal's credit ratio is rounded, so only ties with a CPP part are unsafe
+    unsafe = cpp12 != 0
+    if c.capped_credit_exact:
+        unsafe &= cpp12 != 12 * c.max_cpp
+    cols.fallback |= tie & unsafe
+    return k2
+
+
+def _calculate_group(c: _GroupConstants, cols: _Columns) -> dict[str, NDArray[np.int64]]:
+    """Run the regular-pay pipeline for one group; returns cents columns."""
+    P = c.P
+    pm = cols.pm
+
+    regular_earnings = (
+        cols["gross_regular"]
+        + cols["gross_overtime"]
+        + cols["holiday_pay"]
+        + cols["holiday_premium_pay"]
+        + cols["vacation_pay"]
+        + cols["other_earnings"]
+    )
+    regular_gross = regular_earnings + cols["taxable_benefits_pensionable"]
+    insurable = regular_earnings + cols["taxable_benefits_insurable"]
+
+    # ------------------------------------------------------------------
+    # CPP base
+    # ------------------------------------------------------------------
+    ytd_cpp = cols["ytd_cpp_base"]
+    cpp_rate = c.cpp_rate
+    effective_max, _ = _round_half_up(c.max_cpp * pm, 12)
+    effective_max = np.where(pm >= 12, c.max_cpp, effective_max)
+
+    after_exemption = np.maximum(regular_gross - c.basic_exemption_per_period, 0)
+    base_num = after_exemption * cpp_rate.numerator
+    base, _ = _round_half_up(base_num, cpp_rate.denominator)
+    over = ytd_cpp * cpp_rate.denominator + base_num > effective_max * cpp_rate.denominator
+    base = np.where(over, np.maximum(effective_max - ytd_cpp, 0), base)
+    base = np.where((ytd_cpp >= effective_max) | cols.cpp_exempt, 0, base)
+
+    # ------------------------------------------------------------------
+    # CPP2 (twelfths of a cent, W factor per T4127)
+    # ------------------------------------------------------------------
+    ytd_pe = cols["ytd_pensionable_earnings"]
+    ytd_cpp2 = cols["ytd_cpp_additional"]
+    cpp2_rate = c.cpp2_rate
+    max2_12 = c.max_cpp2 * pm
+    w12 = np.maximum(12 * ytd_pe, c.ympe * pm)
+    above_w12 = np.maximum(12 * (ytd_pe + regular_gross) - w12, 0)
+    cpp2_num = np.minimum(
+        (max2_12 - 12 * ytd_cpp2) * cpp2_rate.denominator,
+        above_w12 * cpp2_rate.numerator,
+    )
+    cpp2, tie = _round_half_up(np.maximum(cpp2_num, 0), 12 * cpp2_rate.denominator)
+    cols.fallback |= tie & (pm != 12)
+    cpp2 = np.where((12 * ytd_cpp2 >= max2_12) | cols.cpp2_exempt | cols.cpp_exempt, 0, cpp2)
+
+    # F5 = C x (0.01 / 0.0595) + C2
+    f5_den = _F5_RATIO.denominator
+    f5, tie = _round_half_up(base * _F5_RATIO.numerator + cpp2 * f5_den, f5_den)
+    cols.fallback |= tie
+
+    # ------------------------------------------------------------------
+    # EI (YTD insurable derived from YTD EI when present)
+    # ------------------------------------------------------------------
+    ytd_ei = cols["ytd_ei"]
+    ytd_insurable = cols["ytd_insurable_earnings"]
+    en, ed = c.ei_rate.numerator, c.ei_rate.denominator
+    derived = ytd_ei > 0
+    past_mie = np.where(derived, ytd_ei * ed >= c.mie * en, ytd_insurable >= c.mie)
+    premium_num = np.where(
+        derived,
+        np.minimum(insurable * en, c.mie * en - ytd_ei * ed),
+        np.minimum(insurable, c.mie - ytd_insurable) * en,
+    )
+    capped = ytd_ei * ed + premium_num > c.max_ei * ed
+    premium_num = np.where(capped, np.maximum(c.max_ei - ytd_ei, 0) * ed, premium_num)
+    ei, tie = _round_half_up(premium_num, ed)
+    cols.fallback |= tie & derived
+    ei = np.where((ytd_ei >= c.max_ei) | past_mie | cols.ei_exempt, 0, ei)
+
+    # ------------------------------------------------------------------
+    # Annual taxable income: A = P x (I - F - F5 - U1)
+    # ------------------------------------------------------------------
+    annual = np.maximum(
+        P * (regular_gross - cols["rrsp_per_period"] - cols["union_dues_per_period"] - f5),
+        0,
+    )
+
+    # ------------------------------------------------------------------
+    # Federal: T3 = R x A - K - K1 - K2 - K4
+    # ------------------------------------------------------------------
+    R, K = c.federal.lookup(annual)
+    k1, _ = _round_half_up(
+        cols["federal_claim_amount"] * c.k1_rate.numerator, c.k1_rate.denominator
+    )
+    k2 = _credit_k2(c, c.k2_rate, base, ei, cols)
+    k4, _ = _round_half_up(
+        np.minimum(annual, c.federal_cea) * c.k4_rate.numerator, c.k4_rate.denominator
+    )
+    t3 = np.maximum(R * annual - K - (k1 + k2 + k4) * MICRO_PER_CENT, 0)
+    federal_tax, _ = _round_half_up(t3, MICRO_PER_CENT * P)
+
+    # ------------------------------------------------------------------
+    # Provincial: T4 = V x A - KP - K1P - K2P - K4P - K5P, then T2
+    # ------------------------------------------------------------------
+    lowest = c.lowest_rate
+    V, KP = c.provincial.lookup(annual)
+    k1p, _ = _round_half_up(cols["provincial_claim_amount"] * lowest.numerator, lowest.denominator)
+    k2p = _credit_k2(c, lowest, base, ei, cols)
+    if c.k4p_cea:
+        k4p, _ = _round_half_up(
+            np.minimum(annual, c.k4p_cea) * lowest.numerator, lowest.denominator
+        )
+    else:
+        k4p = np.zeros_like(annual)
+    if c.k5p_applies:
+        credits = k1p + k2p
+        above = credits > c.k5p_threshold
+        k5p, tie = _round_half_up(
+            np.maximum(credits - c.k5p_threshold, 0) * c.k5p_factor.numerator,
+            c.k5p_factor.denominator,
+        )
+        cols.fallback |= tie & above
+        k5p = np.where(above, k5p, 0)
+    else:
+        k5p = np.zeros_like(annual)
+
+    t4 = np.maximum(V * annual - KP - (k1p + k2p + k4p + k5p) * MICRO_PER_CENT, 0)
+    t2 = _provincial_adjustments(c, t4, annual)
+    t2_cents, _ = _round_half_up(t2, MICRO_PER_CENT)
+    provincial_tax, _ = _round_half_up(t2_cents, P)
+
+    # ------------------------------------------------------------------
+    # Totals (same order as PayrollEngine.calculate step 6)
+    # ------------------------------------------------------------------
+    cpp_total = base + cpp2
+    deductions = (
+        cpp_total
+        + ei
+        + federal_tax
+        + provincial_tax
+        + cols["rrsp_per_period"]
+        + cols["union_dues_per_period"]
+        + cols["garnishments"]
+        + cols["other_deductions"]
+    )
+    # Employer EI = 1.4 x employee, kept in tenths of a cent
+    ei_employer_mills = 14 * ei
+    employer_costs, _ = _round_half_up(10 * cpp_total + ei_employer_mills, 10)
+
+    return {
+        "total_gross": regular_earnings,
+        "cpp_base": base,
+        "cpp_additional": cpp2,
+        "cpp_total": cpp_total,
+        "ei": ei,
+        "ei_employer_mills": ei_employer_mills,
+        "federal_tax": federal_tax,
+        "provincial_tax": provincial_tax,
+        "deductions": deductions,
+        "employer_costs": employer_costs,
+        "net_pay": regular_gross - deductions,
+    }
+
+
+def _provincial_adjustments(
+    c: _GroupConstants, t4: NDArray[np.int64], annual: NDArray[np.int64]
+) -> NDArray[np.int64]:
+    """Apply ON surtax + health premium, BC reduction or PEI surtax to T4 (1e-6 dollars)."""
+    table = c.table
+    # rate (1e-4) x amount (1e-6 dollars) -> 1e-8 cents
+    surtax_den = RATE_SCALE * MICRO_PER_CENT
+
+    if c.province_code == "ON":
+        surtax = np.zeros_like(t4)
+        if table.has_surtax:
+            on_surtax = table.ontario_surtax
+            first = _scaled(on_surtax.first_threshold, 10**6)
+            second = _scaled(on_surtax.second_threshold, 10**6)
+            num = _scaled(on_surtax.first_rate, RATE_SCALE) * (t4 - first)
+            num = num + np.where(
+                t4 > second, _scaled(on_surtax.second_rate, RATE_SCALE) * (t4 - second), 0
+            )
+            surtax, _ = _round_half_up(num, surtax_den)
+            surtax = np.where(t4 <= first, 0, surtax)
+        premium = np.zeros_like(t4)
+        if table.has_health_premium and table.health_premium_brackets:
+            premium = _health_premium(table, annual)
+        return t4 + (surtax + premium) * MICRO_PER_CENT
+
+    if c.province_code == "BC":
+        if not table.has_tax_reduction:
+            return t4
+        bc_reduction = table.bc_tax_reduction
+        start = _scaled(bc_reduction.phase_out_start, 100)
+        end = _scaled(bc_reduction.phase_out_end, 100)
+        base_reduction = _scaled(bc_reduction.base_reduction, 10**6)
+        reduction_rate = _scaled(bc_reduction.reduction_rate, RATE_SCALE)
+        phased = base_reduction - reduction_rate * (annual - start)
+        phased, _ = _round_half_up(phased, MICRO_PER_CENT)
+        reduction = np.where(
+            annual <= start,
+            base_reduction,
+            np.where(annual >= end, 0, np.maximum(phased, 0) * MICRO_PER_CENT),
+        )
+        return np.maximum(t4 - reduction, 0)
+
+    if c.province_code == "PE":
+        if not table.has_surtax:
+            return t4
+        pei_surtax = table.pei_surtax
+        threshold = _scaled(pei_surtax.threshold, 10**6)
+        surtax, _ = _round_half_up(_scaled(pei_surtax.rate, RATE_SCALE) * t4, surtax_den)
+        surtax = np.where(t4 <= threshold, 0, surtax)
+        return t4 + surtax * MICRO_PER_CENT
+
+    return t4
+
+
+def _health_premium(table: CompiledProvincialTable, annual: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Rounded Ontario Health Premium in cents (see CompiledProvincialTable.health_premium)."""
+    premium = np.zeros_like(annual)
+    for bracket in table.health_premium_brackets:
+        threshold = _scaled(bracket.threshold, 100)
+        if bracket.rate is not None:
+            income = (
+                annual if bracket.upper is None else np.minimum(annual, _scaled(bracket.upper, 100))
+            )
+            value = _scaled(bracket.base, 10**6) + _scaled(bracket.rate, RATE_SCALE) * (
+                income - threshold
+            )
+        else:
+            value = np.full_like(annual, _scaled(bracket.premium, 10**6))
+        # Brackets ascend, so the last threshold reached wins
+        premium = np.where(annual >= threshold, value, premium)
+    rounded, _ = _round_half_up(premium, MICRO_PER_CENT)
+    return rounded
+
+
+def _build_results(
+    engine: PayrollEngine,
+    group_inputs: list[EmployeePayrollInput],
+    out: dict[str, NDArray[np.int64]],
+    province_code: str,
+    P: int,
+) -> list[PayrollCalculationResult]:
+    """Turn kernel output columns back into PayrollCalculationResult objects."""
+    from app.services.payroll.payroll_engine import PayrollCalculationResult
+
+    # Decimal(int).scaleb is exact; one call per value dominates this loop
+    columns = [
+        [Decimal(value).scaleb(exponent) for value in out[name].tolist()]
+        for name, exponent in _OUTPUT_COLUMNS
+    ]
+    details = {
+        "method": "columnar",
+        "pay_periods_per_year": P,
+        "province": province_code,
+        "year": engine.year,
+    }
+    results = []
+    for inp, (
+        total_gross,
+        cpp_base,
+        cpp_additional,
+        cpp_total,
+        ei,
+        ei_employer,
+        federal_tax,
+        provincial_tax,
+        deductions,
+        employer_costs,
+        net_pay,
+    ) in zip(group_inputs, zip(*columns, strict=True), strict=True):
+        results.append(
+            PayrollCalculationResult(
+                employee_id=inp.employee_id,
+                province=province_code,
+                gross_regular=inp.gross_regular,
+                gross_overtime=inp.gross_overtime,
+                holiday_pay=inp.holiday_pay,
+                holiday_premium_pay=inp.holiday_premium_pay,
+                vacation_pay=inp.vacation_pay,
+                other_earnings=inp.other_earnings,
+                bonus_earnings=inp.bonus_earnings,
+                total_gross=total_gross,
+                cpp_base=cpp_base,
+                cpp_additional=cpp_additional,
+                cpp_total=cpp_total,
+                ei_employee=ei,
+                federal_tax=federal_tax,
+                provincial_tax=provincial_tax,
+                rrsp=inp.rrsp_per_period,
+                union_dues=inp.union_dues_per_period,
+                garnishments=inp.garnishments,
+                other_deductions=inp.other_deductions,
+                total_employee_deductions=deductions,
+                cpp_employer=cpp_total,
+                ei_employer=ei_employer,
+                total_employer_costs=employer_costs,
+                net_pay=net_pay,
+                new_ytd_gross=inp.ytd_gross + total_gross,
+                new_ytd_cpp=inp.ytd_cpp_base + inp.ytd_cpp_additional + cpp_total,
+                new_ytd_ei=inp.ytd_ei + ei,
+                new_ytd_federal_tax=inp.ytd_federal_tax + federal_tax,
+                new_ytd_provincial_tax=inp.ytd_provincial_tax + provincial_tax,
+                federal_tax_on_income=federal_tax,
+                provincial_tax_on_income=provincial_tax,
+                calculation_details=dict(details),
+            )
+        )
+    return results
+
+
+def _row(inp: EmployeePayrollInput) -> tuple[list[int], tuple[bool, bool, bool, int]]:
+    """Integer columns for one input, or raise _Unsupported."""
+    if inp.bonus_earnings or inp.retroactive_pay_amount:
+        raise _Unsupported
+    pm = inp.pensionable_months
+    if pm is None:
+        pm = 12
+    elif not 1 <= pm <= 12:
+        raise _Unsupported
+
+    money = []
+    for value in _money_getter(inp):
+        if not value:
+            money.append(0)
+            continue
+        # Exact cents iff the reduced denominator divides 100
+        numerator, denominator = value.as_integer_ratio()
+        if 100 % denominator:
+            raise _Unsupported
+        cents = numerator * (100 // denominator)
+        if not 0 <= cents <= MAX_CENTS:
+            raise _Unsupported
+        money.append(cents)
+    return money, (inp.is_cpp_exempt, inp.is_ei_exempt, inp.cpp2_exempt, pm)
+
+
+def calculate_columnar(
+    engine: PayrollEngine, inputs: list[EmployeePayrollInput]
+) -> list[PayrollCalculationResult]:
+    """
+    Calculate a batch with the integer-cents kernel, preserving input order.
+
+    Rows the kernel cannot reproduce exactly go through engine.calculate().
+
+    Raises:
+        RuntimeError: If numpy is not installed
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for the columnar batch path")
+
+    results: list[PayrollCalculationResult | None] = [None] * len(inputs)
+    groups: dict[tuple[str, int, str], list[int]] = defaultdict(list)
+    rows: dict[int, tuple[list[int], tuple[bool, bool, bool, int]]] = {}
+    for i, inp in enumerate(inputs):
+        try:
+            rows[i] = _row(inp)
+        except _Unsupported:
+            continue
+        key = (
+            inp.province.value,
+            inp.pay_frequency.periods_per_year,
+            _resolve_edition(engine.year, inp.pay_date),
+        )
+        groups[key].append(i)
+
+    for (province_code, P, edition), indices in groups.items():
+        pay_date = inputs[indices[0]].pay_date
+        federal_calc = engine._get_federal_calculator(P, pay_date)
+        provincial_calc = engine._get_provincial_calculator(province_code, P, pay_date)
+        try:
+            constants = _GroupConstants.build(
+                P,
+                engine.year,
+                edition,
+                federal_calc.cpp_table,
+                federal_calc.ei_table,
+                federal_calc.table,
+                provincial_calc.table,
+            )
+        except _Unsupported:
+            logger.debug(f"Columnar path unsupported for {province_code}/{P}/{edition}")
+            continue
+
+        cols = _Columns([rows[i][0] for i in indices], [rows[i][1] for i in indices])
+        out = _calculate_group(constants, cols)
+        fallback = cols.fallback.tolist()
+        keep = [i for i, fb in zip(indices, fallback, strict=True) if not fb]
+        if len(keep) != len(indices):
+            mask = ~cols.fallback
+            out = {name: values[mask] for name, values in out.items()}
+        group_results = _build_results(engine, [inputs[i] for i in keep], out, province_code, P)
+        for i, result in zip(keep, group_results, strict=True):
+            results[i] = result
+
+    fallback_count = 0
+    calculated: list[PayrollCalculationResult] = []
+    for input_data, columnar in zip(inputs, results, strict=True):
+        if columnar is None:
+            columnar = engine.calculate(input_data)
+            fallback_count += 1
+        calculated.append(columnar)
+    if fallback_count:
+        logger.debug(f"Columnar batch: {fallback_count}/{len(inputs)} rows used Decimal path")
+
+    return calculated
@@ -13,10 +13,17 @@ import logging
 from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
 from typing import NamedTuple
 
-from app.services.payroll.tax_tables import get_cpp_config
+from app.services.payroll.tax_tables import get_cpp_config, get_cpp_table
 
 logger = logging.getLogger(__name__)
 
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+_TWELVE = Decimal("12")
+
+# F2 = C × (0.01 / 0.0595), the enhancement portion of base CPP
+_ENHANCEMENT_RATIO = Decimal("0.01") / Decimal("0.0595")
+
 
 class CppContribution(NamedTuple):
     """CPP contribution breakdown."""
@@ -51,24 +58,37 @@ class CPPCalculator:
         self.P = pay_periods_per_year
         self.year = year
         self._config = get_cpp_config(year)
-
-        # Load configuration values as Decimal
-        self.ympe = Decimal(str(self._config["ympe"]))
-        self.yampe = Decimal(str(self._config["yampe"]))
-        self.basic_exemption = Decimal(str(self._config["basic_exemption"]))
-        self.base_rate = Decimal(str(self._config["base_rate"]))
-        self.additional_rate = Decimal(str(self._config["additional_rate"]))
-        self.max_base_contribution = Decimal(str(self._config["max_base_contribution"]))
-        self.max_additional_contribution = Decimal(
-            str(self._config.get("max_additional_contribution", "396.00"))
+        self.table = get_cpp_table(year)
+
+        # Pre-parsed Decimal configuration values
+        self.ympe = self.table.ympe
+        self.yampe = self.table.yampe
+        self.basic_exemption = self.table.basic_exemption
+        self.base_rate = self.table.base_rate
+        self.additional_rate = self.table.additional_rate
+        self.max_base_contribution = self.table.max_base_contribution
+        self.max_additional_contribution = self.table.max_additional_contribution
+        self.max_total_contribution = self.table.max_total_contribution
+
+        # Per-pay-frequency constants, derived once instead of on every call
+        # Basic exemption per pay period (T4127: drop 3rd digit)
+        self.exemption_per_period = (self.basic_exemption / self.P).quantize(
+            _CENT, rounding=ROUND_DOWN
+        )
+        # Prorated maxima indexed by pensionable months (0-12); CPP2 values
+        # are left unrounded, as calculate_additional_cpp uses them
+        months = [Decimal(m) for m in range(13)]
+        self._prorated_max_base = tuple(
+            self.get_prorated_max(m, self.max_base_contribution) for m in range(13)
         )
-        self.max_total_contribution = Decimal(
-            str(self._config.get("max_total_contribution", "4430.10"))
+        self._prorated_max_additional = tuple(
+            self.max_additional_contribution * m / _TWELVE for m in months
         )
+        self._prorated_ympe = tuple(self.ympe * m / _TWELVE for m in months)
 
     def _round(self, value: Decimal) -> Decimal:
         """Round to 2 decimal places using banker's rounding."""
-        return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        return value.quantize(_CENT, rounding=ROUND_HALF_UP)
 
     def get_prorated_max(
         self,
@@ -88,15 +108,19 @@ class CPPCalculator:
             Prorated maximum, or full maximum if pensionable_months is None/12
         """
         if max_amount is None:
+            if pensionable_months is None:
+                return self.max_base_contribution
+            if type(pensionable_months) is int and 0 < pensionable_months < 12:
+                return self._prorated_max_base[pensionable_months]
             max_amount = self.max_base_contribution
 
         if pensionable_months is None or pensionable_months >= 12:
             return max_amount
 
         if pensionable_months <= 0:
-            return Decimal("0")
+            return _ZERO
 
-        prorated = max_amount * Decimal(pensionable_months) / Decimal("12")
+        prorated = max_amount * Decimal(pensionable_months) / _TWELVE
         return self._round(prorated)
 
     def calculate_base_cpp(
@@ -135,17 +159,12 @@ class CPPCalculator:
 
         # Check if already at annual maximum
         if ytd_cpp_base >= effective_max:
-            return Decimal("0")
-
-        # Basic exemption per pay period (T4127: drop 3rd digit)
-        exemption_per_period = (self.basic_exemption / self.P).quantize(
-            Decimal("0.01"), rounding=ROUND_DOWN
-        )
+            return _ZERO
 
         # Pensionable earnings after exemption
         pensionable_after_exemption = max(
-            pensionable_earnings - exemption_per_period,
-            Decimal("0")
+            pensionable_earnings - self.exemption_per_period,
+            _ZERO
         )
 
         # Calculate contribution
@@ -153,7 +172,7 @@ class CPPCalculator:
 
         # Check annual maximum (prorated if applicable)
         if ytd_cpp_base + base_cpp > effective_max:
-            base_cpp = max(effective_max - ytd_cpp_base, Decimal("0"))
+            base_cpp = max(effective_max - ytd_cpp_base, _ZERO)
 
         return self._round(base_cpp)
 
@@ -200,21 +219,26 @@ class CPPCalculator:
         """
         # Check CPP2 exemption (CPT30 on file)
         if cpp2_exempt:
-            return Decimal("0")
-
-        # Default to 12 months if not specified
-        PM = Decimal(str(pensionable_months)) if pensionable_months else Decimal("12")
-
-        # Prorated maximum CPP2
-        prorated_max = self.max_additional_contribution * PM / Decimal("12")
+            return _ZERO
+
+        if not pensionable_months:
+            # Default to 12 months if not specified
+            prorated_max = self._prorated_max_additional[12]
+            prorated_ympe = self._prorated_ympe[12]
+        elif type(pensionable_months) is int and 0 < pensionable_months <= 12:
+            prorated_max = self._prorated_max_additional[pensionable_months]
+            prorated_ympe = self._prorated_ympe[pensionable_months]
+        else:
+            PM = Decimal(str(pensionable_months))
+            prorated_max = self.max_additional_contribution * PM / _TWELVE
+            prorated_ympe = self.ympe * PM / _TWELVE
 
         # Already at maximum
         if ytd_cpp_additional >= prorated_max:
-            return Decimal("0")
+            return _ZERO
 
         # Calculate W factor per T4127
         # W = max(PIYTD, YMPE × PM/12)
-        prorated_ympe = self.ympe * PM / Decimal("12")
         W = max(ytd_pensionable_earnings, prorated_ympe)
 
         # Option (i): prorated_max - D2
@@ -222,12 +246,12 @@ class CPPCalculator:
 
         # Option (ii): (PIYTD + PI - W) × additional_rate
         earnings_above_w = ytd_pensionable_earnings + pensionable_earnings - W
-        option_ii = max(earnings_above_w, Decimal("0")) * self.additional_rate
+        option_ii = max(earnings_above_w, _ZERO) * self.additional_rate
 
         # C2 = lesser of option (i) and option (ii)
         cpp2 = min(option_i, option_ii)
 
-        return self._round(max(cpp2, Decimal("0")))
+        return self._round(max(cpp2, _ZERO))
 
     def calculate_total_cpp(
         self,
@@ -303,8 +327,7 @@ class CPPCalculator:
             F5: Total CPP deduction from taxable income
         """
         # F2 = C × (0.01 / 0.0595) - the enhancement portion of base CPP
-        enhancement_ratio = Decimal("0.01") / Decimal("0.0595")
-        f2 = base_cpp * enhancement_ratio
+        f2 = base_cpp * _ENHANCEMENT_RATIO
 
         # F5 = F2 + C2
         f5 = f2 + cpp2
@@ -12,10 +12,13 @@ import logging
 from decimal import ROUND_HALF_UP, Decimal
 from typing import NamedTuple
 
-from app.services.payroll.tax_tables import get_ei_config
+from app.services.payroll.tax_tables import get_ei_config, get_ei_table
 
 logger = logging.getLogger(__name__)
 
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+
 
 class EiPremium(NamedTuple):
     """EI premium breakdown."""
@@ -47,22 +50,21 @@ class EICalculator:
         self.P = pay_periods_per_year
         self.year = year
         self._config = get_ei_config(year)
+        self.table = get_ei_table(year)
 
-        # Load configuration values as Decimal
-        self.mie = Decimal(str(self._config["mie"]))  # Maximum Insurable Earnings
-        self.employee_rate = Decimal(str(self._config["employee_rate"]))
-        self.employer_rate_multiplier = Decimal(str(self._config["employer_rate_multiplier"]))
-        self.max_employee_premium = Decimal(str(self._config["max_employee_premium"]))
-        self.max_employer_premium = Decimal(
-            str(self._config.get("max_employer_premium", "1508.47"))
-        )
+        # Pre-parsed Decimal configuration values
+        self.mie = self.table.mie  # Maximum Insurable Earnings
+        self.employee_rate = self.table.employee_rate
+        self.employer_rate_multiplier = self.table.employer_rate_multiplier
+        self.max_employee_premium = self.table.max_employee_premium
+        self.max_employer_premium = self.table.max_employer_premium
 
         # Calculate employer rate
         self.employer_rate = self.employee_rate * self.employer_rate_multiplier
 
     def _round(self, value: Decimal) -> Decimal:
         """Round to 2 decimal places using banker's rounding."""
-        return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        return value.quantize(_CENT, rounding=ROUND_HALF_UP)
 
     def calculate_ei_premium(
         self,
@@ -91,11 +93,11 @@ class EICalculator:
         """
         # Check if already at annual maximum
         if ytd_ei >= self.max_employee_premium:
-            return Decimal("0")
+            return _ZERO
 
         # Check if YTD insurable earnings exceed maximum
         if ytd_insurable_earnings >= self.mie:
-            return Decimal("0")
+            return _ZERO
 
         # Calculate how much insurable earnings remain for this year
         remaining_insurable = self.mie - ytd_insurable_earnings
@@ -106,7 +108,7 @@ class EICalculator:
 
         # Ensure we don't exceed annual maximum
         if ytd_ei + ei_premium > self.max_employee_premium:
-            ei_premium = max(self.max_employee_premium - ytd_ei, Decimal("0"))
+            ei_premium = max(self.max_employee_premium - ytd_ei, _ZERO)
 
         return self._round(ei_premium)
 
@@ -164,7 +166,7 @@ class EICalculator:
         Returns:
             Remaining annual EI premium
         """
-        return max(self.max_employee_premium - ytd_ei, Decimal("0"))
+        return max(self.max_employee_premium - ytd_ei, _ZERO)
 
     def is_at_annual_maximum(self, ytd_ei: Decimal) -> bool:
         """
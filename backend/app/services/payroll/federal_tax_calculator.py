@@ -15,10 +15,12 @@ from decimal import ROUND_HALF_UP, Decimal
 from typing import Any, NamedTuple
 
 from app.services.payroll.tax_tables import (
-    find_tax_bracket,
     get_cpp_config,
+    get_cpp_table,
     get_ei_config,
+    get_ei_table,
     get_federal_config,
+    get_federal_table,
 )
 
 logger = logging.getLogger(__name__)
@@ -79,22 +81,26 @@ class FederalTaxCalculator:
         self._cpp_config = get_cpp_config(year)
         self._ei_config = get_ei_config(year)
 
-        # Load configuration values as Decimal
-        self.bpaf = Decimal(str(self._config["bpaf"]))  # Basic Personal Amount Federal
-        self.cea = Decimal(str(self._config["cea"]))    # Canada Employment Amount
+        # Compiled tables (pre-parsed Decimals) used on the calculation path
+        self.table = get_federal_table(year, pay_date)
+        self.cpp_table = get_cpp_table(year)
+        self.ei_table = get_ei_table(year)
+
+        self.bpaf = self.table.bpaf  # Basic Personal Amount Federal
+        self.cea = self.table.cea    # Canada Employment Amount
         self.brackets = self._config["brackets"]
 
         # Tax credit rates
-        self.k1_rate = Decimal(str(self._config.get("k1_rate", "0.15")))
-        self.k2_rate = Decimal(str(self._config.get("k2_cpp_ei_rate", "0.15")))
-        self.k4_rate = Decimal(str(self._config.get("k4_canada_employment_rate", "0.15")))
+        self.k1_rate = self.table.k1_rate
+        self.k2_rate = self.table.k2_rate
+        self.k4_rate = self.table.k4_rate
 
         # CPP/EI maximums for credit calculation
-        self.max_cpp_credit = Decimal(str(self._cpp_config["max_base_contribution"]))
-        self.max_ei_credit = Decimal(str(self._ei_config["max_employee_premium"]))
+        self.max_cpp_credit = self.cpp_table.max_base_contribution
+        self.max_ei_credit = self.ei_table.max_employee_premium
 
         # CPP credit ratio (uses 4.95% rate, not full 5.95%)
-        self.cpp_credit_ratio = Decimal("0.0495") / Decimal(str(self._cpp_config["base_rate"]))
+        self.cpp_credit_ratio = Decimal("0.0495") / self.cpp_table.base_rate
 
     def _round(self, value: Decimal) -> Decimal:
         """Round to 2 decimal places using banker's rounding."""
@@ -331,7 +337,7 @@ class FederalTaxCalculator:
         A = annual_taxable_income
 
         # Find applicable tax bracket
-        R, K = find_tax_bracket(A, self.brackets)
+        R, K = self.table.find_bracket(A)
 
         # Calculate credits
         K1 = self.calculate_k1(total_claim_amount)
@@ -0,0 +1,314 @@
+"""
+Parallel Payroll Engine - shard large batches across a process pool.
+
+PayrollEngine.calculate_batch is CPU bound and runs on whatever thread calls
+it; from an async endpoint that is the event loop. ParallelPayrollEngine
+wraps an engine and:
+
+- runs batches below a threshold in-process (off the event loop when awaited)
+- splits larger batches into contiguous shards on a shared ProcessPoolExecutor
+  whose workers preload and compile the tax tables once at start-up
+- returns results in input order
+- records and logs per-shard timing (last_timing) for tuning the threshold
+- sends only result cache misses to the pool, so a recalculated run whose
+  inputs did not change is served from this process's PayrollResultCache
+
+Usage:
+    engine = ParallelPayrollEngine(PayrollEngine(year=2025))
+    results = await engine.calculate_batch_async(inputs)
+    engine.last_timing.to_dict()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.core.config import get_config
+from app.services.payroll.payroll_engine import (
+    EmployeePayrollInput,
+    PayrollCalculationResult,
+    PayrollEngine,
+)
+from app.services.payroll.result_cache import ResultCacheKey
+from app.services.payroll.tax_config_repository import get_tax_config_repository
+
+logger = logging.getLogger(__name__)
+
+# Shards per worker: >1 evens out shards that hit slower Decimal fallbacks
+SHARDS_PER_WORKER = 2
+MIN_SHARD_SIZE = 50
+
+
+@dataclass
+class ShardTiming:
+    """Calculation time for one shard, measured inside the worker."""
+
+    index: int
+    size: int
+    seconds: float
+    pid: int
+
+
+@dataclass
+class BatchTiming:
+    """Timing for one calculate_batch call."""
+
+    mode: str  # "in_process" or "process_pool"
+    size: int
+    total_seconds: float = 0.0
+    shards: list[ShardTiming] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+# =============================================================================
+# Worker side
+# =============================================================================
+
+
+def _init_worker(years: tuple[int, ...]) -> None:
+    """Process pool initializer: load and compile tax tables once per worker."""
+    get_tax_config_repository().preload(years or None)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _calculate_shard(
+    year: int, columnar: bool, index: int, inputs: list[EmployeePayrollInput]
+) -> tuple[list[PayrollCalculationResult], ShardTiming]:
+    started = time.perf_counter()
+    results = PayrollEngine(year=year).calculate_batch(inputs, columnar=columnar)
+    timing = ShardTiming(
+        index=index, size=len(inputs), seconds=time.perf_counter() - started, pid=os.getpid()
+    )
+    return results, timing
+
+
+# =============================================================================
+# Shared pool
+# =============================================================================
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _default_workers() -> int:
+    configured = get_config().payroll_parallel_workers
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def get_payroll_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    Get the process-wide payroll worker pool, creating it on first use.
+
+    Workers use the spawn start method (the parent has threads, so fork is
+    unsafe) and preload every tax table year found on disk.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = max_workers or _default_workers()
+            years = tuple(get_tax_config_repository().available_years())
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(years,),
+            )
+            logger.info(f"Started payroll process pool with {_pool_workers} workers")
+        return _pool
+
+
+def warm_payroll_process_pool(max_workers: int | None = None) -> list[int]:
+    """Start every worker now so the first large run does not pay spawn cost."""
+    pool = get_payroll_process_pool(max_workers)
+    futures = [pool.submit(_ping) for _ in range(_pool_workers)]
+    return sorted({f.result() for f in futures})
+
+
+def shutdown_payroll_process_pool(wait: bool = True) -> None:
+    """Shut down the shared pool (app shutdown, or after a worker crash)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# =============================================================================
+# Engine
+# =============================================================================
+
+
+class ParallelPayrollEngine:
+    """
+    PayrollEngine.calculate_batch spread across processes for large batches.
+
+    Results are identical to engine.calculate_batch(inputs); only where the
+    work runs changes.
+    """
+
+    def __init__(
+        self,
+        engine: PayrollEngine,
+        threshold: int | None = None,
+        max_workers: int | None = None,
+        columnar: bool = False,
+    ):
+        """
+        Initialize parallel engine.
+
+        Args:
+            engine: Engine used in-process; its year is used in the workers
+            threshold: Minimum batch size for the process pool
+                (default: PAYROLL_PARALLEL_THRESHOLD)
+            max_workers: Worker count if this call creates the shared pool
+            columnar: Pass columnar=True to calculate_batch (see columnar_batch)
+        """
+        self.engine = engine
+        self.threshold = (
+            threshold if threshold is not None else get_config().payroll_parallel_threshold
+        )
+        self.max_workers = max_workers
+        self.columnar = columnar
+        self.last_timing: BatchTiming | None = None
+
+    def _calculate_in_process(
+        self, inputs: list[EmployeePayrollInput]
+    ) -> list[PayrollCalculationResult]:
+        started = time.perf_counter()
+        if self.columnar:
+            results = self.engine.calculate_batch(inputs, columnar=True)
+        else:
+            results = self.engine.calculate_batch(inputs)
+        elapsed = time.perf_counter() - started
+        self.last_timing = BatchTiming(
+            mode="in_process",
+            size=len(inputs),
+            total_seconds=elapsed,
+            shards=[ShardTiming(index=0, size=len(inputs), seconds=elapsed, pid=os.getpid())],
+        )
+        return results
+
+    def _shards(self, inputs: list[EmployeePayrollInput]) -> list[list[EmployeePayrollInput]]:
+        workers = self.max_workers or _pool_workers or _default_workers()
+        count = max(1, min(workers * SHARDS_PER_WORKER, len(inputs) // MIN_SHARD_SIZE))
+        size = math.ceil(len(inputs) / count)
+        return [inputs[i : i + size] for i in range(0, len(inputs), size)]
+
+    def _submit(self, inputs: list[EmployeePayrollInput]) -> list[Future[Any]]:
+        pool = get_payroll_process_pool(self.max_workers)
+        return [
+            pool.submit(_calculate_shard, self.engine.year, self.columnar, index, shard)
+            for index, shard in enumerate(self._shards(inputs))
+        ]
+
+    def _lookup_cached(
+        self, inputs: list[EmployeePayrollInput]
+    ) -> tuple[list[PayrollCalculationResult | None], list[ResultCacheKey] | None]:
+        """Results already in the engine's result cache (None on a miss) and their keys."""
+        cache = self.engine.result_cache
+        if not cache.enabled:
+            return [None] * len(inputs), None
+        keys = [cache.key(self.engine.year, input_data) for input_data in inputs]
+        cached = [
+            cache.get(key, input_data.employee_id)
+            for key, input_data in zip(keys, inputs, strict=True)
+        ]
+        return cached, keys
+
+    def _collect(
+        self,
+        outputs: list[tuple[list[PayrollCalculationResult], ShardTiming]],
+        cached: list[PayrollCalculationResult | None],
+        keys: list[ResultCacheKey] | None,
+        started: float,
+    ) -> list[PayrollCalculationResult]:
+        # Shards are contiguous and submitted in order, so concatenating
+        # preserves the order of the misses
+        calculated = iter(result for shard_results, _ in outputs for result in shard_results)
+        cache = self.engine.result_cache
+        # Columnar results carry reduced calculation_details; don't serve them
+        # to later calculate() calls
+        store_keys = None if self.columnar else keys
+        results: list[PayrollCalculationResult] = []
+        for index, result in enumerate(cached):
+            if result is None:
+                result = next(calculated)
+                if store_keys is not None:
+                    cache.put(store_keys[index], result)
+            results.append(result)
+
+        hits = sum(result is not None for result in cached)
+        self.last_timing = BatchTiming(
+            mode="process_pool",
+            size=len(results),
+            total_seconds=time.perf_counter() - started,
+            shards=[timing for _, timing in outputs],
+        )
+        # Per-shard sizes and worker times, for tuning PAYROLL_PARALLEL_THRESHOLD
+        shards = ", ".join(
+            f"#{t.index} {t.size} in {t.seconds * 1000:.1f}ms (pid {t.pid})"
+            for t in self.last_timing.shards
+        )
+        logger.info(
+            f"Calculated {len(results)} employees ({hits} cached) in {len(outputs)} shards "
+            f"in {self.last_timing.total_seconds * 1000:.1f}ms: [{shards}]"
+        )
+        return results
+
+    def _use_pool(self, inputs: list[EmployeePayrollInput]) -> bool:
+        return self.threshold > 0 and len(inputs) >= self.threshold
+
+    def calculate_batch(self, inputs: list[EmployeePayrollInput]) -> list[PayrollCalculationResult]:
+        """
+        Calculate a batch, in-process or on the process pool by size.
+
+        Falls back to in-process if the pool is broken (e.g. a worker died).
+        """
+        if not self._use_pool(inputs):
+            return self._calculate_in_process(inputs)
+
+        started = time.perf_counter()
+        cached, keys = self._lookup_cached(inputs)
+        misses = [i for i, result in zip(inputs, cached, strict=True) if result is None]
+        try:
+            outputs = [future.result() for future in self._submit(misses)] if misses else []
+        except BrokenProcessPool:
+            logger.warning("Payroll process pool broken, calculating in-process")
+            shutdown_payroll_process_pool(wait=False)
+            return self._calculate_in_process(inputs)
+        return self._collect(outputs, cached, keys, started)
+
+    async def calculate_batch_async(
+        self, inputs: list[EmployeePayrollInput]
+    ) -> list[PayrollCalculationResult]:
+        """calculate_batch without blocking the event loop."""
+        if not self._use_pool(inputs):
+            return await asyncio.to_thread(self._calculate_in_process, inputs)
+
+        started = time.perf_counter()
+        cached, keys = await asyncio.to_thread(self._lookup_cached, inputs)
+        misses = [i for i, result in zip(inputs, cached, strict=True) if result is None]
+        try:
+            futures = await asyncio.to_thread(self._submit, misses) if misses else []
+            outputs = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        except BrokenProcessPool:
+            logger.warning("Payroll process pool broken, calculating in-process")
+            shutdown_payroll_process_pool(wait=False)
+            return await asyncio.to_thread(self._calculate_in_process, inputs)
+        return self._collect(list(outputs), cached, keys, started)
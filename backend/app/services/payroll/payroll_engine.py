@@ -17,12 +17,20 @@ from typing import Any
 
 from app.models.payroll import PayFrequency, Province
 from app.services.payroll.bonus_tax_calculator import BonusTaxCalculator
+from app.services.payroll.calculator_registry import (
+    CalculatorRegistry,
+    get_calculator_registry,
+)
 from app.services.payroll.cpp_calculator import CPPCalculator, CppContribution
 from app.services.payroll.ei_calculator import EICalculator, EiPremium
 from app.services.payroll.federal_tax_calculator import FederalTaxCalculator
 from app.services.payroll.provincial_tax_calculator import (
     ProvincialTaxCalculator,
 )
+from app.services.payroll.result_cache import (
+    PayrollResultCache,
+    get_payroll_result_cache,
+)
 from app.services.payroll.retroactive_tax_calculator import RetroactiveTaxCalculator
 
 logger = logging.getLogger(__name__)
@@ -212,75 +220,101 @@ class PayrollEngine:
     - Federal Tax Calculator: T4127 Option 1 formula
     - Provincial Tax Calculator: Province-specific calculations
 
+    Results are memoized in a PayrollResultCache keyed by the input
+    fingerprint and tax table version, so identical inputs are calculated once.
+
     Usage:
         engine = PayrollEngine(year=2025)
         result = engine.calculate(employee_input)
     """
 
-    def __init__(self, year: int = 2025):
+    def __init__(
+        self,
+        year: int = 2025,
+        registry: CalculatorRegistry | None = None,
+        result_cache: PayrollResultCache | None = None,
+    ):
         """
         Initialize payroll engine.
 
         Args:
             year: Tax year for all calculations
+            registry: Calculator registry to draw from (defaults to the
+                process-wide registry shared by all engines)
+            result_cache: Result cache to memoize in (defaults to the
+                process-wide cache shared by all engines)
         """
         self.year = year
-        self._cpp_calculators: dict[int, CPPCalculator] = {}
-        self._ei_calculators: dict[int, EICalculator] = {}
-        self._federal_calculators: dict[tuple[int, date], FederalTaxCalculator] = {}
-        self._provincial_calculators: dict[tuple[str, int, date | None], ProvincialTaxCalculator] = {}
-        self._bonus_calculators: dict[tuple[str, int, date | None], BonusTaxCalculator] = {}
+        self._registry = registry if registry is not None else get_calculator_registry()
+        self._result_cache = (
+            result_cache if result_cache is not None else get_payroll_result_cache()
+        )
+
+    @property
+    def result_cache(self) -> PayrollResultCache:
+        """Result cache this engine memoizes in."""
+        return self._result_cache
 
     def _get_cpp_calculator(self, pay_periods: int) -> CPPCalculator:
-        """Get or create CPP calculator for pay frequency."""
-        if pay_periods not in self._cpp_calculators:
-            self._cpp_calculators[pay_periods] = CPPCalculator(pay_periods, self.year)
-        return self._cpp_calculators[pay_periods]
+        """Get CPP calculator for pay frequency."""
+        return self._registry.get_cpp(self.year, pay_periods)
 
     def _get_ei_calculator(self, pay_periods: int) -> EICalculator:
-        """Get or create EI calculator for pay frequency."""
-        if pay_periods not in self._ei_calculators:
-            self._ei_calculators[pay_periods] = EICalculator(pay_periods, self.year)
-        return self._ei_calculators[pay_periods]
+        """Get EI calculator for pay frequency."""
+        return self._registry.get_ei(self.year, pay_periods)
 
     def _get_federal_calculator(
         self, pay_periods: int, pay_date: date | None = None
     ) -> FederalTaxCalculator:
-        """Get or create federal tax calculator for pay frequency and date."""
-        key = (pay_periods, pay_date)
-        if key not in self._federal_calculators:
-            self._federal_calculators[key] = FederalTaxCalculator(
-                pay_periods, self.year, pay_date
-            )
-        return self._federal_calculators[key]
+        """Get federal tax calculator for pay frequency and date."""
+        return self._registry.get_federal(self.year, pay_periods, pay_date)
 
     def _get_provincial_calculator(
         self, province: str, pay_periods: int, pay_date: date | None = None
     ) -> ProvincialTaxCalculator:
-        """Get or create provincial tax calculator for province, pay frequency, and date."""
-        key = (province, pay_periods, pay_date)
-        if key not in self._provincial_calculators:
-            self._provincial_calculators[key] = ProvincialTaxCalculator(
-                province, pay_periods, self.year, pay_date
-            )
-        return self._provincial_calculators[key]
+        """Get provincial tax calculator for province, pay frequency, and date."""
+        return self._registry.get_provincial(province, self.year, pay_periods, pay_date)
 
     def _get_bonus_calculator(
         self, province: str, pay_periods: int, pay_date: date | None = None
     ) -> BonusTaxCalculator:
-        """Get or create bonus tax calculator for province and pay frequency."""
-        key = (province, pay_periods, pay_date)
-        if key not in self._bonus_calculators:
-            self._bonus_calculators[key] = BonusTaxCalculator(
-                province, pay_periods, self.year, pay_date
-            )
-        return self._bonus_calculators[key]
+        """Get bonus tax calculator for province and pay frequency."""
+        return self._registry.get_bonus(province, self.year, pay_periods, pay_date)
+
+    def _get_retroactive_calculator(
+        self, province: str, pay_periods: int, pay_date: date | None = None
+    ) -> RetroactiveTaxCalculator:
+        """Get retroactive pay tax calculator for province, pay frequency, and date."""
+        return self._registry.get_retroactive(province, self.year, pay_periods, pay_date)
 
     def _round(self, value: Decimal) -> Decimal:
         """Round to 2 decimal places."""
         return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
     def calculate(self, input_data: EmployeePayrollInput) -> PayrollCalculationResult:
+        """
+        Calculate complete payroll for one employee, from the result cache if
+        the same inputs were already calculated with the same tax tables.
+
+        Args:
+            input_data: Employee payroll input data
+
+        Returns:
+            Complete payroll calculation result
+        """
+        cache = self._result_cache
+        if not cache.enabled:
+            return self._calculate(input_data)
+
+        key = cache.key(self.year, input_data)
+        cached = cache.get(key, input_data.employee_id)
+        if cached is not None:
+            return cached
+        result = self._calculate(input_data)
+        cache.put(key, result)
+        return result
+
+    def _calculate(self, input_data: EmployeePayrollInput) -> PayrollCalculationResult:
         """
         Calculate complete payroll for one employee.
 
@@ -705,11 +739,8 @@ class PayrollEngine:
         provincial_tax_total = provincial_tax_per_period
 
         if has_retroactive:
-            retro_calc = RetroactiveTaxCalculator(
-                province_code=province_code,
-                pay_periods_per_year=pay_periods,
-                year=self.year,
-                pay_date=input_data.pay_date,
+            retro_calc = self._get_retroactive_calculator(
+                province_code, pay_periods, input_data.pay_date
             )
 
             # Calculate retroactive tax using dedicated calculator
@@ -844,17 +875,26 @@ class PayrollEngine:
         )
 
     def calculate_batch(
-        self, inputs: list[EmployeePayrollInput]
+        self, inputs: list[EmployeePayrollInput], columnar: bool = False
     ) -> list[PayrollCalculationResult]:
         """
         Calculate payroll for multiple employees.
 
         Args:
             inputs: List of employee payroll inputs
+            columnar: Use the NumPy integer-cents path (see columnar_batch).
+                Results are identical; calculation_details is reduced to the
+                grouping keys for rows it handles. Ignored if numpy is missing.
 
         Returns:
-            List of calculation results
+            List of calculation results, in input order
         """
+        if columnar:
+            from app.services.payroll import columnar_batch
+
+            if columnar_batch.NUMPY_AVAILABLE:
+                return columnar_batch.calculate_columnar(self, inputs)
+            logger.warning("numpy not installed, columnar batch falls back to Decimal path")
         return [self.calculate(input_data) for input_data in inputs]
 
     def validate_input(self, input_data: EmployeePayrollInput) -> list[str]:
@@ -21,11 +21,12 @@ from decimal import ROUND_HALF_UP, Decimal
 from typing import Any, NamedTuple
 
 from app.services.payroll.tax_tables import (
-    calculate_dynamic_bpa,
-    find_tax_bracket,
     get_cpp_config,
+    get_cpp_table,
     get_ei_config,
+    get_ei_table,
     get_province_config,
+    get_province_table,
 )
 
 logger = logging.getLogger(__name__)
@@ -89,25 +90,30 @@ class ProvincialTaxCalculator:
         self._cpp_config = get_cpp_config(year)
         self._ei_config = get_ei_config(year)
 
+        # Compiled tables (pre-parsed Decimals) used on the calculation path
+        self.table = get_province_table(province_code, year, pay_date)
+        self.cpp_table = get_cpp_table(year)
+        self.ei_table = get_ei_table(year)
+
         # Load basic configuration
         self.brackets = self._config["brackets"]
-        self.bpa = Decimal(str(self._config["bpa"]))
-        self.bpa_is_dynamic = self._config.get("bpa_is_dynamic", False)
+        self.bpa = self.table.bpa
+        self.bpa_is_dynamic = self.table.bpa_is_dynamic
 
         # Get lowest tax rate for credit calculations
-        self.lowest_rate = Decimal(str(self.brackets[0]["rate"]))
+        self.lowest_rate = self.table.lowest_rate
 
         # Special features
-        self.has_surtax = self._config.get("has_surtax", False)
-        self.has_health_premium = self._config.get("has_health_premium", False)
-        self.has_tax_reduction = self._config.get("has_tax_reduction", False)
-        self.has_k4p = self._config.get("has_k4p", False)
-        self.cea = Decimal(str(self._config.get("cea", 0)))  # Canada Employment Amount
+        self.has_surtax = self.table.has_surtax
+        self.has_health_premium = self.table.has_health_premium
+        self.has_tax_reduction = self.table.has_tax_reduction
+        self.has_k4p = self.table.has_k4p
+        self.cea = self.table.cea  # Canada Employment Amount
 
         # CPP/EI maximums for credit calculation
-        self.max_cpp_credit = Decimal(str(self._cpp_config["max_base_contribution"]))
-        self.max_ei_credit = Decimal(str(self._ei_config["max_employee_premium"]))
-        self.cpp_credit_ratio = Decimal("0.0495") / Decimal(str(self._cpp_config["base_rate"]))
+        self.max_cpp_credit = self.cpp_table.max_base_contribution
+        self.max_ei_credit = self.ei_table.max_employee_premium
+        self.cpp_credit_ratio = Decimal("0.0495") / self.cpp_table.base_rate
 
     def _round(self, value: Decimal) -> Decimal:
         """Round to 2 decimal places using banker's rounding."""
@@ -159,16 +165,7 @@ class ProvincialTaxCalculator:
         Returns:
             Basic Personal Amount for this province
         """
-        if not self.bpa_is_dynamic:
-            return self.bpa
-
-        return calculate_dynamic_bpa(
-            self.province_code,
-            annual_income,
-            net_income,
-            self.year,
-            self.pay_date,
-        )
+        return self.table.basic_personal_amount(annual_income, net_income)
 
     def calculate_k1p(self, total_claim_amount: Decimal) -> Decimal:
         """
@@ -295,28 +292,15 @@ class ProvincialTaxCalculator:
             if self.pay_date < k5p_effective_date:
                 return Decimal("0")
 
-        # Get K5P config from province configuration
-        k5p_config = self._config.get("k5p_config", {})
-
-        # Default to 2025 values if not configured
-        threshold = Decimal(str(k5p_config.get("threshold", "3600.00")))
-
-        # Support both factor formats:
-        # - "factor": direct multiplier (e.g., 0.25 for 2026)
-        # - "factor_numerator"/"factor_denominator": ratio (e.g., 0.04/0.06 for 2025)
-        if "factor" in k5p_config:
-            factor = Decimal(str(k5p_config["factor"]))
-        else:
-            numerator = Decimal(str(k5p_config.get("factor_numerator", "0.04")))
-            denominator = Decimal(str(k5p_config.get("factor_denominator", "0.06")))
-            factor = numerator / denominator
-
+        # Threshold and factor are pre-parsed from k5p_config (either a direct
+        # "factor" or a "factor_numerator"/"factor_denominator" ratio)
+        k5p_params = self.table.k5p
         total_credits = k1p + k2p
 
-        if total_credits <= threshold:
+        if total_credits <= k5p_params.threshold:
             return Decimal("0")
 
-        k5p = (total_credits - threshold) * factor
+        k5p = (total_credits - k5p_params.threshold) * k5p_params.factor
         return self._round(k5p)
 
     def calculate_k4p(self, annual_taxable_income: Decimal) -> Decimal:
@@ -357,21 +341,17 @@ class ProvincialTaxCalculator:
         if self.province_code != "ON" or not self.has_surtax:
             return Decimal("0")
 
-        config = self._config.get("surtax_config", {})
-        first_threshold = Decimal(str(config.get("first_threshold", "5710")))
-        first_rate = Decimal(str(config.get("first_rate", "0.20")))
-        second_threshold = Decimal(str(config.get("second_threshold", "7307")))
-        second_rate = Decimal(str(config.get("second_rate", "0.36")))
+        config = self.table.ontario_surtax
 
-        if basic_tax_t4 <= first_threshold:
+        if basic_tax_t4 <= config.first_threshold:
             return Decimal("0")
 
         # First tier surtax
-        surtax = first_rate * (basic_tax_t4 - first_threshold)
+        surtax = config.first_rate * (basic_tax_t4 - config.first_threshold)
 
         # Second tier surtax (additional)
-        if basic_tax_t4 > second_threshold:
-            surtax += second_rate * (basic_tax_t4 - second_threshold)
+        if basic_tax_t4 > config.second_threshold:
+            surtax += config.second_rate * (basic_tax_t4 - config.second_threshold)
 
         return self._round(surtax)
 
@@ -390,32 +370,7 @@ class ProvincialTaxCalculator:
         if self.province_code != "ON" or not self.has_health_premium:
             return Decimal("0")
 
-        config = self._config.get("health_premium_config", {})
-        brackets = config.get("brackets", [])
-
-        if not brackets:
-            return Decimal("0")
-
-        # Find applicable bracket
-        premium = Decimal("0")
-
-        for i, bracket in enumerate(brackets):
-            threshold = Decimal(str(bracket["threshold"]))
-            if annual_income >= threshold:
-                # Check if this is a flat premium bracket or rate-based
-                if "rate" in bracket:
-                    base = Decimal(str(bracket.get("base", "0")))
-                    rate = Decimal(str(bracket["rate"]))
-                    # Next threshold (or income if no next bracket)
-                    next_threshold = Decimal(str(brackets[i + 1]["threshold"])) if i + 1 < len(brackets) else annual_income
-                    income_in_bracket = min(annual_income, next_threshold) - threshold
-                    premium = base + (rate * income_in_bracket)
-                else:
-                    premium = Decimal(str(bracket.get("premium", "0")))
-            else:
-                break
-
-        return self._round(premium)
+        return self._round(self.table.health_premium(annual_income))
 
     def _calculate_bc_tax_reduction(self, annual_income: Decimal) -> Decimal:
         """
@@ -435,20 +390,18 @@ class ProvincialTaxCalculator:
         if self.province_code != "BC" or not self.has_tax_reduction:
             return Decimal("0")
 
-        config = self._config.get("tax_reduction_config", {})
-        base_reduction = Decimal(str(config.get("base_reduction", "521")))
-        reduction_rate = Decimal(str(config.get("reduction_rate", "0.036")))
-        phase_out_start = Decimal(str(config.get("phase_out_start", "25437")))
-        phase_out_end = Decimal(str(config.get("phase_out_end", "39913")))
+        config = self.table.bc_tax_reduction
 
-        if annual_income <= phase_out_start:
-            return base_reduction
+        if annual_income <= config.phase_out_start:
+            return config.base_reduction
 
-        if annual_income >= phase_out_end:
+        if annual_income >= config.phase_out_end:
             return Decimal("0")
 
         # Phase out reduction
-        reduction = base_reduction - (reduction_rate * (annual_income - phase_out_start))
+        reduction = config.base_reduction - (
+            config.reduction_rate * (annual_income - config.phase_out_start)
+        )
         return max(self._round(reduction), Decimal("0"))
 
     def _calculate_pe_surtax(self, basic_tax_t4: Decimal) -> Decimal:
@@ -466,14 +419,12 @@ class ProvincialTaxCalculator:
         if self.province_code != "PE" or not self.has_surtax:
             return Decimal("0")
 
-        config = self._config.get("surtax_config", {})
-        threshold = Decimal(str(config.get("threshold", "13500")))
-        rate = Decimal(str(config.get("rate", "0.10")))
+        config = self.table.pei_surtax
 
-        if basic_tax_t4 <= threshold:
+        if basic_tax_t4 <= config.threshold:
             return Decimal("0")
 
-        return self._round(rate * basic_tax_t4)
+        return self._round(config.rate * basic_tax_t4)
 
     def calculate_provincial_tax(
         self,
@@ -513,7 +464,7 @@ class ProvincialTaxCalculator:
         A = annual_taxable_income
 
         # Find applicable tax bracket
-        V, KP = find_tax_bracket(A, self.brackets)
+        V, KP = self.table.find_bracket(A)
 
         # Calculate credits
         K1P = self.calculate_k1p(total_claim_amount)
@@ -622,7 +573,7 @@ class ProvincialTaxCalculator:
         return {
             "province": {
                 "code": self.province_code,
-                "name": self._config.get("name", self.province_code),
+                "name": self.table.name,
                 "bpa": str(self.get_basic_personal_amount(annual_taxable_income, net_income)),
                 "lowest_rate": str(self.lowest_rate),
                 "has_surtax": self.has_surtax,
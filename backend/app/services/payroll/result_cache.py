@@ -0,0 +1,197 @@
+"""
+Result Cache - process-wide memo of payroll calculation results.
+
+Many employees of a run share identical calculation inputs (same salary,
+province, claims and frequency, and the same YTD position early in the
+year), and recalculating a run repeats the previous results. The cache keeps
+one bounded LRU of PayrollCalculationResult per process, keyed by
+(year, tax table snapshot version, input fingerprint), and PayrollEngine
+consults it before calculating.
+
+The fingerprint covers every EmployeePayrollInput field except employee_id,
+and the snapshot version changes with the tax tables, so a hit is always the
+result calculate() would return. Reloading the tax tables also clears the
+cache.
+
+Lookups have to cost far less than the ~100us calculation they replace, so
+the fingerprint is the tuple of field values itself (hashed by the dict, with
+Decimals compared by value) and a hit is a shallow copy: results, including
+calculation_details, are read-only once calculated.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import get_config
+from app.services.payroll.tax_config_repository import get_tax_config_repository
+
+if TYPE_CHECKING:
+    from app.services.payroll.payroll_engine import (
+        EmployeePayrollInput,
+        PayrollCalculationResult,
+    )
+
+logger = logging.getLogger(__name__)
+
+# Bump when calculate() changes in a way the tax tables do not capture
+FINGERPRINT_VERSION = 1
+
+# Every EmployeePayrollInput field value except employee_id, in field order
+InputFingerprint = tuple[Any, ...]
+
+# (year, tax table snapshot version, input fingerprint)
+ResultCacheKey = tuple[int, str, InputFingerprint]
+
+
+# attrgetter of every field except employee_id, per input dataclass; built
+# once per type (a race only builds an identical getter twice)
+_fingerprint_getters: dict[type, attrgetter[Any]] = {}
+
+
+def _fingerprint_getter(input_type: type) -> attrgetter[Any]:
+    getter = _fingerprint_getters.get(input_type)
+    if getter is None:
+        names = [f.name for f in dataclasses.fields(input_type) if f.name != "employee_id"]
+        getter = _fingerprint_getters[input_type] = attrgetter(*names)
+    return getter
+
+
+def input_fingerprint(input_data: EmployeePayrollInput) -> InputFingerprint:
+    """
+    Canonical key of one employee's calculation inputs.
+
+    Args:
+        input_data: Employee payroll input
+
+    Returns:
+        FINGERPRINT_VERSION followed by every field value except employee_id
+    """
+    return (FINGERPRINT_VERSION, *_fingerprint_getter(type(input_data))(input_data))
+
+
+@dataclass
+class ResultCacheStats:
+    """Hit/miss counters for the result cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PayrollResultCache:
+    """
+    Bounded LRU of calculation results shared across PayrollEngine instances.
+
+    Cached results are never handed out directly: a hit returns a shallow
+    copy carrying the requesting employee's ID.
+
+    Usage:
+        cache = get_payroll_result_cache()
+        key = cache.key(2025, input_data)
+        result = cache.get(key, input_data.employee_id)
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of results kept (0 disables the cache)
+        """
+        if max_size < 0:
+            raise ValueError("max_size cannot be negative")
+        self.max_size = max_size
+        self._entries: OrderedDict[ResultCacheKey, PayrollCalculationResult] = OrderedDict()
+        self._stats = ResultCacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def key(self, year: int, input_data: EmployeePayrollInput) -> ResultCacheKey:
+        """Cache key for input_data calculated with year's current tax tables."""
+        return (
+            year,
+            get_tax_config_repository().snapshot_version(year),
+            input_fingerprint(input_data),
+        )
+
+    def get(self, key: ResultCacheKey, employee_id: str) -> PayrollCalculationResult | None:
+        """
+        Return a copy of the cached result for key, for employee_id.
+
+        Args:
+            key: Cache key from key()
+            employee_id: Employee the result is for
+
+        Returns:
+            Result, or None on a miss
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+        result = copy.copy(cached)
+        result.employee_id = employee_id
+        return result
+
+    def put(self, key: ResultCacheKey, result: PayrollCalculationResult) -> None:
+        """Store result for key, evicting the least recently used entry if full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every cached result (the tax tables were reloaded)."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.invalidations += 1
+        logger.info("Payroll result cache invalidated")
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of size and hit/miss/eviction counters for monitoring."""
+        with self._lock:
+            data = asdict(self._stats)
+            data["hit_rate"] = round(self._stats.hit_rate, 4)
+            data["size"] = len(self._entries)
+        data["max_size"] = self.max_size
+        return data
+
+
+# Singleton pattern for the process-wide cache
+_cache: PayrollResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_payroll_result_cache() -> PayrollResultCache:
+    """Get the process-wide result cache, invalidated on tax table reload."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PayrollResultCache(get_config().payroll_result_cache_size)
+            get_tax_config_repository().add_reload_listener(_cache.invalidate)
+            logger.info(f"Payroll result cache created (max_size={_cache.max_size})")
+        return _cache
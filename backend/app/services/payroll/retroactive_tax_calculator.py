@@ -15,13 +15,7 @@ from dataclasses import dataclass
 from datetime import date
 from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
 
-from app.services.payroll.tax_tables import (
-    find_tax_bracket,
-    get_cpp_config,
-    get_ei_config,
-    get_federal_config,
-    get_province_config,
-)
+from app.services.payroll.tax_tables import get_tax_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -63,49 +57,34 @@ class RetroactiveTaxCalculator:
         self.year = year
         self.pay_date = pay_date
 
-        # Load configurations
-        self._cpp_config = get_cpp_config(year)
-        self._ei_config = get_ei_config(year)
-        self._federal_config = get_federal_config(year, pay_date)
-        self._provincial_config = get_province_config(province_code, year, pay_date)
+        # Load compiled tax tables (pre-parsed Decimals)
+        self._snapshot = get_tax_snapshot(province_code, year, pay_date)
+        cpp = self._snapshot.cpp
+        federal = self._snapshot.federal
+        provincial = self._snapshot.provincial
 
         # CPP constants
-        self.cpp_base_rate = Decimal(str(self._cpp_config["base_rate"]))
-        self.cpp_base_credit_rate = Decimal(
-            str(self._cpp_config.get("base_credit_rate", "0.0495"))
-        )
-        max_base_contribution = Decimal(str(self._cpp_config["max_base_contribution"]))
-        self.cpp_max_base_credit = Decimal(
-            str(
-                self._cpp_config.get(
-                    "max_base_credit",
-                    max_base_contribution * (self.cpp_base_credit_rate / self.cpp_base_rate),
-                )
-            )
-        )
+        self.cpp_base_rate = cpp.base_rate
+        self.cpp_base_credit_rate = cpp.base_credit_rate
+        self.cpp_max_base_credit = cpp.max_base_credit
+        self.cpp_basic_exemption = cpp.basic_exemption
+        self.cpp_max_base_contribution = cpp.max_base_contribution
 
         # EI constants
-        self.ei_rate = Decimal(str(self._ei_config["employee_rate"]))
-        self.ei_max_premium = Decimal(str(self._ei_config["max_employee_premium"]))
+        self.ei_rate = self._snapshot.ei.employee_rate
+        self.ei_max_premium = self._snapshot.ei.max_employee_premium
 
         # Federal constants
-        self.federal_k1_rate = Decimal(str(self._federal_config["k1_rate"]))
-        self.federal_k2_rate = Decimal(
-            str(self._federal_config.get("k2_rate", self._federal_config["k2_cpp_ei_rate"]))
-        )
-        self.federal_k4_rate = Decimal(
-            str(self._federal_config.get("k4_rate", self._federal_config["k4_canada_employment_rate"]))
-        )
-        self.federal_cea = Decimal(str(self._federal_config["cea"]))
+        self.federal_k1_rate = federal.k1_rate
+        self.federal_k2_rate = federal.k2_rate
+        self.federal_k4_rate = federal.k4_rate
+        self.federal_cea = federal.cea
 
         # Provincial constants (use lowest bracket rate)
-        lowest_rate = Decimal(str(self._provincial_config["brackets"][0]["rate"]))
-        self.provincial_k1_rate = lowest_rate
-        self.provincial_k2_rate = lowest_rate
-        self.has_surtax = bool(self._provincial_config.get("has_surtax", False))
-        self.has_health_premium = bool(
-            self._provincial_config.get("has_health_premium", False)
-        )
+        self.provincial_k1_rate = provincial.lowest_rate
+        self.provincial_k2_rate = provincial.lowest_rate
+        self.has_surtax = provincial.has_surtax
+        self.has_health_premium = provincial.has_health_premium
 
     def _round(self, value: Decimal) -> Decimal:
         """Round to 2 decimal places."""
@@ -157,12 +136,12 @@ class RetroactiveTaxCalculator:
                 f5b_per_period = Decimal("0")
 
         if regular_cpp_per_period is None:
-            exemption_per_period = (Decimal(str(self._cpp_config["basic_exemption"])) / pay_periods).quantize(
+            exemption_per_period = (self.cpp_basic_exemption / pay_periods).quantize(
                 Decimal("0.01"), rounding=ROUND_DOWN
             )
             pensionable_after_exemption = max(gross_regular - exemption_per_period, Decimal("0"))
             regular_cpp_per_period = self._round(self.cpp_base_rate * pensionable_after_exemption)
-            prorated_max = Decimal(str(self._cpp_config["max_base_contribution"])) * (pay_months / Decimal("12"))
+            prorated_max = self.cpp_max_base_contribution * (pay_months / Decimal("12"))
             regular_cpp_per_period = min(regular_cpp_per_period, self._round(prorated_max))
 
         if regular_ei_per_period is None:
@@ -279,9 +258,7 @@ class RetroactiveTaxCalculator:
         pay_months: Decimal,
     ) -> Decimal:
         """Calculate raw annual federal tax (T1)."""
-        rate, constant = find_tax_bracket(
-            annual_income, self._federal_config["brackets"]
-        )
+        rate, constant = self._snapshot.federal.find_bracket(annual_income)
 
         k1 = self._round(self.federal_k1_rate * federal_claim)
         k2 = self._calculate_k2(
@@ -303,9 +280,7 @@ class RetroactiveTaxCalculator:
         pay_months: Decimal,
     ) -> Decimal:
         """Calculate raw annual provincial tax (T2)."""
-        rate, constant = find_tax_bracket(
-            annual_income, self._provincial_config["brackets"]
-        )
+        rate, constant = self._snapshot.provincial.find_bracket(annual_income)
 
         k1p = self._round(self.provincial_k1_rate * provincial_claim)
         k2p = self._calculate_k2(
@@ -328,18 +303,14 @@ class RetroactiveTaxCalculator:
         if self.province_code != "ON" or not self.has_surtax:
             return Decimal("0")
 
-        config = self._provincial_config.get("surtax_config", {})
-        first_threshold = Decimal(str(config.get("first_threshold", "0")))
-        first_rate = Decimal(str(config.get("first_rate", "0")))
-        second_threshold = Decimal(str(config.get("second_threshold", "0")))
-        second_rate = Decimal(str(config.get("second_rate", "0")))
+        config = self._snapshot.provincial.ontario_surtax
 
-        if t4_raw <= first_threshold:
+        if t4_raw <= config.first_threshold:
             return Decimal("0")
 
-        surtax = first_rate * (t4_raw - first_threshold)
-        if t4_raw > second_threshold:
-            surtax += second_rate * (t4_raw - second_threshold)
+        surtax = config.first_rate * (t4_raw - config.first_threshold)
+        if t4_raw > config.second_threshold:
+            surtax += config.second_rate * (t4_raw - config.second_threshold)
 
         return self._round(self._clamp_min_zero(surtax))
 
@@ -348,28 +319,4 @@ class RetroactiveTaxCalculator:
         if self.province_code != "ON" or not self.has_health_premium:
             return Decimal("0")
 
-        config = self._provincial_config.get("health_premium_config", {})
-        brackets = config.get("brackets", [])
-
-        if not brackets:
-            return Decimal("0")
-
-        premium = Decimal("0")
-
-        for i, bracket in enumerate(brackets):
-            threshold = Decimal(str(bracket["threshold"]))
-            if annual_income >= threshold:
-                if "rate" in bracket:
-                    base = Decimal(str(bracket.get("base", "0")))
-                    rate = Decimal(str(bracket["rate"]))
-                    next_threshold = Decimal(
-                        str(brackets[i + 1]["threshold"])
-                    ) if i + 1 < len(brackets) else annual_income
-                    income_in_bracket = min(annual_income, next_threshold) - threshold
-                    premium = base + (rate * income_in_bracket)
-                else:
-                    premium = Decimal(str(bracket.get("premium", "0")))
-            else:
-                break
-
-        return self._round(premium)
+        return self._round(self._snapshot.provincial.health_premium(annual_income))
@@ -0,0 +1,313 @@
+"""
+Tax Config Repository - explicit store of every tax table year/edition.
+
+The tax_tables loaders are lazy lru_caches keyed by file path. That works for
+a single year, but a process serving a retro run for last year alongside the
+current year keeps touching several years and both T4127 editions. The
+repository discovers every year under config/tax_tables/, loads them in
+parallel (eagerly at startup or lazily per year on first use), keeps them
+keyed by (year, kind, edition), and offers reload() with load metrics.
+snapshot_version() fingerprints a year's loaded tables so derived caches can
+key on the exact tables a result was calculated from.
+
+The repository is built on the tax_tables loaders rather than beside them:
+entries are the very dicts those lru_caches return (never copies), and the
+compiled tables calculators read are warmed from the same loaders. The
+tax_tables getters therefore mirror the repository, and reload() clears both
+together so neither can serve the other's stale tables.
+
+Usage:
+    repo = get_tax_config_repository()
+    repo.preload()                       # startup, all years in parallel
+    federal = repo.get_federal(2026, "jan")
+    repo.snapshot_version(2026)          # changes when the tables change
+    repo.reload()                        # after JSON files change
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.services.payroll import tax_tables
+from app.services.payroll.calculator_registry import get_calculator_registry
+from app.services.payroll.tax_tables import TaxConfigError
+
+logger = logging.getLogger(__name__)
+
+EDITIONS = ("jan", "jul")
+
+# (year, kind, edition) - edition is "" for cpp_ei which has no editions
+TaxConfigKey = tuple[int, str, str]
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class TaxConfigLoadStats:
+    """Load counters for monitoring."""
+
+    load_count: int = 0
+    reload_count: int = 0
+    total_load_seconds: float = 0.0
+    last_load_seconds: float = 0.0
+    year_load_seconds: dict[int, float] = field(default_factory=dict)
+
+
+def _load_entry(key: TaxConfigKey) -> dict[str, Any]:
+    """Load one (year, kind, edition) entry through the tax_tables loaders."""
+    year, kind, edition = key
+    if kind == "cpp_ei":
+        return tax_tables._load_json_file(str(tax_tables._get_config_path(year, "cpp_ei.json")))
+    if kind == "federal":
+        return tax_tables._get_federal_config_with_edition(year, edition)
+    return tax_tables._get_provinces_config_with_edition(year, edition)
+
+
+def _timed_load_entry(key: TaxConfigKey) -> tuple[dict[str, Any], float]:
+    started = time.perf_counter()
+    entry = _load_entry(key)
+    return entry, time.perf_counter() - started
+
+
+def _compile_year(year: int) -> None:
+    """Warm the compiled tables for every edition and province of year."""
+    tax_tables.get_cpp_table(year)
+    tax_tables.get_ei_table(year)
+    for edition in EDITIONS:
+        tax_tables._compile_federal_table(year, edition)
+        for province_code in tax_tables.SUPPORTED_PROVINCES:
+            tax_tables._compile_province_table(province_code, year, edition)
+
+
+def _year_keys(year: int) -> list[TaxConfigKey]:
+    keys: list[TaxConfigKey] = [(year, "cpp_ei", "")]
+    for edition in EDITIONS:
+        keys.append((year, "federal", edition))
+        keys.append((year, "provinces", edition))
+    return keys
+
+
+class TaxConfigRepository:
+    """
+    Parallel, explicitly keyed store of raw tax table configs.
+
+    Entries are shared with the tax_tables loader caches. Reloading drops
+    those caches, the compiled tables and the calculator registry so nothing
+    keeps serving the old values.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize repository.
+
+        Args:
+            max_workers: Thread pool size for parallel file loading
+        """
+        self.max_workers = max_workers
+        self._entries: dict[TaxConfigKey, dict[str, Any]] = {}
+        self._loaded_years: set[int] = set()
+        self._year_locks: dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = TaxConfigLoadStats()
+        self._reload_listeners: list[Callable[[], None]] = []
+        self._versions: dict[int, str] = {}
+
+    def available_years(self) -> list[int]:
+        """List years with a directory under config/tax_tables/."""
+        base = tax_tables.CONFIG_BASE_PATH
+        if not base.exists():
+            return []
+        return sorted(int(p.name) for p in base.iterdir() if p.is_dir() and p.name.isdigit())
+
+    @property
+    def loaded_years(self) -> list[int]:
+        with self._lock:
+            return sorted(self._loaded_years)
+
+    def _unloaded(self, years: Iterable[int]) -> list[int]:
+        with self._lock:
+            return [y for y in years if y not in self._loaded_years]
+
+    def _year_lock(self, year: int) -> threading.Lock:
+        with self._lock:
+            return self._year_locks.setdefault(year, threading.Lock())
+
+    def ensure_year(self, year: int) -> None:
+        """Load every kind/edition for year unless already loaded."""
+        self.preload([year], compile_tables=False)
+
+    def preload(
+        self, years: Iterable[int] | None = None, compile_tables: bool = True
+    ) -> dict[str, Any]:
+        """
+        Load years in parallel, skipping ones already loaded.
+
+        Args:
+            years: Years to load (default: every year under config/tax_tables/)
+            compile_tables: Also build the compiled tables calculators use
+
+        Returns:
+            Current load stats
+
+        Raises:
+            TaxConfigError: If a year's files are missing or invalid
+        """
+        requested = sorted(set(years)) if years is not None else self.available_years()
+        pending = self._unloaded(requested)
+        if not pending:
+            return self.stats()
+
+        # Hold the per-year locks so concurrent lazy callers for the same year
+        # wait for this load instead of repeating it
+        locks = [self._year_lock(y) for y in pending]
+        for lock in locks:
+            lock.acquire()
+        try:
+            pending = self._unloaded(pending)
+            keys = [key for y in pending for key in _year_keys(y)]
+            started = time.perf_counter()
+            year_seconds: dict[int, float] = dict.fromkeys(pending, 0.0)
+            loaded: dict[TaxConfigKey, dict[str, Any]] = {}
+            if keys:
+                workers = max(1, min(self.max_workers, len(keys)))
+                with ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="tax-config"
+                ) as pool:
+                    for key, (entry, seconds) in zip(keys, pool.map(_timed_load_entry, keys)):
+                        loaded[key] = entry
+                        year_seconds[key[0]] += seconds
+                    if compile_tables:
+                        list(pool.map(_compile_year, pending))
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._entries.update(loaded)
+                self._loaded_years.update(pending)
+                self._stats.load_count += len(loaded)
+                self._stats.total_load_seconds += elapsed
+                self._stats.last_load_seconds = elapsed
+                self._stats.year_load_seconds.update(year_seconds)
+        finally:
+            for lock in locks:
+                lock.release()
+
+        if pending:
+            logger.info(f"Loaded tax tables for {pending} in {elapsed * 1000:.1f}ms")
+        return self.stats()
+
+    def _get(self, key: TaxConfigKey) -> dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.ensure_year(key[0])
+            entry = self._entries.get(key)
+            if entry is None:
+                raise TaxConfigError(f"No {key[1]} config loaded for year {key[0]}")
+        return entry
+
+    def get_cpp_ei(self, year: int) -> dict[str, Any]:
+        """Get raw cpp_ei.json contents for year (loads the year if needed)."""
+        return self._get((year, "cpp_ei", ""))
+
+    def get_federal(self, year: int, edition: str) -> dict[str, Any]:
+        """Get raw federal config for year and edition (loads the year if needed)."""
+        return self._get((year, "federal", edition))
+
+    def get_provinces(self, year: int, edition: str) -> dict[str, dict[str, Any]]:
+        """Get raw provinces config for year and edition (loads the year if needed)."""
+        return self._get((year, "provinces", edition))
+
+    def snapshot_version(self, year: int) -> str:
+        """
+        Content hash of every loaded table of year (loads the year if needed).
+
+        Args:
+            year: Tax year
+
+        Returns:
+            Hex SHA-256 digest; changes whenever a reload changes the tables
+        """
+        version = self._versions.get(year)
+        if version is not None:
+            return version
+
+        generation = self._stats.reload_count
+        entries = {
+            f"{kind}:{edition}": self._get((key_year, kind, edition))
+            for key_year, kind, edition in _year_keys(year)
+        }
+        version = hashlib.sha256(
+            json.dumps(entries, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        with self._lock:
+            # Not cached if a reload started meanwhile: entries may predate it
+            if self._stats.reload_count == generation:
+                self._versions[year] = version
+        return version
+
+    def add_reload_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback invoked after reload() (e.g. to drop derived caches)."""
+        with self._lock:
+            self._reload_listeners.append(listener)
+
+    def reload(self, compile_tables: bool = True) -> dict[str, Any]:
+        """
+        Drop every cached tax table and reload the years that were loaded.
+
+        Args:
+            compile_tables: Also rebuild the compiled tables calculators use
+
+        Returns:
+            Load stats after reloading
+        """
+        with self._lock:
+            years = sorted(self._loaded_years)
+            self._entries.clear()
+            self._loaded_years.clear()
+            self._versions.clear()
+            self._stats.reload_count += 1
+            listeners = list(self._reload_listeners)
+
+        clear_tax_table_caches()
+        for listener in listeners:
+            listener()
+
+        logger.info(f"Reloading tax tables for {years}")
+        return self.preload(years, compile_tables=compile_tables)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of load counters for monitoring."""
+        with self._lock:
+            data = asdict(self._stats)
+            data["loaded_years"] = sorted(self._loaded_years)
+            data["entries"] = len(self._entries)
+        return data
+
+
+def clear_tax_table_caches() -> None:
+    """Clear raw loader caches, compiled tables and cached calculators."""
+    tax_tables._load_json_file.cache_clear()
+    tax_tables.get_cpp_config.cache_clear()
+    tax_tables.get_ei_config.cache_clear()
+    tax_tables._get_provinces_config_with_edition.cache_clear()
+    tax_tables.clear_compiled_tables()
+    get_calculator_registry().clear()
+
+
+# Singleton pattern for the process-wide repository
+_repository: TaxConfigRepository | None = None
+
+
+def get_tax_config_repository() -> TaxConfigRepository:
+    """Get the process-wide tax config repository singleton."""
+    global _repository
+    if _repository is None:
+        _repository = TaxConfigRepository()
+    return _repository
@@ -11,6 +11,9 @@ from __future__ import annotations
 
 import json
 import logging
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
 from functools import lru_cache
@@ -22,6 +25,13 @@ logger = logging.getLogger(__name__)
 # Base path for tax table configuration files
 CONFIG_BASE_PATH = Path(__file__).parent.parent.parent.parent / "config" / "tax_tables"
 
+# Raw loader cache sizes. Every year/edition under config/tax_tables/ must fit:
+# a process routinely serves a retro run for last year next to the current
+# year, across both T4127 editions (5 files per year).
+_MAX_CACHED_YEARS = 8
+_JSON_FILE_CACHE_SIZE = _MAX_CACHED_YEARS * 5
+_EDITION_CACHE_SIZE = _MAX_CACHED_YEARS * 2
+
 # Supported provinces (Quebec excluded - requires separate system)
 SUPPORTED_PROVINCES = frozenset([
     "AB", "BC", "MB", "NB", "NL", "NS", "NT", "NU", "ON", "PE", "SK", "YT"
@@ -37,7 +47,11 @@ class TaxConfigError(Exception):
 # JSON Loading Functions
 # =============================================================================
 
-@lru_cache(maxsize=4)
+# These loaders are the storage behind TaxConfigRepository: its entries are the
+# dicts cached here, so both always agree. Reload through the repository (not
+# cache_clear()) so derived caches are invalidated too.
+
+@lru_cache(maxsize=_JSON_FILE_CACHE_SIZE)
 def _load_json_file(file_path: str) -> dict[str, Any]:
     """Load and cache a JSON configuration file."""
     path = Path(file_path)
@@ -109,7 +123,7 @@ def get_federal_config(year: int = 2025, pay_date: date | None = None) -> dict[s
     return _get_federal_config_with_edition(year, edition)
 
 
-@lru_cache(maxsize=1)
+@lru_cache(maxsize=_MAX_CACHED_YEARS)
 def get_cpp_config(year: int = 2025) -> dict[str, Any]:
     """
     Get CPP configuration for a given year.
@@ -120,7 +134,7 @@ def get_cpp_config(year: int = 2025) -> dict[str, Any]:
     return cast(dict[str, Any], data["cpp"])
 
 
-@lru_cache(maxsize=1)
+@lru_cache(maxsize=_MAX_CACHED_YEARS)
 def get_ei_config(year: int = 2025) -> dict[str, Any]:
     """
     Get EI configuration for a given year.
@@ -131,7 +145,7 @@ def get_ei_config(year: int = 2025) -> dict[str, Any]:
     return cast(dict[str, Any], data["ei"])
 
 
-@lru_cache(maxsize=8)
+@lru_cache(maxsize=_EDITION_CACHE_SIZE)
 def _get_provinces_config_with_edition(year: int, edition: str) -> dict[str, dict[str, Any]]:
     """
     Load provinces config, auto-detecting versioned vs single file.
@@ -374,6 +388,554 @@ def _calculate_bpa_nova_scotia(
     return min(result, max_bpa)
 
 
+# =============================================================================
+# Compiled Tax Table Snapshots
+# =============================================================================
+#
+# The JSON loaders above return raw dicts, which forces every calculation to
+# re-parse numbers with Decimal(str(...)). The compiled tables below are built
+# once per (year, edition, province) and hold pre-parsed Decimals, so the
+# per-employee hot path never touches dicts or string conversion.
+
+ZERO = Decimal("0")
+
+
+def _dec(value: Any) -> Decimal:
+    """Parse a JSON number exactly as the raw-dict code paths do."""
+    return Decimal(str(value))
+
+
+def _resolve_edition(year: int, pay_date: date | None) -> str:
+    """Select the T4127 edition ("jan" or "jul") for a pay date."""
+    if pay_date is not None and pay_date < _get_july_cutoff(year):
+        return "jan"
+    return "jul"
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledBracket:
+    """One tax bracket with pre-parsed threshold, rate and constant."""
+
+    threshold: Decimal
+    rate: Decimal
+    constant: Decimal
+
+
+def _compile_brackets(brackets: list[dict[str, Any]]) -> tuple[CompiledBracket, ...]:
+    return tuple(
+        CompiledBracket(
+            threshold=_dec(b["threshold"]),
+            rate=_dec(b["rate"]),
+            constant=_dec(b["constant"]),
+        )
+        for b in brackets
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class BracketIndex:
+    """
+    Sorted bracket arrays searched with bisect.
+
+    Built once per compiled table. The per-bracket constants (K / KP) are
+    the cumulative constants published by CRA in T4127, stored alongside
+    the thresholds so a lookup is a single binary search:
+
+        i = bisect_right(thresholds, income) - 1  ->  (rates[i], constants[i])
+
+    Incomes below the first threshold resolve to (0, 0), matching
+    find_tax_bracket().
+    """
+
+    thresholds: tuple[Decimal, ...]
+    rates: tuple[Decimal, ...]
+    constants: tuple[Decimal, ...]
+
+    @classmethod
+    def from_brackets(cls, brackets: tuple[CompiledBracket, ...]) -> BracketIndex:
+        ordered = sorted(brackets, key=lambda b: b.threshold)
+        return cls(
+            thresholds=tuple(b.threshold for b in ordered),
+            rates=tuple(b.rate for b in ordered),
+            constants=tuple(b.constant for b in ordered),
+        )
+
+    def rate_and_constant(self, income: Decimal) -> tuple[Decimal, Decimal]:
+        """Return (rate, constant) for the bracket containing income."""
+        i = bisect_right(self.thresholds, income) - 1
+        if i < 0:
+            return (ZERO, ZERO)
+        return (self.rates[i], self.constants[i])
+
+    def rate_and_constant_many(
+        self, incomes: Iterable[Decimal]
+    ) -> list[tuple[Decimal, Decimal]]:
+        """Vectorized rate_and_constant() preserving input order."""
+        thresholds = self.thresholds
+        rates = self.rates
+        constants = self.constants
+        out: list[tuple[Decimal, Decimal]] = []
+        append = out.append
+        for income in incomes:
+            i = bisect_right(thresholds, income) - 1
+            append((rates[i], constants[i]) if i >= 0 else (ZERO, ZERO))
+        return out
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledCppTable:
+    """Pre-parsed CPP constants for one year."""
+
+    year: int
+    ympe: Decimal
+    yampe: Decimal
+    basic_exemption: Decimal
+    base_rate: Decimal
+    additional_rate: Decimal
+    max_base_contribution: Decimal
+    max_additional_contribution: Decimal
+    max_total_contribution: Decimal
+    base_credit_rate: Decimal
+    max_base_credit: Decimal
+
+    @classmethod
+    def from_config(cls, year: int, config: dict[str, Any]) -> CompiledCppTable:
+        base_rate = _dec(config["base_rate"])
+        base_credit_rate = _dec(config.get("base_credit_rate", "0.0495"))
+        max_base_contribution = _dec(config["max_base_contribution"])
+        return cls(
+            year=year,
+            ympe=_dec(config["ympe"]),
+            yampe=_dec(config["yampe"]),
+            basic_exemption=_dec(config["basic_exemption"]),
+            base_rate=base_rate,
+            additional_rate=_dec(config["additional_rate"]),
+            max_base_contribution=max_base_contribution,
+            max_additional_contribution=_dec(
+                config.get("max_additional_contribution", "396.00")
+            ),
+            max_total_contribution=_dec(config.get("max_total_contribution", "4430.10")),
+            base_credit_rate=base_credit_rate,
+            max_base_credit=_dec(
+                config.get(
+                    "max_base_credit",
+                    max_base_contribution * (base_credit_rate / base_rate),
+                )
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledEiTable:
+    """Pre-parsed EI constants for one year."""
+
+    year: int
+    mie: Decimal
+    employee_rate: Decimal
+    employer_rate_multiplier: Decimal
+    max_employee_premium: Decimal
+    max_employer_premium: Decimal
+
+    @classmethod
+    def from_config(cls, year: int, config: dict[str, Any]) -> CompiledEiTable:
+        return cls(
+            year=year,
+            mie=_dec(config["mie"]),
+            employee_rate=_dec(config["employee_rate"]),
+            employer_rate_multiplier=_dec(config["employer_rate_multiplier"]),
+            max_employee_premium=_dec(config["max_employee_premium"]),
+            max_employer_premium=_dec(config.get("max_employer_premium", "1508.47")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledFederalTable:
+    """Pre-parsed federal brackets and credit constants for one edition."""
+
+    year: int
+    edition: str
+    brackets: tuple[CompiledBracket, ...]
+    bpaf: Decimal
+    cea: Decimal
+    k1_rate: Decimal
+    k2_rate: Decimal
+    k4_rate: Decimal
+    bracket_index: BracketIndex
+
+    @classmethod
+    def from_config(cls, year: int, edition: str, config: dict[str, Any]) -> CompiledFederalTable:
+        brackets = _compile_brackets(config["brackets"])
+        return cls(
+            year=year,
+            edition=edition,
+            brackets=brackets,
+            bpaf=_dec(config["bpaf"]),
+            cea=_dec(config["cea"]),
+            k1_rate=_dec(config.get("k1_rate", "0.15")),
+            k2_rate=_dec(config.get("k2_cpp_ei_rate", "0.15")),
+            k4_rate=_dec(config.get("k4_canada_employment_rate", "0.15")),
+            bracket_index=BracketIndex.from_brackets(brackets),
+        )
+
+    def find_bracket(self, annual_income: Decimal) -> tuple[Decimal, Decimal]:
+        """Return (rate, constant) for the bracket containing annual_income."""
+        return self.bracket_index.rate_and_constant(annual_income)
+
+
+@dataclass(frozen=True, slots=True)
+class DynamicBpa:
+    """
+    Income-dependent BPA parameters (MB, NS, YT).
+
+    ``limit`` is the floor for a reduction (MB) or the ceiling for an
+    increase (NS). For "follows_federal" (YT) only ``base_bpa`` is used and
+    holds the federal BPA of the same edition.
+    """
+
+    kind: str
+    base_bpa: Decimal
+    start: Decimal = ZERO
+    end: Decimal = ZERO
+    limit: Decimal = ZERO
+    rate: Decimal = ZERO
+
+    @classmethod
+    def manitoba(cls, config: dict[str, Any]) -> DynamicBpa:
+        return cls(
+            kind="income_based_reduction",
+            base_bpa=_dec(config.get("base_bpa", "15591")),
+            start=_dec(config.get("reduction_start", "200000")),
+            end=_dec(config.get("reduction_end", "400000")),
+            limit=_dec(config.get("min_bpa", "0")),
+        )
+
+    @classmethod
+    def nova_scotia(cls, config: dict[str, Any]) -> DynamicBpa:
+        return cls(
+            kind="income_based_increase",
+            base_bpa=_dec(config.get("base_bpa", "11744")),
+            start=_dec(config.get("increase_start", "25000")),
+            end=_dec(config.get("increase_end", "75000")),
+            limit=_dec(config.get("max_bpa", "14744")),
+            rate=_dec(config.get("increase_rate", "0.06")),
+        )
+
+    def amount(self, annual_income: Decimal, net_income: Decimal | None = None) -> Decimal:
+        """Evaluate the BPA formula for the given income."""
+        if self.kind == "income_based_reduction":
+            ni = net_income or annual_income
+            if ni <= self.start:
+                return self.base_bpa
+            if ni >= self.end:
+                return self.limit
+            reduction = (ni - self.start) * (self.base_bpa / (self.end - self.start))
+            return max(self.base_bpa - reduction, self.limit)
+
+        if self.kind == "income_based_increase":
+            if annual_income <= self.start:
+                return self.base_bpa
+            if annual_income >= self.end:
+                return self.limit
+            return min(self.base_bpa + (annual_income - self.start) * self.rate, self.limit)
+
+        return self.base_bpa
+
+
+@dataclass(frozen=True, slots=True)
+class HealthPremiumBracket:
+    """Ontario Health Premium bracket; ``upper`` is the next threshold, if any."""
+
+    threshold: Decimal
+    upper: Decimal | None
+    premium: Decimal
+    rate: Decimal | None
+    base: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class OntarioSurtax:
+    first_threshold: Decimal
+    first_rate: Decimal
+    second_threshold: Decimal
+    second_rate: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class PeiSurtax:
+    threshold: Decimal
+    rate: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class BcTaxReduction:
+    base_reduction: Decimal
+    reduction_rate: Decimal
+    phase_out_start: Decimal
+    phase_out_end: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class AlbertaK5p:
+    threshold: Decimal
+    factor: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledProvincialTable:
+    """Pre-parsed provincial brackets, BPA and surtax parameters for one edition."""
+
+    province_code: str
+    name: str
+    year: int
+    edition: str
+    brackets: tuple[CompiledBracket, ...]
+    lowest_rate: Decimal
+    bpa: Decimal
+    dynamic_bpa: DynamicBpa | None
+    cea: Decimal
+    has_surtax: bool
+    has_health_premium: bool
+    has_tax_reduction: bool
+    has_k4p: bool
+    ontario_surtax: OntarioSurtax
+    pei_surtax: PeiSurtax
+    bc_tax_reduction: BcTaxReduction
+    k5p: AlbertaK5p
+    health_premium_brackets: tuple[HealthPremiumBracket, ...]
+    bracket_index: BracketIndex
+
+    @property
+    def bpa_is_dynamic(self) -> bool:
+        return self.dynamic_bpa is not None
+
+    @classmethod
+    def from_config(
+        cls,
+        province_code: str,
+        year: int,
+        edition: str,
+        config: dict[str, Any],
+        federal_bpaf: Decimal,
+    ) -> CompiledProvincialTable:
+        brackets = _compile_brackets(config["brackets"])
+        bpa = _dec(config["bpa"])
+
+        dynamic_bpa: DynamicBpa | None = None
+        if config.get("bpa_is_dynamic", False):
+            dynamic_type = config.get("dynamic_bpa_type", "")
+            dynamic_config = config.get("dynamic_bpa_config", {})
+            if dynamic_type == "income_based_reduction":
+                dynamic_bpa = DynamicBpa.manitoba(dynamic_config)
+            elif dynamic_type == "income_based_increase":
+                dynamic_bpa = DynamicBpa.nova_scotia(dynamic_config)
+            elif dynamic_type == "follows_federal":
+                dynamic_bpa = DynamicBpa(kind=dynamic_type, base_bpa=federal_bpaf)
+            else:
+                dynamic_bpa = DynamicBpa(kind="static", base_bpa=bpa)
+
+        surtax = config.get("surtax_config", {})
+        reduction = config.get("tax_reduction_config", {})
+        k5p_config = config.get("k5p_config", {})
+        if "factor" in k5p_config:
+            k5p_factor = _dec(k5p_config["factor"])
+        else:
+            k5p_factor = _dec(k5p_config.get("factor_numerator", "0.04")) / _dec(
+                k5p_config.get("factor_denominator", "0.06")
+            )
+
+        raw_premiums = config.get("health_premium_config", {}).get("brackets", [])
+        health_premium_brackets = tuple(
+            HealthPremiumBracket(
+                threshold=_dec(b["threshold"]),
+                upper=(
+                    _dec(raw_premiums[i + 1]["threshold"])
+                    if i + 1 < len(raw_premiums)
+                    else None
+                ),
+                premium=_dec(b.get("premium", "0")),
+                rate=_dec(b["rate"]) if "rate" in b else None,
+                base=_dec(b.get("base", "0")),
+            )
+            for i, b in enumerate(raw_premiums)
+        )
+
+        return cls(
+            province_code=province_code,
+            name=config.get("name", province_code),
+            year=year,
+            edition=edition,
+            brackets=brackets,
+            lowest_rate=brackets[0].rate,
+            bpa=bpa,
+            dynamic_bpa=dynamic_bpa,
+            cea=_dec(config.get("cea", 0)),
+            has_surtax=bool(config.get("has_surtax", False)),
+            has_health_premium=bool(config.get("has_health_premium", False)),
+            has_tax_reduction=bool(config.get("has_tax_reduction", False)),
+            has_k4p=bool(config.get("has_k4p", False)),
+            ontario_surtax=OntarioSurtax(
+                first_threshold=_dec(surtax.get("first_threshold", "5710")),
+                first_rate=_dec(surtax.get("first_rate", "0.20")),
+                second_threshold=_dec(surtax.get("second_threshold", "7307")),
+                second_rate=_dec(surtax.get("second_rate", "0.36")),
+            ),
+            pei_surtax=PeiSurtax(
+                threshold=_dec(surtax.get("threshold", "13500")),
+                rate=_dec(surtax.get("rate", "0.10")),
+            ),
+            bc_tax_reduction=BcTaxReduction(
+                base_reduction=_dec(reduction.get("base_reduction", "521")),
+                reduction_rate=_dec(reduction.get("reduction_rate", "0.036")),
+                phase_out_start=_dec(reduction.get("phase_out_start", "25437")),
+                phase_out_end=_dec(reduction.get("phase_out_end", "39913")),
+            ),
+            k5p=AlbertaK5p(
+                threshold=_dec(k5p_config.get("threshold", "3600.00")),
+                factor=k5p_factor,
+            ),
+            health_premium_brackets=health_premium_brackets,
+            bracket_index=BracketIndex.from_brackets(brackets),
+        )
+
+    def find_bracket(self, annual_income: Decimal) -> tuple[Decimal, Decimal]:
+        """Return (rate, constant) for the bracket containing annual_income."""
+        return self.bracket_index.rate_and_constant(annual_income)
+
+    def basic_personal_amount(
+        self, annual_income: Decimal, net_income: Decimal | None = None
+    ) -> Decimal:
+        """BPA for this province, evaluating the dynamic formula if any."""
+        if self.dynamic_bpa is None:
+            return self.bpa
+        return self.dynamic_bpa.amount(annual_income, net_income)
+
+    def health_premium(self, annual_income: Decimal) -> Decimal:
+        """Unrounded Ontario Health Premium for annual_income (0 if no brackets)."""
+        premium = ZERO
+        for bracket in self.health_premium_brackets:
+            if annual_income < bracket.threshold:
+                break
+            if bracket.rate is not None:
+                upper = bracket.upper if bracket.upper is not None else annual_income
+                premium = bracket.base + bracket.rate * (min(annual_income, upper) - bracket.threshold)
+            else:
+                premium = bracket.premium
+        return premium
+
+
+@dataclass(frozen=True, slots=True)
+class TaxTableSnapshot:
+    """All compiled tables needed to calculate one employee's deductions."""
+
+    year: int
+    edition: str
+    province_code: str
+    federal: CompiledFederalTable
+    provincial: CompiledProvincialTable
+    cpp: CompiledCppTable
+    ei: CompiledEiTable
+
+
+@lru_cache(maxsize=16)
+def _compile_cpp_table(year: int) -> CompiledCppTable:
+    return CompiledCppTable.from_config(year, get_cpp_config(year))
+
+
+@lru_cache(maxsize=16)
+def _compile_ei_table(year: int) -> CompiledEiTable:
+    return CompiledEiTable.from_config(year, get_ei_config(year))
+
+
+@lru_cache(maxsize=32)
+def _compile_federal_table(year: int, edition: str) -> CompiledFederalTable:
+    return CompiledFederalTable.from_config(
+        year, edition, _get_federal_config_with_edition(year, edition)
+    )
+
+
+@lru_cache(maxsize=512)
+def _compile_province_table(
+    province_code: str, year: int, edition: str
+) -> CompiledProvincialTable:
+    provinces = _get_provinces_config_with_edition(year, edition)
+    if province_code not in provinces:
+        raise TaxConfigError(f"Province '{province_code}' not found in {year} configuration")
+    return CompiledProvincialTable.from_config(
+        province_code,
+        year,
+        edition,
+        provinces[province_code],
+        federal_bpaf=_compile_federal_table(year, edition).bpaf,
+    )
+
+
+def get_cpp_table(year: int = 2025) -> CompiledCppTable:
+    """Get the compiled CPP table for a year."""
+    return _compile_cpp_table(year)
+
+
+def get_ei_table(year: int = 2025) -> CompiledEiTable:
+    """Get the compiled EI table for a year."""
+    return _compile_ei_table(year)
+
+
+def get_federal_table(year: int = 2025, pay_date: date | None = None) -> CompiledFederalTable:
+    """
+    Get the compiled federal table for a year and pay date.
+
+    Edition selection follows get_federal_config().
+    """
+    return _compile_federal_table(year, _resolve_edition(year, pay_date))
+
+
+def get_province_table(
+    province_code: str,
+    year: int = 2025,
+    pay_date: date | None = None,
+) -> CompiledProvincialTable:
+    """
+    Get the compiled provincial table for a province, year and pay date.
+
+    Edition selection follows get_province_config().
+
+    Raises:
+        TaxConfigError: If province is not supported
+    """
+    province_code = province_code.upper()
+    if province_code not in SUPPORTED_PROVINCES:
+        raise TaxConfigError(
+            f"Province '{province_code}' not supported. "
+            f"Supported: {sorted(SUPPORTED_PROVINCES)}"
+        )
+    return _compile_province_table(province_code, year, _resolve_edition(year, pay_date))
+
+
+def get_tax_snapshot(
+    province_code: str,
+    year: int = 2025,
+    pay_date: date | None = None,
+) -> TaxTableSnapshot:
+    """Get every compiled table for (year, edition, province) in one object."""
+    provincial = get_province_table(province_code, year, pay_date)
+    return TaxTableSnapshot(
+        year=year,
+        edition=provincial.edition,
+        province_code=provincial.province_code,
+        federal=_compile_federal_table(year, provincial.edition),
+        provincial=provincial,
+        cpp=_compile_cpp_table(year),
+        ei=_compile_ei_table(year),
+    )
+
+
+def clear_compiled_tables() -> None:
+    """Drop all compiled tables (e.g. after tax table JSON files change)."""
+    _compile_cpp_table.cache_clear()
+    _compile_ei_table.cache_clear()
+    _compile_federal_table.cache_clear()
+    _compile_province_table.cache_clear()
+
+
 # =============================================================================
 # JSON Schema Validation
 # =============================================================================
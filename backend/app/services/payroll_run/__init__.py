@@ -29,6 +29,7 @@ from app.services.payroll_run.result_persister import PayrollResultPersister
 from app.services.payroll_run.run_operations import PayrollRunOperations
 from app.services.payroll_run.vacation_manager import VacationManager
 from app.services.payroll_run.ytd_calculator import YtdCalculator
+from app.services.payroll_run.ytd_ledger import YtdLedger, YtdLedgerVerification
 
 __all__ = [
     # Constants
@@ -51,6 +52,8 @@ __all__ = [
     "BenefitsCalculator",
     "HolidayPayCalculator",
     "YtdCalculator",
+    "YtdLedger",
+    "YtdLedgerVerification",
     "PayrollRunOperations",
     "EmployeeManagement",
     # New modular classes (extracted from run_operations.py)
@@ -15,8 +15,9 @@ from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
+from app.core.async_db import execute, run_blocking
 from app.models.payroll import PayFrequency, Province
-from app.services.payroll import EmployeePayrollInput, PayrollEngine
+from app.services.payroll import EmployeePayrollInput, ParallelPayrollEngine, PayrollEngine
 from app.services.payroll_run.benefits_calculator import BenefitsCalculator
 from app.services.payroll_run.constants import (
     extract_year_from_date,
@@ -81,9 +82,11 @@ class EmployeeManagement:
         period_end = run["period_end"]
 
         # Get pay groups with matching next_period_end
-        pay_groups_result = self.supabase.table("pay_groups").select(
-            "id, name, pay_frequency, employment_type, group_benefits"
-        ).eq("next_period_end", period_end).execute()
+        pay_groups_result = await execute(
+            self.supabase.table("pay_groups").select(
+                "id, name, pay_frequency, employment_type, group_benefits"
+            ).eq("next_period_end", period_end)
+        )
 
         pay_groups = pay_groups_result.data or []
         if not pay_groups:
@@ -98,22 +101,26 @@ class EmployeeManagement:
         pay_group_map = {pg["id"]: pg for pg in pay_groups}
 
         # Get all active employees from these pay groups
-        employees_result = self.supabase.table("employees").select(
-            "id, first_name, last_name, province_of_employment, pay_group_id, "
-            "annual_salary, hourly_rate, standard_hours_per_week, "
-            "federal_additional_claims, provincial_additional_claims, "
-            "is_cpp_exempt, is_ei_exempt, cpp2_exempt, vacation_config, hire_date"
-        ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
-            "pay_group_id", pay_group_ids
-        ).is_("termination_date", "null").execute()
+        employees_result = await execute(
+            self.supabase.table("employees").select(
+                "id, first_name, last_name, province_of_employment, pay_group_id, "
+                "annual_salary, hourly_rate, standard_hours_per_week, "
+                "federal_additional_claims, provincial_additional_claims, "
+                "is_cpp_exempt, is_ei_exempt, cpp2_exempt, vacation_config, hire_date"
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
+                "pay_group_id", pay_group_ids
+            ).is_("termination_date", "null")
+        )
 
         all_employees = employees_result.data or []
         current_employee_ids = {emp["id"] for emp in all_employees}
 
         # Get existing employee IDs in this run
-        existing_records_result = self.supabase.table("payroll_records").select(
-            "employee_id"
-        ).eq("payroll_run_id", str(run_id)).execute()
+        existing_records_result = await execute(
+            self.supabase.table("payroll_records").select(
+                "employee_id"
+            ).eq("payroll_run_id", str(run_id))
+        )
 
         existing_employee_ids = {
             r["employee_id"] for r in (existing_records_result.data or [])
@@ -124,14 +131,16 @@ class EmployeeManagement:
         removed_count = 0
 
         if removed_employee_ids:
-            removed_records_result = self.supabase.table("payroll_records").select(
-                "id, employee_id, gross_regular, gross_overtime, holiday_pay, "
-                "holiday_premium_pay, vacation_pay_paid, other_earnings, bonus_earnings, "
-                "cpp_employee, cpp_additional, cpp_employer, ei_employee, ei_employer, "
-                "federal_tax, provincial_tax, rrsp, union_dues, garnishments, other_deductions"
-            ).eq("payroll_run_id", str(run_id)).in_(
-                "employee_id", [str(eid) for eid in removed_employee_ids]
-            ).execute()
+            removed_records_result = await execute(
+                self.supabase.table("payroll_records").select(
+                    "id, employee_id, gross_regular, gross_overtime, holiday_pay, "
+                    "holiday_premium_pay, vacation_pay_paid, other_earnings, bonus_earnings, "
+                    "cpp_employee, cpp_additional, cpp_employer, ei_employee, ei_employer, "
+                    "federal_tax, provincial_tax, rrsp, union_dues, garnishments, other_deductions"
+                ).eq("payroll_run_id", str(run_id)).in_(
+                    "employee_id", [str(eid) for eid in removed_employee_ids]
+                )
+            )
 
             removed_records = removed_records_result.data or []
             if removed_records:
@@ -188,48 +197,52 @@ class EmployeeManagement:
                     total_net_pay_removed += net_pay
                     total_employer_cost_removed += cpp_employer + ei_employer
 
-                self.supabase.table("payroll_records").delete().eq(
-                    "payroll_run_id", str(run_id)
-                ).in_("employee_id", [str(eid) for eid in removed_employee_ids]).execute()
+                await execute(
+                    self.supabase.table("payroll_records").delete().eq(
+                        "payroll_run_id", str(run_id)
+                    ).in_("employee_id", [str(eid) for eid in removed_employee_ids])
+                )
 
-                self.supabase.table("payroll_runs").update({
-                    "total_employees": max(
-                        0, (run.get("total_employees") or 0) - len(removed_records)
-                    ),
-                    "total_gross": max(
-                        0, float(run.get("total_gross", 0)) - total_gross_removed
-                    ),
-                    "total_cpp_employee": max(
-                        0,
-                        float(run.get("total_cpp_employee", 0)) - total_cpp_employee_removed,
-                    ),
-                    "total_cpp_employer": max(
-                        0,
-                        float(run.get("total_cpp_employer", 0)) - total_cpp_employer_removed,
-                    ),
-                    "total_ei_employee": max(
-                        0, float(run.get("total_ei_employee", 0)) - total_ei_employee_removed
-                    ),
-                    "total_ei_employer": max(
-                        0, float(run.get("total_ei_employer", 0)) - total_ei_employer_removed
-                    ),
-                    "total_federal_tax": max(
-                        0, float(run.get("total_federal_tax", 0)) - total_federal_tax_removed
-                    ),
-                    "total_provincial_tax": max(
-                        0,
-                        float(run.get("total_provincial_tax", 0))
-                        - total_provincial_tax_removed,
-                    ),
-                    "total_net_pay": max(
-                        0, float(run.get("total_net_pay", 0)) - total_net_pay_removed
-                    ),
-                    "total_employer_cost": max(
-                        0,
-                        float(run.get("total_employer_cost", 0))
-                        - total_employer_cost_removed,
-                    ),
-                }).eq("id", str(run_id)).execute()
+                await execute(
+                    self.supabase.table("payroll_runs").update({
+                        "total_employees": max(
+                            0, (run.get("total_employees") or 0) - len(removed_records)
+                        ),
+                        "total_gross": max(
+                            0, float(run.get("total_gross", 0)) - total_gross_removed
+                        ),
+                        "total_cpp_employee": max(
+                            0,
+                            float(run.get("total_cpp_employee", 0)) - total_cpp_employee_removed,
+                        ),
+                        "total_cpp_employer": max(
+                            0,
+                            float(run.get("total_cpp_employer", 0)) - total_cpp_employer_removed,
+                        ),
+                        "total_ei_employee": max(
+                            0, float(run.get("total_ei_employee", 0)) - total_ei_employee_removed
+                        ),
+                        "total_ei_employer": max(
+                            0, float(run.get("total_ei_employer", 0)) - total_ei_employer_removed
+                        ),
+                        "total_federal_tax": max(
+                            0, float(run.get("total_federal_tax", 0)) - total_federal_tax_removed
+                        ),
+                        "total_provincial_tax": max(
+                            0,
+                            float(run.get("total_provincial_tax", 0))
+                            - total_provincial_tax_removed,
+                        ),
+                        "total_net_pay": max(
+                            0, float(run.get("total_net_pay", 0)) - total_net_pay_removed
+                        ),
+                        "total_employer_cost": max(
+                            0,
+                            float(run.get("total_employer_cost", 0))
+                            - total_employer_cost_removed,
+                        ),
+                    }).eq("id", str(run_id))
+                )
 
                 removed_count = len(removed_records)
                 updated_run = await self._get_run(run_id)
@@ -270,18 +283,20 @@ class EmployeeManagement:
         new_employer_cost = new_cpp_employer + new_ei_employer
 
         # Update run totals
-        self.supabase.table("payroll_runs").update({
-            "total_employees": (run.get("total_employees") or 0) + len(added_employees),
-            "total_gross": float(run.get("total_gross", 0)) + new_gross,
-            "total_cpp_employee": float(run.get("total_cpp_employee", 0)) + new_cpp_employee,
-            "total_cpp_employer": float(run.get("total_cpp_employer", 0)) + new_cpp_employer,
-            "total_ei_employee": float(run.get("total_ei_employee", 0)) + new_ei_employee,
-            "total_ei_employer": float(run.get("total_ei_employer", 0)) + new_ei_employer,
-            "total_federal_tax": float(run.get("total_federal_tax", 0)) + new_federal_tax,
-            "total_provincial_tax": float(run.get("total_provincial_tax", 0)) + new_provincial_tax,
-            "total_net_pay": float(run.get("total_net_pay", 0)) + new_net_pay,
-            "total_employer_cost": float(run.get("total_employer_cost", 0)) + new_employer_cost,
-        }).eq("id", str(run_id)).execute()
+        await execute(
+            self.supabase.table("payroll_runs").update({
+                "total_employees": (run.get("total_employees") or 0) + len(added_employees),
+                "total_gross": float(run.get("total_gross", 0)) + new_gross,
+                "total_cpp_employee": float(run.get("total_cpp_employee", 0)) + new_cpp_employee,
+                "total_cpp_employer": float(run.get("total_cpp_employer", 0)) + new_cpp_employer,
+                "total_ei_employee": float(run.get("total_ei_employee", 0)) + new_ei_employee,
+                "total_ei_employer": float(run.get("total_ei_employer", 0)) + new_ei_employer,
+                "total_federal_tax": float(run.get("total_federal_tax", 0)) + new_federal_tax,
+                "total_provincial_tax": float(run.get("total_provincial_tax", 0)) + new_provincial_tax,
+                "total_net_pay": float(run.get("total_net_pay", 0)) + new_net_pay,
+                "total_employer_cost": float(run.get("total_employer_cost", 0)) + new_employer_cost,
+            }).eq("id", str(run_id))
+        )
 
         updated_run = await self._get_run(run_id)
         if not updated_run:
@@ -316,21 +331,25 @@ class EmployeeManagement:
             )
 
         # Check if employee already in run
-        existing_record = self.supabase.table("payroll_records").select("id").eq(
-            "payroll_run_id", str(run_id)
-        ).eq("employee_id", employee_id).execute()
+        existing_record = await execute(
+            self.supabase.table("payroll_records").select("id").eq(
+                "payroll_run_id", str(run_id)
+            ).eq("employee_id", employee_id)
+        )
 
         if existing_record.data and len(existing_record.data) > 0:
             raise ValueError("Employee already exists in this payroll run")
 
         # Get employee data
-        employee_result = self.supabase.table("employees").select(
-            "id, first_name, last_name, province_of_employment, pay_group_id, "
-            "annual_salary, hourly_rate, federal_additional_claims, provincial_additional_claims, "
-            "is_cpp_exempt, is_ei_exempt, cpp2_exempt, vacation_config, hire_date"
-        ).eq("id", employee_id).eq("user_id", self.user_id).eq(
-            "company_id", self.company_id
-        ).single().execute()
+        employee_result = await execute(
+            self.supabase.table("employees").select(
+                "id, first_name, last_name, province_of_employment, pay_group_id, "
+                "annual_salary, hourly_rate, federal_additional_claims, provincial_additional_claims, "
+                "is_cpp_exempt, is_ei_exempt, cpp2_exempt, vacation_config, hire_date"
+            ).eq("id", employee_id).eq("user_id", self.user_id).eq(
+                "company_id", self.company_id
+            ).single()
+        )
 
         if not employee_result.data:
             raise ValueError("Employee not found")
@@ -341,9 +360,11 @@ class EmployeeManagement:
         pay_group_id = employee.get("pay_group_id")
         pay_group = {}
         if pay_group_id:
-            pg_result = self.supabase.table("pay_groups").select(
-                "id, name, pay_frequency, employment_type, group_benefits"
-            ).eq("id", pay_group_id).execute()
+            pg_result = await execute(
+                self.supabase.table("pay_groups").select(
+                    "id, name, pay_frequency, employment_type, group_benefits"
+                ).eq("id", pay_group_id)
+            )
             if pg_result.data:
                 pay_group = pg_result.data[0]
 
@@ -363,18 +384,20 @@ class EmployeeManagement:
         # Update run totals
         if results:
             r = results[0]
-            self.supabase.table("payroll_runs").update({
-                "total_employees": (run.get("total_employees") or 0) + 1,
-                "total_gross": float(run.get("total_gross", 0)) + float(r.total_gross),
-                "total_cpp_employee": float(run.get("total_cpp_employee", 0)) + float(r.cpp_total),
-                "total_cpp_employer": float(run.get("total_cpp_employer", 0)) + float(r.cpp_employer),
-                "total_ei_employee": float(run.get("total_ei_employee", 0)) + float(r.ei_employee),
-                "total_ei_employer": float(run.get("total_ei_employer", 0)) + float(r.ei_employer),
-                "total_federal_tax": float(run.get("total_federal_tax", 0)) + float(r.federal_tax),
-                "total_provincial_tax": float(run.get("total_provincial_tax", 0)) + float(r.provincial_tax),
-                "total_net_pay": float(run.get("total_net_pay", 0)) + float(r.net_pay),
-                "total_employer_cost": float(run.get("total_employer_cost", 0)) + float(r.cpp_employer) + float(r.ei_employer),
-            }).eq("id", str(run_id)).execute()
+            await execute(
+                self.supabase.table("payroll_runs").update({
+                    "total_employees": (run.get("total_employees") or 0) + 1,
+                    "total_gross": float(run.get("total_gross", 0)) + float(r.total_gross),
+                    "total_cpp_employee": float(run.get("total_cpp_employee", 0)) + float(r.cpp_total),
+                    "total_cpp_employer": float(run.get("total_cpp_employer", 0)) + float(r.cpp_employer),
+                    "total_ei_employee": float(run.get("total_ei_employee", 0)) + float(r.ei_employee),
+                    "total_ei_employer": float(run.get("total_ei_employer", 0)) + float(r.ei_employer),
+                    "total_federal_tax": float(run.get("total_federal_tax", 0)) + float(r.federal_tax),
+                    "total_provincial_tax": float(run.get("total_provincial_tax", 0)) + float(r.provincial_tax),
+                    "total_net_pay": float(run.get("total_net_pay", 0)) + float(r.net_pay),
+                    "total_employer_cost": float(run.get("total_employer_cost", 0)) + float(r.cpp_employer) + float(r.ei_employer),
+                }).eq("id", str(run_id))
+            )
 
         return {
             "employee_id": employee_id,
@@ -403,9 +426,11 @@ class EmployeeManagement:
             )
 
         # Get the record to remove
-        record_result = self.supabase.table("payroll_records").select("*").eq(
-            "payroll_run_id", str(run_id)
-        ).eq("employee_id", employee_id).eq("user_id", self.user_id).execute()
+        record_result = await execute(
+            self.supabase.table("payroll_records").select("*").eq(
+                "payroll_run_id", str(run_id)
+            ).eq("employee_id", employee_id).eq("user_id", self.user_id)
+        )
 
         if not record_result.data or len(record_result.data) == 0:
             raise ValueError("Employee not found in this payroll run")
@@ -413,14 +438,18 @@ class EmployeeManagement:
         record = record_result.data[0]
 
         # Delete the record
-        self.supabase.table("payroll_records").delete().eq(
-            "id", record["id"]
-        ).execute()
+        await execute(
+            self.supabase.table("payroll_records").delete().eq(
+                "id", record["id"]
+            )
+        )
 
         # Clear employee's pay_group_id
-        self.supabase.table("employees").update({
-            "pay_group_id": None
-        }).eq("id", employee_id).eq("user_id", self.user_id).execute()
+        await execute(
+            self.supabase.table("employees").update({
+                "pay_group_id": None
+            }).eq("id", employee_id).eq("user_id", self.user_id)
+        )
 
         # Update run totals
         gross = float(record.get("gross_regular", 0)) + float(record.get("gross_overtime", 0))
@@ -432,18 +461,20 @@ class EmployeeManagement:
         provincial_tax = float(record.get("provincial_tax", 0))
         net_pay = gross - cpp_employee - ei_employee - federal_tax - provincial_tax
 
-        self.supabase.table("payroll_runs").update({
-            "total_employees": max(0, (run.get("total_employees") or 0) - 1),
-            "total_gross": max(0, float(run.get("total_gross", 0)) - gross),
-            "total_cpp_employee": max(0, float(run.get("total_cpp_employee", 0)) - cpp_employee),
-            "total_cpp_employer": max(0, float(run.get("total_cpp_employer", 0)) - cpp_employer),
-            "total_ei_employee": max(0, float(run.get("total_ei_employee", 0)) - ei_employee),
-            "total_ei_employer": max(0, float(run.get("total_ei_employer", 0)) - ei_employer),
-            "total_federal_tax": max(0, float(run.get("total_federal_tax", 0)) - federal_tax),
-            "total_provincial_tax": max(0, float(run.get("total_provincial_tax", 0)) - provincial_tax),
-            "total_net_pay": max(0, float(run.get("total_net_pay", 0)) - net_pay),
-            "total_employer_cost": max(0, float(run.get("total_employer_cost", 0)) - cpp_employer - ei_employer),
-        }).eq("id", str(run_id)).execute()
+        await execute(
+            self.supabase.table("payroll_runs").update({
+                "total_employees": max(0, (run.get("total_employees") or 0) - 1),
+                "total_gross": max(0, float(run.get("total_gross", 0)) - gross),
+                "total_cpp_employee": max(0, float(run.get("total_cpp_employee", 0)) - cpp_employee),
+                "total_cpp_employer": max(0, float(run.get("total_cpp_employer", 0)) - cpp_employer),
+                "total_ei_employee": max(0, float(run.get("total_ei_employee", 0)) - ei_employee),
+                "total_ei_employer": max(0, float(run.get("total_ei_employer", 0)) - ei_employer),
+                "total_federal_tax": max(0, float(run.get("total_federal_tax", 0)) - federal_tax),
+                "total_provincial_tax": max(0, float(run.get("total_provincial_tax", 0)) - provincial_tax),
+                "total_net_pay": max(0, float(run.get("total_net_pay", 0)) - net_pay),
+                "total_employer_cost": max(0, float(run.get("total_employer_cost", 0)) - cpp_employer - ei_employer),
+            }).eq("id", str(run_id))
+        )
 
         return {
             "removed": True,
@@ -468,8 +499,9 @@ class EmployeeManagement:
 
         # Get prior YTD data
         employee_ids = [emp["id"] for emp in employees]
-        prior_ytd_data = self.ytd_calculator.get_prior_ytd_for_employees(
-            employee_ids, str(run_id), year=tax_year
+        prior_ytd_data = await run_blocking(
+            self.ytd_calculator.get_prior_ytd_for_employees,
+            employee_ids, str(run_id), year=tax_year,
         )
 
         # Build calculation inputs
@@ -547,9 +579,9 @@ class EmployeeManagement:
             calculation_inputs.append(calc_input)
             employee_map[emp["id"]] = emp
 
-        # Calculate using PayrollEngine
-        engine = PayrollEngine(year=tax_year)
-        results = engine.calculate_batch(calculation_inputs)
+        # Calculate using PayrollEngine (process pool for large runs)
+        engine = ParallelPayrollEngine(PayrollEngine(year=tax_year))
+        results = await engine.calculate_batch_async(calculation_inputs)
 
         # Create payroll records
         records_to_insert = []
@@ -661,6 +693,6 @@ class EmployeeManagement:
 
         # Insert all records
         if records_to_insert:
-            self.supabase.table("payroll_records").insert(records_to_insert).execute()
+            await execute(self.supabase.table("payroll_records").insert(records_to_insert))
 
         return added_employees, results
@@ -8,14 +8,17 @@ split into logical components for maintainability:
 - WorkDayTracker: Work day tracking and counting
 - FormulaCalculators: Provincial formula implementations
 - EarningsFetcher: Historical earnings queries
+- HolidayPayContext: Run-level prefetch of the data the components read
 """
 
 from app.services.payroll_run.holiday_pay.calculator import (
     HolidayPayCalculator,
     HolidayPayResult,
 )
+from app.services.payroll_run.holiday_pay.context import HolidayPayContext
 
 __all__ = [
     "HolidayPayCalculator",
+    "HolidayPayContext",
     "HolidayPayResult",
 ]
@@ -25,6 +25,7 @@ from app.services.payroll.holiday_pay_config_loader import (
     get_config,
 )
 from app.services.payroll_run.gross_calculator import GrossCalculator
+from app.services.payroll_run.holiday_pay.context import HolidayPayContext
 from app.services.payroll_run.holiday_pay.earnings_fetcher import EarningsFetcher
 from app.services.payroll_run.holiday_pay.eligibility_checker import EligibilityChecker
 from app.services.payroll_run.holiday_pay.formula_calculators import FormulaCalculators
@@ -78,6 +79,63 @@ class HolidayPayCalculator:
         self.formula_calculators = FormulaCalculators(
             supabase, self.earnings_fetcher, self.work_day_tracker
         )
+        self.context: HolidayPayContext | None = None
+
+    def prefetch(
+        self,
+        employee_ids: list[str],
+        holidays_in_period: list[dict[str, Any]],
+    ) -> HolidayPayContext | None:
+        """Prefetch holiday pay data for all employees of a payroll run.
+
+        Loads timesheets, prior payroll earnings and sick leave around the
+        period's holidays in a few bulk queries; subsequent
+        calculate_holiday_pay() calls read them from memory instead of
+        querying per employee. Without holidays there is nothing to prefetch.
+
+        Args:
+            employee_ids: Employees in the payroll run
+            holidays_in_period: Statutory holidays in the pay period (all provinces)
+
+        Returns:
+            The loaded context, or None if nothing was prefetched
+        """
+        context = self.load_context(employee_ids, holidays_in_period)
+        self.set_context(context)
+        return context
+
+    def load_context(
+        self,
+        employee_ids: list[str],
+        holidays_in_period: list[dict[str, Any]],
+    ) -> HolidayPayContext | None:
+        """Load the data prefetch() would, without sharing it with the components.
+
+        Returns:
+            The loaded context, or None without holidays or if the load failed
+        """
+        holiday_dates = []
+        for h in holidays_in_period:
+            try:
+                holiday_dates.append(date.fromisoformat(h.get("holiday_date", "")))
+            except (ValueError, TypeError):
+                pass
+
+        context = None
+        if holiday_dates and employee_ids:
+            try:
+                context = HolidayPayContext.load(self.supabase, employee_ids, holiday_dates)
+            except Exception as e:
+                logger.warning("Holiday pay prefetch failed, querying per employee: %s", e)
+        return context
+
+    def set_context(self, context: HolidayPayContext | None) -> None:
+        """Share a run-level context with the helper components (None clears it)."""
+        self.context = context
+        self.work_day_tracker.context = context
+        self.earnings_fetcher.context = context
+        self.eligibility_checker.context = context
+        self.formula_calculators.context = context
 
     def _get_config(self, province: str, pay_date: date | None = None) -> HolidayPayConfig:
         """Get holiday pay config for a province."""
@@ -0,0 +1,290 @@
+"""Run-level Data Context for Holiday Pay.
+
+Prefetches the timesheet entries, prior payroll earnings and sick leave that
+holiday pay calculations read, for every employee of a payroll run, in a few
+bulk queries. The helper components serve lookups that fall inside the
+prefetched window from per-employee in-memory indexes and query the database
+for anything outside it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from datetime import date, timedelta
+from functools import partial
+from typing import Any
+
+from app.services.payroll_run.constants import COMPLETED_RUN_STATUSES
+from app.services.payroll_run.holiday_pay.timesheet_index import TimesheetIndex
+
+logger = logging.getLogger(__name__)
+
+# Prefetch window around the run's holidays: 13 weeks back covers the longest
+# lookback (12-week commission average, Alberta 5-of-9 weeks); 28 days forward
+# covers the last/first rule's first scheduled day after the holiday
+HOLIDAY_LOOKBACK_DAYS = 91
+HOLIDAY_LOOKAHEAD_DAYS = 28
+
+# Employee IDs per bulk query and rows per page (PostgREST row cap)
+CONTEXT_EMPLOYEE_CHUNK_SIZE = 200
+CONTEXT_PAGE_SIZE = 1000
+
+TIMESHEET_COLUMNS = "id, employee_id, work_date, regular_hours, overtime_hours"
+PAYROLL_RECORD_COLUMNS = (
+    "id, employee_id, payroll_run_id, gross_regular, gross_overtime, "
+    "vacation_pay_paid, holiday_pay, commission_pay, "
+    "payroll_runs!inner(id, pay_date, status)"
+)
+SICK_LEAVE_COLUMNS = "id, employee_id, usage_date, is_paid, sick_pay_amount"
+
+_EMPTY_TIMESHEET_INDEX = TimesheetIndex([])
+
+
+class _DateIndex:
+    """Rows of one employee sorted by a date column, sliced by bisection."""
+
+    def __init__(self, keyed_rows: list[tuple[date, dict[str, Any]]]):
+        keyed_rows.sort(key=lambda item: item[0])
+        self.dates = [row_date for row_date, _ in keyed_rows]
+        self.rows = [row for _, row in keyed_rows]
+
+    def between(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """Rows dated within [start_date, end_date]."""
+        lo = bisect_left(self.dates, start_date)
+        hi = bisect_right(self.dates, end_date)
+        return self.rows[lo:hi]
+
+
+def _index_by_employee(
+    rows: list[dict[str, Any]], get_date: Callable[[dict[str, Any]], str | None]
+) -> dict[str, _DateIndex]:
+    keyed: dict[str, list[tuple[date, dict[str, Any]]]] = {}
+    for row in rows:
+        try:
+            row_date = date.fromisoformat(get_date(row) or "")
+        except (ValueError, TypeError):
+            continue
+        keyed.setdefault(row["employee_id"], []).append((row_date, row))
+    return {emp_id: _DateIndex(items) for emp_id, items in keyed.items()}
+
+
+class HolidayPayContext:
+    """Prefetched holiday pay inputs for all employees of a payroll run.
+
+    Lookups return None when the employee or date range is outside what was
+    prefetched, so callers can fall back to querying the database.
+    """
+
+    def __init__(
+        self,
+        employee_ids: list[str],
+        window_start: date,
+        window_end: date,
+        timesheet_entries: list[dict[str, Any]],
+        payroll_records: list[dict[str, Any]],
+        sick_leave: list[dict[str, Any]],
+    ):
+        """Build in-memory indexes over prefetched rows.
+
+        Args:
+            employee_ids: Employees the rows were fetched for
+            window_start: First date of the prefetched window (inclusive)
+            window_end: Last date of the prefetched window (inclusive)
+            timesheet_entries: timesheet_entries rows in the window
+            payroll_records: Completed-run payroll_records with pay_date in the window
+            sick_leave: sick_leave_usage_history rows in the window
+        """
+        self.employee_ids = set(employee_ids)
+        self.window_start = window_start
+        self.window_end = window_end
+        entries_by_employee: dict[str, list[dict[str, Any]]] = {}
+        for entry in timesheet_entries:
+            entries_by_employee.setdefault(entry["employee_id"], []).append(entry)
+        self._timesheets = {
+            emp_id: TimesheetIndex(entries) for emp_id, entries in entries_by_employee.items()
+        }
+        self._payroll_records = _index_by_employee(
+            payroll_records, lambda row: (row.get("payroll_runs") or {}).get("pay_date")
+        )
+        self._sick_leave = _index_by_employee(
+            sick_leave, lambda row: row.get("usage_date")
+        )
+
+    @classmethod
+    def load(
+        cls,
+        supabase: Any,
+        employee_ids: list[str],
+        holiday_dates: list[date],
+    ) -> HolidayPayContext:
+        """Prefetch holiday pay inputs around a run's holidays.
+
+        Issues one query per table per CONTEXT_EMPLOYEE_CHUNK_SIZE employees
+        (plus one per extra CONTEXT_PAGE_SIZE rows), regardless of how many
+        holidays, formulas or eligibility rules the calculation uses.
+
+        Args:
+            supabase: Supabase client instance
+            employee_ids: Employees in the payroll run
+            holiday_dates: Statutory holiday dates in the pay period
+
+        Returns:
+            HolidayPayContext covering HOLIDAY_LOOKBACK_DAYS before the earliest
+            holiday through HOLIDAY_LOOKAHEAD_DAYS after the latest
+        """
+        unique_ids = list(dict.fromkeys(employee_ids))
+        window_start = min(holiday_dates) - timedelta(days=HOLIDAY_LOOKBACK_DAYS)
+        window_end = max(holiday_dates) + timedelta(days=HOLIDAY_LOOKAHEAD_DAYS)
+        start, end = window_start.isoformat(), window_end.isoformat()
+
+        timesheet_entries: list[dict[str, Any]] = []
+        payroll_records: list[dict[str, Any]] = []
+        sick_leave: list[dict[str, Any]] = []
+
+        for offset in range(0, len(unique_ids), CONTEXT_EMPLOYEE_CHUNK_SIZE):
+            chunk = unique_ids[offset : offset + CONTEXT_EMPLOYEE_CHUNK_SIZE]
+            timesheet_entries.extend(
+                _paged(partial(_timesheet_query, supabase, chunk, start, end))
+            )
+            payroll_records.extend(
+                _paged(partial(_payroll_records_query, supabase, chunk, start, end))
+            )
+            sick_leave.extend(
+                _paged(partial(_sick_leave_query, supabase, chunk, start, end))
+            )
+
+        logger.debug(
+            "Holiday pay context for %d employees (%s to %s): "
+            "timesheets=%d, payroll_records=%d, sick_leave=%d",
+            len(unique_ids), window_start, window_end,
+            len(timesheet_entries), len(payroll_records), len(sick_leave),
+        )
+
+        return cls(
+            unique_ids, window_start, window_end,
+            timesheet_entries, payroll_records, sick_leave,
+        )
+
+    def employee_digest(self, employee_id: str) -> str:
+        """SHA-256 of an employee's prefetched rows.
+
+        Covers the timesheet entries, completed-run payroll records and sick
+        leave in the window, i.e. everything holiday pay reads for the
+        employee, so a change to any of them changes the digest.
+        """
+        timesheets = self._timesheets.get(employee_id)
+        payroll_records = self._payroll_records.get(employee_id)
+        sick_leave = self._sick_leave.get(employee_id)
+        canonical = json.dumps(
+            {
+                "window": [self.window_start, self.window_end],
+                "timesheets": (
+                    timesheets.entries(self.window_start, self.window_end) if timesheets else []
+                ),
+                "payroll_records": payroll_records.rows if payroll_records else [],
+                "sick_leave": sick_leave.rows if sick_leave else [],
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def covers(self, employee_id: str, start_date: date, end_date: date) -> bool:
+        """Whether [start_date, end_date] for employee_id was prefetched."""
+        return (
+            employee_id in self.employee_ids
+            and self.window_start <= start_date
+            and end_date <= self.window_end
+        )
+
+    def timesheet_index(
+        self, employee_id: str, start_date: date, end_date: date
+    ) -> TimesheetIndex | None:
+        """The employee's timesheet index, if it covers [start_date, end_date]."""
+        if not self.covers(employee_id, start_date, end_date):
+            return None
+        return self._timesheets.get(employee_id) or _EMPTY_TIMESHEET_INDEX
+
+    def timesheet_entries(
+        self, employee_id: str, start_date: date, end_date: date
+    ) -> list[dict[str, Any]] | None:
+        """Timesheet entries with work_date in [start_date, end_date], by date."""
+        index = self.timesheet_index(employee_id, start_date, end_date)
+        return index.entries(start_date, end_date) if index is not None else None
+
+    def payroll_records(
+        self,
+        employee_id: str,
+        start_date: date,
+        end_date: date,
+        exclude_run_id: str | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """Completed-run payroll records with pay_date in [start_date, end_date]."""
+        if not self.covers(employee_id, start_date, end_date):
+            return None
+        index = self._payroll_records.get(employee_id)
+        if not index:
+            return []
+        return [
+            record for record in index.between(start_date, end_date)
+            if not exclude_run_id or record.get("payroll_run_id") != exclude_run_id
+        ]
+
+    def sick_leave(
+        self, employee_id: str, start_date: date, end_date: date, is_paid: bool
+    ) -> list[dict[str, Any]] | None:
+        """Sick leave usage with usage_date in [start_date, end_date]."""
+        if not self.covers(employee_id, start_date, end_date):
+            return None
+        index = self._sick_leave.get(employee_id)
+        if not index:
+            return []
+        return [
+            usage for usage in index.between(start_date, end_date)
+            if bool(usage.get("is_paid")) == is_paid
+        ]
+
+
+def _timesheet_query(supabase: Any, employee_ids: list[str], start: str, end: str) -> Any:
+    return supabase.table("timesheet_entries").select(
+        TIMESHEET_COLUMNS
+    ).in_("employee_id", employee_ids).gte("work_date", start).lte(
+        "work_date", end
+    ).order("id")
+
+
+def _payroll_records_query(
+    supabase: Any, employee_ids: list[str], start: str, end: str
+) -> Any:
+    return supabase.table("payroll_records").select(
+        PAYROLL_RECORD_COLUMNS
+    ).in_("employee_id", employee_ids).in_(
+        "payroll_runs.status", COMPLETED_RUN_STATUSES
+    ).gte("payroll_runs.pay_date", start).lte(
+        "payroll_runs.pay_date", end
+    ).order("id")
+
+
+def _sick_leave_query(supabase: Any, employee_ids: list[str], start: str, end: str) -> Any:
+    return supabase.table("sick_leave_usage_history").select(
+        SICK_LEAVE_COLUMNS
+    ).in_("employee_id", employee_ids).gte("usage_date", start).lte(
+        "usage_date", end
+    ).order("id")
+
+
+def _paged(build_query: Callable[[], Any]) -> list[dict[str, Any]]:
+    """Fetch every row of a query, CONTEXT_PAGE_SIZE rows per request."""
+    rows: list[dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = build_query().range(offset, offset + CONTEXT_PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < CONTEXT_PAGE_SIZE:
+            return rows
+        offset += CONTEXT_PAGE_SIZE
@@ -12,6 +12,7 @@ from decimal import Decimal
 from typing import Any
 
 from app.services.payroll_run.constants import COMPLETED_RUN_STATUSES
+from app.services.payroll_run.holiday_pay.context import HolidayPayContext
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,34 @@ class EarningsFetcher:
             supabase: Supabase client instance
         """
         self.supabase = supabase
+        # Run-level prefetched data, set by HolidayPayCalculator.prefetch()
+        self.context: HolidayPayContext | None = None
+
+    def _timesheet_hours(
+        self, employee_id: str, start_date: date, end_date: date
+    ) -> tuple[Decimal, Decimal]:
+        """Total (regular, overtime) timesheet hours in [start_date, end_date]."""
+        if self.context is not None:
+            index = self.context.timesheet_index(employee_id, start_date, end_date)
+            if index is not None:
+                return index.hours(start_date, end_date)
+
+        result = self.supabase.table("timesheet_entries").select(
+            "regular_hours, overtime_hours"
+        ).eq(
+            "employee_id", employee_id
+        ).gte(
+            "work_date", start_date.isoformat()
+        ).lte(
+            "work_date", end_date.isoformat()
+        ).execute()
+
+        regular_hours = Decimal("0")
+        overtime_hours = Decimal("0")
+        for entry in result.data or []:
+            regular_hours += Decimal(str(entry.get("regular_hours", 0) or 0))
+            overtime_hours += Decimal(str(entry.get("overtime_hours", 0) or 0))
+        return regular_hours, overtime_hours
 
     def get_wages_from_timesheet(
         self,
@@ -57,25 +86,11 @@ class EarningsFetcher:
             Total wages as Decimal
         """
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "regular_hours, overtime_hours"
-            ).eq(
-                "employee_id", employee_id
-            ).gte(
-                "work_date", start_date.isoformat()
-            ).lte(
-                "work_date", end_date.isoformat()
-            ).execute()
-
-            total_regular_hours = Decimal("0")
-            total_overtime_hours = Decimal("0")
-            for entry in result.data or []:
-                regular = Decimal(str(entry.get("regular_hours", 0) or 0))
-                overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
-
-                total_regular_hours += regular
-                if include_overtime:
-                    total_overtime_hours += overtime
+            total_regular_hours, total_overtime_hours = self._timesheet_hours(
+                employee_id, start_date, end_date
+            )
+            if not include_overtime:
+                total_overtime_hours = Decimal("0")
 
             regular_wages = total_regular_hours * hourly_rate
             overtime_wages = total_overtime_hours * hourly_rate * overtime_multiplier
@@ -110,22 +125,27 @@ class EarningsFetcher:
         start_date = before_date - timedelta(days=28)
 
         try:
-            result = self.supabase.table("payroll_records").select(
-                "gross_regular, gross_overtime, vacation_pay_paid, "
-                "payroll_runs!inner(id, pay_date, status)"
-            ).eq(
-                "employee_id", employee_id
-            ).neq(
-                "payroll_run_id", current_run_id
-            ).gte(
-                "payroll_runs.pay_date", start_date.isoformat()
-            ).lt(
-                "payroll_runs.pay_date", before_date.isoformat()
-            ).in_(
-                "payroll_runs.status", COMPLETED_RUN_STATUSES
-            ).execute()
-
-            records = result.data or []
+            records = None
+            if self.context is not None:
+                records = self.context.payroll_records(
+                    employee_id, start_date, before_date - timedelta(days=1), current_run_id
+                )
+            if records is None:
+                result = self.supabase.table("payroll_records").select(
+                    "gross_regular, gross_overtime, vacation_pay_paid, "
+                    "payroll_runs!inner(id, pay_date, status)"
+                ).eq(
+                    "employee_id", employee_id
+                ).neq(
+                    "payroll_run_id", current_run_id
+                ).gte(
+                    "payroll_runs.pay_date", start_date.isoformat()
+                ).lt(
+                    "payroll_runs.pay_date", before_date.isoformat()
+                ).in_(
+                    "payroll_runs.status", COMPLETED_RUN_STATUSES
+                ).execute()
+                records = result.data or []
 
             logger.info(
                 "4-week earnings query for %s: start=%s, before=%s, records=%d",
@@ -184,24 +204,10 @@ class EarningsFetcher:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "regular_hours, overtime_hours"
-            ).eq(
-                "employee_id", employee_id
-            ).gte(
-                "work_date", start_date.isoformat()
-            ).lte(
-                "work_date", end_date.isoformat()
-            ).execute()
-
-            total_hours = Decimal("0")
-            for entry in result.data or []:
-                regular = Decimal(str(entry.get("regular_hours", 0) or 0))
-                overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
-                if include_overtime:
-                    total_hours += regular + overtime
-                else:
-                    total_hours += regular
+            regular_hours, overtime_hours = self._timesheet_hours(
+                employee_id, start_date, end_date
+            )
+            total_hours = regular_hours + overtime_hours if include_overtime else regular_hours
 
             total_wages = total_hours * hourly_rate
 
@@ -240,22 +246,27 @@ class EarningsFetcher:
         start_date = before_date - timedelta(days=lookback_days)
 
         try:
-            result = self.supabase.table("payroll_records").select(
-                "gross_regular, vacation_pay_paid, holiday_pay, "
-                "payroll_runs!inner(id, pay_date, status)"
-            ).eq(
-                "employee_id", employee_id
-            ).neq(
-                "payroll_run_id", current_run_id
-            ).gte(
-                "payroll_runs.pay_date", start_date.isoformat()
-            ).lt(
-                "payroll_runs.pay_date", before_date.isoformat()
-            ).in_(
-                "payroll_runs.status", COMPLETED_RUN_STATUSES
-            ).execute()
-
-            records = result.data or []
+            records = None
+            if self.context is not None:
+                records = self.context.payroll_records(
+                    employee_id, start_date, before_date - timedelta(days=1), current_run_id
+                )
+            if records is None:
+                result = self.supabase.table("payroll_records").select(
+                    "gross_regular, vacation_pay_paid, holiday_pay, "
+                    "payroll_runs!inner(id, pay_date, status)"
+                ).eq(
+                    "employee_id", employee_id
+                ).neq(
+                    "payroll_run_id", current_run_id
+                ).gte(
+                    "payroll_runs.pay_date", start_date.isoformat()
+                ).lt(
+                    "payroll_runs.pay_date", before_date.isoformat()
+                ).in_(
+                    "payroll_runs.status", COMPLETED_RUN_STATUSES
+                ).execute()
+                records = result.data or []
 
             if not records:
                 return Decimal("0"), Decimal("0"), Decimal("0")
@@ -14,6 +14,7 @@ from typing import Any
 from dateutil.relativedelta import relativedelta
 
 from app.models.holiday_pay_config import HolidayPayConfig
+from app.services.payroll_run.holiday_pay.context import HolidayPayContext
 from app.services.payroll_run.holiday_pay.work_day_tracker import WorkDayTracker
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,8 @@ class EligibilityChecker:
         """
         self.supabase = supabase
         self.work_day_tracker = work_day_tracker
+        # Run-level prefetched data, set by HolidayPayCalculator.prefetch()
+        self.context: HolidayPayContext | None = None
 
     def is_eligible_for_holiday_pay(
         self,
@@ -398,42 +401,14 @@ class EligibilityChecker:
 
         if last_scheduled_day is not None:
             try:
-                result = (
-                    self.supabase.table("timesheet_entries")
-                    .select("regular_hours, overtime_hours")
-                    .eq("employee_id", employee_id)
-                    .eq("work_date", last_scheduled_day.isoformat())
-                    .execute()
-                )
-
-                if result.data and len(result.data) > 0:
-                    entry = result.data[0]
-                    regular = Decimal(str(entry.get("regular_hours", 0) or 0))
-                    overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
-                    worked_before = (regular + overtime) > 0
-                else:
-                    worked_before = False
+                worked_before = self._worked_on(employee_id, last_scheduled_day)
             except Exception as e:
                 logger.warning("Failed to check last scheduled day: %s", e)
                 worked_before = not strict_mode
 
         if first_scheduled_day is not None:
             try:
-                result = (
-                    self.supabase.table("timesheet_entries")
-                    .select("regular_hours, overtime_hours")
-                    .eq("employee_id", employee_id)
-                    .eq("work_date", first_scheduled_day.isoformat())
-                    .execute()
-                )
-
-                if result.data and len(result.data) > 0:
-                    entry = result.data[0]
-                    regular = Decimal(str(entry.get("regular_hours", 0) or 0))
-                    overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
-                    worked_after = (regular + overtime) > 0
-                else:
-                    worked_after = False
+                worked_after = self._worked_on(employee_id, first_scheduled_day)
             except Exception as e:
                 logger.warning("Failed to check first scheduled day: %s", e)
                 worked_after = not strict_mode
@@ -444,3 +419,24 @@ class EligibilityChecker:
         )
 
         return worked_before, worked_after, last_scheduled_day, first_scheduled_day
+
+    def _worked_on(self, employee_id: str, work_day: date) -> bool:
+        """Whether the employee logged hours on work_day."""
+        if self.context is not None:
+            index = self.context.timesheet_index(employee_id, work_day, work_day)
+            if index is not None:
+                return bool(index.worked_on(work_day))
+
+        result = (
+            self.supabase.table("timesheet_entries")
+            .select("regular_hours, overtime_hours")
+            .eq("employee_id", employee_id)
+            .eq("work_date", work_day.isoformat())
+            .execute()
+        )
+        if result.data and len(result.data) > 0:
+            entry = result.data[0]
+            regular = Decimal(str(entry.get("regular_hours", 0) or 0))
+            overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
+            return (regular + overtime) > 0
+        return False
@@ -12,6 +12,7 @@ from typing import Any
 
 from app.services.payroll_run.constants import COMPLETED_RUN_STATUSES
 from app.services.payroll_run.gross_calculator import GrossCalculator
+from app.services.payroll_run.holiday_pay.context import HolidayPayContext
 from app.services.payroll_run.holiday_pay.earnings_fetcher import EarningsFetcher
 from app.services.payroll_run.holiday_pay.work_day_tracker import WorkDayTracker
 
@@ -57,6 +58,8 @@ class FormulaCalculators:
         self.supabase = supabase
         self.earnings_fetcher = earnings_fetcher
         self.work_day_tracker = work_day_tracker
+        # Run-level prefetched data, set by HolidayPayCalculator.prefetch()
+        self.context: HolidayPayContext | None = None
 
     def apply_30_day_average(
         self,
@@ -111,17 +114,20 @@ class FormulaCalculators:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "work_date, regular_hours, overtime_hours"
-            ).eq(
-                "employee_id", employee_id
-            ).gte(
-                "work_date", start_date.isoformat()
-            ).lte(
-                "work_date", end_date.isoformat()
-            ).execute()
-
-            entries = result.data or []
+            entries = None
+            if self.context is not None:
+                entries = self.context.timesheet_entries(employee_id, start_date, end_date)
+            if entries is None:
+                result = self.supabase.table("timesheet_entries").select(
+                    "work_date, regular_hours, overtime_hours"
+                ).eq(
+                    "employee_id", employee_id
+                ).gte(
+                    "work_date", start_date.isoformat()
+                ).lte(
+                    "work_date", end_date.isoformat()
+                ).execute()
+                entries = result.data or []
 
             if not entries:
                 if new_employee_fallback == "pro_rated":
@@ -167,21 +173,27 @@ class FormulaCalculators:
 
             if include_vacation_pay or include_previous_holiday_pay:
                 try:
-                    payroll_result = self.supabase.table("payroll_records").select(
-                        "vacation_pay_paid, holiday_pay, "
-                        "payroll_runs!inner(id, pay_date, status)"
-                    ).eq(
-                        "employee_id", employee_id
-                    ).gte(
-                        "payroll_runs.pay_date", start_date.isoformat()
-                    ).lt(
-                        "payroll_runs.pay_date", end_date.isoformat()
-                    ).in_(
-                        "payroll_runs.status", COMPLETED_RUN_STATUSES
-                    ).execute()
+                    records = None
+                    if self.context is not None:
+                        records = self.context.payroll_records(
+                            employee_id, start_date, end_date - timedelta(days=1)
+                        )
+                    if records is None:
+                        payroll_result = self.supabase.table("payroll_records").select(
+                            "vacation_pay_paid, holiday_pay, "
+                            "payroll_runs!inner(id, pay_date, status)"
+                        ).eq(
+                            "employee_id", employee_id
+                        ).gte(
+                            "payroll_runs.pay_date", start_date.isoformat()
+                        ).lt(
+                            "payroll_runs.pay_date", end_date.isoformat()
+                        ).in_(
+                            "payroll_runs.status", COMPLETED_RUN_STATUSES
+                        ).execute()
+                        records = payroll_result.data or []
 
                     # Exclude current run if provided
-                    records = payroll_result.data or []
                     for record in records:
                         run_info = record.get("payroll_runs", {})
                         if current_run_id and run_info.get("id") == current_run_id:
@@ -312,20 +324,25 @@ class FormulaCalculators:
             Total sick pay as Decimal
         """
         try:
-            result = self.supabase.table("sick_leave_usage_history").select(
-                "sick_pay_amount"
-            ).eq(
-                "employee_id", employee_id
-            ).eq(
-                "is_paid", True
-            ).gte(
-                "usage_date", start_date.isoformat()
-            ).lte(
-                "usage_date", end_date.isoformat()
-            ).execute()
+            records = None
+            if self.context is not None:
+                records = self.context.sick_leave(employee_id, start_date, end_date, is_paid=True)
+            if records is None:
+                result = self.supabase.table("sick_leave_usage_history").select(
+                    "sick_pay_amount"
+                ).eq(
+                    "employee_id", employee_id
+                ).eq(
+                    "is_paid", True
+                ).gte(
+                    "usage_date", start_date.isoformat()
+                ).lte(
+                    "usage_date", end_date.isoformat()
+                ).execute()
+                records = result.data or []
 
             total_sick_pay = Decimal("0")
-            for record in result.data or []:
+            for record in records:
                 amount = record.get("sick_pay_amount")
                 if amount:
                     total_sick_pay += Decimal(str(amount))
@@ -399,17 +416,20 @@ class FormulaCalculators:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "work_date, regular_hours, overtime_hours"
-            ).eq(
-                "employee_id", employee_id
-            ).gte(
-                "work_date", start_date.isoformat()
-            ).lte(
-                "work_date", end_date.isoformat()
-            ).execute()
-
-            entries = result.data or []
+            entries = None
+            if self.context is not None:
+                entries = self.context.timesheet_entries(employee_id, start_date, end_date)
+            if entries is None:
+                result = self.supabase.table("timesheet_entries").select(
+                    "work_date, regular_hours, overtime_hours"
+                ).eq(
+                    "employee_id", employee_id
+                ).gte(
+                    "work_date", start_date.isoformat()
+                ).lte(
+                    "work_date", end_date.isoformat()
+                ).execute()
+                entries = result.data or []
 
             if not entries:
                 logger.info("NL 3-week avg: No data for %s", employee_id)
@@ -469,22 +489,27 @@ class FormulaCalculators:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("payroll_records").select(
-                "gross_regular, gross_overtime, "
-                "payroll_runs!inner(id, pay_date, status)"
-            ).eq(
-                "employee_id", employee_id
-            ).neq(
-                "payroll_run_id", current_run_id
-            ).gte(
-                "payroll_runs.pay_date", start_date.isoformat()
-            ).lt(
-                "payroll_runs.pay_date", end_date.isoformat()
-            ).in_(
-                "payroll_runs.status", COMPLETED_RUN_STATUSES
-            ).execute()
-
-            records = result.data or []
+            records = None
+            if self.context is not None:
+                records = self.context.payroll_records(
+                    employee_id, start_date, end_date - timedelta(days=1), current_run_id
+                )
+            if records is None:
+                result = self.supabase.table("payroll_records").select(
+                    "gross_regular, gross_overtime, "
+                    "payroll_runs!inner(id, pay_date, status)"
+                ).eq(
+                    "employee_id", employee_id
+                ).neq(
+                    "payroll_run_id", current_run_id
+                ).gte(
+                    "payroll_runs.pay_date", start_date.isoformat()
+                ).lt(
+                    "payroll_runs.pay_date", end_date.isoformat()
+                ).in_(
+                    "payroll_runs.status", COMPLETED_RUN_STATUSES
+                ).execute()
+                records = result.data or []
 
             if not records:
                 # Try timesheet-based calculation
@@ -553,22 +578,27 @@ class FormulaCalculators:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("payroll_records").select(
-                "gross_regular, gross_overtime, commission_pay, "
-                "payroll_runs!inner(id, pay_date, status)"
-            ).eq(
-                "employee_id", employee_id
-            ).neq(
-                "payroll_run_id", current_run_id
-            ).gte(
-                "payroll_runs.pay_date", start_date.isoformat()
-            ).lt(
-                "payroll_runs.pay_date", end_date.isoformat()
-            ).in_(
-                "payroll_runs.status", COMPLETED_RUN_STATUSES
-            ).execute()
-
-            records = result.data or []
+            records = None
+            if self.context is not None:
+                records = self.context.payroll_records(
+                    employee_id, start_date, end_date - timedelta(days=1), current_run_id
+                )
+            if records is None:
+                result = self.supabase.table("payroll_records").select(
+                    "gross_regular, gross_overtime, commission_pay, "
+                    "payroll_runs!inner(id, pay_date, status)"
+                ).eq(
+                    "employee_id", employee_id
+                ).neq(
+                    "payroll_run_id", current_run_id
+                ).gte(
+                    "payroll_runs.pay_date", start_date.isoformat()
+                ).lt(
+                    "payroll_runs.pay_date", end_date.isoformat()
+                ).in_(
+                    "payroll_runs.status", COMPLETED_RUN_STATUSES
+                ).execute()
+                records = result.data or []
 
             if not records:
                 logger.info("Commission: No data for %s", employee_id)
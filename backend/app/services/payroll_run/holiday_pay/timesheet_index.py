@@ -0,0 +1,128 @@
+"""Date Index over an Employee's Timesheet Entries.
+
+Answers the range questions holiday pay asks of timesheets - days worked in
+a window, hours in a window, nearest work day before/after a date, days
+worked on a given weekday - with binary searches over sorted date ordinals
+and prefix sums of hours, instead of a query and a scan per question.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Any
+
+from app.utils.business_days import ordinal_span
+
+_DAY = timedelta(days=1)
+
+
+class TimesheetIndex:
+    """One employee's timesheet entries indexed by work date.
+
+    A day counts as worked when its entries total more than zero regular plus
+    overtime hours. All ranges are inclusive of both ends.
+    """
+
+    def __init__(self, entries: list[dict[str, Any]]):
+        """Build the index.
+
+        Args:
+            entries: Timesheet entries with work_date, regular_hours and
+                overtime_hours (entries without a valid work_date are skipped)
+        """
+        keyed: list[tuple[int, dict[str, Any]]] = []
+        daily: dict[int, tuple[Decimal, Decimal]] = {}
+        for entry in entries:
+            try:
+                ordinal = date.fromisoformat(entry.get("work_date") or "").toordinal()
+            except (ValueError, TypeError):
+                continue
+            keyed.append((ordinal, entry))
+            regular, overtime = daily.get(ordinal, (Decimal("0"), Decimal("0")))
+            daily[ordinal] = (
+                regular + Decimal(str(entry.get("regular_hours", 0) or 0)),
+                overtime + Decimal(str(entry.get("overtime_hours", 0) or 0)),
+            )
+        keyed.sort(key=lambda item: item[0])
+
+        # Every entry, for callers that need the rows themselves
+        self._entry_ordinals = [ordinal for ordinal, _ in keyed]
+        self._entries = [entry for _, entry in keyed]
+
+        # One slot per day with entries; prefix sums have a leading zero
+        self._day_ordinals = sorted(daily)
+        self._regular_prefix = list(
+            accumulate((daily[o][0] for o in self._day_ordinals), initial=Decimal("0"))
+        )
+        self._overtime_prefix = list(
+            accumulate((daily[o][1] for o in self._day_ordinals), initial=Decimal("0"))
+        )
+
+        self._worked = [o for o in self._day_ordinals if sum(daily[o]) > 0]
+        self._worked_by_weekday: list[list[int]] = [[] for _ in range(7)]
+        for ordinal in self._worked:
+            self._worked_by_weekday[date.fromordinal(ordinal).weekday()].append(ordinal)
+
+    def entries(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """Entries with work_date in the range, ordered by work_date."""
+        lo, hi = ordinal_span(self._entry_ordinals, start_date, end_date + _DAY)
+        return self._entries[lo:hi]
+
+    def days_worked(self, start_date: date, end_date: date) -> int:
+        """Number of worked days in the range."""
+        lo, hi = ordinal_span(self._worked, start_date, end_date + _DAY)
+        return hi - lo
+
+    def has_work(self, start_date: date, end_date: date) -> bool:
+        """Whether any day in the range was worked."""
+        return self.days_worked(start_date, end_date) > 0
+
+    def days_worked_on_weekday(self, weekday: int, start_date: date, end_date: date) -> int:
+        """Number of worked days in the range falling on weekday (Mon=0)."""
+        lo, hi = ordinal_span(self._worked_by_weekday[weekday], start_date, end_date + _DAY)
+        return hi - lo
+
+    def hours(self, start_date: date, end_date: date) -> tuple[Decimal, Decimal]:
+        """Total (regular_hours, overtime_hours) in the range."""
+        lo, hi = ordinal_span(self._day_ordinals, start_date, end_date + _DAY)
+        return (
+            self._regular_prefix[hi] - self._regular_prefix[lo],
+            self._overtime_prefix[hi] - self._overtime_prefix[lo],
+        )
+
+    def worked_on(self, day: date) -> bool | None:
+        """Whether day was worked, or None if it has no entries."""
+        lo, hi = ordinal_span(self._day_ordinals, day, day + _DAY)
+        if lo == hi:
+            return None
+        return self.days_worked(day, day) > 0
+
+    def nearest_work_day(self, day: date, direction: str, max_days: int) -> date | None:
+        """Nearest day with entries within max_days before/after day, if worked.
+
+        Mirrors WorkDayTracker.find_nearest_work_day: the nearest day that has
+        any entry is the scheduled day, and it only counts if it was worked.
+
+        Args:
+            day: Reference date (excluded from the search)
+            direction: "before" to search backward, otherwise forward
+            max_days: Days to search
+
+        Returns:
+            The nearest scheduled day if worked, else None
+        """
+        if direction == "before":
+            lo, hi = ordinal_span(self._day_ordinals, day - timedelta(days=max_days), day)
+            nearest = self._day_ordinals[hi - 1] if hi > lo else None
+        else:
+            lo, hi = ordinal_span(
+                self._day_ordinals, day + _DAY, day + timedelta(days=max_days + 1)
+            )
+            nearest = self._day_ordinals[lo] if hi > lo else None
+
+        if nearest is None:
+            return None
+        nearest_day = date.fromordinal(nearest)
+        return nearest_day if self.worked_on(nearest_day) else None
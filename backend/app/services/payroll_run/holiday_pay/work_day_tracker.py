@@ -12,6 +12,9 @@ from decimal import Decimal
 from typing import Any
 
 from app.models.holiday_pay_config import HolidayPayConfig
+from app.services.payroll_run.holiday_pay.context import HolidayPayContext
+from app.services.payroll_run.holiday_pay.timesheet_index import TimesheetIndex
+from app.utils.business_days import HolidayCalendar, count_business_days
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +37,25 @@ class WorkDayTracker:
             supabase: Supabase client instance
         """
         self.supabase = supabase
+        # Run-level prefetched data, set by HolidayPayCalculator.prefetch()
+        self.context: HolidayPayContext | None = None
+        # Statutory holiday calendars by year, see _holiday_calendar()
+        self._holiday_calendars: dict[int, HolidayCalendar] = {}
+
+    def _timesheet_index(
+        self, employee_id: str, start_date: date, end_date: date
+    ) -> TimesheetIndex | None:
+        """Prefetched timesheet index covering [start_date, end_date], or None to query."""
+        if self.context is None:
+            return None
+        return self.context.timesheet_index(employee_id, start_date, end_date)
+
+    def _cached_timesheet_entries(
+        self, employee_id: str, start_date: date, end_date: date
+    ) -> list[dict[str, Any]] | None:
+        """Prefetched entries in [start_date, end_date], or None to query."""
+        index = self._timesheet_index(employee_id, start_date, end_date)
+        return index.entries(start_date, end_date) if index is not None else None
 
     def has_work_in_range(
         self,
@@ -105,6 +127,16 @@ class WorkDayTracker:
         Returns:
             Number of unique days entitled to wages
         """
+        # The run's timesheet index answers this without scanning the entries
+        if (
+            employee_id
+            and (index := self._timesheet_index(employee_id, start_date, end_date)) is not None
+        ):
+            paid_leave_days = self._get_paid_leave_days(employee_id, start_date, end_date)
+            return index.days_worked(start_date, end_date) + sum(
+                1 for day in paid_leave_days if not index.worked_on(day)
+            )
+
         days_with_wages: set[date] = set()
 
         # Count days with work hours from timesheet
@@ -150,19 +182,24 @@ class WorkDayTracker:
         paid_leave_dates: set[date] = set()
 
         try:
-            result = self.supabase.table("sick_leave_usage_history").select(
-                "usage_date"
-            ).eq(
-                "employee_id", employee_id
-            ).eq(
-                "is_paid", True
-            ).gte(
-                "usage_date", start_date.isoformat()
-            ).lte(
-                "usage_date", end_date.isoformat()
-            ).execute()
-
-            for record in result.data or []:
+            records = None
+            if self.context is not None:
+                records = self.context.sick_leave(employee_id, start_date, end_date, is_paid=True)
+            if records is None:
+                result = self.supabase.table("sick_leave_usage_history").select(
+                    "usage_date"
+                ).eq(
+                    "employee_id", employee_id
+                ).eq(
+                    "is_paid", True
+                ).gte(
+                    "usage_date", start_date.isoformat()
+                ).lte(
+                    "usage_date", end_date.isoformat()
+                ).execute()
+                records = result.data or []
+
+            for record in records:
                 usage_date_str = record.get("usage_date")
                 if usage_date_str:
                     try:
@@ -211,19 +248,26 @@ class WorkDayTracker:
         unpaid_leave_dates: set[date] = set()
 
         try:
-            result = self.supabase.table("sick_leave_usage_history").select(
-                "usage_date"
-            ).eq(
-                "employee_id", employee_id
-            ).eq(
-                "is_paid", False  # Only unpaid sick leave
-            ).gte(
-                "usage_date", start_date.isoformat()
-            ).lt(
-                "usage_date", end_date.isoformat()
-            ).execute()
-
-            for record in result.data or []:
+            records = None
+            if self.context is not None:
+                records = self.context.sick_leave(
+                    employee_id, start_date, end_date - timedelta(days=1), is_paid=False
+                )
+            if records is None:
+                result = self.supabase.table("sick_leave_usage_history").select(
+                    "usage_date"
+                ).eq(
+                    "employee_id", employee_id
+                ).eq(
+                    "is_paid", False  # Only unpaid sick leave
+                ).gte(
+                    "usage_date", start_date.isoformat()
+                ).lt(
+                    "usage_date", end_date.isoformat()
+                ).execute()
+                records = result.data or []
+
+            for record in records:
                 usage_date_str = record.get("usage_date")
                 if usage_date_str:
                     try:
@@ -283,17 +327,18 @@ class WorkDayTracker:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "work_date, regular_hours, overtime_hours"
-            ).eq(
-                "employee_id", employee["id"]
-            ).gte(
-                "work_date", start_date.isoformat()
-            ).lte(
-                "work_date", end_date.isoformat()
-            ).execute()
-
-            entries = result.data or []
+            entries = self._cached_timesheet_entries(employee["id"], start_date, end_date)
+            if entries is None:
+                result = self.supabase.table("timesheet_entries").select(
+                    "work_date, regular_hours, overtime_hours"
+                ).eq(
+                    "employee_id", employee["id"]
+                ).gte(
+                    "work_date", start_date.isoformat()
+                ).lte(
+                    "work_date", end_date.isoformat()
+                ).execute()
+                entries = result.data or []
 
             if not entries:
                 logger.debug(
@@ -364,29 +409,32 @@ class WorkDayTracker:
             Number of unique days with hours > 0 in the period
         """
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "work_date, regular_hours, overtime_hours"
-            ).eq(
-                "employee_id", employee_id
-            ).gte(
-                "work_date", start_date.isoformat()
-            ).lt(
-                "work_date", end_date.isoformat()
-            ).execute()
-
-            entries = result.data or []
-
-            days_with_work: set[str] = set()
-            for entry in entries:
-                work_date = entry.get("work_date")
-                if not work_date:
-                    continue
-                regular = Decimal(str(entry.get("regular_hours", 0) or 0))
-                overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
-                if regular + overtime > 0:
-                    days_with_work.add(work_date)
+            last_date = end_date - timedelta(days=1)
+            index = self._timesheet_index(employee_id, start_date, last_date)
+            if index is not None:
+                work_days_count = index.days_worked(start_date, last_date)
+            else:
+                result = self.supabase.table("timesheet_entries").select(
+                    "work_date, regular_hours, overtime_hours"
+                ).eq(
+                    "employee_id", employee_id
+                ).gte(
+                    "work_date", start_date.isoformat()
+                ).lt(
+                    "work_date", end_date.isoformat()
+                ).execute()
+
+                days_with_work: set[str] = set()
+                for entry in result.data or []:
+                    work_date = entry.get("work_date")
+                    if not work_date:
+                        continue
+                    regular = Decimal(str(entry.get("regular_hours", 0) or 0))
+                    overtime = Decimal(str(entry.get("overtime_hours", 0) or 0))
+                    if regular + overtime > 0:
+                        days_with_work.add(work_date)
+                work_days_count = len(days_with_work)
 
-            work_days_count = len(days_with_work)
             logger.debug(
                 "Work days eligibility: employee=%s, period=%s to %s, work_days=%d",
                 employee_id, start_date, end_date, work_days_count
@@ -427,6 +475,10 @@ class WorkDayTracker:
             start_date = holiday_date + timedelta(days=1)
             end_date = holiday_date + timedelta(days=max_days)
 
+        index = self._timesheet_index(employee_id, start_date, end_date)
+        if index is not None:
+            return index.nearest_work_day(holiday_date, direction, max_days)
+
         try:
             result = (
                 self.supabase.table("timesheet_entries")
@@ -469,6 +521,10 @@ class WorkDayTracker:
         Returns:
             List of timesheet entries, or None if query fails.
         """
+        entries = self._cached_timesheet_entries(employee_id, start_date, end_date)
+        if entries is not None:
+            return entries
+
         try:
             result = (
                 self.supabase.table("timesheet_entries")
@@ -499,21 +555,25 @@ class WorkDayTracker:
         end_date = holiday_date - timedelta(days=1)
 
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "work_date, regular_hours, overtime_hours"
-            ).eq("employee_id", employee_id).gte(
-                "work_date", start_date.isoformat()
-            ).lte("work_date", end_date.isoformat()).execute()
-
-            days_worked: set[date] = set()
-            for entry in result.data or []:
-                work_date = date.fromisoformat(entry["work_date"])
-                regular = Decimal(str(entry.get("regular_hours", 0)))
-                overtime = Decimal(str(entry.get("overtime_hours", 0)))
-                if regular + overtime > 0:
-                    days_worked.add(work_date)
+            index = self._timesheet_index(employee_id, start_date, end_date)
+            if index is not None:
+                count = index.days_worked(start_date, end_date)
+            else:
+                result = self.supabase.table("timesheet_entries").select(
+                    "work_date, regular_hours, overtime_hours"
+                ).eq("employee_id", employee_id).gte(
+                    "work_date", start_date.isoformat()
+                ).lte("work_date", end_date.isoformat()).execute()
+
+                days_worked: set[date] = set()
+                for entry in result.data or []:
+                    work_date = date.fromisoformat(entry["work_date"])
+                    regular = Decimal(str(entry.get("regular_hours", 0)))
+                    overtime = Decimal(str(entry.get("overtime_hours", 0)))
+                    if regular + overtime > 0:
+                        days_worked.add(work_date)
+                count = len(days_worked)
 
-            count = len(days_worked)
             logger.debug(
                 "Days worked in 4-week period for %s: %d days",
                 employee_id, count,
@@ -533,13 +593,7 @@ class WorkDayTracker:
         Returns:
             Number of business days (Mon-Fri) in the range
         """
-        count = 0
-        current = start_date
-        while current < end_date:
-            if current.weekday() < 5:  # Mon=0 to Fri=4
-                count += 1
-            current += timedelta(days=1)
-        return count
+        return count_business_days(start_date, end_date)
 
     def get_salaried_work_days_in_period(
         self,
@@ -712,28 +766,15 @@ class WorkDayTracker:
             Number of statutory holidays on business days
         """
         try:
-            result = self.supabase.table("statutory_holidays").select(
-                "holiday_date"
-            ).eq(
-                "province", province.upper()
-            ).eq(
-                "is_statutory", True
-            ).gte(
-                "holiday_date", start_date.isoformat()
-            ).lt(
-                "holiday_date", end_date.isoformat()
-            ).execute()
-
             count = 0
-            for record in result.data or []:
-                holiday_str = record.get("holiday_date")
-                if holiday_str:
-                    try:
-                        holiday = date.fromisoformat(holiday_str)
-                        if holiday.weekday() < 5:  # Only count if on business day
-                            count += 1
-                    except (ValueError, TypeError):
-                        continue
+            last_day = end_date - timedelta(days=1)
+            for year in range(start_date.year, last_day.year + 1):
+                calendar = self._holiday_calendar(year)
+                count += calendar.count_holidays(
+                    province,
+                    max(start_date, date(year, 1, 1)),
+                    min(end_date, date(year + 1, 1, 1)),
+                )
 
             if count > 0:
                 logger.debug(
@@ -746,6 +787,30 @@ class WorkDayTracker:
             logger.warning("Failed to count statutory holidays for %s: %s", province, e)
             return 0
 
+    def _holiday_calendar(self, year: int) -> HolidayCalendar:
+        """Statutory holiday calendar for all provinces in a year, loaded once.
+
+        Args:
+            year: Calendar year
+
+        Returns:
+            HolidayCalendar of the year's statutory holidays
+        """
+        calendar = self._holiday_calendars.get(year)
+        if calendar is None:
+            result = self.supabase.table("statutory_holidays").select(
+                "holiday_date, province"
+            ).eq(
+                "is_statutory", True
+            ).gte(
+                "holiday_date", date(year, 1, 1).isoformat()
+            ).lte(
+                "holiday_date", date(year, 12, 31).isoformat()
+            ).execute()
+            calendar = HolidayCalendar(result.data or [])
+            self._holiday_calendars[year] = calendar
+        return calendar
+
     def is_regular_work_day_5_of_9(
         self,
         employee_id: str,
@@ -793,20 +858,24 @@ class WorkDayTracker:
                 start_date = hire_date
 
         try:
-            result = self.supabase.table("timesheet_entries").select(
-                "work_date, regular_hours, overtime_hours"
-            ).eq("employee_id", employee_id).gte(
-                "work_date", start_date.isoformat()
-            ).lte("work_date", end_date.isoformat()).execute()
-
-            count = 0
-            for entry in result.data or []:
-                work_date = date.fromisoformat(entry["work_date"])
-                if work_date.weekday() == holiday_dow:
-                    regular = Decimal(str(entry.get("regular_hours", 0)))
-                    overtime = Decimal(str(entry.get("overtime_hours", 0)))
-                    if regular + overtime > 0:
-                        count += 1
+            index = self._timesheet_index(employee_id, start_date, end_date)
+            if index is not None:
+                count = index.days_worked_on_weekday(holiday_dow, start_date, end_date)
+            else:
+                result = self.supabase.table("timesheet_entries").select(
+                    "work_date, regular_hours, overtime_hours"
+                ).eq("employee_id", employee_id).gte(
+                    "work_date", start_date.isoformat()
+                ).lte("work_date", end_date.isoformat()).execute()
+
+                count = 0
+                for entry in result.data or []:
+                    work_date = date.fromisoformat(entry["work_date"])
+                    if work_date.weekday() == holiday_dow:
+                        regular = Decimal(str(entry.get("regular_hours", 0)))
+                        overtime = Decimal(str(entry.get("overtime_hours", 0)))
+                        if regular + overtime > 0:
+                            count += 1
 
             is_regular = count >= threshold
 
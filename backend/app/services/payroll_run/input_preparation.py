@@ -3,25 +3,108 @@ Payroll Input Preparation
 
 Prepares employee payroll inputs for calculation engine.
 Extracted from run_operations.py for better modularity.
+
+compute_inputs_hash fingerprints a record's calculation inputs, so a
+recalculation can skip records whose inputs have not changed. Prior YTD
+enters it as the versions of the completed runs it is summed from (part of
+the run context), so it is only loaded for the records being recalculated.
+Holiday pay also reads timesheets, prior payroll earnings and sick leave
+around the period's holidays; those enter the hash as a digest of the
+employee's HolidayPayContext rows, which the caller loads for the employees
+with a holiday in the period.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 from datetime import date
 from decimal import Decimal
 from typing import Any
 
+from app.core.async_db import execute, run_blocking
 from app.models.payroll import PayFrequency, Province
-from app.services.payroll import EmployeePayrollInput
+from app.services.payroll import EmployeePayrollInput, get_tax_config_repository
 from app.services.payroll_run.benefits_calculator import BenefitsCalculator
 from app.services.payroll_run.constants import get_federal_bpa, get_provincial_bpa
 from app.services.payroll_run.gross_calculator import GrossCalculator
+from app.services.payroll_run.holiday_pay import HolidayPayContext
 from app.services.payroll_run.holiday_pay_calculator import HolidayPayCalculator
 from app.services.payroll_run.ytd_calculator import YtdCalculator
 
 logger = logging.getLogger(__name__)
 
+# Bump when the calculation changes in a way that should recalculate every
+# record whose stored inputs_hash predates it
+INPUTS_HASH_VERSION = 2
+
+
+def compute_inputs_hash(
+    record: dict[str, Any],
+    run_context: dict[str, Any],
+    holiday_inputs: str | None = None,
+) -> str:
+    """Fingerprint of one payroll record's calculation inputs.
+
+    Covers the record's input_data, its employee and pay group (the joined
+    employees row, including initial YTD), the run context (pay date,
+    period, tax year, tax-table snapshot version, the completed runs prior
+    YTD is summed from and the statutory holidays of the employee's
+    province) and, when the employee has a holiday in the period, the
+    holiday pay data read for them.
+
+    Args:
+        record: Payroll record with joined employee info
+        run_context: Run-level inputs from run_inputs_context()
+        holiday_inputs: HolidayPayContext.employee_digest() for the employee,
+            if their province has a holiday in the period
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    employee = record.get("employees") or {}
+    province = employee.get("province_of_employment")
+    canonical = json.dumps(
+        {
+            "version": INPUTS_HASH_VERSION,
+            "input_data": record.get("input_data") or {},
+            "employee": employee,
+            "run": {k: v for k, v in run_context.items() if k != "holidays"},
+            "holidays": [h for h in run_context.get("holidays", []) if h.get("province") == province],
+            "holiday_inputs": holiday_inputs,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def run_inputs_context(
+    run: dict[str, Any],
+    tax_year: int,
+    holidays_in_period: list[dict[str, Any]],
+    prior_runs: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Run-level inputs shared by every record's calculation.
+
+    Args:
+        run: Payroll run data
+        tax_year: Tax year for calculations
+        holidays_in_period: Statutory holidays in the period
+        prior_runs: YtdCalculator.get_prior_run_versions() for the run
+    """
+    return {
+        "pay_date": run.get("pay_date"),
+        "period_start": run.get("period_start"),
+        "period_end": run.get("period_end"),
+        "tax_year": tax_year,
+        "tax_tables": get_tax_config_repository().snapshot_version(tax_year),
+        "prior_runs": prior_runs or [],
+        "holidays": holidays_in_period,
+    }
+
 
 class PayrollInputPreparer:
     """Prepares employee payroll inputs for calculation."""
@@ -58,6 +141,9 @@ class PayrollInputPreparer:
         pay_date: date | None,
         period_start: date | None,
         period_end: date | None,
+        holidays_in_period: list[dict[str, Any]] | None = None,
+        prior_ytd_data: dict[str, dict[str, Any]] | None = None,
+        holiday_context: HolidayPayContext | None = None,
     ) -> tuple[list[EmployeePayrollInput], dict[str, dict[str, Any]]]:
         """Prepare calculation inputs for all employees.
 
@@ -69,55 +155,76 @@ class PayrollInputPreparer:
             pay_date: Pay date for tax edition selection
             period_start: Period start date
             period_end: Period end date
+            holidays_in_period: Statutory holidays in the period (queried if None)
+            prior_ytd_data: Map of employee_id to prior YTD (queried if None)
+            holiday_context: Holiday pay data already loaded for the run
+                (prefetched if None)
 
         Returns:
             Tuple of (calculation_inputs, record_map with metadata)
         """
         # Query statutory holidays in the pay period
-        holidays_in_period = await self._get_holidays_in_period(period_start, period_end)
+        if holidays_in_period is None:
+            holidays_in_period = await self.get_holidays_in_period(period_start, period_end)
 
         # Get prior YTD data for all employees
         employee_ids = [record["employee_id"] for record in records]
-        prior_ytd_data = self.ytd_calculator.get_prior_ytd_for_employees(
-            employee_ids, run_id, year=tax_year
+        prior_ytd: dict[str, dict[str, Any]] = (
+            prior_ytd_data
+            if prior_ytd_data is not None
+            else await run_blocking(
+                self.ytd_calculator.get_prior_ytd_for_employees,
+                employee_ids, run_id, year=tax_year,
+            )
         )
 
+        # Load holiday pay data for every employee at once instead of per employee
+        if holiday_context is not None:
+            self.holiday_calculator.set_context(holiday_context)
+        else:
+            await run_blocking(self.holiday_calculator.prefetch, employee_ids, holidays_in_period)
+
         calculation_inputs: list[EmployeePayrollInput] = []
         record_map: dict[str, dict[str, Any]] = {}
 
-        for record in records:
-            calc_input, record_metadata = await self._prepare_single_input(
-                record=record,
-                run=run,
-                run_id=run_id,
-                tax_year=tax_year,
-                pay_date=pay_date,
-                period_start=period_start,
-                period_end=period_end,
-                holidays_in_period=holidays_in_period,
-                prior_ytd_data=prior_ytd_data,
-            )
-            calculation_inputs.append(calc_input)
-            record_map[record["employee_id"]] = record_metadata
+        try:
+            for record in records:
+                calc_input, record_metadata = await self._prepare_single_input(
+                    record=record,
+                    run=run,
+                    run_id=run_id,
+                    tax_year=tax_year,
+                    pay_date=pay_date,
+                    period_start=period_start,
+                    period_end=period_end,
+                    holidays_in_period=holidays_in_period,
+                    prior_ytd_data=prior_ytd,
+                )
+                calculation_inputs.append(calc_input)
+                record_map[record["employee_id"]] = record_metadata
+        finally:
+            self.holiday_calculator.set_context(None)
 
         return calculation_inputs, record_map
 
-    async def _get_holidays_in_period(
+    async def get_holidays_in_period(
         self, period_start: date | None, period_end: date | None
     ) -> list[dict[str, Any]]:
         """Query statutory holidays in the pay period."""
         if not period_start or not period_end:
             return []
 
-        holidays_result = self.supabase.table("statutory_holidays").select(
-            "holiday_date, name, province"
-        ).gte(
-            "holiday_date", period_start.strftime("%Y-%m-%d")
-        ).lte(
-            "holiday_date", period_end.strftime("%Y-%m-%d")
-        ).eq(
-            "is_statutory", True
-        ).execute()
+        holidays_result = await execute(
+            self.supabase.table("statutory_holidays").select(
+                "holiday_date, name, province"
+            ).gte(
+                "holiday_date", period_start.strftime("%Y-%m-%d")
+            ).lte(
+                "holiday_date", period_end.strftime("%Y-%m-%d")
+            ).eq(
+                "is_statutory", True
+            )
+        )
 
         return holidays_result.data or []
 
@@ -381,7 +488,9 @@ class PayrollInputPreparer:
             len(employee_holidays),
         )
 
-        holiday_result = self.holiday_calculator.calculate_holiday_pay(
+        # Queries anything the run-level prefetch did not cover
+        holiday_result = await run_blocking(
+            self.holiday_calculator.calculate_holiday_pay,
             employee=employee,
             province=province_code,
             pay_frequency=pay_frequency_str,
@@ -3,17 +3,41 @@ Paystub Generation Orchestrator
 
 Orchestrates paystub PDF generation and storage.
 Extracted from run_operations.py for better modularity.
+
+Paystubs are generated as a staged pipeline:
+
+1. prefetch - one bulk YTD query, then models and PaystubData for every record
+2. render - ReportLab PDF rendering, on the shared payroll process pool for
+   runs of at least PAYSTUB_RENDER_POOL_THRESHOLD paystubs, else one thread
+3. upload / db_update - at most PAYSTUB_CONCURRENCY uploads and
+   payroll_records updates in flight at once
+
+Each paystub moves to upload as soon as it is rendered. At most
+4 x PAYSTUB_CONCURRENCY paystubs are between render and db_update at once,
+so memory for rendered PDFs does not grow with the run. Per-stage timing
+is kept in last_timing.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
 from datetime import date, datetime
 from typing import Any
 
 import httpx
 
+from app.core.config import get_config
+from app.models.payroll import PayrollRecord
+from app.models.paystub import PaystubData
 from app.services.payroll import PaystubDataBuilder, PaystubGenerator
+from app.services.payroll.parallel_engine import (
+    get_payroll_process_pool,
+    shutdown_payroll_process_pool,
+)
 from app.services.payroll.paystub_storage import PaystubStorage
 from app.services.payroll_run.model_builders import ModelBuilder
 from app.services.payroll_run.ytd_calculator import YtdCalculator
@@ -21,6 +45,54 @@ from app.services.payroll_run.ytd_calculator import YtdCalculator
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PaystubJob:
+    """A paystub ready to render: everything later stages need."""
+
+    record_id: str
+    employee_id: str
+    employee_name: str
+    company_name: str
+    paystub_data: PaystubData
+
+
+@dataclass
+class PaystubPipelineTiming:
+    """
+    Timing for one generate_all_paystubs call.
+
+    prefetch_seconds and total_seconds are wall-clock. Render, upload and
+    db_update run concurrently across paystubs, so their seconds are summed
+    over paystubs and can exceed total_seconds.
+    """
+
+    paystubs: int = 0
+    render_mode: str = "in_process"  # or "process_pool"
+    concurrency: int = 1
+    prefetch_seconds: float = 0.0
+    render_seconds: float = 0.0
+    upload_seconds: float = 0.0
+    db_update_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+# Worker side: one generator (ReportLab styles) per worker process
+_worker_generator: PaystubGenerator | None = None
+
+
+def _render_paystub(paystub_data: PaystubData) -> tuple[bytes, float]:
+    """Render one paystub in a pool worker; returns (pdf_bytes, seconds)."""
+    global _worker_generator
+    started = time.perf_counter()
+    if _worker_generator is None:
+        _worker_generator = PaystubGenerator()
+    pdf_bytes = _worker_generator.generate_paystub_bytes(paystub_data)
+    return pdf_bytes, time.perf_counter() - started
+
+
 class PaystubOrchestrator:
     """Orchestrates paystub generation and storage."""
 
@@ -42,6 +114,7 @@ class PaystubOrchestrator:
         self.paystub_storage = paystub_storage
         self.paystub_builder = PaystubDataBuilder()
         self.paystub_generator = PaystubGenerator()
+        self.last_timing: PaystubPipelineTiming | None = None
 
     async def generate_all_paystubs(
         self,
@@ -57,32 +130,173 @@ class PaystubOrchestrator:
         Returns:
             Tuple of (paystubs_generated_count, error_messages)
         """
+        config = get_config()
+        concurrency = max(config.paystub_concurrency, 1)
+        pool_threshold = config.paystub_render_pool_threshold
+        timing = PaystubPipelineTiming(concurrency=concurrency)
+        started = time.perf_counter()
+
+        # 1. Prefetch
+        jobs, paystub_errors = await self._prefetch(run, records)
+        timing.prefetch_seconds = time.perf_counter() - started
+        timing.paystubs = len(jobs)
+        if pool_threshold > 0 and len(jobs) >= pool_threshold:
+            timing.render_mode = "process_pool"
+
+        # 2-3. Render, then upload and update each paystub as it is rendered;
+        # paystubs in flight are capped so rendered PDFs don't pile up ahead
+        # of uploads
+        pay_date = date.fromisoformat(run["pay_date"])
+        pipeline_slots = asyncio.Semaphore(concurrency * 4)
+        render_slot = asyncio.Semaphore(1)
+        upload_slots = asyncio.Semaphore(concurrency)
+        db_slots = asyncio.Semaphore(concurrency)
+
+        async def process(job: PaystubJob) -> None:
+            async with pipeline_slots:
+                pdf_bytes = await self._render(job, timing, render_slot)
+
+                async with upload_slots:
+                    stage_started = time.perf_counter()
+                    storage_key = await self.paystub_storage.save_paystub(
+                        pdf_bytes=pdf_bytes,
+                        company_name=job.company_name,
+                        employee_id=job.employee_id,
+                        pay_date=pay_date,
+                        record_id=job.record_id,
+                    )
+                    timing.upload_seconds += time.perf_counter() - stage_started
+
+                async with db_slots:
+                    stage_started = time.perf_counter()
+                    await asyncio.to_thread(self._mark_generated, job.record_id, storage_key)
+                    timing.db_update_seconds += time.perf_counter() - stage_started
+
+            logger.info(
+                "Generated paystub for employee %s (record %s), size: %d bytes",
+                job.employee_name, job.record_id, len(pdf_bytes)
+            )
+
+        outcomes = await asyncio.gather(
+            *(process(job) for job in jobs), return_exceptions=True
+        )
+
+        paystubs_generated = 0
+        for job, outcome in zip(jobs, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.error("Failed to generate paystub for record %s: %s", job.record_id, outcome)
+                paystub_errors.append(f"Record {job.record_id}: {str(outcome)}")
+            else:
+                paystubs_generated += 1
+
+        timing.total_seconds = time.perf_counter() - started
+        self.last_timing = timing
+        logger.info(
+            "Generated %d paystubs in %.1fs (prefetch %.1fs, render %.1fs, upload %.1fs, "
+            "db %.1fs, %s)",
+            paystubs_generated, timing.total_seconds, timing.prefetch_seconds,
+            timing.render_seconds, timing.upload_seconds, timing.db_update_seconds,
+            timing.render_mode,
+        )
+
+        return paystubs_generated, paystub_errors
+
+    async def _prefetch(
+        self,
+        run: dict[str, Any],
+        records: list[dict[str, Any]],
+    ) -> tuple[list[PaystubJob], list[str]]:
+        """Build PaystubData for every record before any rendering starts.
+
+        Args:
+            run: Payroll run data
+            records: List of payroll records with employee data
+
+        Returns:
+            Tuple of (jobs, error_messages for records that cannot be built)
+        """
         # Build PayrollRun model
         payroll_run = ModelBuilder.build_payroll_run(run)
 
         # Pre-download company logo (only once for all employees)
         logo_bytes = await self._download_company_logo(records)
 
-        paystubs_generated = 0
-        paystub_errors: list[str] = []
+        # Get prior YTD records for every employee at once
+        # Use pay_date year for YTD lookup (Canadian payroll tax is based on payment date)
+        # Cross-year example: Dec 2025 period paid in Jan 2026 → income belongs to 2026 tax year
+        ytd_records_by_employee = await self.ytd_calculator.get_ytd_records_for_employees(
+            [record["employee_id"] for record in records],
+            int(run["pay_date"][:4]),
+            str(run["id"]),
+        )
 
+        jobs: list[PaystubJob] = []
+        errors: list[str] = []
         for record_data in records:
             try:
-                success, error = await self._generate_single_paystub(
-                    record_data=record_data,
-                    run=run,
-                    payroll_run=payroll_run,
-                    logo_bytes=logo_bytes,
+                job = self._build_job(
+                    record_data,
+                    payroll_run,
+                    ytd_records_by_employee.get(record_data["employee_id"], []),
+                    logo_bytes,
                 )
-                if success:
-                    paystubs_generated += 1
-                elif error:
-                    paystub_errors.append(error)
             except Exception as e:
                 logger.error("Failed to generate paystub for record %s: %s", record_data['id'], e)
-                paystub_errors.append(f"Record {record_data['id']}: {str(e)}")
+                errors.append(f"Record {record_data['id']}: {str(e)}")
+                continue
+            if job is None:
+                errors.append(f"Record {record_data['id']}: missing company data")
+            else:
+                jobs.append(job)
 
-        return paystubs_generated, paystub_errors
+        return jobs, errors
+
+    async def _render(
+        self,
+        job: PaystubJob,
+        timing: PaystubPipelineTiming,
+        render_slot: asyncio.Semaphore,
+    ) -> bytes:
+        """Render one paystub PDF without blocking the event loop.
+
+        Args:
+            job: Paystub to render
+            timing: Pipeline timing to add render time to
+            render_slot: Serializes in-process rendering (ReportLab is not thread-safe)
+
+        Returns:
+            PDF bytes
+        """
+        if timing.render_mode == "process_pool":
+            try:
+                future = get_payroll_process_pool().submit(_render_paystub, job.paystub_data)
+                pdf_bytes, seconds = await asyncio.wrap_future(future)
+                timing.render_seconds += seconds
+                return pdf_bytes
+            except BrokenProcessPool:
+                logger.warning("Payroll process pool broken, rendering paystubs in-process")
+                shutdown_payroll_process_pool(wait=False)
+                timing.render_mode = "in_process"
+
+        async with render_slot:
+            started = time.perf_counter()
+            pdf_bytes = await asyncio.to_thread(
+                self.paystub_generator.generate_paystub_bytes, job.paystub_data
+            )
+            timing.render_seconds += time.perf_counter() - started
+            return pdf_bytes
+
+    def _mark_generated(self, record_id: str, storage_key: str) -> None:
+        """Record the stored paystub on its payroll record.
+
+        Args:
+            record_id: Payroll record ID
+            storage_key: Storage key of the uploaded PDF
+        """
+        self.supabase.table("payroll_records").update({
+            "paystub_generated_at": datetime.now().isoformat(),
+            "paystub_storage_key": storage_key,
+        }).eq("id", record_id).execute()
 
     async def _download_company_logo(
         self, records: list[dict[str, Any]]
@@ -114,23 +328,23 @@ class PaystubOrchestrator:
             logger.warning("Failed to download company logo from %s: %s", logo_url, e)
             return None
 
-    async def _generate_single_paystub(
+    def _build_job(
         self,
         record_data: dict[str, Any],
-        run: dict[str, Any],
         payroll_run: Any,
+        ytd_records: list[PayrollRecord],
         logo_bytes: bytes | None,
-    ) -> tuple[bool, str | None]:
-        """Generate a single paystub for an employee.
+    ) -> PaystubJob | None:
+        """Build the paystub data for one employee.
 
         Args:
             record_data: Payroll record data
-            run: Payroll run data
             payroll_run: PayrollRun model
+            ytd_records: Employee's records from prior completed runs this year
             logo_bytes: Company logo bytes
 
         Returns:
-            Tuple of (success, error_message)
+            PaystubJob, or None if the record has no company data
         """
         employee_data = record_data["employees"]
         company_data = employee_data.get("companies")
@@ -145,17 +359,7 @@ class PaystubOrchestrator:
             logger.warning(
                 f"Skipping paystub for record {record_data['id']}: no company data"
             )
-            return False, f"Record {record_data['id']}: missing company data"
-
-        # Get prior YTD records
-        # Use pay_date year for YTD lookup (Canadian payroll tax is based on payment date)
-        # Cross-year example: Dec 2025 period paid in Jan 2026 → income belongs to 2026 tax year
-        ytd_year = int(run["pay_date"][:4])
-        ytd_records = await self.ytd_calculator.get_ytd_records_for_employee(
-            record_data["employee_id"],
-            str(run["id"]),
-            ytd_year,
-        )
+            return None
 
         masked_sin = "***-***-***"
 
@@ -170,25 +374,10 @@ class PaystubOrchestrator:
             logo_bytes=logo_bytes,
         )
 
-        pdf_bytes = self.paystub_generator.generate_paystub_bytes(paystub_data)
-
-        pay_date = date.fromisoformat(run["pay_date"])
-        storage_key = await self.paystub_storage.save_paystub(
-            pdf_bytes=pdf_bytes,
-            company_name=company.company_name,
-            employee_id=record_data["employee_id"],
-            pay_date=pay_date,
+        return PaystubJob(
             record_id=record_data["id"],
+            employee_id=record_data["employee_id"],
+            employee_name=f"{employee.first_name} {employee.last_name}",
+            company_name=company.company_name,
+            paystub_data=paystub_data,
         )
-
-        self.supabase.table("payroll_records").update({
-            "paystub_generated_at": datetime.now().isoformat(),
-            "paystub_storage_key": storage_key,
-        }).eq("id", record_data["id"]).execute()
-
-        logger.info(
-            "Generated paystub for employee %s %s (record %s), size: %d bytes",
-            employee.first_name, employee.last_name, record_data['id'], len(pdf_bytes)
-        )
-
-        return True, None
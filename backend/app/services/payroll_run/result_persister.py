@@ -3,16 +3,48 @@ Payroll Result Persister
 
 Persists payroll calculation results to database.
 Extracted from run_operations.py for better modularity.
+
+Records are written in bulk: the calculated values are inserted into
+payroll_record_update_staging in chunks, then apply_payroll_record_updates
+copies the whole batch into payroll_records in one transaction. Either every
+record of the run is updated or none is.
+
+The run's totals are written in the same transaction: re-summed from the
+results when every record was recalculated, otherwise adjusted by the
+difference between each record's old and new values
+(apply_payroll_run_total_deltas).
+Both sides use the engine's figures: the engine's net pay (which counts
+taxable benefits and retroactive pay) is stored in calculated_net_pay,
+since the generated net_pay column cannot see either.
 """
 
 from __future__ import annotations
 
 import logging
+import math
 from decimal import Decimal
 from typing import Any, Protocol
+from uuid import uuid4
+
+from app.core.config import get_config
 
 logger = logging.getLogger(__name__)
 
+STAGING_TABLE = "payroll_record_update_staging"
+
+# payroll_runs total columns, summed over a run's results or adjusted by deltas
+RUN_TOTAL_COLUMNS = (
+    "total_gross",
+    "total_cpp_employee",
+    "total_cpp_employer",
+    "total_ei_employee",
+    "total_ei_employer",
+    "total_federal_tax",
+    "total_provincial_tax",
+    "total_net_pay",
+    "total_employer_cost",
+)
+
 
 class PayrollResult(Protocol):
     """Protocol for payroll calculation results."""
@@ -37,6 +69,9 @@ class PayrollResult(Protocol):
     provincial_tax_on_income: Decimal
     federal_tax_on_bonus: Decimal
     provincial_tax_on_bonus: Decimal
+    rrsp: Decimal
+    union_dues: Decimal
+    garnishments: Decimal
     other_deductions: Decimal
     net_pay: Decimal
     total_gross: Decimal
@@ -50,43 +85,142 @@ class PayrollResult(Protocol):
 class PayrollResultPersister:
     """Persists payroll calculation results to database."""
 
-    def __init__(self, supabase: Any):
+    def __init__(self, supabase: Any, chunk_size: int | None = None):
         """Initialize result persister.
 
         Args:
             supabase: Supabase client instance
+            chunk_size: Records staged per request
+                (default: PAYROLL_PERSIST_CHUNK_SIZE; 0 = one UPDATE per record)
         """
         self.supabase = supabase
+        self.chunk_size = (
+            chunk_size if chunk_size is not None else get_config().payroll_persist_chunk_size
+        )
 
     def persist_results(
         self,
+        run_id: str,
         results: list[Any],
         record_map: dict[str, dict[str, Any]],
         prior_ytd_data: dict[str, dict[str, Any]],
+        inputs_hashes: dict[str, str] | None = None,
+        adjust_run_totals: bool = False,
+        replace_run_totals: bool = False,
     ) -> None:
         """Persist all calculation results to database.
 
         Args:
+            run_id: Payroll run ID
             results: List of PayrollResult objects
             record_map: Map of employee_id to record data with metadata
             prior_ytd_data: Map of employee_id to prior YTD data
+            inputs_hashes: Map of employee_id to the inputs hash to store
+            adjust_run_totals: Add each record's change to the run totals
+                (for a recalculation of only some of the run's records)
+            replace_run_totals: Set the run totals to the sum of the results
+                (for a recalculation of every record)
+
+        Raises:
+            APIError: If staging or applying fails; no record is updated
         """
-        for result in results:
-            record = record_map[result.employee_id]
-            self._update_single_record(result, record, prior_ytd_data)
+        inputs_hashes = inputs_hashes or {}
+        payloads = {
+            result.employee_id: self._build_record_update(
+                result,
+                record_map[result.employee_id],
+                prior_ytd_data,
+                inputs_hashes.get(result.employee_id),
+            )
+            for result in results
+        }
+        deltas = (
+            self._total_deltas(
+                [(record_map[result.employee_id], result) for result in results]
+            )
+            if adjust_run_totals
+            else None
+        )
+
+        if self.chunk_size <= 0:
+            for result in results:
+                record = record_map[result.employee_id]
+                self.supabase.table("payroll_records").update(
+                    payloads[result.employee_id]
+                ).eq("id", record["id"]).execute()
+            if deltas is not None:
+                self.supabase.rpc(
+                    "apply_payroll_run_total_deltas", {"p_run_id": run_id, "p_deltas": deltas}
+                ).execute()
+            if replace_run_totals:
+                self.update_run_totals(run_id, results)
+            return
+
+        batch_id = str(uuid4())
+        staged = [
+            {
+                "batch_id": batch_id,
+                "record_id": record_map[result.employee_id]["id"],
+                "payroll_run_id": run_id,
+                "user_id": record_map[result.employee_id]["user_id"],
+                "payload": payloads[result.employee_id],
+            }
+            for result in results
+        ]
+        apply_params: dict[str, Any] = {
+            "p_run_id": run_id,
+            "p_batch_id": batch_id,
+            "p_expected_count": len(staged),
+        }
+        if deltas is not None:
+            apply_params["p_total_deltas"] = deltas
+        if replace_run_totals:
+            apply_params["p_run_totals"] = self.run_totals(results)
+
+        try:
+            for start in range(0, len(staged), self.chunk_size):
+                self.supabase.table(STAGING_TABLE).insert(
+                    staged[start : start + self.chunk_size]
+                ).execute()
+            self.supabase.rpc("apply_payroll_record_updates", apply_params).execute()
+        except Exception:
+            # Nothing was applied; drop the partial batch
+            self._discard_batch(batch_id)
+            raise
+
+        logger.info(
+            "Persisted %d records for run %s in %d chunks",
+            len(staged), run_id, math.ceil(len(staged) / self.chunk_size)
+        )
 
-    def _update_single_record(
+    def _discard_batch(self, batch_id: str) -> None:
+        """Delete staged rows of a batch that was not applied.
+
+        Args:
+            batch_id: Staging batch ID
+        """
+        try:
+            self.supabase.table(STAGING_TABLE).delete().eq("batch_id", batch_id).execute()
+        except Exception as e:
+            logger.warning("Failed to discard staged batch %s: %s", batch_id, e)
+
+    def _build_record_update(
         self,
         result: Any,
         record: dict[str, Any],
         prior_ytd_data: dict[str, dict[str, Any]],
-    ) -> None:
-        """Update a single payroll record with calculation results.
+        inputs_hash: str | None = None,
+    ) -> dict[str, Any]:
+        """Build the payroll_records column values for one calculation result.
 
         Args:
             result: PayrollResult object
             record: Record data with metadata
             prior_ytd_data: Map of employee_id to prior YTD data
+            inputs_hash: Inputs hash of the calculation (None = unknown)
+
+        Returns:
+            Column name to value (JSON-serializable)
         """
         input_data = record.get("input_data") or {}
         employee = record["employees"]
@@ -100,7 +234,7 @@ class PayrollResultPersister:
         sick_hours_taken = record.get("_sick_hours_taken", Decimal("0"))
         sick_pay = record.get("_sick_pay", Decimal("0"))
 
-        self.supabase.table("payroll_records").update({
+        return {
             "gross_regular": float(result.gross_regular),
             "gross_overtime": float(result.gross_overtime),
             "holiday_pay": float(result.holiday_pay),
@@ -120,7 +254,11 @@ class PayrollResultPersister:
             "provincial_tax_on_income": float(result.provincial_tax_on_income),
             "federal_tax_on_bonus": float(result.federal_tax_on_bonus),
             "provincial_tax_on_bonus": float(result.provincial_tax_on_bonus),
+            "rrsp": float(result.rrsp),
+            "union_dues": float(result.union_dues),
+            "garnishments": float(result.garnishments),
             "other_deductions": float(result.other_deductions),
+            "calculated_net_pay": float(result.net_pay),
             "cpp_employer": float(result.cpp_employer),
             "ei_employer": float(result.ei_employer),
             "ytd_gross": float(result.new_ytd_gross),
@@ -135,7 +273,8 @@ class PayrollResultPersister:
             "is_modified": False,
             "regular_hours_worked": input_data.get("regularHours"),
             "overtime_hours_worked": input_data.get("overtimeHours", 0),
-        }).eq("id", record["id"]).execute()
+            "inputs_hash": inputs_hash,
+        }
 
     def _calculate_vacation_accrued(
         self, employee: dict[str, Any], result: Any
@@ -163,6 +302,95 @@ class PayrollResultPersister:
         )
         return base_earnings * vacation_rate
 
+    @staticmethod
+    def result_totals(result: Any) -> dict[str, float]:
+        """A calculation result's contribution to its run's totals.
+
+        Args:
+            result: PayrollResult object
+
+        Returns:
+            payroll_runs total column to amount
+        """
+        cpp_employer = float(result.cpp_employer)
+        ei_employer = float(result.ei_employer)
+        return {
+            "total_gross": float(result.total_gross),
+            "total_cpp_employee": float(result.cpp_total),
+            "total_cpp_employer": cpp_employer,
+            "total_ei_employee": float(result.ei_employee),
+            "total_ei_employer": ei_employer,
+            "total_federal_tax": float(result.federal_tax),
+            "total_provincial_tax": float(result.provincial_tax),
+            "total_net_pay": float(result.net_pay),
+            "total_employer_cost": cpp_employer + ei_employer,
+        }
+
+    @staticmethod
+    def record_totals(record: dict[str, Any]) -> dict[str, float]:
+        """A stored record's contribution to its run's totals.
+
+        The same figures result_totals gave when the record was calculated.
+        Records calculated before calculated_net_pay was stored fall back to
+        the generated net_pay column.
+
+        Args:
+            record: payroll_records row
+
+        Returns:
+            payroll_runs total column to amount
+        """
+        def value(column: str) -> float:
+            return float(record.get(column) or 0)
+
+        net_pay = record.get("calculated_net_pay")
+        return {
+            "total_gross": value("total_gross"),
+            "total_cpp_employee": value("cpp_employee") + value("cpp_additional"),
+            "total_cpp_employer": value("cpp_employer"),
+            "total_ei_employee": value("ei_employee"),
+            "total_ei_employer": value("ei_employer"),
+            "total_federal_tax": value("federal_tax"),
+            "total_provincial_tax": value("provincial_tax"),
+            "total_net_pay": float(net_pay) if net_pay is not None else value("net_pay"),
+            "total_employer_cost": value("cpp_employer") + value("ei_employer"),
+        }
+
+    def _total_deltas(self, updates: list[tuple[dict[str, Any], Any]]) -> dict[str, float]:
+        """Change in the run totals from recalculating these records.
+
+        Args:
+            updates: (stored record, PayrollResult) pairs
+
+        Returns:
+            payroll_runs total column to amount to add
+        """
+        deltas = dict.fromkeys(RUN_TOTAL_COLUMNS, 0.0)
+        for record, result in updates:
+            old = self.record_totals(record)
+            new = self.result_totals(result)
+            for column in RUN_TOTAL_COLUMNS:
+                deltas[column] += new[column] - old[column]
+        return {column: round(amount, 2) for column, amount in deltas.items()}
+
+    def run_totals(self, results: list[Any]) -> dict[str, Any]:
+        """Run totals summed over every result of the run.
+
+        Args:
+            results: List of PayrollResult objects
+
+        Returns:
+            payroll_runs total column (and total_employees) to amount
+        """
+        totals = dict.fromkeys(RUN_TOTAL_COLUMNS, 0.0)
+        for result in results:
+            for column, amount in self.result_totals(result).items():
+                totals[column] += amount
+        return {
+            "total_employees": len(results),
+            **{column: round(amount, 2) for column, amount in totals.items()},
+        }
+
     def update_run_totals(self, run_id: str, results: list[Any]) -> None:
         """Calculate and update payroll run totals.
 
@@ -170,30 +398,11 @@ class PayrollResultPersister:
             run_id: Payroll run ID
             results: List of PayrollResult objects
         """
-        total_gross = sum(float(r.total_gross) for r in results)
-        total_cpp_employee = sum(float(r.cpp_total) for r in results)
-        total_cpp_employer = sum(float(r.cpp_employer) for r in results)
-        total_ei_employee = sum(float(r.ei_employee) for r in results)
-        total_ei_employer = sum(float(r.ei_employer) for r in results)
-        total_federal_tax = sum(float(r.federal_tax) for r in results)
-        total_provincial_tax = sum(float(r.provincial_tax) for r in results)
-        total_net_pay = sum(float(r.net_pay) for r in results)
-        total_employer_cost = total_cpp_employer + total_ei_employer
-
-        self.supabase.table("payroll_runs").update({
-            "total_employees": len(results),
-            "total_gross": total_gross,
-            "total_cpp_employee": total_cpp_employee,
-            "total_cpp_employer": total_cpp_employer,
-            "total_ei_employee": total_ei_employee,
-            "total_ei_employer": total_ei_employer,
-            "total_federal_tax": total_federal_tax,
-            "total_provincial_tax": total_provincial_tax,
-            "total_net_pay": total_net_pay,
-            "total_employer_cost": total_employer_cost,
-        }).eq("id", run_id).execute()
+        totals = self.run_totals(results)
+
+        self.supabase.table("payroll_runs").update(totals).eq("id", run_id).execute()
 
         logger.info(
             "Updated run %s totals: gross=%.2f, net=%.2f, employees=%d",
-            run_id, total_gross, total_net_pay, len(results)
+            run_id, totals["total_gross"], totals["total_net_pay"], len(results)
         )
@@ -22,7 +22,8 @@ from datetime import datetime, timedelta
 from typing import Any, cast
 from uuid import UUID
 
-from app.services.payroll import PayrollEngine
+from app.core.async_db import execute, run_blocking
+from app.services.payroll import ParallelPayrollEngine, PayrollEngine
 from app.services.payroll.paystub_storage import (
     PaystubStorage,
     PaystubStorageConfigError,
@@ -35,11 +36,16 @@ from app.services.payroll_run.constants import (
     is_pay_date_compliant,
 )
 from app.services.payroll_run.holiday_pay_calculator import HolidayPayCalculator
-from app.services.payroll_run.input_preparation import PayrollInputPreparer
+from app.services.payroll_run.input_preparation import (
+    PayrollInputPreparer,
+    compute_inputs_hash,
+    run_inputs_context,
+)
 from app.services.payroll_run.paystub_orchestrator import PaystubOrchestrator
 from app.services.payroll_run.result_persister import PayrollResultPersister
 from app.services.payroll_run.vacation_manager import VacationManager
 from app.services.payroll_run.ytd_calculator import YtdCalculator
+from app.services.payroll_run.ytd_ledger import YtdLedger
 from app.services.remittance import RemittancePeriodService
 
 logger = logging.getLogger(__name__)
@@ -91,18 +97,32 @@ class PayrollRunOperations:
         )
         self.result_persister = PayrollResultPersister(supabase)
         self.vacation_manager = VacationManager(supabase)
-
-    async def recalculate_run(self, run_id: UUID) -> dict[str, Any]:
-        """Recalculate all records in a draft payroll run.
-
-        1. Reads input_data from all payroll_records
-        2. Calls PayrollEngine.calculate_batch()
-        3. Updates payroll_records with new CPP/EI/Tax values
-        4. Updates payroll_runs summary totals
+        self.ytd_ledger = YtdLedger(supabase, user_id, company_id)
+
+    async def recalculate_run(self, run_id: UUID, full: bool = False) -> dict[str, Any]:
+        """Recalculate the records of a draft payroll run whose inputs changed.
+
+        A record is recalculated when it is flagged is_modified or when the
+        hash of its inputs (input_data, employee, run dates, tax tables, the
+        completed runs prior YTD is summed from, holidays and the timesheets,
+        earnings and sick leave holiday pay reads) differs from the
+        inputs_hash stored at its last calculation.
+
+        1. Computes each record's inputs hash
+        2. Loads prior YTD for the changed records and calls
+           PayrollEngine.calculate_batch() for them
+        3. Updates those payroll_records with new CPP/EI/Tax values
+        4. Updates payroll_runs summary totals in the same transaction (by
+           delta when only some records were recalculated)
         5. Clears is_modified flags
 
+        Args:
+            run_id: Payroll run ID
+            full: Recalculate every record regardless of its inputs hash
+
         Returns:
-            Updated payroll run data
+            Updated payroll run data with calculation_timing (batch and
+            per-shard seconds of the calculation; absent if nothing changed)
 
         Raises:
             ValueError: If run is not in draft status
@@ -133,32 +153,97 @@ class PayrollRunOperations:
         period_start_obj = datetime.strptime(period_start_str, "%Y-%m-%d").date() if period_start_str else None
         period_end_obj = datetime.strptime(period_end_str, "%Y-%m-%d").date() if period_end_str else None
 
-        # 1. Prepare calculation inputs
+        # 1. Find the records whose inputs changed since their last calculation.
+        # Prior YTD enters the hash as the versions of the completed runs it is
+        # summed from, so it is only loaded for the records recalculated below.
+        holidays_in_period = await self.input_preparer.get_holidays_in_period(
+            period_start_obj, period_end_obj
+        )
+        prior_runs = await run_blocking(
+            self.ytd_calculator.get_prior_run_versions, str(run_id), tax_year
+        )
+        run_context = run_inputs_context(run, tax_year, holidays_in_period, prior_runs)
+        # Holiday pay reads timesheets, earnings and sick leave around the
+        # holidays; their per-employee digest is part of the hash of employees
+        # with a holiday in the period. If they cannot be loaded, those
+        # employees are always recalculated.
+        holiday_provinces = {h.get("province") for h in holidays_in_period}
+        holiday_employee_ids = [
+            record["employee_id"] for record in records
+            if (record.get("employees") or {}).get("province_of_employment") in holiday_provinces
+        ]
+        holiday_context = (
+            await run_blocking(
+                self.holiday_calculator.load_context, holiday_employee_ids, holidays_in_period
+            )
+            if holiday_employee_ids
+            else None
+        )
+        inputs_hashes = {}
+        unverifiable = set()
+        for record in records:
+            employee_id = record["employee_id"]
+            holiday_inputs = None
+            province = (record.get("employees") or {}).get("province_of_employment")
+            if province in holiday_provinces:
+                if holiday_context is None:
+                    unverifiable.add(employee_id)
+                else:
+                    holiday_inputs = holiday_context.employee_digest(employee_id)
+            inputs_hashes[employee_id] = compute_inputs_hash(record, run_context, holiday_inputs)
+        changed = [
+            record for record in records
+            if full
+            or record.get("is_modified")
+            or record["employee_id"] in unverifiable
+            or record.get("inputs_hash") != inputs_hashes[record["employee_id"]]
+        ]
+        if not changed:
+            logger.info("Payroll run %s is up to date; nothing to recalculate", run_id)
+            return cast(dict[str, Any], run)
+
+        # 2. Prepare calculation inputs
+        prior_ytd_data = await run_blocking(
+            self.ytd_calculator.get_prior_ytd_for_employees,
+            [record["employee_id"] for record in changed], str(run_id), year=tax_year,
+        )
         calculation_inputs, record_map = await self.input_preparer.prepare_all_inputs(
             run=run,
-            records=records,
+            records=changed,
             run_id=str(run_id),
             tax_year=tax_year,
             pay_date=pay_date_obj,
             period_start=period_start_obj,
             period_end=period_end_obj,
+            holidays_in_period=holidays_in_period,
+            prior_ytd_data=prior_ytd_data,
+            holiday_context=holiday_context,
         )
 
-        # 2. Calculate using PayrollEngine
-        engine = PayrollEngine(year=tax_year)
-        results = engine.calculate_batch(calculation_inputs)
-
-        # 3. Get prior YTD for persistence
-        employee_ids = [record["employee_id"] for record in records]
-        prior_ytd_data = self.ytd_calculator.get_prior_ytd_for_employees(
-            employee_ids, str(run_id), year=tax_year
+        # 3. Calculate using PayrollEngine (process pool for large runs)
+        engine = ParallelPayrollEngine(PayrollEngine(year=tax_year))
+        results = await engine.calculate_batch_async(calculation_inputs)
+
+        # 4. Persist results with the run totals, adjusted in place unless
+        # every record changed
+        partial = len(changed) < len(records)
+        await run_blocking(
+            self.result_persister.persist_results,
+            str(run_id), results, record_map, prior_ytd_data,
+            inputs_hashes=inputs_hashes,
+            adjust_run_totals=partial,
+            replace_run_totals=not partial,
+        )
+        logger.info(
+            "Recalculated %d of %d records for payroll run %s",
+            len(changed), len(records), run_id,
         )
 
-        # 4. Persist results
-        self.result_persister.persist_results(results, record_map, prior_ytd_data)
-        self.result_persister.update_run_totals(str(run_id), results)
-
-        return await self._get_run(run_id) or {}
+        updated = await self._get_run(run_id) or {}
+        return {
+            **updated,
+            "calculation_timing": engine.last_timing.to_dict() if engine.last_timing else None,
+        }
 
     async def finalize_run(self, run_id: UUID) -> dict[str, Any]:
         """Finalize a draft payroll run, transitioning to pending_approval.
@@ -180,9 +265,11 @@ class PayrollRunOperations:
             )
 
         # Check for modified records
-        modified_result = self.supabase.table("payroll_records").select(
-            "id"
-        ).eq("payroll_run_id", str(run_id)).eq("is_modified", True).execute()
+        modified_result = await execute(
+            self.supabase.table("payroll_records").select(
+                "id"
+            ).eq("payroll_run_id", str(run_id)).eq("is_modified", True)
+        )
 
         if modified_result.data and len(modified_result.data) > 0:
             raise ValueError(
@@ -190,9 +277,11 @@ class PayrollRunOperations:
                 "changes. Please recalculate before finalizing."
             )
 
-        update_result = self.supabase.table("payroll_runs").update({
-            "status": "pending_approval"
-        }).eq("id", str(run_id)).execute()
+        update_result = await execute(
+            self.supabase.table("payroll_runs").update({
+                "status": "pending_approval"
+            }).eq("id", str(run_id))
+        )
 
         if not update_result.data or len(update_result.data) == 0:
             raise ValueError("Failed to update payroll run status")
@@ -207,7 +296,8 @@ class PayrollRunOperations:
         Generates paystub PDFs, stores them, and updates status to approved.
 
         Returns:
-            Updated payroll run data with paystubs_generated count
+            Updated payroll run data with paystubs_generated count and
+            paystub_timing (per-stage seconds of paystub generation)
 
         Raises:
             ValueError: If run is not in pending_approval status
@@ -275,30 +365,43 @@ class PayrollRunOperations:
         if approved_by:
             update_data["approved_by"] = approved_by
 
-        update_result = self.supabase.table("payroll_runs").update(
-            update_data
-        ).eq("id", str(run_id)).execute()
+        update_result = await execute(
+            self.supabase.table("payroll_runs").update(
+                update_data
+            ).eq("id", str(run_id))
+        )
 
         if not update_result.data or len(update_result.data) == 0:
             raise ValueError("Failed to update payroll run status")
 
-        # 5. Update pay group next_period_end
-        self._update_pay_group_periods(records, run)
+        # 5. Add the run to the YTD ledger (the next prior-YTD lookup applies
+        # it if this fails)
+        try:
+            await run_blocking(self.ytd_ledger.apply_run, str(run_id))
+        except Exception as e:
+            logger.error("Failed to apply run %s to YTD ledger: %s", run_id, e)
+
+        # 6. Update pay group next_period_end
+        await run_blocking(self._update_pay_group_periods, records, run)
 
-        # 6. Auto-generate/aggregate remittance period
+        # 7. Auto-generate/aggregate remittance period
         try:
-            self._update_remittance_period(update_result.data[0])
+            await run_blocking(self._update_remittance_period, update_result.data[0])
         except Exception as e:
             logger.error("Failed to update remittance period: %s", e)
 
         return {
             **update_result.data[0],
             "paystubs_generated": paystubs_generated,
+            "paystub_timing": (
+                paystub_orchestrator.last_timing.to_dict()
+                if paystub_orchestrator.last_timing else None
+            ),
         }
 
     async def _get_records_with_full_info(self, run_id: UUID) -> list[dict[str, Any]]:
         """Get payroll records with full employee, company, and pay group info."""
-        records_result = self.supabase.table("payroll_records").select(
+        records_result = await execute(self.supabase.table("payroll_records").select(
             """
             *,
             employees!inner (
@@ -324,7 +427,7 @@ class PayrollRunOperations:
             """
         ).eq("payroll_run_id", str(run_id)).eq(
             "user_id", self.user_id
-        ).eq("company_id", self.company_id).execute()
+        ).eq("company_id", self.company_id))
 
         return records_result.data or []
 
@@ -400,14 +503,14 @@ class PayrollRunOperations:
                 "not 'approved'"
             )
 
-        records_result = self.supabase.table("payroll_records").select(
+        records_result = await execute(self.supabase.table("payroll_records").select(
             """
             id, employee_id, paystub_storage_key,
             employees!inner (id, first_name, last_name, email)
             """
         ).eq("payroll_run_id", str(run_id)).eq(
             "user_id", self.user_id
-        ).eq("company_id", self.company_id).execute()
+        ).eq("company_id", self.company_id))
 
         records = records_result.data or []
         if not records:
@@ -436,9 +539,11 @@ class PayrollRunOperations:
                     f"{employee.get('first_name')} {employee.get('last_name')}"
                 )
 
-                self.supabase.table("payroll_records").update({
-                    "paystub_sent_at": datetime.now().isoformat(),
-                }).eq("id", record["id"]).execute()
+                await execute(
+                    self.supabase.table("payroll_records").update({
+                        "paystub_sent_at": datetime.now().isoformat(),
+                    }).eq("id", record["id"])
+                )
 
                 sent_count += 1
                 sent_record_ids.append(record["id"])
@@ -490,9 +595,11 @@ class PayrollRunOperations:
             ValueError: If pay_date is provided but not compliant with province regulations
         """
         # Check if run already exists for this period_end and pay_group_ids
-        existing_result = self.supabase.table("payroll_runs").select("*").eq(
-            "user_id", self.user_id
-        ).eq("company_id", self.company_id).eq("period_end", period_end).execute()
+        existing_result = await execute(
+            self.supabase.table("payroll_runs").select("*").eq(
+                "user_id", self.user_id
+            ).eq("company_id", self.company_id).eq("period_end", period_end)
+        )
 
         if existing_result.data and len(existing_result.data) > 0:
             # If pay_group_ids provided, find the run that matches those specific pay groups
@@ -534,14 +641,18 @@ class PayrollRunOperations:
         # Get pay groups - use provided IDs if available, otherwise query by next_period_end
         if pay_group_ids:
             # Use the explicitly provided pay group IDs
-            pay_groups_result = self.supabase.table("pay_groups").select(
-                "id, name, pay_frequency, employment_type, group_benefits, province"
-            ).eq("company_id", self.company_id).in_("id", pay_group_ids).eq("is_active", True).execute()
+            pay_groups_result = await execute(
+                self.supabase.table("pay_groups").select(
+                    "id, name, pay_frequency, employment_type, group_benefits, province"
+                ).eq("company_id", self.company_id).in_("id", pay_group_ids).eq("is_active", True)
+            )
         else:
             # Fallback: query by next_period_end (legacy behavior)
-            pay_groups_result = self.supabase.table("pay_groups").select(
-                "id, name, pay_frequency, employment_type, group_benefits, province"
-            ).eq("company_id", self.company_id).eq("next_period_end", period_end).eq("is_active", True).execute()
+            pay_groups_result = await execute(
+                self.supabase.table("pay_groups").select(
+                    "id, name, pay_frequency, employment_type, group_benefits, province"
+                ).eq("company_id", self.company_id).eq("next_period_end", period_end).eq("is_active", True)
+            )
 
         pay_groups = pay_groups_result.data or []
         if not pay_groups:
@@ -558,14 +669,16 @@ class PayrollRunOperations:
             pay_group_provinces = {"SK"}  # Default fallback
 
         # Get all active employees
-        employees_result = self.supabase.table("employees").select(
-            "id, first_name, last_name, province_of_employment, pay_group_id, "
-            "annual_salary, hourly_rate, standard_hours_per_week, "
-            "federal_additional_claims, provincial_additional_claims, "
-            "is_cpp_exempt, is_ei_exempt, cpp2_exempt, vacation_config"
-        ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
-            "pay_group_id", selected_pay_group_ids
-        ).is_("termination_date", "null").execute()
+        employees_result = await execute(
+            self.supabase.table("employees").select(
+                "id, first_name, last_name, province_of_employment, pay_group_id, "
+                "annual_salary, hourly_rate, standard_hours_per_week, "
+                "federal_additional_claims, provincial_additional_claims, "
+                "is_cpp_exempt, is_ei_exempt, cpp2_exempt, vacation_config"
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
+                "pay_group_id", selected_pay_group_ids
+            ).is_("termination_date", "null")
+        )
 
         employees = employees_result.data or []
         if not employees:
@@ -609,25 +722,27 @@ class PayrollRunOperations:
             pay_date_obj = calculate_pay_date(period_end_obj, most_restrictive_province)
 
         # Create the payroll run
-        run_insert_result = self.supabase.table("payroll_runs").insert({
-            "user_id": self.user_id,
-            "company_id": self.company_id,
-            "period_start": period_start.strftime("%Y-%m-%d"),
-            "period_end": period_end,
-            "pay_date": pay_date_obj.strftime("%Y-%m-%d"),
-            "status": "draft",
-            "pay_group_ids": selected_pay_group_ids,
-            "total_employees": len(employees),
-            "total_gross": 0,
-            "total_cpp_employee": 0,
-            "total_cpp_employer": 0,
-            "total_ei_employee": 0,
-            "total_ei_employer": 0,
-            "total_federal_tax": 0,
-            "total_provincial_tax": 0,
-            "total_net_pay": 0,
-            "total_employer_cost": 0,
-        }).execute()
+        run_insert_result = await execute(
+            self.supabase.table("payroll_runs").insert({
+                "user_id": self.user_id,
+                "company_id": self.company_id,
+                "period_start": period_start.strftime("%Y-%m-%d"),
+                "period_end": period_end,
+                "pay_date": pay_date_obj.strftime("%Y-%m-%d"),
+                "status": "draft",
+                "pay_group_ids": selected_pay_group_ids,
+                "total_employees": len(employees),
+                "total_gross": 0,
+                "total_cpp_employee": 0,
+                "total_cpp_employer": 0,
+                "total_ei_employee": 0,
+                "total_ei_employer": 0,
+                "total_federal_tax": 0,
+                "total_provincial_tax": 0,
+                "total_net_pay": 0,
+                "total_employer_cost": 0,
+            })
+        )
 
         if not run_insert_result.data or len(run_insert_result.data) == 0:
             raise ValueError("Failed to create payroll run")
@@ -652,17 +767,19 @@ class PayrollRunOperations:
             total_net_pay = sum(float(r.net_pay) for r in results)
             total_employer_cost = total_cpp_employer + total_ei_employer
 
-            self.supabase.table("payroll_runs").update({
-                "total_gross": total_gross,
-                "total_cpp_employee": total_cpp_employee,
-                "total_cpp_employer": total_cpp_employer,
-                "total_ei_employee": total_ei_employee,
-                "total_ei_employer": total_ei_employer,
-                "total_federal_tax": total_federal_tax,
-                "total_provincial_tax": total_provincial_tax,
-                "total_net_pay": total_net_pay,
-                "total_employer_cost": total_employer_cost,
-            }).eq("id", run_id).execute()
+            await execute(
+                self.supabase.table("payroll_runs").update({
+                    "total_gross": total_gross,
+                    "total_cpp_employee": total_cpp_employee,
+                    "total_cpp_employer": total_cpp_employer,
+                    "total_ei_employee": total_ei_employee,
+                    "total_ei_employer": total_ei_employer,
+                    "total_federal_tax": total_federal_tax,
+                    "total_provincial_tax": total_provincial_tax,
+                    "total_net_pay": total_net_pay,
+                    "total_employer_cost": total_employer_cost,
+                }).eq("id", run_id)
+            )
 
             run = await self._get_run(UUID(run_id)) or run
 
@@ -700,9 +817,11 @@ class PayrollRunOperations:
             )
 
         # Get payroll records to determine provinces from employees
-        records_result = self.supabase.table("payroll_records").select(
-            "id, employee_id, employees!inner(province_of_employment)"
-        ).eq("payroll_run_id", str(run_id)).execute()
+        records_result = await execute(
+            self.supabase.table("payroll_records").select(
+                "id, employee_id, employees!inner(province_of_employment)"
+            ).eq("payroll_run_id", str(run_id))
+        )
 
         # Collect all unique provinces from employee records
         provinces: set[str] = set()
@@ -738,9 +857,11 @@ class PayrollRunOperations:
             )
 
         # Update the pay_date
-        update_result = self.supabase.table("payroll_runs").update({
-            "pay_date": pay_date,
-        }).eq("id", str(run_id)).eq("user_id", self.user_id).eq("company_id", self.company_id).execute()
+        update_result = await execute(
+            self.supabase.table("payroll_runs").update({
+                "pay_date": pay_date,
+            }).eq("id", str(run_id)).eq("user_id", self.user_id).eq("company_id", self.company_id)
+        )
 
         if not update_result.data or len(update_result.data) == 0:
             raise ValueError("Failed to update pay date")
@@ -749,9 +870,11 @@ class PayrollRunOperations:
         # This persists the needs_recalculation state in the database
         if records_result.data:
             record_ids = [r["id"] for r in records_result.data]
-            self.supabase.table("payroll_records").update({
-                "is_modified": True,
-            }).in_("id", record_ids).execute()
+            await execute(
+                self.supabase.table("payroll_records").update({
+                    "is_modified": True,
+                }).in_("id", record_ids)
+            )
             logger.info(
                 "Marked %d records as modified after pay_date change for run %s",
                 len(record_ids), run_id
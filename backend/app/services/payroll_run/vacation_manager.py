@@ -11,6 +11,8 @@ import logging
 from decimal import Decimal
 from typing import Any
 
+from app.core.async_db import execute
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,9 +88,11 @@ class VacationManager:
             current_balance = Decimal(str(employee_data.get("vacation_balance", 0)))
             new_balance = max(current_balance + vacation_accrued - vacation_pay_paid, Decimal("0"))
 
-            self.supabase.table("employees").update({
-                "vacation_balance": float(new_balance)
-            }).eq("id", employee_data["id"]).execute()
+            await execute(
+                self.supabase.table("employees").update({
+                    "vacation_balance": float(new_balance)
+                }).eq("id", employee_data["id"])
+            )
 
             logger.info(
                 "Updated vacation balance for employee %s %s: $%.2f -> $%.2f (accrued: $%.2f, paid: $%.2f)",
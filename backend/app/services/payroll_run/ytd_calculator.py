@@ -2,40 +2,72 @@
 YTD (Year-to-Date) Calculator for Payroll Run
 
 Handles calculation of YTD totals from completed payroll runs.
+
+Prior YTD totals come from the employee YTD ledger (one row per employee)
+when enabled, falling back to summing every completed payroll record.
 """
 
 from __future__ import annotations
 
+import logging
 from decimal import Decimal
 from typing import Any
 
+from app.core.async_db import execute
+from app.core.config import get_config
 from app.models.payroll import PayrollRecord
 from app.services.payroll_run.constants import COMPLETED_RUN_STATUSES, DEFAULT_TAX_YEAR
 from app.services.payroll_run.model_builders import ModelBuilder
+from app.services.payroll_run.ytd_ledger import (
+    GROSS_COMPONENTS,
+    TOTAL_FIELDS,
+    YtdLedger,
+    add_record_totals,
+    empty_totals,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bulk YTD record lookups: employee IDs per query (keeps the PostgREST URL
+# short) and rows per page (PostgREST caps rows returned per request)
+YTD_EMPLOYEE_CHUNK_SIZE = 200
+YTD_PAGE_SIZE = 1000
 
 
 class YtdCalculator:
     """Calculates YTD totals from completed payroll runs."""
 
-    def __init__(self, supabase: Any, user_id: str, company_id: str):
+    def __init__(
+        self,
+        supabase: Any,
+        user_id: str,
+        company_id: str,
+        use_ledger: bool | None = None,
+    ):
         """Initialize YTD calculator with database context.
 
         Args:
             supabase: Supabase client instance
             user_id: Current user ID
             company_id: Current company ID
+            use_ledger: Read prior YTD totals from the YTD ledger
+                (default: YTD_LEDGER_ENABLED)
         """
         self.supabase = supabase
         self.user_id = user_id
         self.company_id = company_id
+        if use_ledger is None:
+            use_ledger = get_config().ytd_ledger_enabled
+        self.ledger = YtdLedger(supabase, user_id, company_id) if use_ledger else None
 
     def get_prior_ytd_for_employees(
         self, employee_ids: list[str], current_run_id: str, year: int = DEFAULT_TAX_YEAR
     ) -> dict[str, dict[str, Decimal]]:
         """Get prior YTD totals for employees from completed payroll runs.
 
-        This queries all approved/paid payroll_records for each employee
-        in the given year, EXCLUDING the current run, and sums their totals.
+        This totals all approved/paid payroll_records for each employee
+        in the given year, EXCLUDING the current run: from the YTD ledger when
+        enabled (one row per employee), otherwise by summing the records.
         Also includes initial_ytd_* values from employee records for transferred
         employees (those who worked at another employer earlier this year).
 
@@ -61,6 +93,99 @@ class YtdCalculator:
         # Only include values that match the current tax year
         initial_ytd = self._get_initial_ytd_for_employees(employee_ids, year)
 
+        record_totals = None
+        if self.ledger is not None:
+            try:
+                record_totals = self._get_ledger_totals(
+                    self.ledger, employee_ids, current_run_id, year
+                )
+            except Exception as e:
+                logger.error("YTD ledger lookup failed, summing payroll records: %s", e)
+        if record_totals is None:
+            record_totals = self._sum_prior_records(employee_ids, current_run_id, year)
+
+        # Initialize YTD dict for all employees with initial values
+        ytd_data: dict[str, dict[str, Decimal]] = {}
+        for emp_id in employee_ids:
+            init = initial_ytd.get(emp_id, {})
+            totals = record_totals.get(emp_id) or empty_totals()
+            pensionable_insurable = (
+                totals["gross"] + totals["bonus_earnings"] + totals["sick_pay_paid"]
+            )
+            ytd_data[emp_id] = {
+                "ytd_gross": totals["gross"],
+                "ytd_bonus_earnings": totals["bonus_earnings"],
+                "ytd_pensionable_earnings": pensionable_insurable,
+                "ytd_insurable_earnings": pensionable_insurable,
+                # Include initial YTD from previous employer
+                # Track CPP base and additional (CPP2) separately
+                "ytd_cpp": init.get("initial_ytd_cpp", Decimal("0")) + totals["cpp_employee"],
+                "ytd_cpp_additional": (
+                    init.get("initial_ytd_cpp2", Decimal("0")) + totals["cpp_additional"]
+                ),
+                "ytd_ei": init.get("initial_ytd_ei", Decimal("0")) + totals["ei_employee"],
+                "ytd_federal_tax": totals["federal_tax"],
+                "ytd_provincial_tax": totals["provincial_tax"],
+                "ytd_net_pay": totals["net_pay"],
+            }
+
+        return ytd_data
+
+    def get_prior_run_versions(
+        self, current_run_id: str, year: int = DEFAULT_TAX_YEAR
+    ) -> list[dict[str, Any]]:
+        """Id, status and updated_at of the completed runs prior YTD is summed from.
+
+        Prior YTD only changes when one of these runs does (or an employee's
+        initial YTD does), so one small query stands in for every employee's
+        prior YTD when deciding which records to recalculate.
+
+        Args:
+            current_run_id: The current payroll run ID to exclude
+            year: The tax year
+
+        Returns:
+            Completed payroll_runs rows ordered by id
+        """
+        result = self.supabase.table("payroll_runs").select(
+            "id, status, updated_at"
+        ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
+            "status", COMPLETED_RUN_STATUSES
+        ).gte(
+            "pay_date", f"{year}-01-01"
+        ).lte(
+            "pay_date", f"{year}-12-31"
+        ).neq(
+            "id", current_run_id
+        ).order("id").execute()
+
+        return result.data or []
+
+    def _get_ledger_totals(
+        self, ledger: YtdLedger, employee_ids: list[str], current_run_id: str, year: int
+    ) -> dict[str, dict[str, Decimal]]:
+        """Prior record totals from the YTD ledger: one row per employee.
+
+        The ledger holds every completed run, so if the current run is one of
+        them its records are subtracted again.
+        """
+        applied_run_ids = ledger.sync_year(year)
+        totals = ledger.get_totals(employee_ids, year)
+
+        if current_run_id in applied_run_ids:
+            result = self.supabase.table("payroll_records").select(
+                "employee_id, " + ", ".join((*GROSS_COMPONENTS, *TOTAL_FIELDS[1:]))
+            ).eq("payroll_run_id", current_run_id).in_("employee_id", employee_ids).execute()
+            for record in result.data or []:
+                if record["employee_id"] in totals:
+                    add_record_totals(totals[record["employee_id"]], record, sign=-1)
+
+        return totals
+
+    def _sum_prior_records(
+        self, employee_ids: list[str], current_run_id: str, year: int
+    ) -> dict[str, dict[str, Decimal]]:
+        """Prior record totals summed from every completed payroll record."""
         # Define year boundaries for efficient database filtering
         year_start = f"{year}-01-01"
         year_end = f"{year}-12-31"
@@ -77,11 +202,13 @@ class YtdCalculator:
             vacation_pay_paid,
             other_earnings,
             bonus_earnings,
+            sick_pay_paid,
             cpp_employee,
             cpp_additional,
             ei_employee,
             federal_tax,
             provincial_tax,
+            net_pay,
             payroll_runs!inner (
                 id,
                 pay_date,
@@ -100,66 +227,16 @@ class YtdCalculator:
             "payroll_run_id", current_run_id
         ).execute()
 
-        # Initialize YTD dict for all employees with initial values
-        ytd_data: dict[str, dict[str, Decimal]] = {}
-        for emp_id in employee_ids:
-            init = initial_ytd.get(emp_id, {})
-            ytd_data[emp_id] = {
-                "ytd_gross": Decimal("0"),
-                "ytd_bonus_earnings": Decimal("0"),
-                "ytd_pensionable_earnings": Decimal("0"),
-                "ytd_insurable_earnings": Decimal("0"),
-                # Include initial YTD from previous employer
-                "ytd_cpp": init.get("initial_ytd_cpp", Decimal("0")),
-                "ytd_cpp_additional": init.get("initial_ytd_cpp2", Decimal("0")),
-                "ytd_ei": init.get("initial_ytd_ei", Decimal("0")),
-                "ytd_federal_tax": Decimal("0"),
-                "ytd_provincial_tax": Decimal("0"),
-                "ytd_net_pay": Decimal("0"),
-            }
+        totals = {emp_id: empty_totals() for emp_id in employee_ids}
 
         # Sum up prior records (year filtering already done at database level)
         for record in result.data or []:
             emp_id = record["employee_id"]
-            if emp_id not in ytd_data:
+            if emp_id not in totals:
                 continue
+            add_record_totals(totals[emp_id], record)
 
-            # Calculate total gross for this record
-            total_gross = (
-                Decimal(str(record.get("gross_regular", 0)))
-                + Decimal(str(record.get("gross_overtime", 0)))
-                + Decimal(str(record.get("holiday_pay", 0)))
-                + Decimal(str(record.get("holiday_premium_pay", 0)))
-                + Decimal(str(record.get("vacation_pay_paid", 0)))
-                + Decimal(str(record.get("other_earnings", 0)))
-            )
-            bonus_earnings = Decimal(str(record.get("bonus_earnings", 0)))
-            sick_pay_paid = Decimal(str(record.get("sick_pay_paid", 0)))
-            pensionable_insurable = total_gross + bonus_earnings + sick_pay_paid
-
-            ytd_data[emp_id]["ytd_gross"] += total_gross
-            ytd_data[emp_id]["ytd_bonus_earnings"] += Decimal(
-                str(record.get("bonus_earnings", 0))
-            )
-            ytd_data[emp_id]["ytd_pensionable_earnings"] += pensionable_insurable
-            ytd_data[emp_id]["ytd_insurable_earnings"] += pensionable_insurable
-            # Track CPP base and additional (CPP2) separately
-            ytd_data[emp_id]["ytd_cpp"] += Decimal(str(record.get("cpp_employee", 0)))
-            ytd_data[emp_id]["ytd_cpp_additional"] += Decimal(
-                str(record.get("cpp_additional", 0))
-            )
-            ytd_data[emp_id]["ytd_ei"] += Decimal(str(record.get("ei_employee", 0)))
-            ytd_data[emp_id]["ytd_federal_tax"] += Decimal(
-                str(record.get("federal_tax", 0))
-            )
-            ytd_data[emp_id]["ytd_provincial_tax"] += Decimal(
-                str(record.get("provincial_tax", 0))
-            )
-            ytd_data[emp_id]["ytd_net_pay"] += Decimal(
-                str(record.get("net_pay", 0))
-            )
-
-        return ytd_data
+        return totals
 
     async def get_ytd_records_for_employee(
         self,
@@ -180,7 +257,7 @@ class YtdCalculator:
         year_start = f"{year}-01-01"
         year_end = f"{year}-12-31"
 
-        result = self.supabase.table("payroll_records").select(
+        result = await execute(self.supabase.table("payroll_records").select(
             """
             *,
             payroll_runs!inner (
@@ -197,7 +274,7 @@ class YtdCalculator:
             "payroll_runs.pay_date", year_end
         ).neq(
             "payroll_run_id", current_run_id
-        ).execute()
+        ))
 
         records: list[PayrollRecord] = []
         for r in result.data or []:
@@ -205,6 +282,73 @@ class YtdCalculator:
 
         return records
 
+    async def get_ytd_records_for_employees(
+        self,
+        employee_ids: list[str],
+        year: int,
+        exclude_run_id: str,
+    ) -> dict[str, list[PayrollRecord]]:
+        """Get prior YTD payroll records for many employees at once.
+
+        Bulk form of get_ytd_records_for_employee: one query per
+        YTD_EMPLOYEE_CHUNK_SIZE employees (plus one per extra YTD_PAGE_SIZE
+        rows), instead of one query per employee.
+
+        Args:
+            employee_ids: Employee IDs to query
+            year: Tax year
+            exclude_run_id: Current run ID to exclude
+
+        Returns:
+            Dict mapping employee_id -> PayrollRecord models for prior completed
+            runs (every requested employee has an entry, possibly empty)
+        """
+        records_by_employee: dict[str, list[PayrollRecord]] = {
+            emp_id: [] for emp_id in employee_ids
+        }
+        if not employee_ids:
+            return records_by_employee
+
+        year_start = f"{year}-01-01"
+        year_end = f"{year}-12-31"
+        unique_ids = list(records_by_employee)
+
+        for start in range(0, len(unique_ids), YTD_EMPLOYEE_CHUNK_SIZE):
+            chunk = unique_ids[start : start + YTD_EMPLOYEE_CHUNK_SIZE]
+            offset = 0
+            while True:
+                result = await execute(self.supabase.table("payroll_records").select(
+                    """
+                    *,
+                    payroll_runs!inner (
+                        id,
+                        pay_date,
+                        status
+                    )
+                    """
+                ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
+                    "employee_id", chunk
+                ).in_(
+                    "payroll_runs.status", COMPLETED_RUN_STATUSES
+                ).gte(
+                    "payroll_runs.pay_date", year_start
+                ).lte(
+                    "payroll_runs.pay_date", year_end
+                ).neq(
+                    "payroll_run_id", exclude_run_id
+                ).order("id").range(offset, offset + YTD_PAGE_SIZE - 1))
+
+                rows = result.data or []
+                for r in rows:
+                    records_by_employee[r["employee_id"]].append(
+                        ModelBuilder.build_payroll_record(r)
+                    )
+                if len(rows) < YTD_PAGE_SIZE:
+                    break
+                offset += YTD_PAGE_SIZE
+
+        return records_by_employee
+
     def _get_initial_ytd_for_employees(
         self, employee_ids: list[str], year: int = DEFAULT_TAX_YEAR
     ) -> dict[str, dict[str, Decimal]]:
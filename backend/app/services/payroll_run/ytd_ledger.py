@@ -0,0 +1,317 @@
+"""
+YTD Ledger for Payroll Run
+
+Reads and maintains employee_ytd_ledger: per-employee, per-tax-year running
+totals of approved/paid payroll_records.
+
+- apply_run / reverse_run add or subtract one run (idempotent RPCs)
+- sync_year applies any completed run the ledger is missing
+- get_totals reads one ledger row per employee
+- verify recomputes totals from raw payroll_records and reports drift
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+from typing import Any
+
+from app.services.payroll_run.constants import COMPLETED_RUN_STATUSES
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = "employee_ytd_ledger"
+LEDGER_RUNS_TABLE = "ytd_ledger_runs"
+
+# Ledger columns, in the order of the employee_ytd_ledger table
+TOTAL_FIELDS = (
+    "gross",
+    "bonus_earnings",
+    "sick_pay_paid",
+    "cpp_employee",
+    "cpp_additional",
+    "ei_employee",
+    "federal_tax",
+    "provincial_tax",
+    "net_pay",
+)
+
+# payroll_records columns summed into the ledger's gross
+GROSS_COMPONENTS = (
+    "gross_regular",
+    "gross_overtime",
+    "holiday_pay",
+    "holiday_premium_pay",
+    "vacation_pay_paid",
+    "other_earnings",
+)
+
+# Employee IDs per ledger query and rows per page (PostgREST row cap)
+LEDGER_EMPLOYEE_CHUNK_SIZE = 200
+LEDGER_PAGE_SIZE = 1000
+
+
+def empty_totals() -> dict[str, Decimal]:
+    """Zero totals for an employee with no completed records."""
+    return {name: Decimal("0") for name in TOTAL_FIELDS}
+
+
+def _empty_counted_totals() -> dict[str, Decimal]:
+    return {**empty_totals(), "record_count": Decimal("0")}
+
+
+def add_record_totals(totals: dict[str, Decimal], record: dict[str, Any], sign: int = 1) -> None:
+    """Add (sign=1) or subtract (sign=-1) one payroll_records row into totals.
+
+    Mirrors ytd_ledger_add_record() in the employee_ytd_ledger migration.
+    """
+    gross = sum(
+        (Decimal(str(record.get(name) or 0)) for name in GROSS_COMPONENTS), Decimal("0")
+    )
+    totals["gross"] += sign * gross
+    for name in TOTAL_FIELDS[1:]:
+        totals[name] += sign * Decimal(str(record.get(name) or 0))
+
+
+@dataclass
+class YtdLedgerDrift:
+    """One ledger total that differs from the raw payroll_records sum."""
+
+    employee_id: str
+    field: str
+    ledger: Decimal
+    records: Decimal
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "employee_id": self.employee_id,
+            "field": self.field,
+            "ledger": float(self.ledger),
+            "records": float(self.records),
+            "difference": float(self.ledger - self.records),
+        }
+
+
+@dataclass
+class YtdLedgerVerification:
+    """Result of YtdLedger.verify for one tax year."""
+
+    tax_year: int
+    employees_checked: int = 0
+    runs_synced: int = 0
+    repaired: int = 0
+    drifts: list[YtdLedgerDrift] = field(default_factory=list)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.drifts)
+
+    def to_dict(self) -> dict[str, Any]:
+        result = asdict(self)
+        result["drifts"] = [drift.to_dict() for drift in self.drifts]
+        result["has_drift"] = self.has_drift
+        return result
+
+
+class YtdLedger:
+    """Maintains and reads the employee YTD ledger."""
+
+    def __init__(self, supabase: Any, user_id: str, company_id: str):
+        """Initialize YTD ledger with database context.
+
+        Args:
+            supabase: Supabase client instance
+            user_id: Current user ID
+            company_id: Current company ID
+        """
+        self.supabase = supabase
+        self.user_id = user_id
+        self.company_id = company_id
+
+    def apply_run(self, run_id: str) -> int:
+        """Add an approved/paid run's records to the ledger.
+
+        Returns:
+            Number of records added (0 if the run was already applied)
+        """
+        result = self.supabase.rpc(
+            "apply_payroll_run_to_ytd_ledger", {"p_run_id": run_id}
+        ).execute()
+        return int(result.data or 0)
+
+    def reverse_run(self, run_id: str) -> int:
+        """Subtract a run's records from the ledger.
+
+        Run deletion, leaving approved/paid and record amendments are reversed
+        by database triggers; this is for explicit corrections.
+
+        Returns:
+            Number of records subtracted (0 if the run was not applied)
+        """
+        result = self.supabase.rpc(
+            "reverse_payroll_run_from_ytd_ledger", {"p_run_id": run_id}
+        ).execute()
+        return int(result.data or 0)
+
+    def sync_year(self, year: int) -> set[str]:
+        """Apply every completed run of the year that the ledger is missing.
+
+        Approval applies runs as they complete, so this normally finds
+        nothing; it catches runs whose apply call failed.
+
+        Args:
+            year: Tax year (pay_date year)
+
+        Returns:
+            IDs of the runs included in the ledger for the year
+        """
+        completed = self.supabase.table("payroll_runs").select("id").eq(
+            "user_id", self.user_id
+        ).eq("company_id", self.company_id).in_(
+            "status", COMPLETED_RUN_STATUSES
+        ).gte("pay_date", f"{year}-01-01").lte("pay_date", f"{year}-12-31").execute()
+        completed_ids = {row["id"] for row in completed.data or []}
+
+        applied = self.supabase.table(LEDGER_RUNS_TABLE).select("payroll_run_id").eq(
+            "company_id", self.company_id
+        ).eq("tax_year", year).execute()
+        applied_ids = {row["payroll_run_id"] for row in applied.data or []}
+
+        for run_id in sorted(completed_ids - applied_ids):
+            logger.warning("Payroll run %s missing from YTD ledger, applying", run_id)
+            self.apply_run(run_id)
+
+        return applied_ids | completed_ids
+
+    def get_totals(self, employee_ids: list[str], year: int) -> dict[str, dict[str, Decimal]]:
+        """Get ledger totals for employees.
+
+        Args:
+            employee_ids: Employee IDs to look up
+            year: Tax year
+
+        Returns:
+            Dict mapping employee_id -> {field: Decimal} for TOTAL_FIELDS
+            (zeros for employees without a ledger row)
+        """
+        totals = {emp_id: empty_totals() for emp_id in employee_ids}
+        unique_ids = list(totals)
+
+        for start in range(0, len(unique_ids), LEDGER_EMPLOYEE_CHUNK_SIZE):
+            chunk = unique_ids[start : start + LEDGER_EMPLOYEE_CHUNK_SIZE]
+            result = self.supabase.table(LEDGER_TABLE).select(
+                "employee_id, " + ", ".join(TOTAL_FIELDS)
+            ).eq("company_id", self.company_id).eq("tax_year", year).in_(
+                "employee_id", chunk
+            ).execute()
+            for row in result.data or []:
+                totals[row["employee_id"]] = {
+                    name: Decimal(str(row.get(name) or 0)) for name in TOTAL_FIELDS
+                }
+
+        return totals
+
+    def verify(self, year: int, repair: bool = False) -> YtdLedgerVerification:
+        """Recompute the year's totals from raw payroll_records and compare.
+
+        Args:
+            year: Tax year to verify
+            repair: Overwrite drifted ledger rows with the recomputed totals
+
+        Returns:
+            YtdLedgerVerification listing every drifted employee field
+        """
+        report = YtdLedgerVerification(tax_year=year)
+
+        applied_before = self._applied_run_ids(year)
+        report.runs_synced = len(self.sync_year(year) - applied_before)
+
+        ledger = self._load_ledger(year)
+        records = self._sum_records(year)
+        report.employees_checked = len(ledger.keys() | records.keys())
+
+        drifted: set[str] = set()
+        for emp_id in sorted(ledger.keys() | records.keys()):
+            expected = records.get(emp_id) or _empty_counted_totals()
+            actual = ledger.get(emp_id) or _empty_counted_totals()
+            for name in expected:
+                if actual[name] != expected[name]:
+                    report.drifts.append(
+                        YtdLedgerDrift(emp_id, name, actual[name], expected[name])
+                    )
+                    drifted.add(emp_id)
+
+        if report.drifts:
+            logger.warning(
+                "YTD ledger drift for %d employee(s) in %d (company %s)",
+                len(drifted), year, self.company_id
+            )
+        if repair and drifted:
+            rows = []
+            for emp_id in sorted(drifted):
+                expected = records.get(emp_id) or _empty_counted_totals()
+                rows.append({
+                    "employee_id": emp_id,
+                    "tax_year": year,
+                    "user_id": self.user_id,
+                    "company_id": self.company_id,
+                    **{name: float(expected[name]) for name in TOTAL_FIELDS},
+                    "record_count": int(expected["record_count"]),
+                })
+            self.supabase.table(LEDGER_TABLE).upsert(
+                rows, on_conflict="employee_id,tax_year"
+            ).execute()
+            report.repaired = len(rows)
+
+        return report
+
+    def _applied_run_ids(self, year: int) -> set[str]:
+        result = self.supabase.table(LEDGER_RUNS_TABLE).select("payroll_run_id").eq(
+            "company_id", self.company_id
+        ).eq("tax_year", year).execute()
+        return {row["payroll_run_id"] for row in result.data or []}
+
+    def _load_ledger(self, year: int) -> dict[str, dict[str, Decimal]]:
+        """All ledger rows of the company for a year, with record_count."""
+        ledger: dict[str, dict[str, Decimal]] = {}
+        for row in self._paged(
+            lambda: self.supabase.table(LEDGER_TABLE).select(
+                "employee_id, record_count, " + ", ".join(TOTAL_FIELDS)
+            ).eq("company_id", self.company_id).eq("tax_year", year).order("employee_id")
+        ):
+            totals = {name: Decimal(str(row.get(name) or 0)) for name in TOTAL_FIELDS}
+            totals["record_count"] = Decimal(row.get("record_count") or 0)
+            ledger[row["employee_id"]] = totals
+        return ledger
+
+    def _sum_records(self, year: int) -> dict[str, dict[str, Decimal]]:
+        """Sum all completed payroll_records of the company for a year."""
+        sums: dict[str, dict[str, Decimal]] = {}
+        for row in self._paged(
+            lambda: self.supabase.table("payroll_records").select(
+                "id, employee_id, "
+                + ", ".join((*GROSS_COMPONENTS, *TOTAL_FIELDS[1:]))
+                + ", payroll_runs!inner (id, pay_date, status)"
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
+                "payroll_runs.status", COMPLETED_RUN_STATUSES
+            ).gte("payroll_runs.pay_date", f"{year}-01-01").lte(
+                "payroll_runs.pay_date", f"{year}-12-31"
+            ).order("id")
+        ):
+            totals = sums.setdefault(row["employee_id"], _empty_counted_totals())
+            add_record_totals(totals, row)
+            totals["record_count"] += 1
+        return sums
+
+    @staticmethod
+    def _paged(build_query: Any) -> list[dict[str, Any]]:
+        """Fetch every row of a query, LEDGER_PAGE_SIZE rows per request."""
+        rows: list[dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = build_query().range(offset, offset + LEDGER_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < LEDGER_PAGE_SIZE:
+                return rows
+            offset += LEDGER_PAGE_SIZE
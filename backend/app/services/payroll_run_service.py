@@ -15,11 +15,13 @@ import logging
 from typing import Any, cast
 from uuid import UUID
 
+from app.core.async_db import execute, run_blocking
 from app.core.supabase_client import get_supabase_client
 from app.services.payroll_run import (
     EmployeeManagement,
     PayrollRunOperations,
     YtdCalculator,
+    YtdLedger,
 )
 
 logger = logging.getLogger(__name__)
@@ -70,9 +72,11 @@ class PayrollRunService:
         Note: RLS policies using auth.uid() will automatically filter by user.
         The explicit user_id/company_id filters provide defense-in-depth.
         """
-        result = self.supabase.table("payroll_runs").select("*").eq(
-            "id", str(run_id)
-        ).eq("user_id", self.user_id).eq("company_id", self.company_id).execute()
+        result = await execute(
+            self.supabase.table("payroll_runs").select("*").eq(
+                "id", str(run_id)
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id)
+        )
 
         if result.data and len(result.data) > 0:
             return cast(dict[str, Any], result.data[0])
@@ -108,7 +112,7 @@ class PayrollRunService:
 
         query = query.order("pay_date", desc=True).range(offset, offset + limit - 1)
 
-        result = query.execute()
+        result = await execute(query)
 
         return {
             "runs": result.data or [],
@@ -117,9 +121,11 @@ class PayrollRunService:
 
     async def get_record(self, record_id: UUID | str) -> dict[str, Any] | None:
         """Get a single payroll record by ID."""
-        result = self.supabase.table("payroll_records").select("*").eq(
-            "id", str(record_id)
-        ).eq("user_id", self.user_id).eq("company_id", self.company_id).execute()
+        result = await execute(
+            self.supabase.table("payroll_records").select("*").eq(
+                "id", str(record_id)
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id)
+        )
 
         if result.data and len(result.data) > 0:
             return cast(dict[str, Any], result.data[0])
@@ -127,7 +133,7 @@ class PayrollRunService:
 
     async def get_run_records(self, run_id: UUID) -> list[dict[str, Any]]:
         """Get all records for a payroll run with employee info."""
-        result = self.supabase.table("payroll_records").select(
+        result = await execute(self.supabase.table("payroll_records").select(
             """
             *,
             employees!inner (
@@ -146,6 +152,10 @@ class PayrollRunService:
                 vacation_config,
                 vacation_balance,
                 hire_date,
+                initial_ytd_cpp,
+                initial_ytd_cpp2,
+                initial_ytd_ei,
+                initial_ytd_year,
                 pay_group_id,
                 pay_groups (
                     id,
@@ -158,7 +168,7 @@ class PayrollRunService:
             """
         ).eq("payroll_run_id", str(run_id)).eq("user_id", self.user_id).eq(
             "company_id", self.company_id
-        ).execute()
+        ))
 
         return result.data or []
 
@@ -182,9 +192,11 @@ class PayrollRunService:
             )
 
         # Get current record
-        record_result = self.supabase.table("payroll_records").select("*").eq(
-            "id", str(record_id)
-        ).eq("payroll_run_id", str(run_id)).eq("user_id", self.user_id).execute()
+        record_result = await execute(
+            self.supabase.table("payroll_records").select("*").eq(
+                "id", str(record_id)
+            ).eq("payroll_run_id", str(run_id)).eq("user_id", self.user_id)
+        )
 
         if not record_result.data or len(record_result.data) == 0:
             raise ValueError("Payroll record not found")
@@ -196,10 +208,12 @@ class PayrollRunService:
         merged_input_data = {**existing_input_data, **input_data}
 
         # Update the record
-        update_result = self.supabase.table("payroll_records").update({
-            "input_data": merged_input_data,
-            "is_modified": True
-        }).eq("id", str(record_id)).execute()
+        update_result = await execute(
+            self.supabase.table("payroll_records").update({
+                "input_data": merged_input_data,
+                "is_modified": True
+            }).eq("id", str(record_id))
+        )
 
         if not update_result.data or len(update_result.data) == 0:
             raise ValueError("Failed to update payroll record")
@@ -208,9 +222,11 @@ class PayrollRunService:
 
     async def check_has_modified_records(self, run_id: UUID) -> bool:
         """Check if any records in the run have is_modified = True."""
-        result = self.supabase.table("payroll_records").select("id").eq(
-            "payroll_run_id", str(run_id)
-        ).eq("is_modified", True).limit(1).execute()
+        result = await execute(
+            self.supabase.table("payroll_records").select("id").eq(
+                "payroll_run_id", str(run_id)
+            ).eq("is_modified", True).limit(1)
+        )
 
         return bool(result.data and len(result.data) > 0)
 
@@ -233,9 +249,11 @@ class PayrollRunService:
                 "Only draft runs can be deleted."
             )
 
-        self.supabase.table("payroll_runs").delete().eq(
-            "id", str(run_id)
-        ).eq("user_id", self.user_id).eq("company_id", self.company_id).execute()
+        await execute(
+            self.supabase.table("payroll_runs").delete().eq(
+                "id", str(run_id)
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id)
+        )
 
         return {
             "deleted": True,
@@ -268,9 +286,9 @@ class PayrollRunService:
         """
         return await self._run_ops.create_or_get_run_by_period_end(period_end, pay_date, pay_group_ids)
 
-    async def recalculate_run(self, run_id: UUID) -> dict[str, Any]:
-        """Recalculate all records in a draft payroll run."""
-        return await self._run_ops.recalculate_run(run_id)
+    async def recalculate_run(self, run_id: UUID, full: bool = False) -> dict[str, Any]:
+        """Recalculate the changed records (or all, if full) of a draft payroll run."""
+        return await self._run_ops.recalculate_run(run_id, full=full)
 
     async def finalize_run(self, run_id: UUID) -> dict[str, Any]:
         """Finalize a draft payroll run, transitioning to pending_approval."""
@@ -321,6 +339,16 @@ class PayrollRunService:
         """Remove an employee from a draft payroll run."""
         return await self._emp_mgmt.remove_employee_from_run(run_id, employee_id)
 
+    # =========================================================================
+    # YTD Ledger
+    # =========================================================================
+
+    async def verify_ytd_ledger(self, year: int, repair: bool = False) -> dict[str, Any]:
+        """Recompute a tax year's YTD ledger from payroll records and report drift."""
+        ledger = YtdLedger(self.supabase, self.user_id, self.company_id)
+        report = await run_blocking(ledger.verify, year, repair=repair)
+        return report.to_dict()
+
 
 # Factory function for creating service instance
 def get_payroll_run_service(user_id: str, company_id: str) -> PayrollRunService:
@@ -0,0 +1,124 @@
+"""
+SIN Key Rotation Service - Re-encrypt employee SINs under a new key
+
+Streams the employees table in id order, one page at a time:
+1. Fetch a page of (id, sin_encrypted)
+2. Re-encrypt the page in bulk under the current key (SecurityManager.rotate_many)
+3. Write changed SINs back with one rotate_employee_sins() RPC, which only
+   overwrites a SIN that still holds the value that was read
+
+Deploy with ENCRYPTION_KEY="new-key,old-key", run the rotation, then drop the
+old key. SINs already under the new key are left untouched, so a rotation
+that stopped part-way can simply be run again (or resumed with start_after).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from app.core.async_db import execute, run_blocking
+from app.core.security import SecurityManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+class SinKeyRotationService:
+    """Re-encrypts every employee SIN under the current encryption key."""
+
+    def __init__(self, supabase: Any, page_size: int = DEFAULT_PAGE_SIZE):
+        """
+        Initialize rotation service.
+
+        Args:
+            supabase: Supabase client allowed to read and update all employees
+                (the admin client)
+            page_size: Employees fetched and written per round-trip
+        """
+        self.supabase = supabase
+        self.page_size = page_size
+
+    async def rotate_all(self, start_after: str | None = None) -> dict[str, Any]:
+        """
+        Rotate all employee SINs.
+
+        Args:
+            start_after: Resume after this employee id (from a previous
+                run's last_id)
+
+        Returns:
+            Counts of scanned, rotated, already current, undecryptable and
+            concurrently changed SINs, the last employee id processed, and
+            throughput
+        """
+        stats: dict[str, Any] = {
+            "scanned": 0,
+            "rotated": 0,
+            "already_current": 0,
+            "failed": 0,
+            "conflicts": 0,
+            "last_id": start_after,
+        }
+        started = time.perf_counter()
+
+        while True:
+            page = await self._fetch_page(stats["last_id"])
+            if not page:
+                break
+
+            tokens = [row["sin_encrypted"] for row in page]
+            rotated = await run_blocking(SecurityManager.rotate_many, tokens)
+
+            updates = []
+            for row, new_sin in zip(page, rotated, strict=True):
+                if new_sin is None:
+                    stats["failed"] += 1
+                    logger.error(f"Cannot decrypt SIN for employee {row['id']} with any key")
+                elif new_sin == row["sin_encrypted"]:
+                    stats["already_current"] += 1
+                else:
+                    updates.append({
+                        "id": row["id"],
+                        "old_sin": row["sin_encrypted"],
+                        "new_sin": new_sin,
+                    })
+
+            if updates:
+                result = await execute(
+                    self.supabase.rpc("rotate_employee_sins", {"p_updates": updates})
+                )
+                applied = int(result.data or 0)
+                stats["rotated"] += applied
+                stats["conflicts"] += len(updates) - applied
+
+            stats["scanned"] += len(page)
+            stats["last_id"] = page[-1]["id"]
+            logger.info(
+                f"SIN rotation: {stats['scanned']} scanned, {stats['rotated']} rotated"
+            )
+
+            if len(page) < self.page_size:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 3)
+        stats["per_second"] = round(stats["scanned"] / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info(
+            f"SIN rotation finished: {stats['scanned']} employees in {elapsed:.2f}s "
+            f"({stats['per_second']:,.0f}/s), {stats['rotated']} rotated, "
+            f"{stats['failed']} failed, {stats['conflicts']} changed concurrently"
+        )
+        return stats
+
+    async def _fetch_page(self, after_id: str | None) -> list[dict[str, Any]]:
+        """Fetch the next page of employees with a SIN, keyset-paginated by id."""
+        query = self.supabase.table("employees").select("id, sin_encrypted").not_.is_(
+            "sin_encrypted", "null"
+        ).neq("sin_encrypted", "")
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        result = await execute(query.order("id").limit(self.page_size))
+        return result.data or []
@@ -2,6 +2,7 @@
 
 from app.services.t4.aggregation_service import T4AggregationService
 from app.services.t4.pdf_generator import T4PDFGenerator
+from app.services.t4.slip_generation_service import T4SlipGenerationService
 from app.services.t4.storage_service import T4StorageService, get_t4_storage
 from app.services.t4.xml_generator import T4XMLGenerator
 from app.services.t4.xml_validator import T4XMLValidator
@@ -9,6 +10,7 @@ from app.services.t4.xml_validator import T4XMLValidator
 __all__ = [
     "T4AggregationService",
     "T4PDFGenerator",
+    "T4SlipGenerationService",
     "T4StorageService",
     "T4XMLGenerator",
     "T4XMLValidator",
@@ -3,16 +3,23 @@ T4 Aggregation Service
 
 Aggregates payroll data for T4 slip generation.
 Queries completed payroll records and computes annual totals for each employee.
+
+Generating every slip for a year streams the company's completed records in
+pages and totals them per employee (and for the employer) in one pass, so the
+number of queries grows with the number of records per page, not with one
+query per employee.
 """
 
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
-from app.core.security import decrypt_sin
+from app.core.async_db import execute, run_blocking
+from app.core.security import decrypt_sin, decrypt_sins
 from app.models.payroll import Company, Employee
 from app.models.t4 import T4SlipData, T4Status, T4Summary
 from app.utils.sin_validator import validate_sin_luhn
@@ -22,6 +29,46 @@ logger = logging.getLogger(__name__)
 # Statuses that count as "completed" for T4 aggregation
 COMPLETED_RUN_STATUSES = ["approved", "paid"]
 
+# Rows per request when streaming a year's payroll records
+AGGREGATION_PAGE_SIZE = 1000
+# Employees per request when loading slip employees (ids go in the URL)
+AGGREGATION_EMPLOYEE_CHUNK_SIZE = 200
+
+# payroll_records columns the T4 boxes and employer totals are built from
+T4_RECORD_COLUMNS = """
+    id,
+    employee_id,
+    gross_regular,
+    gross_overtime,
+    holiday_pay,
+    holiday_premium_pay,
+    vacation_pay_paid,
+    other_earnings,
+    cpp_employee,
+    cpp_additional,
+    ei_employee,
+    federal_tax,
+    provincial_tax,
+    union_dues,
+    cpp_employer,
+    ei_employer,
+    payroll_runs!inner (
+        pay_date,
+        status
+    )
+"""
+
+
+@dataclass
+class T4YearTotals:
+    """Per-employee T4 totals and employer totals for one tax year."""
+
+    by_employee: dict[str, dict[str, Decimal]] = field(default_factory=dict)
+    cpp_employer: Decimal = Decimal("0")
+    ei_employer: Decimal = Decimal("0")
+    record_count: int = 0
+    query_count: int = 0
+
 
 class T4AggregationService:
     """
@@ -43,6 +90,7 @@ class T4AggregationService:
         self.supabase = supabase
         self.user_id = user_id
         self.company_id = company_id
+        self._year_totals: dict[int, T4YearTotals] = {}
 
     async def get_company(self) -> Company | None:
         """Get company data for T4 employer info."""
@@ -111,6 +159,7 @@ class T4AggregationService:
         employee: Employee,
         company: Company,
         tax_year: int,
+        sin: str | None = None,
     ) -> T4SlipData | None:
         """
         Aggregate all payroll data for one employee for the tax year.
@@ -119,6 +168,7 @@ class T4AggregationService:
             employee: Employee model
             company: Company model (employer info)
             tax_year: Tax year to aggregate
+            sin: SIN already decrypted in bulk; decrypted here if omitted
 
         Returns:
             T4SlipData with all boxes populated, or None if no data
@@ -156,8 +206,32 @@ class T4AggregationService:
         # Aggregate totals
         totals = self._aggregate_records(records)
 
+        return self._build_slip(employee, company, tax_year, totals, sin)
+
+    def _build_slip(
+        self,
+        employee: Employee,
+        company: Company,
+        tax_year: int,
+        totals: dict[str, Decimal],
+        sin: str | None = None,
+    ) -> T4SlipData | None:
+        """
+        Build one employee's T4 slip from their annual totals.
+
+        Args:
+            employee: Employee model
+            company: Company model (employer info)
+            tax_year: Tax year
+            totals: Annual totals from _aggregate_records
+            sin: SIN already decrypted in bulk; decrypted here if omitted
+
+        Returns:
+            T4SlipData, or None if the SIN cannot be decrypted
+        """
         # Decrypt and validate SIN
-        sin = decrypt_sin(employee.sin_encrypted)
+        if sin is None:
+            sin = decrypt_sin(employee.sin_encrypted)
         if not sin:
             logger.error(f"Failed to decrypt SIN for employee {employee.id}")
             return None
@@ -211,59 +285,100 @@ class T4AggregationService:
         Returns:
             Dict with aggregated totals for T4 boxes
         """
-        totals = {
-            "employment_income": Decimal("0"),
-            "cpp_employee": Decimal("0"),
-            "cpp_additional": Decimal("0"),
-            "ei_employee": Decimal("0"),
-            "income_tax": Decimal("0"),
-            "ei_insurable_earnings": Decimal("0"),
-            "cpp_pensionable_earnings": Decimal("0"),
-            "union_dues": Decimal("0"),
-            "cpp_employer": Decimal("0"),
-            "ei_employer": Decimal("0"),
-        }
-
+        totals = _new_totals()
         for record in records:
-            # Box 14: Employment income (all gross earnings)
-            gross = (
-                Decimal(str(record.get("gross_regular", 0)))
-                + Decimal(str(record.get("gross_overtime", 0)))
-                + Decimal(str(record.get("holiday_pay", 0)))
-                + Decimal(str(record.get("holiday_premium_pay", 0)))
-                + Decimal(str(record.get("vacation_pay_paid", 0)))
-                + Decimal(str(record.get("other_earnings", 0)))
-            )
-            totals["employment_income"] += gross
+            _add_record(totals, record)
+        return _finalize_totals(totals)
+
+    async def aggregate_year(self, tax_year: int) -> T4YearTotals:
+        """
+        Total every completed payroll record of the tax year in one pass.
 
-            # Box 16: CPP contributions (base)
-            totals["cpp_employee"] += Decimal(str(record.get("cpp_employee", 0)))
+        Streams the company's records AGGREGATION_PAGE_SIZE rows at a time,
+        keeping only running totals per employee and for the employer. The
+        result is kept for the service's lifetime, so a T4 Summary built
+        after the slips does not scan the year again.
 
-            # Box 17: CPP2 contributions (additional)
-            totals["cpp_additional"] += Decimal(str(record.get("cpp_additional", 0)))
+        Args:
+            tax_year: Tax year to aggregate
 
-            # Box 18: EI premiums
-            totals["ei_employee"] += Decimal(str(record.get("ei_employee", 0)))
+        Returns:
+            T4YearTotals with per-employee totals keyed by employee_id
+        """
+        cached = self._year_totals.get(tax_year)
+        if cached is not None:
+            return cached
 
-            # Box 22: Income tax deducted (federal + provincial)
-            totals["income_tax"] += (
-                Decimal(str(record.get("federal_tax", 0)))
-                + Decimal(str(record.get("provincial_tax", 0)))
-            )
+        year_start = f"{tax_year}-01-01"
+        year_end = f"{tax_year}-12-31"
+        year = T4YearTotals()
+        offset = 0
+
+        while True:
+            # CRA T4 uses cash basis: filter by pay_date (when paid)
+            result = await execute(self.supabase.table("payroll_records").select(
+                T4_RECORD_COLUMNS
+            ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
+                "payroll_runs.status", COMPLETED_RUN_STATUSES
+            ).gte(
+                "payroll_runs.pay_date", year_start
+            ).lte(
+                "payroll_runs.pay_date", year_end
+            ).order("id").range(offset, offset + AGGREGATION_PAGE_SIZE - 1))
+            year.query_count += 1
+
+            rows = result.data or []
+            # Decimal summing of a large page would stall the event loop
+            await run_blocking(_add_page, year, rows)
+
+            if len(rows) < AGGREGATION_PAGE_SIZE:
+                break
+            offset += AGGREGATION_PAGE_SIZE
+
+        for totals in year.by_employee.values():
+            _finalize_totals(totals)
+            year.cpp_employer += totals["cpp_employer"]
+            year.ei_employer += totals["ei_employer"]
+
+        logger.info(
+            f"Aggregated {year.record_count} payroll records for "
+            f"{len(year.by_employee)} employees in {year.query_count} queries ({tax_year})"
+        )
+        self._year_totals[tax_year] = year
+        return year
 
-            # Box 44: Union dues
-            totals["union_dues"] += Decimal(str(record.get("union_dues", 0)))
+    async def get_employees(self, employee_ids: list[str]) -> list[Employee]:
+        """
+        Get employees by ID, AGGREGATION_EMPLOYEE_CHUNK_SIZE per request.
 
-            # Employer contributions (for summary)
-            totals["cpp_employer"] += Decimal(str(record.get("cpp_employer", 0)))
-            totals["ei_employer"] += Decimal(str(record.get("ei_employer", 0)))
+        Args:
+            employee_ids: Employee IDs
 
-        # Box 24 & 26: Use employment income as insurable/pensionable earnings
-        # (In a full implementation, these would be capped at YMPE/MIE)
-        totals["ei_insurable_earnings"] = totals["employment_income"]
-        totals["cpp_pensionable_earnings"] = totals["employment_income"]
+        Returns:
+            List of Employee models, in employee_ids order
+        """
+        rows: dict[str, dict[str, Any]] = {}
+        for start in range(0, len(employee_ids), AGGREGATION_EMPLOYEE_CHUNK_SIZE):
+            chunk = employee_ids[start : start + AGGREGATION_EMPLOYEE_CHUNK_SIZE]
+            result = await execute(
+                self.supabase.table("employees").select("*").eq(
+                    "user_id", self.user_id
+                ).in_("id", chunk)
+            )
+            for row in result.data or []:
+                rows[str(row.get("id"))] = row
 
-        return totals
+        employees = []
+        for employee_id in employee_ids:
+            employee_data = rows.get(employee_id)
+            if not employee_data:
+                logger.warning(f"Employee {employee_id} has payroll records but was not found")
+                continue
+            try:
+                employees.append(Employee.model_validate(employee_data))
+            except Exception as e:
+                logger.warning(f"Failed to validate employee {employee_id}: {e}")
+        return employees
 
     async def generate_all_t4_slips(
         self,
@@ -285,17 +400,25 @@ class T4AggregationService:
             logger.error(f"Company not found: {self.company_id}")
             return []
 
-        employees = await self.get_employees_with_payroll(tax_year)
+        year = await self.aggregate_year(tax_year)
 
         # Filter to specific employees if requested
+        employee_ids_to_load = list(year.by_employee)
         if employee_ids:
-            employee_id_set = set(employee_ids)
-            employees = [e for e in employees if e.id in employee_id_set]
+            requested = {str(e) for e in employee_ids}
+            employee_ids_to_load = [e for e in employee_ids_to_load if e in requested]
+
+        employees = await self.get_employees(employee_ids_to_load)
+
+        # Decrypt every SIN in one bulk call, off the event loop
+        sins = await run_blocking(decrypt_sins, [e.sin_encrypted for e in employees])
 
         slips = []
-        for employee in employees:
+        for employee, sin in zip(employees, sins, strict=True):
             try:
-                slip = await self.aggregate_employee_year(employee, company, tax_year)
+                slip = self._build_slip(
+                    employee, company, tax_year, year.by_employee[str(employee.id)], sin
+                )
                 if slip:
                     slips.append(slip)
             except Exception as e:
@@ -360,35 +483,82 @@ class T4AggregationService:
 
     async def _get_employer_totals(self, tax_year: int) -> dict[str, Decimal]:
         """Get employer contribution totals for the year."""
-        year_start = f"{tax_year}-01-01"
-        year_end = f"{tax_year}-12-31"
-
-        # CRA T4 uses cash basis: filter by pay_date (when paid)
-        result = self.supabase.table("payroll_records").select(
-            """
-            cpp_employer,
-            ei_employer,
-            payroll_runs!inner (
-                pay_date,
-                status
-            )
-            """
-        ).eq("user_id", self.user_id).eq("company_id", self.company_id).in_(
-            "payroll_runs.status", COMPLETED_RUN_STATUSES
-        ).gte(
-            "payroll_runs.pay_date", year_start
-        ).lte(
-            "payroll_runs.pay_date", year_end
-        ).execute()
-
-        cpp_employer = Decimal("0")
-        ei_employer = Decimal("0")
-
-        for record in result.data or []:
-            cpp_employer += Decimal(str(record.get("cpp_employer", 0)))
-            ei_employer += Decimal(str(record.get("ei_employer", 0)))
-
+        year = await self.aggregate_year(tax_year)
         return {
-            "cpp_employer": cpp_employer,
-            "ei_employer": ei_employer,
+            "cpp_employer": year.cpp_employer,
+            "ei_employer": year.ei_employer,
         }
+
+
+def _new_totals() -> dict[str, Decimal]:
+    """Zeroed T4 totals for one employee."""
+    return {
+        "employment_income": Decimal("0"),
+        "cpp_employee": Decimal("0"),
+        "cpp_additional": Decimal("0"),
+        "ei_employee": Decimal("0"),
+        "income_tax": Decimal("0"),
+        "ei_insurable_earnings": Decimal("0"),
+        "cpp_pensionable_earnings": Decimal("0"),
+        "union_dues": Decimal("0"),
+        "cpp_employer": Decimal("0"),
+        "ei_employer": Decimal("0"),
+    }
+
+
+def _add_record(totals: dict[str, Decimal], record: dict[str, Any]) -> None:
+    """Add one payroll record's amounts to running T4 totals."""
+    # Box 14: Employment income (all gross earnings)
+    gross = (
+        Decimal(str(record.get("gross_regular", 0)))
+        + Decimal(str(record.get("gross_overtime", 0)))
+        + Decimal(str(record.get("holiday_pay", 0)))
+        + Decimal(str(record.get("holiday_premium_pay", 0)))
+        + Decimal(str(record.get("vacation_pay_paid", 0)))
+        + Decimal(str(record.get("other_earnings", 0)))
+    )
+    totals["employment_income"] += gross
+
+    # Box 16: CPP contributions (base)
+    totals["cpp_employee"] += Decimal(str(record.get("cpp_employee", 0)))
+
+    # Box 17: CPP2 contributions (additional)
+    totals["cpp_additional"] += Decimal(str(record.get("cpp_additional", 0)))
+
+    # Box 18: EI premiums
+    totals["ei_employee"] += Decimal(str(record.get("ei_employee", 0)))
+
+    # Box 22: Income tax deducted (federal + provincial)
+    totals["income_tax"] += (
+        Decimal(str(record.get("federal_tax", 0)))
+        + Decimal(str(record.get("provincial_tax", 0)))
+    )
+
+    # Box 44: Union dues
+    totals["union_dues"] += Decimal(str(record.get("union_dues", 0)))
+
+    # Employer contributions (for summary)
+    totals["cpp_employer"] += Decimal(str(record.get("cpp_employer", 0)))
+    totals["ei_employer"] += Decimal(str(record.get("ei_employer", 0)))
+
+
+def _add_page(year: T4YearTotals, records: list[dict[str, Any]]) -> None:
+    """Add a page of payroll records to per-employee running totals."""
+    for record in records:
+        employee_id = record.get("employee_id")
+        if not employee_id:
+            continue
+        totals = year.by_employee.get(employee_id)
+        if totals is None:
+            totals = year.by_employee[employee_id] = _new_totals()
+        _add_record(totals, record)
+    year.record_count += len(records)
+
+
+def _finalize_totals(totals: dict[str, Decimal]) -> dict[str, Decimal]:
+    """Fill in the boxes derived from the summed amounts."""
+    # Box 24 & 26: Use employment income as insurable/pensionable earnings
+    # (In a full implementation, these would be capped at YMPE/MIE)
+    totals["ei_insurable_earnings"] = totals["employment_income"]
+    totals["cpp_pensionable_earnings"] = totals["employment_income"]
+    return totals
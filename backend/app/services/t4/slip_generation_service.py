@@ -0,0 +1,351 @@
+"""
+T4 Slip Generation Service
+
+Generates and stores T4 slip PDFs for a tax year as a staged pipeline:
+
+1. aggregate - every slip from one pass over the year's payroll records
+   (T4AggregationService), then one paginated query for stored slips
+2. render - ReportLab PDF rendering, on the shared payroll process pool for
+   at least T4_RENDER_POOL_THRESHOLD slips, else one thread
+3. upload - at most T4_CONCURRENCY uploads in flight at once
+4. save - finished slips are upserted into t4_slips, T4_SLIP_WRITE_CHUNK
+   rows per request
+
+Finished slips are saved while the job runs, so an interrupted job loses at
+most one chunk of work: re-running without regenerate skips stored slips,
+and a regeneration resumes with resume_from set to the interrupted job's
+started_at.
+
+The t4.generate_slips background job (app.services.jobs) runs the pipeline
+off the request and publishes its progress.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+from app.core.async_db import execute
+from app.core.config import get_config
+from app.models.payroll import Company
+from app.models.t4 import (
+    T4GenerationJobStatus,
+    T4GenerationProgress,
+    T4SlipData,
+    T4Status,
+)
+from app.services.payroll.parallel_engine import (
+    get_payroll_process_pool,
+    shutdown_payroll_process_pool,
+)
+from app.services.t4.aggregation_service import T4AggregationService
+from app.services.t4.pdf_generator import T4PDFGenerator
+from app.services.t4.storage_service import T4StorageService
+
+logger = logging.getLogger(__name__)
+
+# t4_slips rows per bulk upsert
+T4_SLIP_WRITE_CHUNK = 100
+# Stored slips fetched per request when checking what to skip
+T4_EXISTING_PAGE_SIZE = 1000
+# Unique key of an original (amendment 0) slip
+T4_SLIP_CONFLICT_COLUMNS = "company_id,employee_id,tax_year,amendment_number"
+
+# Worker side: one generator (ReportLab styles) per worker process
+_worker_generator: T4PDFGenerator | None = None
+
+
+def _render_t4_slip(slip: T4SlipData) -> bytes:
+    """Render one T4 slip in a pool worker."""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = T4PDFGenerator()
+    return _worker_generator.generate_t4_slip_pdf(slip)
+
+
+class T4SlipGenerationService:
+    """Renders, uploads and saves every T4 slip of a tax year."""
+
+    def __init__(
+        self,
+        supabase: Any,
+        user_id: str,
+        company_id: str,
+        aggregation: T4AggregationService,
+        storage: T4StorageService | None,
+        pdf_generator: T4PDFGenerator | None = None,
+    ):
+        """
+        Initialize T4 slip generation service.
+
+        Args:
+            supabase: Supabase client instance
+            user_id: Current user ID
+            company_id: Current company ID
+            aggregation: Aggregation service that builds the slips
+            storage: PDF storage, or None to save slips without PDFs
+            pdf_generator: In-process PDF generator (small batches)
+        """
+        self.supabase = supabase
+        self.user_id = user_id
+        self.company_id = company_id
+        self.aggregation = aggregation
+        self.storage = storage
+        self.pdf_generator = pdf_generator or T4PDFGenerator()
+
+    def new_progress(self, tax_year: int) -> T4GenerationProgress:
+        """Progress record for a new job of this company."""
+        return T4GenerationProgress(
+            job_id=str(uuid4()),
+            company_id=UUID(self.company_id),
+            user_id=self.user_id,
+            tax_year=tax_year,
+        )
+
+    async def generate(
+        self,
+        company: Company,
+        tax_year: int,
+        employee_ids: list[UUID] | None = None,
+        regenerate: bool = False,
+        resume_from: datetime | None = None,
+        progress: T4GenerationProgress | None = None,
+    ) -> T4GenerationProgress:
+        """
+        Generate, store and save T4 slips for a tax year.
+
+        Args:
+            company: Company (employer) the slips are for
+            tax_year: Tax year
+            employee_ids: Optional list of specific employee IDs
+            regenerate: Regenerate slips that are already stored
+            resume_from: With regenerate, skip slips generated at or after
+                this time (an interrupted job's started_at)
+            progress: Progress record to update (a new one if None)
+
+        Returns:
+            Final progress, with per-employee errors
+        """
+        progress = progress or self.new_progress(tax_year)
+        progress.status = T4GenerationJobStatus.RUNNING
+        progress.started_at = progress.started_at or datetime.now(timezone.utc)
+
+        try:
+            await self._run(company, tax_year, employee_ids, regenerate, resume_from, progress)
+        except BaseException as e:
+            progress.status = T4GenerationJobStatus.FAILED
+            progress.message = f"T4 generation failed: {e}" if str(e) else "T4 generation interrupted"
+            progress.finished_at = datetime.now(timezone.utc)
+            raise
+
+        progress.status = T4GenerationJobStatus.COMPLETED
+        progress.finished_at = datetime.now(timezone.utc)
+        progress.message = f"Generated {progress.saved} T4 slips" + (
+            f", skipped {progress.skipped}" if progress.skipped else ""
+        )
+        return progress
+
+    async def _run(
+        self,
+        company: Company,
+        tax_year: int,
+        employee_ids: list[UUID] | None,
+        regenerate: bool,
+        resume_from: datetime | None,
+        progress: T4GenerationProgress,
+    ) -> None:
+        """Run the pipeline stages, updating progress as slips finish."""
+        config = get_config()
+        concurrency = max(config.t4_concurrency, 1)
+
+        # 1. Aggregate, and skip slips that are already done
+        slips = await self.aggregation.generate_all_t4_slips(
+            tax_year=tax_year, employee_ids=employee_ids
+        )
+        progress.slips = len(slips)
+        if not slips:
+            return
+
+        generated_at = await self._stored_slips(tax_year)
+        pending = []
+        for slip in slips:
+            employee_id = str(slip.employee_id)
+            if employee_id in generated_at and _is_done(
+                generated_at[employee_id], regenerate, resume_from
+            ):
+                progress.skipped += 1
+            else:
+                pending.append(slip)
+        progress.total = len(pending)
+
+        threshold = config.t4_render_pool_threshold
+        if threshold > 0 and len(pending) >= threshold:
+            progress.render_mode = "process_pool"
+
+        # 2-4. Render, upload and save each slip as it is rendered; slips in
+        # flight are capped so rendered PDFs don't pile up ahead of uploads
+        pipeline_slots = asyncio.Semaphore(concurrency * 4)
+        render_slot = asyncio.Semaphore(1)
+        upload_slots = asyncio.Semaphore(concurrency)
+        write_lock = asyncio.Lock()
+        buffer: list[dict[str, Any]] = []
+
+        async def flush() -> None:
+            async with write_lock:
+                rows = buffer[:]
+                buffer.clear()
+                if rows:
+                    await self._save_rows(rows, progress)
+
+        async def process(slip: T4SlipData) -> None:
+            async with pipeline_slots:
+                pdf_bytes = await self._render(slip, progress, render_slot)
+                progress.rendered += 1
+
+                storage_key = None
+                if self.storage:
+                    async with upload_slots:
+                        storage_key = await self.storage.save_t4_slip(
+                            pdf_bytes=pdf_bytes,
+                            company_name=company.company_name,
+                            tax_year=tax_year,
+                            employee_id=slip.employee_id,
+                        )
+                    progress.uploaded += 1
+
+            buffer.append(self._build_row(slip, tax_year, storage_key))
+            if len(buffer) >= T4_SLIP_WRITE_CHUNK:
+                await flush()
+
+        outcomes = await asyncio.gather(
+            *(process(slip) for slip in pending), return_exceptions=True
+        )
+        await flush()
+
+        for slip, outcome in zip(pending, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Failed to generate T4 for employee {slip.employee_id}: {outcome}")
+                progress.failed += 1
+                progress.errors.append({
+                    "employee_id": str(slip.employee_id),
+                    "message": str(outcome),
+                })
+
+        logger.info(
+            f"T4 generation for {tax_year}: {progress.saved} saved, {progress.skipped} "
+            f"skipped, {progress.failed} failed ({progress.render_mode})"
+        )
+
+    async def _stored_slips(self, tax_year: int) -> dict[str, datetime | None]:
+        """pdf_generated_at of every stored original slip, by employee_id."""
+        generated_at: dict[str, datetime | None] = {}
+        offset = 0
+        while True:
+            result = await execute(
+                self.supabase.table("t4_slips")
+                .select("employee_id, pdf_generated_at")
+                .eq("company_id", self.company_id)
+                .eq("user_id", self.user_id)
+                .eq("tax_year", tax_year)
+                .eq("amendment_number", 0)
+                .order("employee_id")
+                .range(offset, offset + T4_EXISTING_PAGE_SIZE - 1)
+            )
+            rows = result.data or []
+            for row in rows:
+                value = row.get("pdf_generated_at")
+                generated_at[str(row["employee_id"])] = (
+                    datetime.fromisoformat(value) if value else None
+                )
+            if len(rows) < T4_EXISTING_PAGE_SIZE:
+                return generated_at
+            offset += T4_EXISTING_PAGE_SIZE
+
+    async def _render(
+        self,
+        slip: T4SlipData,
+        progress: T4GenerationProgress,
+        render_slot: asyncio.Semaphore,
+    ) -> bytes:
+        """Render one T4 slip PDF without blocking the event loop.
+
+        Args:
+            slip: Slip to render
+            progress: Job progress (its render_mode picks where to render)
+            render_slot: Serializes in-process rendering (ReportLab is not thread-safe)
+
+        Returns:
+            PDF bytes
+        """
+        if progress.render_mode == "process_pool":
+            try:
+                future = get_payroll_process_pool().submit(_render_t4_slip, slip)
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                logger.warning("Payroll process pool broken, rendering T4 slips in-process")
+                shutdown_payroll_process_pool(wait=False)
+                progress.render_mode = "in_process"
+
+        async with render_slot:
+            return await asyncio.to_thread(self.pdf_generator.generate_t4_slip_pdf, slip)
+
+    def _build_row(
+        self, slip: T4SlipData, tax_year: int, storage_key: str | None
+    ) -> dict[str, Any]:
+        """t4_slips row for a generated original slip."""
+        now_utc = datetime.now(timezone.utc).isoformat()
+        return {
+            "company_id": self.company_id,
+            "user_id": self.user_id,
+            "employee_id": str(slip.employee_id),
+            "tax_year": tax_year,
+            "amendment_number": 0,
+            # Build slip_data JSON - exclude computed fields
+            "slip_data": slip.model_dump(
+                mode="json",
+                exclude={
+                    "employee_full_name",  # Computed field
+                    "sin_formatted",  # Computed field
+                },
+            ),
+            "pdf_storage_key": storage_key,
+            "pdf_generated_at": now_utc,
+            "status": T4Status.GENERATED.value,
+            "updated_at": now_utc,
+        }
+
+    async def _save_rows(
+        self, rows: list[dict[str, Any]], progress: T4GenerationProgress
+    ) -> None:
+        """Upsert one chunk of slips; a failed chunk counts against each slip."""
+        try:
+            await execute(
+                self.supabase.table("t4_slips").upsert(
+                    rows, on_conflict=T4_SLIP_CONFLICT_COLUMNS
+                )
+            )
+            progress.saved += len(rows)
+        except Exception as e:
+            logger.error(f"Failed to save {len(rows)} T4 slips: {e}")
+            progress.failed += len(rows)
+            progress.errors.extend(
+                {"employee_id": row["employee_id"], "message": str(e)} for row in rows
+            )
+
+
+def _is_done(
+    generated_at: datetime | None, regenerate: bool, resume_from: datetime | None
+) -> bool:
+    """Whether a stored slip is skipped."""
+    if not regenerate:
+        return True
+    if resume_from is None or generated_at is None:
+        return False
+    if resume_from.tzinfo is None:
+        resume_from = resume_from.replace(tzinfo=timezone.utc)
+    return generated_at >= resume_from
+
@@ -9,6 +9,8 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+from collections.abc import AsyncIterator
+from pathlib import Path
 from uuid import UUID
 
 import boto3
@@ -145,16 +147,18 @@ class T4StorageService:
         company_name: str,
         tax_year: int,
         payroll_account: str,
+        part: int | None = None,
     ) -> str:
         """
         Build storage key for T4 XML file.
 
-        Path format: {root_prefix}/{company}/t4/{year}/T4_{account}_{year}.xml
+        Path format: {root_prefix}/{company}/t4/{year}/T4_{account}_{year}[_N].xml
 
         Args:
             company_name: Company name (will be sanitized)
             tax_year: Tax year
             payroll_account: Payroll account number
+            part: Submission number, for a return split across files
 
         Returns:
             Storage key string
@@ -162,6 +166,8 @@ class T4StorageService:
         safe_company = sanitize_for_path(company_name)
         safe_account = payroll_account.replace(" ", "")
         filename = f"T4_{safe_account}_{tax_year}.xml"
+        if part is not None:
+            filename = f"T4_{safe_account}_{tax_year}_{part}.xml"
 
         parts = [safe_company, "t4", str(tax_year), filename]
         if self.root_prefix:
@@ -300,6 +306,60 @@ class T4StorageService:
         logger.info(f"T4 XML uploaded successfully: {storage_key}")
         return storage_key
 
+    async def save_t4_xml_file(
+        self,
+        path: str | Path,
+        company_name: str,
+        tax_year: int,
+        payroll_account: str,
+        part: int | None = None,
+    ) -> str:
+        """
+        Save a T4 XML file from disk to storage.
+
+        The file is streamed (multipart for large files), so a submission
+        is never held in memory whole.
+
+        Args:
+            path: XML file to upload
+            company_name: Company name
+            tax_year: Tax year
+            payroll_account: Payroll account number
+            part: Submission number, for a return split across files
+
+        Returns:
+            Storage key for the saved file
+
+        Raises:
+            ClientError: If upload fails
+        """
+        storage_key = self._build_t4_xml_key(company_name, tax_year, payroll_account, part)
+
+        logger.info(f"Uploading T4 XML to DO Spaces: {storage_key}")
+
+        metadata = {
+            "type": "t4_xml",
+            "tax_year": str(tax_year),
+            "payroll_account": payroll_account,
+        }
+        if part is not None:
+            metadata["part"] = str(part)
+
+        await asyncio.to_thread(
+            self.s3_client.upload_file,
+            str(path),
+            self.bucket,
+            storage_key,
+            ExtraArgs={
+                "ContentType": "application/xml",
+                "ACL": "private",
+                "Metadata": metadata,
+            },
+        )
+
+        logger.info(f"T4 XML uploaded successfully: {storage_key}")
+        return storage_key
+
     def generate_presigned_url(
         self,
         storage_key: str,
@@ -394,6 +454,36 @@ class T4StorageService:
         content: bytes = response["Body"].read()
         return content
 
+    async def iter_file_content(
+        self,
+        storage_key: str,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """
+        Download file content from storage in chunks.
+
+        Args:
+            storage_key: Storage key of the file
+            chunk_size: Largest chunk to yield, in bytes
+
+        Yields:
+            Consecutive chunks of the file
+
+        Raises:
+            ClientError: If download fails
+        """
+        response = await asyncio.to_thread(
+            self.s3_client.get_object,
+            Bucket=self.bucket,
+            Key=storage_key,
+        )
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
 
 # Singleton instance
 _t4_storage: T4StorageService | None = None
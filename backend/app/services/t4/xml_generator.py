@@ -7,14 +7,25 @@ This is the standard XML format for submitting T4 slips to CRA.
 
 from __future__ import annotations
 
-from decimal import Decimal
-from typing import TYPE_CHECKING
-from xml.dom import minidom
-from xml.etree.ElementTree import Element, SubElement, tostring
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+from xml.etree.ElementTree import Element, SubElement, indent, tostring
+from xml.sax.saxutils import quoteattr
+
+from app.core.config import get_config
 
 if TYPE_CHECKING:
     from app.models.t4 import T4SlipData, T4Summary
 
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+INDENT = "  "
+
+# Streamed output is yielded in chunks of roughly this many bytes
+XML_CHUNK_SIZE = 64 * 1024
+
 
 class T4XMLGenerator:
     """
@@ -49,43 +60,257 @@ class T4XMLGenerator:
     def generate_xml(
         self,
         summary: T4Summary,
-        slips: list[T4SlipData],
+        slips: Iterable[T4SlipData],
+        pretty: bool = True,
     ) -> str:
         """
         Generate complete T619 XML for T4 submission.
 
         Args:
             summary: T4Summary data
-            slips: List of T4SlipData for all employees
+            slips: T4SlipData for all employees
+            pretty: Indent elements two spaces per level
 
         Returns:
             XML string
         """
-        # Create root element with namespaces
-        root = Element("Return")
-        root.set("xmlns", self.T4_NAMESPACE)
-        root.set("xmlns:sdte", self.SDTE_NAMESPACE)
-        root.set("version", self.SCHEMA_VERSION)
+        return b"".join(self.iter_xml(summary, slips, pretty)).decode("utf-8")
+
+    def iter_xml(
+        self,
+        summary: T4Summary,
+        slips: Iterable[T4SlipData],
+        pretty: bool = True,
+    ) -> Iterator[bytes]:
+        """
+        Stream T619 XML for T4 submission.
+
+        Each slip is built and serialized on its own, so memory stays flat
+        however many slips the return holds, and pretty-printing indents
+        elements as they are written instead of re-parsing the document.
+
+        Args:
+            summary: T4Summary data
+            slips: T4SlipData for all employees
+            pretty: Indent elements two spaces per level
+
+        Yields:
+            UTF-8 chunks of about XML_CHUNK_SIZE bytes
+        """
+        head, tail = self._envelope(summary, pretty)
+        buffer = [head]
+        size = len(head)
+        for slip_num, slip in enumerate(slips, start=1):
+            data = self._slip_bytes(slip, slip_num, pretty)
+            buffer.append(data)
+            size += len(data)
+            if size >= XML_CHUNK_SIZE:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        buffer.append(tail)
+        yield b"".join(buffer)
+
+    async def aiter_xml(
+        self,
+        summary: T4Summary,
+        slips: Iterable[T4SlipData],
+        pretty: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """Stream T619 XML as iter_xml does, yielding to the event loop per chunk."""
+        for chunk in self.iter_xml(summary, slips, pretty):
+            yield chunk
+            await asyncio.sleep(0)
+
+    def write_xml(
+        self,
+        summary: T4Summary,
+        slips: Iterable[T4SlipData],
+        out: BinaryIO,
+        pretty: bool = True,
+    ) -> int:
+        """
+        Write T619 XML to a binary file object.
+
+        Returns:
+            Number of bytes written
+        """
+        written = 0
+        for chunk in self.iter_xml(summary, slips, pretty):
+            out.write(chunk)
+            written += len(chunk)
+        return written
+
+    def split_submissions(
+        self,
+        summary: T4Summary,
+        slips: Sequence[T4SlipData],
+        max_bytes: int,
+        pretty: bool = True,
+    ) -> list[tuple[T4Summary, list[T4SlipData]]]:
+        """
+        Split a return into submissions no larger than max_bytes.
 
-        # Add Transmitter info
-        self._add_transmitter(root)
+        Each submission carries its own summary: slip counts and box totals
+        are summed from its slips, and employer CPP/EI contributions are
+        apportioned by its share of employee CPP/EI, with the last
+        submission taking the rounding remainder so the parts add up to
+        the original summary. A return that fits is returned unchanged.
 
-        # Add T4 section
-        t4_element = SubElement(root, "T4")
+        Args:
+            summary: T4Summary for the whole return
+            slips: T4SlipData for all employees
+            max_bytes: Largest submission file allowed
+            pretty: Size the parts for pretty-printed output
 
-        # Add T4 Summary
-        self._add_t4_summary(t4_element, summary)
+        Returns:
+            (summary, slips) for each submission, in slip order
 
-        # Add T4 Slips
-        slips_element = SubElement(t4_element, "T4Slips")
-        for i, slip in enumerate(slips, start=1):
-            self._add_t4_slip(slips_element, slip, i)
+        Raises:
+            ValueError: If a single slip does not fit within max_bytes
+        """
+        head, tail = self._envelope(summary, pretty)
+        overhead = len(head) + len(tail)
+        parts: list[list[T4SlipData]] = [[]]
+        size = overhead
+        for slip_num, slip in enumerate(slips, start=1):
+            # Numbered as in the whole return: a part's own numbering and
+            # totals are never longer, so the estimate is an upper bound
+            slip_size = len(self._slip_bytes(slip, slip_num, pretty))
+            if overhead + slip_size > max_bytes:
+                raise ValueError(
+                    f"T4 slip {slip_num} does not fit in a {max_bytes}-byte submission"
+                )
+            if size + slip_size > max_bytes:
+                parts.append([])
+                size = overhead
+            parts[-1].append(slip)
+            size += slip_size
+
+        if len(parts) == 1:
+            return [(summary, parts[0])]
+        return list(zip(self._part_summaries(summary, parts), parts))
+
+    def write_submissions(
+        self,
+        summary: T4Summary,
+        slips: Sequence[T4SlipData],
+        directory: str | Path,
+        max_bytes: int | None = None,
+        pretty: bool = True,
+    ) -> list[Path]:
+        """
+        Write T619 XML files, splitting the return when it exceeds max_bytes.
 
-        # Convert to pretty-printed string
-        xml_string = tostring(root, encoding="unicode")
-        return self._prettify(xml_string)
+        Args:
+            summary: T4Summary for the whole return
+            slips: T4SlipData for all employees
+            directory: Directory to write the files into
+            max_bytes: Largest submission file (default: T4_XML_MAX_BYTES)
+            pretty: Indent elements two spaces per level
 
-    def _add_transmitter(self, parent: Element) -> None:
+        Returns:
+            Paths written: generate_xml_filename() for a single file, with a
+            _1, _2, ... suffix when the return was split
+        """
+        if max_bytes is None:
+            max_bytes = get_config().t4_xml_max_bytes
+        submissions = self.split_submissions(summary, slips, max_bytes, pretty)
+
+        filename = Path(self.generate_xml_filename(summary))
+        paths = []
+        for part_num, (part_summary, part_slips) in enumerate(submissions, start=1):
+            name = filename.name
+            if len(submissions) > 1:
+                name = f"{filename.stem}_{part_num}{filename.suffix}"
+            path = Path(directory) / name
+            with path.open("wb") as out:
+                self.write_xml(part_summary, part_slips, out, pretty)
+            paths.append(path)
+        return paths
+
+    def _part_summaries(
+        self,
+        summary: T4Summary,
+        parts: list[list[T4SlipData]],
+    ) -> list[T4Summary]:
+        """Summaries for each submission of a split return."""
+        cpp_total = sum(
+            (s.box_16_cpp_contributions + s.box_17_cpp2_contributions for p in parts for s in p),
+            Decimal("0"),
+        )
+        ei_total = sum((s.box_18_ei_premiums for p in parts for s in p), Decimal("0"))
+
+        summaries = []
+        cpp_employer_left = summary.total_cpp_employer
+        ei_employer_left = summary.total_ei_employer
+        for part_num, part in enumerate(parts, start=1):
+            cpp = sum((s.box_16_cpp_contributions for s in part), Decimal("0"))
+            cpp2 = sum((s.box_17_cpp2_contributions for s in part), Decimal("0"))
+            ei = sum((s.box_18_ei_premiums for s in part), Decimal("0"))
+            if part_num == len(parts):
+                cpp_employer, ei_employer = cpp_employer_left, ei_employer_left
+            else:
+                cpp_employer = _share(summary.total_cpp_employer, cpp + cpp2, cpp_total)
+                ei_employer = _share(summary.total_ei_employer, ei, ei_total)
+            cpp_employer_left -= cpp_employer
+            ei_employer_left -= ei_employer
+
+            summaries.append(
+                summary.model_copy(
+                    update={
+                        "total_number_of_t4_slips": len(part),
+                        "total_employment_income": sum(
+                            (s.box_14_employment_income for s in part), Decimal("0")
+                        ),
+                        "total_cpp_contributions": cpp,
+                        "total_cpp2_contributions": cpp2,
+                        "total_ei_premiums": ei,
+                        "total_income_tax_deducted": sum(
+                            (s.box_22_income_tax_deducted for s in part), Decimal("0")
+                        ),
+                        "total_union_dues": sum(
+                            (s.box_44_union_dues or Decimal("0") for s in part), Decimal("0")
+                        ),
+                        "total_cpp_employer": cpp_employer,
+                        "total_ei_employer": ei_employer,
+                    }
+                )
+            )
+        return summaries
+
+    def _envelope(self, summary: T4Summary, pretty: bool) -> tuple[bytes, bytes]:
+        """XML before the first slip (declaration through <T4Slips>) and after the last."""
+        newline, space = ("\n", INDENT) if pretty else ("", "")
+        root_attrs = (
+            f"xmlns={quoteattr(self.T4_NAMESPACE)} "
+            f"xmlns:sdte={quoteattr(self.SDTE_NAMESPACE)} "
+            f"version={quoteattr(self.SCHEMA_VERSION)}"
+        )
+        transmitter = self._add_transmitter(Element("Return"))
+        t4_summary = self._add_t4_summary(Element("T4"), summary)
+
+        head = (
+            XML_DECLARATION + newline
+            + f"<Return {root_attrs}>" + newline
+            + _serialize(transmitter, 1, pretty)
+            + space + "<T4>" + newline
+            + _serialize(t4_summary, 2, pretty)
+            + space * 2 + "<T4Slips>" + newline
+        )
+        tail = (
+            space * 2 + "</T4Slips>" + newline
+            + space + "</T4>" + newline
+            + "</Return>" + newline
+        )
+        return head.encode("utf-8"), tail.encode("utf-8")
+
+    def _slip_bytes(self, slip: T4SlipData, slip_num: int, pretty: bool) -> bytes:
+        """One serialized <T4Slip> element."""
+        element = self._add_t4_slip(Element("T4Slips"), slip, slip_num)
+        return _serialize(element, 3, pretty).encode("utf-8")
+
+    def _add_transmitter(self, parent: Element) -> Element:
         """Add Transmitter section."""
         trans = SubElement(parent, "Transmitter")
 
@@ -98,7 +323,9 @@ class T4XMLGenerator:
         SubElement(contact, "ContactName").text = "Payroll Administrator"
         SubElement(contact, "ContactPhone").text = "000-000-0000"
 
-    def _add_t4_summary(self, parent: Element, summary: T4Summary) -> None:
+        return trans
+
+    def _add_t4_summary(self, parent: Element, summary: T4Summary) -> Element:
         """Add T4 Summary section."""
         sum_elem = SubElement(parent, "T4Summary")
 
@@ -154,7 +381,9 @@ class T4XMLGenerator:
         # Tax year
         SubElement(sum_elem, "TaxYear").text = str(summary.tax_year)
 
-    def _add_t4_slip(self, parent: Element, slip: T4SlipData, slip_num: int) -> None:
+        return sum_elem
+
+    def _add_t4_slip(self, parent: Element, slip: T4SlipData, slip_num: int) -> Element:
         """Add individual T4 slip."""
         slip_elem = SubElement(parent, "T4Slip")
 
@@ -228,6 +457,8 @@ class T4XMLGenerator:
         if slip.ei_exempt:
             SubElement(boxes, "EIExempt").text = "Y"
 
+        return slip_elem
+
     def _format_amount(self, value: Decimal | None) -> str:
         """
         Format decimal amount for XML.
@@ -240,12 +471,6 @@ class T4XMLGenerator:
         cents = int(value * 100)
         return str(cents)
 
-    def _prettify(self, xml_string: str) -> str:
-        """Pretty print XML string."""
-        # Add XML declaration
-        dom = minidom.parseString(xml_string)
-        return dom.toprettyxml(indent="  ", encoding="UTF-8").decode("UTF-8")
-
     def generate_xml_filename(self, summary: T4Summary) -> str:
         """
         Generate standard filename for T4 XML file.
@@ -258,3 +483,18 @@ class T4XMLGenerator:
         """
         account = summary.employer_account_number.replace(" ", "")
         return f"T4_{account}_{summary.tax_year}.xml"
+
+
+def _serialize(element: Element, level: int, pretty: bool) -> str:
+    """Serialize an element nested `level` deep in the document."""
+    if not pretty:
+        return tostring(element, encoding="unicode")
+    indent(element, space=INDENT, level=level)
+    return INDENT * level + tostring(element, encoding="unicode") + "\n"
+
+
+def _share(total: Decimal, part: Decimal, whole: Decimal) -> Decimal:
+    """part/whole of total, to the cent."""
+    if not whole:
+        return Decimal("0")
+    return (total * part / whole).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
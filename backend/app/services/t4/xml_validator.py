@@ -2,15 +2,18 @@
 T4 XML Validator
 
 Validates T4 XML structure and content before CRA submission.
-Uses basic structure validation (not XSD schema validation).
+Uses basic structure validation (not XSD schema validation), checked in a
+single streaming pass so large filings are validated in constant memory.
 """
 
 from __future__ import annotations
 
 import re
+from collections.abc import AsyncIterable, Iterable, Iterator
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
-from xml.etree.ElementTree import Element, ParseError, fromstring
+from typing import cast
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
 
 from app.models.t4 import T4ValidationError, T4ValidationResult, T4ValidationWarning
 from app.utils.sin_validator import validate_sin_luhn
@@ -50,6 +53,23 @@ class T4XMLValidator:
         "TaxYear",
     ]
 
+    # Slip boxes summed for the summary totals check
+    # Note: Box17 is CPP2/QPP2 contributions (second tier CPP, introduced 2024)
+    SLIP_TOTAL_BOXES = {
+        "Box14": "employment_income",
+        "Box16": "cpp_contributions",
+        "Box17": "cpp2_contributions",
+        "Box18": "ei_premiums",
+        "Box22": "income_tax",
+    }
+    SUMMARY_TOTALS = {
+        "TotalEmploymentIncome": "employment_income",
+        "TotalCPPContributions": "cpp_contributions",
+        "TotalCPP2Contributions": "cpp2_contributions",
+        "TotalEIPremiums": "ei_premiums",
+        "TotalIncomeTaxDeducted": "income_tax",
+    }
+
     def _find_element(self, parent: Element, tag: str) -> Element | None:
         """
         Find child element, handling both namespaced and non-namespaced XML.
@@ -65,155 +85,61 @@ class T4XMLValidator:
         Returns:
             Found element or None
         """
-        # Try with namespace first (for generated XML)
-        elem = parent.find(f"t4:{tag}", self.NS)
+        # Try with namespace first (for generated XML); a {namespace}tag
+        # lookup skips ElementPath's prefix handling
+        elem = parent.find(f"{{{self.T4_NAMESPACE}}}{tag}")
         if elem is not None:
             return elem
         # Fallback to no namespace (for simple/test XML)
         return parent.find(tag)
 
-    def _find_all_elements(self, parent: Element, tag: str) -> list[Element]:
+    def validate(self, xml_content: str | bytes) -> T4ValidationResult:
         """
-        Find all child elements with given tag, handling namespaces.
+        Validate T4 XML structure and content.
 
         Args:
-            parent: Parent element to search in
-            tag: Element tag name (without namespace)
+            xml_content: XML string to validate
 
         Returns:
-            List of found elements
+            T4ValidationResult with errors and warnings
         """
-        # Try with namespace first
-        elems = parent.findall(f"t4:{tag}", self.NS)
-        if elems:
-            return elems
-        # Fallback to no namespace
-        return parent.findall(tag)
-
-    def validate(self, xml_content: str) -> T4ValidationResult:
+        stream = self.stream()
+        stream.feed(xml_content)
+        return stream.close()
+
+    def validate_chunks(self, chunks: Iterable[str | bytes]) -> T4ValidationResult:
         """
-        Validate T4 XML structure and content.
+        Validate T4 XML read in chunks, e.g. from a file.
 
         Args:
-            xml_content: XML string to validate
+            chunks: Consecutive pieces of the XML document
 
         Returns:
             T4ValidationResult with errors and warnings
         """
-        errors: list[T4ValidationError] = []
-        warnings: list[T4ValidationWarning] = []
-
-        # 1. XML well-formed check
-        try:
-            root = fromstring(xml_content)
-        except ParseError as e:
-            errors.append(
-                T4ValidationError(
-                    code=self.ERR_XML_PARSE,
-                    message=f"XML parsing failed: {str(e)}",
-                    field="xml",
-                )
-            )
-            return T4ValidationResult(
-                is_valid=False,
-                errors=errors,
-                warnings=warnings,
-            )
-
-        # 2. Required root elements
-        self._validate_required_elements(root, errors)
-
-        # Get T4 section
-        t4_elem = self._find_element(root, "T4")
-        if t4_elem is None:
-            # Already reported in required elements check
-            return T4ValidationResult(
-                is_valid=False,
-                errors=errors,
-                warnings=warnings,
-            )
-
-        # Get T4Summary section
-        summary_elem = self._find_element(t4_elem, "T4Summary")
-        if summary_elem is None:
-            errors.append(
-                T4ValidationError(
-                    code=self.ERR_MISSING_ELEMENT,
-                    message="Missing required element: T4/T4Summary",
-                    field="T4Summary",
-                )
-            )
-            return T4ValidationResult(
-                is_valid=False,
-                errors=errors,
-                warnings=warnings,
-            )
+        stream = self.stream()
+        for chunk in chunks:
+            stream.feed(chunk)
+        return stream.close()
 
-        # 3. Validate T4Summary required elements
-        self._validate_summary_elements(summary_elem, errors)
-
-        # 4. Validate Business Number format
-        self._validate_business_number(summary_elem, errors)
-
-        # 5. Validate Tax Year
-        self._validate_tax_year(summary_elem, errors, warnings)
-
-        # Get T4Slips section
-        slips_elem = self._find_element(t4_elem, "T4Slips")
-        if slips_elem is None:
-            errors.append(
-                T4ValidationError(
-                    code=self.ERR_MISSING_ELEMENT,
-                    message="Missing required element: T4/T4Slips",
-                    field="T4Slips",
-                )
-            )
-        else:
-            # 6. Validate each T4 slip
-            slips = self._find_all_elements(slips_elem, "T4Slip")
-            for i, slip in enumerate(slips, start=1):
-                self._validate_t4_slip(slip, i, errors)
-
-            # 7. Validate slip count matches TotalSlips
-            self._validate_slip_count(summary_elem, slips, errors)
+    async def validate_async(self, chunks: AsyncIterable[bytes]) -> T4ValidationResult:
+        """
+        Validate T4 XML arriving in chunks, e.g. an upload or storage download.
 
-            # 8. Validate summary totals match slip totals
-            self._validate_totals(summary_elem, slips, warnings)
+        Args:
+            chunks: Consecutive pieces of the XML document
 
-        return T4ValidationResult(
-            is_valid=len(errors) == 0,
-            errors=errors,
-            warnings=warnings,
-        )
+        Returns:
+            T4ValidationResult with errors and warnings
+        """
+        stream = self.stream()
+        async for chunk in chunks:
+            stream.feed(chunk)
+        return stream.close()
 
-    def _validate_required_elements(
-        self,
-        root: Element,
-        errors: list[T4ValidationError],
-    ) -> None:
-        """Validate required root elements exist."""
-        for elem_name in self.REQUIRED_ROOT_ELEMENTS:
-            if self._find_element(root, elem_name) is None:
-                errors.append(
-                    T4ValidationError(
-                        code=self.ERR_MISSING_ELEMENT,
-                        message=f"Missing required element: {elem_name}",
-                        field=elem_name,
-                    )
-                )
-
-        # Validate Transmitter elements
-        trans_elem = self._find_element(root, "Transmitter")
-        if trans_elem is not None:
-            for elem_name in self.REQUIRED_TRANSMITTER_ELEMENTS:
-                if self._find_element(trans_elem, elem_name) is None:
-                    errors.append(
-                        T4ValidationError(
-                            code=self.ERR_MISSING_ELEMENT,
-                            message=f"Missing required element: Transmitter/{elem_name}",
-                            field=f"Transmitter/{elem_name}",
-                        )
-                    )
+    def stream(self) -> T4XMLValidationStream:
+        """Start an incremental validation: feed() the XML, then close()."""
+        return T4XMLValidationStream(self)
 
     def _validate_summary_elements(
         self,
@@ -404,7 +330,7 @@ class T4XMLValidator:
     def _validate_slip_count(
         self,
         summary_elem: Element,
-        slips: list[Element],
+        actual_count: int,
         errors: list[T4ValidationError],
     ) -> None:
         """Validate TotalSlips matches actual slip count."""
@@ -412,7 +338,6 @@ class T4XMLValidator:
         if total_elem is not None and total_elem.text:
             try:
                 declared_total = int(total_elem.text)
-                actual_count = len(slips)
                 if declared_total != actual_count:
                     errors.append(
                         T4ValidationError(
@@ -424,53 +349,27 @@ class T4XMLValidator:
             except ValueError:
                 pass
 
+    def _add_slip_totals(self, slip: Element, slip_totals: dict[str, Decimal]) -> None:
+        """Add one slip's boxes to the running slip totals."""
+        amounts = self._find_element(slip, "T4Amounts")
+        if amounts is not None:
+            for box_name, total_key in self.SLIP_TOTAL_BOXES.items():
+                box_elem = self._find_element(amounts, box_name)
+                if box_elem is not None and box_elem.text:
+                    try:
+                        # Amounts are in cents
+                        slip_totals[total_key] += Decimal(box_elem.text)
+                    except (ValueError, TypeError, InvalidOperation):
+                        pass
+
     def _validate_totals(
         self,
         summary_elem: Element,
-        slips: list[Element],
+        slip_totals: dict[str, Decimal],
         warnings: list[T4ValidationWarning],
     ) -> None:
         """Validate summary totals match slip totals."""
-        # Calculate totals from slips
-        # Note: Box17 is CPP2/QPP2 contributions (second tier CPP, introduced 2024)
-        slip_totals = {
-            "employment_income": Decimal("0"),
-            "cpp_contributions": Decimal("0"),
-            "cpp2_contributions": Decimal("0"),
-            "ei_premiums": Decimal("0"),
-            "income_tax": Decimal("0"),
-        }
-
-        box_mapping = {
-            "Box14": "employment_income",
-            "Box16": "cpp_contributions",
-            "Box17": "cpp2_contributions",  # CPP2/QPP2 second tier (2024+)
-            "Box18": "ei_premiums",
-            "Box22": "income_tax",
-        }
-
-        for slip in slips:
-            amounts = self._find_element(slip, "T4Amounts")
-            if amounts is not None:
-                for box_name, total_key in box_mapping.items():
-                    box_elem = self._find_element(amounts, box_name)
-                    if box_elem is not None and box_elem.text:
-                        try:
-                            # Amounts are in cents
-                            slip_totals[total_key] += Decimal(box_elem.text)
-                        except (ValueError, TypeError, InvalidOperation):
-                            pass
-
-        # Compare with summary totals
-        summary_mapping = {
-            "TotalEmploymentIncome": "employment_income",
-            "TotalCPPContributions": "cpp_contributions",
-            "TotalCPP2Contributions": "cpp2_contributions",  # CPP2/QPP2 second tier (2024+)
-            "TotalEIPremiums": "ei_premiums",
-            "TotalIncomeTaxDeducted": "income_tax",
-        }
-
-        for summary_elem_name, total_key in summary_mapping.items():
+        for summary_elem_name, total_key in self.SUMMARY_TOTALS.items():
             elem = self._find_element(summary_elem, summary_elem_name)
             if elem is not None and elem.text:
                 try:
@@ -486,3 +385,176 @@ class T4XMLValidator:
                         )
                 except (ValueError, TypeError, InvalidOperation):
                     pass
+
+
+class T4XMLValidationStream:
+    """
+    Incremental T4 XML validation.
+
+    XML is parsed as it is fed. Each T4Slip is validated and added to the
+    running totals when its closing tag arrives, then dropped from the tree,
+    so memory does not grow with the number of slips. Findings are reported
+    in the same order as a whole-document check once close() is called.
+    """
+
+    def __init__(self, validator: T4XMLValidator):
+        self.validator = validator
+        self._parser: XMLPullParser[Element] = XMLPullParser(events=("start", "end"))
+        self._path: list[str] = []
+        self._elements: list[Element] = []
+        self._names: dict[str, str] = {}
+        self._parse_error: ParseError | None = None
+
+        self._root_children: set[str] = set()
+        self._transmitter_children: set[str] | None = None
+        self._summary: Element | None = None
+        self._has_slips_section = False
+        self._slip_count = 0
+        self._slip_errors: list[T4ValidationError] = []
+        self._slip_totals = {key: Decimal("0") for key in validator.SUMMARY_TOTALS.values()}
+
+    def feed(self, data: str | bytes) -> None:
+        """Parse the next piece of the document."""
+        if self._parse_error is not None:
+            return
+        try:
+            self._parser.feed(data)
+            self._handle_events()
+        except ParseError as e:
+            self._parse_error = e
+
+    def close(self) -> T4ValidationResult:
+        """Finish parsing and return the validation result."""
+        if self._parse_error is None:
+            try:
+                self._parser.close()
+                self._handle_events()
+            except ParseError as e:
+                self._parse_error = e
+
+        v = self.validator
+        errors: list[T4ValidationError] = []
+        warnings: list[T4ValidationWarning] = []
+
+        # 1. XML well-formed check
+        if self._parse_error is not None:
+            errors.append(
+                T4ValidationError(
+                    code=v.ERR_XML_PARSE,
+                    message=f"XML parsing failed: {str(self._parse_error)}",
+                    field="xml",
+                )
+            )
+            return T4ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+
+        # 2. Required root and Transmitter elements
+        for elem_name in v.REQUIRED_ROOT_ELEMENTS:
+            if elem_name not in self._root_children:
+                errors.append(
+                    T4ValidationError(
+                        code=v.ERR_MISSING_ELEMENT,
+                        message=f"Missing required element: {elem_name}",
+                        field=elem_name,
+                    )
+                )
+        if self._transmitter_children is not None:
+            for elem_name in v.REQUIRED_TRANSMITTER_ELEMENTS:
+                if elem_name not in self._transmitter_children:
+                    errors.append(
+                        T4ValidationError(
+                            code=v.ERR_MISSING_ELEMENT,
+                            message=f"Missing required element: Transmitter/{elem_name}",
+                            field=f"Transmitter/{elem_name}",
+                        )
+                    )
+
+        if "T4" not in self._root_children:
+            # Already reported in required elements check
+            return T4ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+
+        if self._summary is None:
+            errors.append(
+                T4ValidationError(
+                    code=v.ERR_MISSING_ELEMENT,
+                    message="Missing required element: T4/T4Summary",
+                    field="T4Summary",
+                )
+            )
+            return T4ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+
+        # 3-5. T4Summary elements, Business Number and Tax Year
+        v._validate_summary_elements(self._summary, errors)
+        v._validate_business_number(self._summary, errors)
+        v._validate_tax_year(self._summary, errors, warnings)
+
+        if not self._has_slips_section:
+            errors.append(
+                T4ValidationError(
+                    code=v.ERR_MISSING_ELEMENT,
+                    message="Missing required element: T4/T4Slips",
+                    field="T4Slips",
+                )
+            )
+        else:
+            # 6. Each T4 slip, 7. slip count, 8. summary totals
+            errors.extend(self._slip_errors)
+            v._validate_slip_count(self._summary, self._slip_count, errors)
+            v._validate_totals(self._summary, self._slip_totals, warnings)
+
+        return T4ValidationResult(
+            is_valid=len(errors) == 0,
+            errors=errors,
+            warnings=warnings,
+        )
+
+    def _handle_events(self) -> None:
+        path = self._path
+        elements = self._elements
+        # Only start and end events are requested, and both carry an Element
+        events = cast(Iterator[tuple[str, Element]], self._parser.read_events())
+        for event, elem in events:
+            if event == "start":
+                name = self._names.get(elem.tag)
+                if name is None:
+                    name = self._names[elem.tag] = self._local_name(elem.tag)
+                path.append(name)
+                elements.append(elem)
+                # Only the top three levels and T4Slip ends need a look;
+                # everything inside a slip is checked when the slip ends
+                if len(path) <= 3:
+                    self._on_start()
+            else:
+                if len(path) <= 4:
+                    self._on_end(elem)
+                path.pop()
+                elements.pop()
+
+    def _on_start(self) -> None:
+        path = self._path
+        if len(path) == 2:
+            self._root_children.add(path[1])
+            if path[1] == "Transmitter" and self._transmitter_children is None:
+                self._transmitter_children = set()
+        elif len(path) == 3 and path[1] == "Transmitter":
+            if self._transmitter_children is not None:
+                self._transmitter_children.add(path[2])
+
+    def _on_end(self, elem: Element) -> None:
+        path = self._path
+        if len(path) == 3 and path[1] == "T4":
+            if path[2] == "T4Summary" and self._summary is None:
+                self._summary = elem
+            elif path[2] == "T4Slips":
+                self._has_slips_section = True
+        elif len(path) == 4 and path[1:] == ["T4", "T4Slips", "T4Slip"]:
+            self._slip_count += 1
+            self.validator._validate_t4_slip(elem, self._slip_count, self._slip_errors)
+            self.validator._add_slip_totals(elem, self._slip_totals)
+            self._elements[-2].remove(elem)
+
+    def _local_name(self, tag: str) -> str:
+        """Tag without the T4 namespace; other namespaces never match."""
+        if tag.startswith("{"):
+            namespace, _, name = tag[1:].partition("}")
+            return name if namespace == self.validator.T4_NAMESPACE else tag
+        return tag
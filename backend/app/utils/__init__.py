@@ -1,5 +1,10 @@
 """Utility functions"""
 
+from app.utils.business_days import (
+    HolidayCalendar,
+    count_business_days,
+    count_weekday,
+)
 from app.utils.response import create_error_response, create_success_response
 from app.utils.sin_validator import (
     format_sin_display,
@@ -13,6 +18,10 @@ __all__ = [
     # Response utilities
     "create_success_response",
     "create_error_response",
+    # Business day utilities
+    "HolidayCalendar",
+    "count_business_days",
+    "count_weekday",
     # SIN validation utilities
     "format_sin_display",
     "mask_sin_display",
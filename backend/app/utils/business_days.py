@@ -0,0 +1,176 @@
+"""
+Business Day and Statutory Holiday Arithmetic
+
+Closed-form weekday counting between dates and a per-province statutory
+holiday calendar with range queries, so counting work days over long
+lookbacks does not walk the calendar one day at a time.
+
+All ranges are half-open: start inclusive, end exclusive.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+
+def count_weekday(weekday: int, start_date: date, end_date: date) -> int:
+    """
+    Count the dates in [start_date, end_date) that fall on weekday.
+
+    Args:
+        weekday: Day of week (Mon=0 .. Sun=6)
+        start_date: Start of range (inclusive)
+        end_date: End of range (exclusive)
+
+    Returns:
+        Number of matching dates (0 for an empty range)
+
+    Examples:
+        >>> count_weekday(0, date(2025, 6, 30), date(2025, 7, 14))
+        2
+    """
+    days = end_date.toordinal() - start_date.toordinal()
+    if days <= 0:
+        return 0
+    # Days from start_date to its first occurrence of weekday
+    lead = (weekday - start_date.weekday()) % 7
+    if lead >= days:
+        return 0
+    return (days - lead - 1) // 7 + 1
+
+
+def count_business_days(start_date: date, end_date: date) -> int:
+    """
+    Count Monday-Friday dates in [start_date, end_date).
+
+    Args:
+        start_date: Start of range (inclusive)
+        end_date: End of range (exclusive)
+
+    Returns:
+        Number of business days (0 for an empty range)
+
+    Examples:
+        >>> count_business_days(date(2025, 6, 30), date(2025, 7, 7))
+        5
+    """
+    days = end_date.toordinal() - start_date.toordinal()
+    if days <= 0:
+        return 0
+    full_weeks, remainder = divmod(days, 7)
+    start_weekday = start_date.weekday()
+    # Remaining days run from start_weekday for `remainder` days
+    extra = sum(1 for offset in range(remainder) if (start_weekday + offset) % 7 < 5)
+    return full_weeks * 5 + extra
+
+
+class HolidayCalendar:
+    """
+    Statutory holidays per province, indexed for range queries.
+
+    Built once from statutory_holidays rows (holiday_date, province); each
+    province keeps sorted date ordinals for all holidays and for those on
+    business days, so counting holidays in a range is two binary searches.
+    """
+
+    def __init__(self, holidays: Iterable[dict[str, Any]]):
+        """
+        Build the calendar.
+
+        Args:
+            holidays: Rows with holiday_date (ISO string or date) and province;
+                rows without a valid date or province are skipped
+        """
+        ordinals: dict[str, set[int]] = {}
+        for holiday in holidays:
+            province = (holiday.get("province") or "").upper()
+            raw_date = holiday.get("holiday_date")
+            try:
+                holiday_date = (
+                    raw_date if isinstance(raw_date, date) else date.fromisoformat(str(raw_date))
+                )
+            except ValueError:
+                continue
+            if province:
+                ordinals.setdefault(province, set()).add(holiday_date.toordinal())
+
+        self._all: dict[str, list[int]] = {p: sorted(o) for p, o in ordinals.items()}
+        self._business: dict[str, list[int]] = {
+            p: [o for o in sorted_ordinals if date.fromordinal(o).weekday() < 5]
+            for p, sorted_ordinals in self._all.items()
+        }
+
+    @property
+    def provinces(self) -> list[str]:
+        """Provinces with at least one holiday."""
+        return sorted(self._all)
+
+    def holidays_between(self, province: str, start_date: date, end_date: date) -> list[date]:
+        """
+        Statutory holidays of a province in [start_date, end_date).
+
+        Args:
+            province: Province code (e.g., "ON")
+            start_date: Start of range (inclusive)
+            end_date: End of range (exclusive)
+
+        Returns:
+            Holiday dates in ascending order
+        """
+        ordinals = self._all.get(province.upper(), [])
+        lo, hi = ordinal_span(ordinals, start_date, end_date)
+        return [date.fromordinal(o) for o in ordinals[lo:hi]]
+
+    def is_holiday(self, province: str, day: date) -> bool:
+        """Whether day is a statutory holiday in the province."""
+        ordinals = self._all.get(province.upper(), [])
+        i = bisect_left(ordinals, day.toordinal())
+        return i < len(ordinals) and ordinals[i] == day.toordinal()
+
+    def count_holidays(
+        self,
+        province: str,
+        start_date: date,
+        end_date: date,
+        business_days_only: bool = True,
+    ) -> int:
+        """
+        Count statutory holidays of a province in [start_date, end_date).
+
+        Args:
+            province: Province code
+            start_date: Start of range (inclusive)
+            end_date: End of range (exclusive)
+            business_days_only: Only count holidays falling Monday-Friday
+
+        Returns:
+            Number of holidays
+        """
+        index = self._business if business_days_only else self._all
+        lo, hi = ordinal_span(index.get(province.upper(), []), start_date, end_date)
+        return hi - lo
+
+    def count_work_days(self, province: str, start_date: date, end_date: date) -> int:
+        """
+        Count business days in [start_date, end_date) that are not holidays.
+
+        Args:
+            province: Province code
+            start_date: Start of range (inclusive)
+            end_date: End of range (exclusive)
+
+        Returns:
+            Business days minus statutory holidays on business days
+        """
+        return count_business_days(start_date, end_date) - self.count_holidays(
+            province, start_date, end_date
+        )
+
+
+def ordinal_span(ordinals: list[int], start_date: date, end_date: date) -> tuple[int, int]:
+    """Slice bounds of the sorted date ordinals within [start_date, end_date)."""
+    lo = bisect_left(ordinals, start_date.toordinal())
+    return lo, max(lo, bisect_left(ordinals, end_date.toordinal()))
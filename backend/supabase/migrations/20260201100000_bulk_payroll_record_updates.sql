@@ -0,0 +1,114 @@
+-- =============================================================================
+-- MIGRATION: Bulk payroll record updates
+-- =============================================================================
+-- Description: Persist recalculated payroll records in chunks, applied atomically
+--   - payroll_record_update_staging holds calculated values, inserted in chunks
+--   - apply_payroll_record_updates() copies one staged batch into
+--     payroll_records in a single transaction and clears the batch
+--   - If any staged record does not match a record of the run, nothing is applied
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS payroll_record_update_staging (
+    batch_id UUID NOT NULL,
+    record_id UUID NOT NULL,
+    payroll_run_id UUID NOT NULL REFERENCES payroll_runs(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (batch_id, record_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_payroll_record_update_staging_run
+    ON payroll_record_update_staging(payroll_run_id);
+
+-- RLS
+ALTER TABLE payroll_record_update_staging ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own payroll_record_update_staging"
+    ON payroll_record_update_staging FOR SELECT
+    USING (user_id = auth.uid()::text);
+CREATE POLICY "Users can insert own payroll_record_update_staging"
+    ON payroll_record_update_staging FOR INSERT
+    WITH CHECK (user_id = auth.uid()::text);
+CREATE POLICY "Users can delete own payroll_record_update_staging"
+    ON payroll_record_update_staging FOR DELETE
+    USING (user_id = auth.uid()::text);
+
+COMMENT ON TABLE payroll_record_update_staging IS
+    'Calculated payroll_records values staged in chunks by the backend, applied by apply_payroll_record_updates().';
+
+-- =============================================================================
+-- apply_payroll_record_updates
+-- =============================================================================
+-- Runs as the caller, so payroll_records RLS still applies. Raises (rolling
+-- back every update) unless exactly p_expected_count records were updated.
+
+CREATE OR REPLACE FUNCTION apply_payroll_record_updates(
+    p_run_id UUID,
+    p_batch_id UUID,
+    p_expected_count INTEGER
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.payroll_records pr SET
+        gross_regular = r.gross_regular,
+        gross_overtime = r.gross_overtime,
+        holiday_pay = r.holiday_pay,
+        holiday_premium_pay = r.holiday_premium_pay,
+        vacation_pay_paid = r.vacation_pay_paid,
+        vacation_hours_taken = r.vacation_hours_taken,
+        sick_hours_taken = r.sick_hours_taken,
+        sick_pay_paid = r.sick_pay_paid,
+        other_earnings = r.other_earnings,
+        bonus_earnings = r.bonus_earnings,
+        cpp_employee = r.cpp_employee,
+        cpp_additional = r.cpp_additional,
+        ei_employee = r.ei_employee,
+        federal_tax = r.federal_tax,
+        provincial_tax = r.provincial_tax,
+        federal_tax_on_income = r.federal_tax_on_income,
+        provincial_tax_on_income = r.provincial_tax_on_income,
+        federal_tax_on_bonus = r.federal_tax_on_bonus,
+        provincial_tax_on_bonus = r.provincial_tax_on_bonus,
+        other_deductions = r.other_deductions,
+        cpp_employer = r.cpp_employer,
+        ei_employer = r.ei_employer,
+        ytd_gross = r.ytd_gross,
+        ytd_cpp = r.ytd_cpp,
+        ytd_ei = r.ytd_ei,
+        ytd_federal_tax = r.ytd_federal_tax,
+        ytd_provincial_tax = r.ytd_provincial_tax,
+        ytd_net_pay = r.ytd_net_pay,
+        vacation_accrued = r.vacation_accrued,
+        is_modified = r.is_modified,
+        regular_hours_worked = r.regular_hours_worked,
+        overtime_hours_worked = r.overtime_hours_worked
+    FROM public.payroll_record_update_staging s
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::public.payroll_records, s.payload) r
+    WHERE s.batch_id = p_batch_id
+      AND s.payroll_run_id = p_run_id
+      AND pr.id = s.record_id
+      AND pr.payroll_run_id = p_run_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    IF v_updated <> p_expected_count THEN
+        RAISE EXCEPTION 'Payroll record batch % updated % of % records',
+            p_batch_id, v_updated, p_expected_count;
+    END IF;
+
+    DELETE FROM public.payroll_record_update_staging WHERE batch_id = p_batch_id;
+
+    RETURN v_updated;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_payroll_record_updates TO authenticated;
+
+COMMENT ON FUNCTION apply_payroll_record_updates IS
+    'Atomically applies one staged batch of recalculated payroll_records values.';
@@ -0,0 +1,309 @@
+-- =============================================================================
+-- MIGRATION: Employee YTD ledger
+-- =============================================================================
+-- Description: Per-employee, per-tax-year running totals of completed payroll
+--   - employee_ytd_ledger holds summed payroll_records amounts, so prior-YTD
+--     lookups read one row per employee instead of every prior record
+--   - ytd_ledger_runs lists the runs included in the ledger; applying or
+--     reversing a run twice is a no-op
+--   - apply_payroll_run_to_ytd_ledger() is called by the backend on approval
+--   - Triggers reverse a run when it is deleted or leaves approved/paid, and
+--     apply record changes (amendments) of runs already in the ledger
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS employee_ytd_ledger (
+    employee_id UUID NOT NULL REFERENCES employees(id) ON DELETE CASCADE,
+    tax_year INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    company_id UUID REFERENCES companies(id),
+    -- gross_regular + gross_overtime + holiday_pay + holiday_premium_pay
+    -- + vacation_pay_paid + other_earnings
+    gross NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    bonus_earnings NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    sick_pay_paid NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    cpp_employee NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    cpp_additional NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    ei_employee NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    federal_tax NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    provincial_tax NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    net_pay NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    record_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (employee_id, tax_year)
+);
+
+CREATE INDEX IF NOT EXISTS idx_employee_ytd_ledger_company_year
+    ON employee_ytd_ledger(company_id, tax_year);
+
+CREATE TABLE IF NOT EXISTS ytd_ledger_runs (
+    payroll_run_id UUID PRIMARY KEY REFERENCES payroll_runs(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    company_id UUID REFERENCES companies(id),
+    tax_year INTEGER NOT NULL,
+    applied_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_ytd_ledger_runs_company_year
+    ON ytd_ledger_runs(company_id, tax_year);
+
+-- RLS
+ALTER TABLE employee_ytd_ledger ENABLE ROW LEVEL SECURITY;
+ALTER TABLE ytd_ledger_runs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own employee_ytd_ledger"
+    ON employee_ytd_ledger FOR SELECT
+    USING (user_id = auth.uid()::text);
+CREATE POLICY "Users can insert own employee_ytd_ledger"
+    ON employee_ytd_ledger FOR INSERT
+    WITH CHECK (user_id = auth.uid()::text);
+CREATE POLICY "Users can update own employee_ytd_ledger"
+    ON employee_ytd_ledger FOR UPDATE
+    USING (user_id = auth.uid()::text);
+
+CREATE POLICY "Users can view own ytd_ledger_runs"
+    ON ytd_ledger_runs FOR SELECT
+    USING (user_id = auth.uid()::text);
+CREATE POLICY "Users can insert own ytd_ledger_runs"
+    ON ytd_ledger_runs FOR INSERT
+    WITH CHECK (user_id = auth.uid()::text);
+CREATE POLICY "Users can delete own ytd_ledger_runs"
+    ON ytd_ledger_runs FOR DELETE
+    USING (user_id = auth.uid()::text);
+
+COMMENT ON TABLE employee_ytd_ledger IS
+    'Running YTD totals of approved/paid payroll_records per employee and tax year (pay_date year).';
+COMMENT ON TABLE ytd_ledger_runs IS
+    'Payroll runs whose records are included in employee_ytd_ledger.';
+
+-- =============================================================================
+-- ytd_ledger_add_record
+-- =============================================================================
+-- Adds (p_sign = 1) or subtracts (p_sign = -1) one record's amounts.
+
+CREATE OR REPLACE FUNCTION ytd_ledger_add_record(
+    p_record public.payroll_records,
+    p_tax_year INTEGER,
+    p_sign INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+BEGIN
+    INSERT INTO public.employee_ytd_ledger AS l (
+        employee_id, tax_year, user_id, company_id,
+        gross, bonus_earnings, sick_pay_paid,
+        cpp_employee, cpp_additional, ei_employee,
+        federal_tax, provincial_tax, net_pay, record_count
+    ) VALUES (
+        p_record.employee_id, p_tax_year, p_record.user_id, p_record.company_id,
+        p_sign * (
+            COALESCE(p_record.gross_regular, 0) + COALESCE(p_record.gross_overtime, 0)
+            + COALESCE(p_record.holiday_pay, 0) + COALESCE(p_record.holiday_premium_pay, 0)
+            + COALESCE(p_record.vacation_pay_paid, 0) + COALESCE(p_record.other_earnings, 0)
+        ),
+        p_sign * COALESCE(p_record.bonus_earnings, 0),
+        p_sign * COALESCE(p_record.sick_pay_paid, 0),
+        p_sign * COALESCE(p_record.cpp_employee, 0),
+        p_sign * COALESCE(p_record.cpp_additional, 0),
+        p_sign * COALESCE(p_record.ei_employee, 0),
+        p_sign * COALESCE(p_record.federal_tax, 0),
+        p_sign * COALESCE(p_record.provincial_tax, 0),
+        p_sign * COALESCE(p_record.net_pay, 0),
+        p_sign
+    )
+    ON CONFLICT (employee_id, tax_year) DO UPDATE SET
+        gross = l.gross + EXCLUDED.gross,
+        bonus_earnings = l.bonus_earnings + EXCLUDED.bonus_earnings,
+        sick_pay_paid = l.sick_pay_paid + EXCLUDED.sick_pay_paid,
+        cpp_employee = l.cpp_employee + EXCLUDED.cpp_employee,
+        cpp_additional = l.cpp_additional + EXCLUDED.cpp_additional,
+        ei_employee = l.ei_employee + EXCLUDED.ei_employee,
+        federal_tax = l.federal_tax + EXCLUDED.federal_tax,
+        provincial_tax = l.provincial_tax + EXCLUDED.provincial_tax,
+        net_pay = l.net_pay + EXCLUDED.net_pay,
+        record_count = l.record_count + EXCLUDED.record_count,
+        updated_at = NOW();
+END;
+$$;
+
+-- =============================================================================
+-- apply_payroll_run_to_ytd_ledger / reverse_payroll_run_from_ytd_ledger
+-- =============================================================================
+-- Both return the number of records added or subtracted (0 if the run was
+-- already in / not in the ledger).
+
+CREATE OR REPLACE FUNCTION apply_payroll_run_to_ytd_ledger(p_run_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_run public.payroll_runs;
+    v_tax_year INTEGER;
+    v_record public.payroll_records;
+    v_count INTEGER := 0;
+BEGIN
+    SELECT * INTO v_run FROM public.payroll_runs WHERE id = p_run_id;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Payroll run % not found', p_run_id;
+    END IF;
+    IF v_run.status NOT IN ('approved', 'paid') THEN
+        RAISE EXCEPTION 'Payroll run % is %, not approved or paid', p_run_id, v_run.status;
+    END IF;
+
+    v_tax_year := EXTRACT(YEAR FROM v_run.pay_date)::INTEGER;
+
+    INSERT INTO public.ytd_ledger_runs (payroll_run_id, user_id, company_id, tax_year)
+    VALUES (p_run_id, v_run.user_id, v_run.company_id, v_tax_year)
+    ON CONFLICT (payroll_run_id) DO NOTHING;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    FOR v_record IN
+        SELECT * FROM public.payroll_records WHERE payroll_run_id = p_run_id
+    LOOP
+        PERFORM public.ytd_ledger_add_record(v_record, v_tax_year, 1);
+        v_count := v_count + 1;
+    END LOOP;
+
+    RETURN v_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION reverse_payroll_run_from_ytd_ledger(p_run_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_tax_year INTEGER;
+    v_record public.payroll_records;
+    v_count INTEGER := 0;
+BEGIN
+    DELETE FROM public.ytd_ledger_runs WHERE payroll_run_id = p_run_id
+    RETURNING tax_year INTO v_tax_year;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    FOR v_record IN
+        SELECT * FROM public.payroll_records WHERE payroll_run_id = p_run_id
+    LOOP
+        PERFORM public.ytd_ledger_add_record(v_record, v_tax_year, -1);
+        v_count := v_count + 1;
+    END LOOP;
+
+    RETURN v_count;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_payroll_run_to_ytd_ledger TO authenticated;
+GRANT EXECUTE ON FUNCTION reverse_payroll_run_from_ytd_ledger TO authenticated;
+
+COMMENT ON FUNCTION apply_payroll_run_to_ytd_ledger IS
+    'Adds an approved/paid run''s records to employee_ytd_ledger (idempotent).';
+COMMENT ON FUNCTION reverse_payroll_run_from_ytd_ledger IS
+    'Subtracts a run''s records from employee_ytd_ledger (idempotent).';
+
+-- =============================================================================
+-- Triggers
+-- =============================================================================
+
+-- Deleting a run: reverse before its records are removed by CASCADE. The
+-- ytd_ledger_runs row is gone by then, so the record triggers do nothing.
+CREATE OR REPLACE FUNCTION ytd_ledger_on_run_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+BEGIN
+    PERFORM public.reverse_payroll_run_from_ytd_ledger(OLD.id);
+    RETURN OLD;
+END;
+$$;
+
+CREATE TRIGGER trigger_ytd_ledger_run_delete
+    BEFORE DELETE ON payroll_runs
+    FOR EACH ROW EXECUTE FUNCTION ytd_ledger_on_run_delete();
+
+-- Leaving approved/paid reverses the run; moving its pay_date re-files it
+-- under the new tax year.
+CREATE OR REPLACE FUNCTION ytd_ledger_on_run_update()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+BEGIN
+    IF NEW.status NOT IN ('approved', 'paid') THEN
+        PERFORM public.reverse_payroll_run_from_ytd_ledger(NEW.id);
+    ELSIF NEW.pay_date IS DISTINCT FROM OLD.pay_date
+        AND public.reverse_payroll_run_from_ytd_ledger(NEW.id) > 0 THEN
+        PERFORM public.apply_payroll_run_to_ytd_ledger(NEW.id);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER trigger_ytd_ledger_run_update
+    AFTER UPDATE OF status, pay_date ON payroll_runs
+    FOR EACH ROW EXECUTE FUNCTION ytd_ledger_on_run_update();
+
+-- Amending records of a run already in the ledger
+CREATE OR REPLACE FUNCTION ytd_ledger_on_record_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_tax_year INTEGER;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT tax_year INTO v_tax_year
+        FROM public.ytd_ledger_runs WHERE payroll_run_id = OLD.payroll_run_id;
+        IF FOUND THEN
+            PERFORM public.ytd_ledger_add_record(OLD, v_tax_year, -1);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT tax_year INTO v_tax_year
+        FROM public.ytd_ledger_runs WHERE payroll_run_id = NEW.payroll_run_id;
+        IF FOUND THEN
+            PERFORM public.ytd_ledger_add_record(NEW, v_tax_year, 1);
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$;
+
+-- Only updates to the columns ytd_ledger_add_record reads (or to the row's
+-- employee/run) touch the ledger; paystub and status updates do not
+CREATE TRIGGER trigger_ytd_ledger_record_change
+    AFTER INSERT OR DELETE OR UPDATE OF
+        employee_id, payroll_run_id, user_id, company_id,
+        gross_regular, gross_overtime, holiday_pay, holiday_premium_pay,
+        vacation_pay_paid, other_earnings, bonus_earnings, sick_pay_paid,
+        cpp_employee, cpp_additional, ei_employee,
+        federal_tax, provincial_tax, net_pay
+    ON payroll_records
+    FOR EACH ROW EXECUTE FUNCTION ytd_ledger_on_record_change();
+
+-- =============================================================================
+-- Backfill existing approved/paid runs
+-- =============================================================================
+
+DO $$
+DECLARE
+    v_run_id UUID;
+BEGIN
+    FOR v_run_id IN
+        SELECT id FROM payroll_runs WHERE status IN ('approved', 'paid')
+    LOOP
+        PERFORM apply_payroll_run_to_ytd_ledger(v_run_id);
+    END LOOP;
+END;
+$$;
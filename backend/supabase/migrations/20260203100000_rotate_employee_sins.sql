@@ -0,0 +1,38 @@
+-- =============================================================================
+-- MIGRATION: Employee SIN key rotation
+-- =============================================================================
+-- Description: Write back SINs re-encrypted under a new key, one page per call
+--   - rotate_employee_sins() takes [{id, old_sin, new_sin}, ...]
+--   - A SIN is only replaced if it still holds old_sin, so an edit made while
+--     the rotation runs is never overwritten
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION rotate_employee_sins(p_updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.employees e SET
+        sin_encrypted = u.new_sin
+    FROM jsonb_to_recordset(p_updates) AS u(id UUID, old_sin TEXT, new_sin TEXT)
+    WHERE e.id = u.id
+      AND e.sin_encrypted = u.old_sin;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    RETURN v_updated;
+END;
+$$;
+
+-- Key rotation spans every company: backend service role only. Supabase's
+-- default privileges grant EXECUTE to anon and authenticated directly, so
+-- revoking from PUBLIC alone is not enough
+REVOKE EXECUTE ON FUNCTION rotate_employee_sins FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION rotate_employee_sins FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION rotate_employee_sins TO service_role;
+
+COMMENT ON FUNCTION rotate_employee_sins IS
+    'Replaces re-encrypted employee SINs whose stored value is unchanged; returns rows updated.';
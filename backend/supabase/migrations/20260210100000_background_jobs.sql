@@ -0,0 +1,114 @@
+-- =============================================================================
+-- MIGRATION: Background jobs
+-- =============================================================================
+-- Description: Persistent queue for long payroll and T4 operations
+--   - background_jobs holds each job's parameters, status, progress and result
+--   - An idempotency key is unique per user; a concurrency key is unique among
+--     a user's queued and running jobs
+--   - claim_background_job() hands the next due job to a worker with
+--     FOR UPDATE SKIP LOCKED, and reclaims running jobs whose worker stopped
+--     renewing its lease (locked_at)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS background_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    company_id UUID REFERENCES companies(id) ON DELETE CASCADE,
+    params JSONB NOT NULL DEFAULT '{}',
+    idempotency_key TEXT,
+    concurrency_key TEXT,
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 1,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    progress JSONB,
+    result JSONB,
+    error TEXT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    CONSTRAINT unique_background_job_idempotency_key UNIQUE (user_id, idempotency_key)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_background_jobs_active_concurrency_key
+    ON background_jobs(user_id, concurrency_key)
+    WHERE concurrency_key IS NOT NULL AND status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_background_jobs_queued
+    ON background_jobs(run_after, created_at)
+    WHERE status = 'queued';
+
+CREATE INDEX IF NOT EXISTS idx_background_jobs_running
+    ON background_jobs(locked_at)
+    WHERE status = 'running';
+
+-- RLS: users read their own jobs; the backend's workers use the service role
+ALTER TABLE background_jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own background_jobs"
+    ON background_jobs FOR SELECT
+    USING (user_id = auth.uid()::text);
+
+CREATE OR REPLACE FUNCTION claim_background_job(
+    p_kinds TEXT[],
+    p_worker TEXT,
+    p_lease_seconds INTEGER
+)
+RETURNS SETOF public.background_jobs
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_expired TIMESTAMPTZ := NOW() - make_interval(secs => p_lease_seconds);
+    v_id UUID;
+BEGIN
+    -- Abandoned jobs with no attempts left are given up
+    UPDATE public.background_jobs SET
+        status = 'failed',
+        error = COALESCE(error, 'Worker stopped responding'),
+        finished_at = NOW(),
+        locked_by = NULL,
+        locked_at = NULL
+    WHERE status = 'running'
+      AND kind = ANY(p_kinds)
+      AND locked_at < v_expired
+      AND attempts >= max_attempts;
+
+    SELECT id INTO v_id
+    FROM public.background_jobs
+    WHERE kind = ANY(p_kinds)
+      AND (
+          (status = 'queued' AND run_after <= NOW())
+          OR (status = 'running' AND locked_at < v_expired)
+      )
+    ORDER BY run_after, created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF v_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    UPDATE public.background_jobs SET
+        status = 'running',
+        attempts = attempts + 1,
+        started_at = COALESCE(started_at, NOW()),
+        locked_by = p_worker,
+        locked_at = NOW()
+    WHERE id = v_id
+    RETURNING *;
+END;
+$$;
+
+-- Workers claim jobs of every user: backend service role only
+REVOKE EXECUTE ON FUNCTION claim_background_job FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION claim_background_job TO service_role;
+
+COMMENT ON FUNCTION claim_background_job IS
+    'Marks the next due queued (or lease-expired running) job of the given kinds running for p_worker and returns it.';
@@ -0,0 +1,167 @@
+-- =============================================================================
+-- MIGRATION: Incremental payroll recalculation
+-- =============================================================================
+-- Description: Recalculate only the payroll records whose inputs changed
+--   - payroll_records.inputs_hash stores the hash of the inputs a record was
+--     last calculated from; records whose hash still matches are skipped
+--   - apply_payroll_run_total_deltas() adds per-column changes to a run's
+--     totals instead of re-summing every record
+--   - payroll_records.calculated_net_pay stores the engine's net pay, which
+--     the run's total_net_pay sums, so a record's old contribution is known
+--   - apply_payroll_record_updates() stores inputs_hash, calculated_net_pay
+--     and the RRSP, union dues and garnishment deductions and, in the same
+--     transaction, adjusts the run totals by p_total_deltas or sets them to
+--     p_run_totals
+-- =============================================================================
+
+ALTER TABLE payroll_records ADD COLUMN IF NOT EXISTS inputs_hash TEXT;
+ALTER TABLE payroll_records ADD COLUMN IF NOT EXISTS calculated_net_pay NUMERIC(12, 2);
+
+COMMENT ON COLUMN payroll_records.inputs_hash IS
+    'SHA-256 of the calculation inputs the record was last calculated from (NULL = recalculate).';
+COMMENT ON COLUMN payroll_records.calculated_net_pay IS
+    'Net pay from the payroll engine, including taxable benefits and retroactive pay (NULL = calculated before this column).';
+
+-- =============================================================================
+-- apply_payroll_run_total_deltas
+-- =============================================================================
+-- Runs as the caller, so payroll_runs RLS still applies.
+
+CREATE OR REPLACE FUNCTION apply_payroll_run_total_deltas(
+    p_run_id UUID,
+    p_deltas JSONB
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+BEGIN
+    UPDATE public.payroll_runs SET
+        total_gross = total_gross + COALESCE((p_deltas->>'total_gross')::NUMERIC, 0),
+        total_cpp_employee = total_cpp_employee + COALESCE((p_deltas->>'total_cpp_employee')::NUMERIC, 0),
+        total_cpp_employer = total_cpp_employer + COALESCE((p_deltas->>'total_cpp_employer')::NUMERIC, 0),
+        total_ei_employee = total_ei_employee + COALESCE((p_deltas->>'total_ei_employee')::NUMERIC, 0),
+        total_ei_employer = total_ei_employer + COALESCE((p_deltas->>'total_ei_employer')::NUMERIC, 0),
+        total_federal_tax = total_federal_tax + COALESCE((p_deltas->>'total_federal_tax')::NUMERIC, 0),
+        total_provincial_tax = total_provincial_tax + COALESCE((p_deltas->>'total_provincial_tax')::NUMERIC, 0),
+        total_net_pay = total_net_pay + COALESCE((p_deltas->>'total_net_pay')::NUMERIC, 0),
+        total_employer_cost = total_employer_cost + COALESCE((p_deltas->>'total_employer_cost')::NUMERIC, 0)
+    WHERE id = p_run_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Payroll run % not found', p_run_id;
+    END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_payroll_run_total_deltas TO authenticated;
+
+COMMENT ON FUNCTION apply_payroll_run_total_deltas IS
+    'Adds the per-column changes of recalculated records to a payroll run''s totals.';
+
+-- =============================================================================
+-- apply_payroll_record_updates
+-- =============================================================================
+-- Same as before, plus inputs_hash, calculated_net_pay, rrsp, union_dues,
+-- garnishments and optional run totals: p_total_deltas for a recalculation of
+-- some records, p_run_totals (every total plus total_employees) for one of
+-- every record. Raises (rolling back every update) unless exactly
+-- p_expected_count records were updated.
+
+DROP FUNCTION IF EXISTS apply_payroll_record_updates(UUID, UUID, INTEGER);
+
+CREATE OR REPLACE FUNCTION apply_payroll_record_updates(
+    p_run_id UUID,
+    p_batch_id UUID,
+    p_expected_count INTEGER,
+    p_total_deltas JSONB DEFAULT NULL,
+    p_run_totals JSONB DEFAULT NULL
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = ''
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.payroll_records pr SET
+        gross_regular = r.gross_regular,
+        gross_overtime = r.gross_overtime,
+        holiday_pay = r.holiday_pay,
+        holiday_premium_pay = r.holiday_premium_pay,
+        vacation_pay_paid = r.vacation_pay_paid,
+        vacation_hours_taken = r.vacation_hours_taken,
+        sick_hours_taken = r.sick_hours_taken,
+        sick_pay_paid = r.sick_pay_paid,
+        other_earnings = r.other_earnings,
+        bonus_earnings = r.bonus_earnings,
+        cpp_employee = r.cpp_employee,
+        cpp_additional = r.cpp_additional,
+        ei_employee = r.ei_employee,
+        federal_tax = r.federal_tax,
+        provincial_tax = r.provincial_tax,
+        federal_tax_on_income = r.federal_tax_on_income,
+        provincial_tax_on_income = r.provincial_tax_on_income,
+        federal_tax_on_bonus = r.federal_tax_on_bonus,
+        provincial_tax_on_bonus = r.provincial_tax_on_bonus,
+        rrsp = r.rrsp,
+        union_dues = r.union_dues,
+        garnishments = r.garnishments,
+        other_deductions = r.other_deductions,
+        calculated_net_pay = r.calculated_net_pay,
+        cpp_employer = r.cpp_employer,
+        ei_employer = r.ei_employer,
+        ytd_gross = r.ytd_gross,
+        ytd_cpp = r.ytd_cpp,
+        ytd_ei = r.ytd_ei,
+        ytd_federal_tax = r.ytd_federal_tax,
+        ytd_provincial_tax = r.ytd_provincial_tax,
+        ytd_net_pay = r.ytd_net_pay,
+        vacation_accrued = r.vacation_accrued,
+        is_modified = r.is_modified,
+        regular_hours_worked = r.regular_hours_worked,
+        overtime_hours_worked = r.overtime_hours_worked,
+        inputs_hash = r.inputs_hash
+    FROM public.payroll_record_update_staging s
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::public.payroll_records, s.payload) r
+    WHERE s.batch_id = p_batch_id
+      AND s.payroll_run_id = p_run_id
+      AND pr.id = s.record_id
+      AND pr.payroll_run_id = p_run_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    IF v_updated <> p_expected_count THEN
+        RAISE EXCEPTION 'Payroll record batch % updated % of % records',
+            p_batch_id, v_updated, p_expected_count;
+    END IF;
+
+    IF p_total_deltas IS NOT NULL THEN
+        PERFORM public.apply_payroll_run_total_deltas(p_run_id, p_total_deltas);
+    END IF;
+
+    IF p_run_totals IS NOT NULL THEN
+        UPDATE public.payroll_runs SET
+            total_employees = (p_run_totals->>'total_employees')::INTEGER,
+            total_gross = (p_run_totals->>'total_gross')::NUMERIC,
+            total_cpp_employee = (p_run_totals->>'total_cpp_employee')::NUMERIC,
+            total_cpp_employer = (p_run_totals->>'total_cpp_employer')::NUMERIC,
+            total_ei_employee = (p_run_totals->>'total_ei_employee')::NUMERIC,
+            total_ei_employer = (p_run_totals->>'total_ei_employer')::NUMERIC,
+            total_federal_tax = (p_run_totals->>'total_federal_tax')::NUMERIC,
+            total_provincial_tax = (p_run_totals->>'total_provincial_tax')::NUMERIC,
+            total_net_pay = (p_run_totals->>'total_net_pay')::NUMERIC,
+            total_employer_cost = (p_run_totals->>'total_employer_cost')::NUMERIC
+        WHERE id = p_run_id;
+    END IF;
+
+    DELETE FROM public.payroll_record_update_staging WHERE batch_id = p_batch_id;
+
+    RETURN v_updated;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_payroll_record_updates TO authenticated;
+
+COMMENT ON FUNCTION apply_payroll_record_updates IS
+    'Atomically applies one staged batch of recalculated payroll_records values and, optionally, the run totals or their deltas.';
@@ -0,0 +1,13 @@
+-- =============================================================================
+-- MIGRATION: T4 XML submissions
+-- =============================================================================
+-- Description: Store every file of a T4 return split across submissions
+--   - t4_summaries.xml_storage_keys lists one storage key per submission, in
+--     slip order; xml_storage_key keeps the first (the only one if unsplit)
+-- =============================================================================
+
+ALTER TABLE t4_summaries
+    ADD COLUMN IF NOT EXISTS xml_storage_keys TEXT[] NOT NULL DEFAULT '{}';
+
+COMMENT ON COLUMN t4_summaries.xml_storage_keys IS
+    'Storage keys of the T619 XML submissions, in order (split at T4_XML_MAX_BYTES).';
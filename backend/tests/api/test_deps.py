@@ -91,7 +91,7 @@ class TestGetCurrentUser:
     @pytest.mark.asyncio
     async def test_raises_401_when_jwt_verification_fails(self):
         """Test that get_current_user raises 401 when JWT verification fails."""
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify:
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify:
             mock_verify.return_value = None
 
             with pytest.raises(HTTPException) as exc_info:
@@ -103,7 +103,7 @@ class TestGetCurrentUser:
     @pytest.mark.asyncio
     async def test_raises_401_when_no_sub_in_payload(self):
         """Test that get_current_user raises 401 when payload has no sub."""
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify:
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify:
             mock_verify.return_value = {"email": "test@example.com"}
 
             with pytest.raises(HTTPException) as exc_info:
@@ -124,7 +124,7 @@ class TestGetCurrentUser:
             },
         }
 
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify, \
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify, \
              patch("app.api.deps.SupabaseClient") as mock_client:
             mock_verify.return_value = payload
 
@@ -148,7 +148,7 @@ class TestGetCurrentUser:
             },
         }
 
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify, \
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify, \
              patch("app.api.deps.SupabaseClient"):
             mock_verify.return_value = payload
 
@@ -167,7 +167,7 @@ class TestGetCurrentUser:
             },
         }
 
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify, \
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify, \
              patch("app.api.deps.SupabaseClient"):
             mock_verify.return_value = payload
 
@@ -183,7 +183,7 @@ class TestGetCurrentUser:
             "email": "test@example.com",
         }
 
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify, \
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify, \
              patch("app.api.deps.SupabaseClient"):
             mock_verify.return_value = payload
 
@@ -213,7 +213,7 @@ class TestGetOptionalUser:
             "user_metadata": {},
         }
 
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify, \
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify, \
              patch("app.api.deps.SupabaseClient"):
             mock_verify.return_value = payload
 
@@ -225,7 +225,7 @@ class TestGetOptionalUser:
     @pytest.mark.asyncio
     async def test_returns_none_when_authentication_fails(self):
         """Test that get_optional_user returns None when authentication fails."""
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify:
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify:
             mock_verify.return_value = None
 
             result = await get_optional_user("Bearer invalid-token")
@@ -236,7 +236,7 @@ class TestGetOptionalUser:
     async def test_returns_none_for_invalid_format(self):
         """Test that get_optional_user returns None for invalid auth format."""
         # This will fail in extract_bearer_token, so get_current_user raises HTTPException
-        with patch("app.api.deps.verify_supabase_jwt") as mock_verify:
+        with patch("app.api.deps.verify_supabase_jwt_async") as mock_verify:
             mock_verify.return_value = None
 
             result = await get_optional_user("InvalidFormat")
@@ -0,0 +1,167 @@
+"""
+API tests for background job endpoints.
+
+Tests:
+- GET /api/v1/jobs/{job_id} (job status)
+- POST /api/v1/jobs/{job_id}/cancel (cancel job)
+- POST /api/v1/payroll/runs/{run_id}/approve/jobs (queue approval)
+- POST /api/v1/payroll/runs/{run_id}/recalculate/jobs (queue recalculation)
+- POST /api/v1/payroll/runs/{run_id}/send-paystubs/jobs (queue paystub emails)
+- POST /api/v1/t4/slips/{company_id}/{tax_year}/generate/jobs (queue T4 generation)
+"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.jobs import JobStatus
+from app.services.jobs.backends import InMemoryJobBackend
+from app.services.jobs.handlers import register_default_handlers
+from app.services.jobs.queue import JobQueue
+from tests.api.conftest import TEST_COMPANY_ID, TEST_USER_ID
+
+
+@pytest.fixture
+def job_queue():
+    """A queue without workers: submitted jobs stay queued."""
+    queue = JobQueue(InMemoryJobBackend())
+    register_default_handlers(queue)
+    with patch("app.api.v1.jobs.get_job_queue", return_value=queue), \
+         patch("app.api.v1.payroll._helpers.get_job_queue", return_value=queue), \
+         patch("app.api.v1.t4.get_job_queue", return_value=queue):
+        yield queue
+
+
+@pytest.fixture
+def company_id():
+    with patch(
+        "app.api.v1.payroll._helpers.get_user_company_id",
+        new_callable=AsyncMock,
+        return_value=TEST_COMPANY_ID,
+    ):
+        yield TEST_COMPANY_ID
+
+
+class TestGetJob:
+    """Tests for GET /api/v1/jobs/{job_id} endpoint."""
+
+    async def test_get_own_job(self, client: TestClient, job_queue: JobQueue):
+        job = await job_queue.submit("payroll.approve_run", TEST_USER_ID, TEST_COMPANY_ID)
+
+        response = client.get(f"/api/v1/jobs/{job.id}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == job.id
+        assert data["status"] == "queued"
+        assert "user_id" not in data
+
+    async def test_other_users_job_not_found(self, client: TestClient, job_queue: JobQueue):
+        job = await job_queue.submit("payroll.approve_run", "other-user", TEST_COMPANY_ID)
+
+        assert client.get(f"/api/v1/jobs/{job.id}").status_code == 404
+
+    def test_missing_job(self, client: TestClient, job_queue: JobQueue):
+        assert client.get("/api/v1/jobs/missing").status_code == 404
+
+
+class TestCancelJob:
+    """Tests for POST /api/v1/jobs/{job_id}/cancel endpoint."""
+
+    async def test_cancel_queued_job(self, client: TestClient, job_queue: JobQueue):
+        job = await job_queue.submit("payroll.approve_run", TEST_USER_ID, TEST_COMPANY_ID)
+
+        response = client.post(f"/api/v1/jobs/{job.id}/cancel")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelled"
+
+    async def test_cancel_finished_job_conflicts(self, client: TestClient, job_queue: JobQueue):
+        job = await job_queue.submit("payroll.approve_run", TEST_USER_ID, TEST_COMPANY_ID)
+        await job_queue.cancel(job.id)
+
+        assert client.post(f"/api/v1/jobs/{job.id}/cancel").status_code == 409
+
+
+class TestSubmitPayrollRunJobs:
+    """Tests for the payroll run job submission endpoints."""
+
+    @pytest.mark.parametrize(
+        ("path", "kind"),
+        [
+            ("approve/jobs", "payroll.approve_run"),
+            ("recalculate/jobs", "payroll.recalculate_run"),
+            ("send-paystubs/jobs", "payroll.send_paystubs"),
+        ],
+    )
+    def test_submit(self, client: TestClient, job_queue: JobQueue, company_id, path, kind):
+        run_id = str(uuid4())
+
+        response = client.post(f"/api/v1/payroll/runs/{run_id}/{path}")
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["kind"] == kind
+        assert data["company_id"] == company_id
+        assert data["params"] == {"run_id": run_id}
+        assert data["concurrency_key"] == f"payroll_run:{run_id}"
+
+    def test_idempotency_key_returns_same_job(
+        self, client: TestClient, job_queue: JobQueue, company_id
+    ):
+        run_id = str(uuid4())
+        headers = {"Idempotency-Key": "approve-once"}
+
+        first = client.post(f"/api/v1/payroll/runs/{run_id}/approve/jobs", headers=headers)
+        second = client.post(f"/api/v1/payroll/runs/{run_id}/approve/jobs", headers=headers)
+
+        assert second.json()["id"] == first.json()["id"]
+        assert second.json()["idempotency_key"] == "approve-once"
+
+    def test_one_active_job_per_run(self, client: TestClient, job_queue: JobQueue, company_id):
+        run_id = str(uuid4())
+
+        approve = client.post(f"/api/v1/payroll/runs/{run_id}/approve/jobs")
+        recalculate = client.post(f"/api/v1/payroll/runs/{run_id}/recalculate/jobs")
+
+        assert recalculate.json()["id"] == approve.json()["id"]
+        assert recalculate.json()["kind"] == "payroll.approve_run"
+
+
+class TestSubmitT4GenerationJob:
+    """Tests for POST /api/v1/t4/slips/{company_id}/{tax_year}/generate/jobs."""
+
+    def test_submit(self, client: TestClient, job_queue: JobQueue):
+        employee_id = str(uuid4())
+        company_id = str(uuid4())
+        with patch("app.api.v1.t4.get_supabase_client"), \
+             patch("app.api.v1.t4.T4AggregationService") as aggregation_cls:
+            aggregation_cls.return_value.get_company = AsyncMock(return_value=MagicMock())
+            response = client.post(
+                f"/api/v1/t4/slips/{company_id}/2025/generate/jobs",
+                json={"tax_year": 2025, "employee_ids": [employee_id], "regenerate": True},
+            )
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["kind"] == "t4.generate_slips"
+        assert data["status"] == JobStatus.QUEUED.value
+        assert data["params"] == {
+            "tax_year": 2025,
+            "employee_ids": [employee_id],
+            "regenerate": True,
+        }
+        assert data["concurrency_key"] == f"t4_generation:{company_id}:2025"
+
+    def test_company_not_found(self, client: TestClient, job_queue: JobQueue):
+        with patch("app.api.v1.t4.get_supabase_client"), \
+             patch("app.api.v1.t4.T4AggregationService") as aggregation_cls:
+            aggregation_cls.return_value.get_company = AsyncMock(return_value=None)
+            response = client.post(f"/api/v1/t4/slips/{uuid4()}/2025/generate/jobs")
+
+        assert response.status_code == 404
+        assert job_queue.stats()["submitted"] == 0
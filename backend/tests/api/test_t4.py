@@ -6,7 +6,9 @@ Tests for T4 slip generation, listing, downloading, and CRA submission endpoints
 
 from __future__ import annotations
 
+import xml.etree.ElementTree as ET
 from decimal import Decimal
+from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID, uuid4
@@ -18,8 +20,11 @@ from app.api.deps import get_current_user
 from app.core.supabase_client import get_supabase_client
 from app.main import app
 from app.models.auth import UserResponse
+from app.models.payroll import Province
 from app.models.t4 import (
+    T4SlipData,
     T4Status,
+    T4Summary,
     T4ValidationError,
     T4ValidationResult,
     T4ValidationWarning,
@@ -149,6 +154,60 @@ def sample_summary_data() -> dict[str, Any]:
     }
 
 
+def _slip(i: int) -> T4SlipData:
+    """A T4 slip for employee number i."""
+    return T4SlipData(
+        employee_id=uuid4(),
+        tax_year=TEST_TAX_YEAR,
+        sin=f"{100000000 + i}",
+        employee_first_name="John",
+        employee_last_name=f"Doe{i}",
+        employee_address_line1="123 Employee St",
+        employee_city="Toronto",
+        employee_province=Province.ON,
+        employee_postal_code="M4K 2A1",
+        employer_name="Test Company Inc.",
+        employer_account_number="123456789RP0001",
+        box_14_employment_income=Decimal("50000.00"),
+        box_16_cpp_contributions=Decimal("3800.00"),
+        box_18_ei_premiums=Decimal("1049.12"),
+        box_22_income_tax_deducted=Decimal("8500.00"),
+        box_24_ei_insurable_earnings=Decimal("50000.00"),
+        box_26_cpp_pensionable_earnings=Decimal("50000.00"),
+        province_of_employment=Province.ON,
+    )
+
+
+def _summary(slips: list[T4SlipData]) -> T4Summary:
+    """A T4 summary totalling the given slips."""
+    return T4Summary(
+        company_id=UUID(TEST_COMPANY_ID),
+        user_id=TEST_USER_ID,
+        tax_year=TEST_TAX_YEAR,
+        employer_name="Test Company Inc.",
+        employer_account_number="123456789RP0001",
+        employer_address_line1="456 Company Ave",
+        employer_city="Toronto",
+        employer_province=Province.ON,
+        employer_postal_code="M5V 1A1",
+        total_number_of_t4_slips=len(slips),
+        total_employment_income=sum((s.box_14_employment_income for s in slips), Decimal("0")),
+        total_cpp_contributions=sum((s.box_16_cpp_contributions for s in slips), Decimal("0")),
+        total_ei_premiums=sum((s.box_18_ei_premiums for s in slips), Decimal("0")),
+        total_income_tax_deducted=sum(
+            (s.box_22_income_tax_deducted for s in slips), Decimal("0")
+        ),
+        total_cpp_employer=sum((s.box_16_cpp_contributions for s in slips), Decimal("0")),
+        total_ei_employer=Decimal("14688.00"),
+    )
+
+
+async def _chunks(*chunks: bytes):
+    """Async byte stream standing in for a storage download."""
+    for chunk in chunks:
+        yield chunk
+
+
 # =============================================================================
 # List T4 Slips Tests
 # =============================================================================
@@ -578,6 +637,61 @@ class TestGenerateT4Summary:
         assert "No T4 slips found" in data["message"]
 
 
+    def test_generate_t4_summary_splits_xml_submissions(self, mock_get_current_user):
+        """Test a return over T4_XML_MAX_BYTES is stored as one object per submission."""
+        mock_supabase = MagicMock()
+        slips = [_slip(i) for i in range(10)]
+        summary = _summary(slips)
+
+        mock_company = MagicMock()
+        mock_company.company_name = "Test Company Inc."
+        mock_company.payroll_account_number = "123456789RP0001"
+
+        mock_agg = MagicMock()
+        mock_agg.get_company = AsyncMock(return_value=mock_company)
+        mock_agg.generate_all_t4_slips = AsyncMock(return_value=slips)
+        mock_agg.generate_t4_summary = AsyncMock(return_value=summary)
+
+        uploaded: list[tuple[bytes, int | None]] = []
+
+        async def save_t4_xml_file(path, company_name, tax_year, payroll_account, part):
+            uploaded.append((Path(path).read_bytes(), part))
+            return f"t4/xml/{tax_year}/T4_{payroll_account}_{tax_year}_{part}.xml"
+
+        mock_storage = MagicMock()
+        mock_storage.save_t4_summary = AsyncMock(return_value="t4/summary/2025.pdf")
+        mock_storage.save_t4_xml_file = AsyncMock(side_effect=save_t4_xml_file)
+
+        with patch("app.api.v1.t4.get_supabase_client", return_value=mock_supabase), \
+             patch("app.api.v1.t4.T4AggregationService", return_value=mock_agg), \
+             patch("app.api.v1.t4.T4PDFGenerator"), \
+             patch("app.api.v1.t4.get_t4_storage", return_value=mock_storage), \
+             patch("app.services.t4.xml_generator.get_config") as mock_config:
+
+            mock_config.return_value.t4_xml_max_bytes = 6000
+
+            app.dependency_overrides[get_current_user] = mock_get_current_user
+            client = TestClient(app)
+            response = client.post(f"/api/v1/t4/summary/{TEST_COMPANY_ID}/{TEST_TAX_YEAR}/generate")
+
+        app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert len(uploaded) > 1
+        assert [part for _, part in uploaded] == list(range(1, len(uploaded) + 1))
+        assert all(len(xml) <= 6000 for xml, _ in uploaded)
+        total_slips = sum(
+            len(ET.fromstring(xml).findall(".//{*}T4Slip")) for xml, _ in uploaded
+        )
+        assert total_slips == 10
+        keys = data["summary"]["xml_storage_keys"]
+        assert len(keys) == len(uploaded)
+        assert data["summary"]["xml_storage_key"] == keys[0]
+        mock_storage.save_t4_xml.assert_not_called()
+
+
 # =============================================================================
 # Download T4 Summary PDF Tests
 # =============================================================================
@@ -698,6 +812,45 @@ class TestDownloadT4Xml:
         assert "XML not available" in response.json()["detail"]
 
 
+    def test_download_xml_submission_part(self, mock_get_current_user):
+        """Test downloading one submission of a split return by part."""
+        mock_supabase = MagicMock()
+
+        mock_response = MagicMock()
+        mock_response.data = {
+            "xml_storage_key": "t4/xml/2025/T4_1.xml",
+            "xml_storage_keys": ["t4/xml/2025/T4_1.xml", "t4/xml/2025/T4_2.xml"],
+            "payroll_account_number": "123456789RP0001",
+        }
+
+        query_builder = MagicMock()
+        query_builder.select.return_value = query_builder
+        query_builder.eq.return_value = query_builder
+        query_builder.maybe_single.return_value = query_builder
+        query_builder.execute.return_value = mock_response
+
+        mock_supabase.table.return_value = query_builder
+
+        mock_storage = MagicMock()
+        mock_storage.get_file_content = AsyncMock(return_value=b"<Return/>")
+
+        app.dependency_overrides[get_current_user] = mock_get_current_user
+
+        with patch("app.api.v1.t4.get_supabase_client", return_value=mock_supabase), \
+             patch("app.api.v1.t4.get_t4_storage", return_value=mock_storage):
+            client = TestClient(app)
+            url = f"/api/v1/t4/summary/{TEST_COMPANY_ID}/{TEST_TAX_YEAR}/download-xml"
+            response = client.get(url, params={"part": 2})
+            missing = client.get(url, params={"part": 3})
+
+        app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        mock_storage.get_file_content.assert_awaited_once_with("t4/xml/2025/T4_2.xml")
+        assert f"T4_123456789RP0001_{TEST_TAX_YEAR}_2.xml" in response.headers["content-disposition"]
+        assert missing.status_code == 404
+
+
 # =============================================================================
 # Validate T4 XML Tests
 # =============================================================================
@@ -777,7 +930,7 @@ class TestValidateT4Xml:
         mock_supabase.table.return_value = query_builder
 
         mock_storage = MagicMock()
-        mock_storage.get_file_content = AsyncMock(return_value=b"<xml>test</xml>")
+        mock_storage.iter_file_content.return_value = _chunks(b"<xml>test</xml>")
 
         mock_validation_result = T4ValidationResult(
             is_valid=True,
@@ -792,7 +945,7 @@ class TestValidateT4Xml:
              patch("app.api.v1.t4.T4XMLValidator") as mock_validator_cls:
 
             mock_validator = MagicMock()
-            mock_validator.validate.return_value = mock_validation_result
+            mock_validator.validate_async = AsyncMock(return_value=mock_validation_result)
             mock_validator_cls.return_value = mock_validator
 
             client = TestClient(app)
@@ -804,6 +957,29 @@ class TestValidateT4Xml:
         data = response.json()
         assert data["success"] is True
         assert data["validation"]["is_valid"] is True
+        mock_storage.iter_file_content.assert_called_once_with("t4/xml/2025/test.xml")
+
+    def test_validate_uploaded_xml(self, mock_get_current_user):
+        """Test validating an XML file sent as the request body."""
+        mock_supabase = MagicMock()
+
+        app.dependency_overrides[get_current_user] = mock_get_current_user
+
+        with patch("app.api.v1.t4.get_supabase_client", return_value=mock_supabase):
+            client = TestClient(app)
+            response = client.post(
+                f"/api/v1/t4/summary/{TEST_COMPANY_ID}/{TEST_TAX_YEAR}/validate",
+                content=b"<Return><Transmitter></Transmitter></Return>",
+                headers={"Content-Type": "application/xml"},
+            )
+
+        app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["validation"]["is_valid"] is False
+        assert data["message"] == "Validation failed with errors"
+        mock_supabase.table.assert_not_called()
 
 
 # =============================================================================
@@ -1082,12 +1258,15 @@ class TestGenerateT4SlipsSuccess:
 
             # Mock existing slip check - returns existing slip
             mock_existing_response = MagicMock()
-            mock_existing_response.data = [{"id": TEST_SLIP_ID}]
+            mock_existing_response.data = [
+                {"employee_id": TEST_EMPLOYEE_ID, "pdf_generated_at": "2026-01-10T12:00:00+00:00"}
+            ]
 
             query_builder = MagicMock()
             query_builder.select.return_value = query_builder
             query_builder.eq.return_value = query_builder
-            query_builder.limit.return_value = query_builder
+            query_builder.order.return_value = query_builder
+            query_builder.range.return_value = query_builder
             query_builder.execute.return_value = mock_existing_response
             mock_supabase.table.return_value = query_builder
 
@@ -1142,16 +1321,20 @@ class TestGenerateT4SlipsSuccess:
 
             # Mock existing slip check - returns existing slip
             mock_existing_response = MagicMock()
-            mock_existing_response.data = [{"id": TEST_SLIP_ID}]
+            mock_existing_response.data = [
+                {"employee_id": TEST_EMPLOYEE_ID, "pdf_generated_at": "2026-01-10T12:00:00+00:00"}
+            ]
 
-            # Mock update response
+            # Mock upsert response
             query_builder = MagicMock()
             query_builder.select.return_value = query_builder
             query_builder.eq.return_value = query_builder
-            query_builder.limit.return_value = query_builder
+            query_builder.order.return_value = query_builder
+            query_builder.range.return_value = query_builder
             query_builder.execute.return_value = mock_existing_response
 
             update_builder = MagicMock()
+            update_builder.upsert.return_value = update_builder
             update_builder.execute.return_value = MagicMock(data=[{"id": TEST_SLIP_ID}])
 
             call_count = [0]
@@ -1163,7 +1346,7 @@ class TestGenerateT4SlipsSuccess:
                     call_count[0] += 1
                     return query_builder
                 else:
-                    # Second call is to update
+                    # Second call is to upsert
                     return update_builder
 
             mock_supabase.table.side_effect = table_side_effect
@@ -1181,6 +1364,9 @@ class TestGenerateT4SlipsSuccess:
         data = response.json()
         assert data["slips_generated"] == 1
         assert data["slips_skipped"] == 0
+        rows = update_builder.upsert.call_args.args[0]
+        assert [row["employee_id"] for row in rows] == [TEST_EMPLOYEE_ID]
+        assert rows[0]["status"] == "generated"
 
 
 class TestDownloadT4SlipStoragePath:
@@ -1392,8 +1578,12 @@ class TestValidateT4XmlStorageError:
 
         mock_supabase.table.return_value = query_builder
 
+        async def failing_download(_storage_key):
+            raise Exception("Storage error")
+            yield b""
+
         mock_storage = MagicMock()
-        mock_storage.get_file_content = AsyncMock(side_effect=Exception("Storage error"))
+        mock_storage.iter_file_content.side_effect = failing_download
 
         app.dependency_overrides[get_current_user] = mock_get_current_user
 
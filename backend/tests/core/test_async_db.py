@@ -0,0 +1,119 @@
+"""
+Tests for async database access helpers.
+
+Tests that queries run off the event loop, that the thread pool bounds
+how many are in flight, and that request context is carried over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core import async_db
+from app.core.async_db import execute, run_blocking, shutdown_db_executor
+
+_request_user: ContextVar[str | None] = ContextVar("_request_user", default=None)
+
+
+@pytest.fixture
+def db_pool():
+    """Fresh database pool with 2 workers."""
+    shutdown_db_executor()
+    with patch("app.core.async_db.get_config") as mock_config:
+        mock_config.return_value = MagicMock(db_max_concurrency=2)
+        yield
+    shutdown_db_executor()
+
+
+class _SlowQuery:
+    """Query builder whose execute() blocks like an HTTP round-trip."""
+
+    def __init__(self, seconds: float, tracker: dict | None = None):
+        self.seconds = seconds
+        self.tracker = tracker
+        self.thread_name: str | None = None
+
+    def execute(self):
+        self.thread_name = threading.current_thread().name
+        if self.tracker is not None:
+            with self.tracker["lock"]:
+                self.tracker["active"] += 1
+                self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        time.sleep(self.seconds)
+        if self.tracker is not None:
+            with self.tracker["lock"]:
+                self.tracker["active"] -= 1
+        return MagicMock(data=[{"id": "run-1"}])
+
+
+class TestExecute:
+    """Tests for execute() and run_blocking()."""
+
+    async def test_returns_query_response(self, db_pool):
+        query = _SlowQuery(0)
+
+        result = await execute(query)
+
+        assert result.data == [{"id": "run-1"}]
+        assert query.thread_name.startswith("db")
+
+    async def test_event_loop_keeps_running_during_query(self, db_pool):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await execute(_SlowQuery(0.1))
+        task.cancel()
+
+        assert ticks >= 5
+
+    async def test_concurrency_bounded_by_pool_size(self, db_pool):
+        tracker = {"lock": threading.Lock(), "active": 0, "peak": 0}
+
+        await asyncio.gather(*(execute(_SlowQuery(0.02, tracker)) for _ in range(8)))
+
+        assert tracker["peak"] == 2
+
+    async def test_propagates_exceptions(self, db_pool):
+        query = MagicMock()
+        query.execute.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(RuntimeError, match="connection reset"):
+            await execute(query)
+
+    async def test_run_blocking_sees_context_variables(self, db_pool):
+        _request_user.set("user-123")
+
+        seen = await run_blocking(_request_user.get)
+
+        assert seen == "user-123"
+
+    async def test_run_blocking_passes_arguments(self, db_pool):
+        def add(a, b, *, scale=1):
+            return (a + b) * scale
+
+        assert await run_blocking(add, 2, 3, scale=10) == 50
+
+
+class TestDbExecutor:
+    """Tests for the shared thread pool lifecycle."""
+
+    def test_pool_is_shared(self, db_pool):
+        assert async_db.get_db_executor() is async_db.get_db_executor()
+
+    def test_shutdown_creates_new_pool_on_next_use(self, db_pool):
+        first = async_db.get_db_executor()
+        shutdown_db_executor()
+
+        assert async_db.get_db_executor() is not first
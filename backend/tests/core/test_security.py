@@ -4,17 +4,26 @@ Tests for security module.
 
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import JWTError, jwk, jwt
 
 from app.core.security import (
     SecurityManager,
     decrypt_sin,
+    decrypt_sins,
     encrypt_sin,
+    encrypt_sins,
     mask_sin,
     verify_supabase_jwt,
+    verify_supabase_jwt_async,
 )
 
 
@@ -24,6 +33,7 @@ class TestSecurityManager:
     def setup_method(self):
         """Reset SecurityManager state before each test."""
         SecurityManager._fernet = None
+        SecurityManager.clear_token_cache()
 
     def test_get_fernet_returns_none_when_no_key(self):
         """Test that get_fernet returns None when encryption key is not configured."""
@@ -160,6 +170,392 @@ class TestSecurityManager:
             assert result is None
 
 
+class TestJwksCache:
+    """Tests for stale-while-revalidate, single-flight JWKS fetching."""
+
+    JWKS = {"keys": [{"kid": "key-1", "kty": "EC"}]}
+
+    def setup_method(self):
+        SecurityManager._jwks_cache = None
+        SecurityManager._jwks_cache_time = 0
+        SecurityManager._jwks_last_attempt = 0
+
+    def teardown_method(self):
+        self.setup_method()
+
+    @staticmethod
+    def _slow_get(calls: list, seconds: float = 0.05, jwks: dict | None = None):
+        def get(url, timeout):
+            calls.append(url)
+            time.sleep(seconds)
+            response = MagicMock()
+            response.json.return_value = jwks or TestJwksCache.JWKS
+            return response
+        return get
+
+    def test_cold_cache_fetches_once_for_concurrent_callers(self):
+        calls: list = []
+        results: list = []
+        with patch("app.core.security.httpx.get", side_effect=self._slow_get(calls)):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(SecurityManager.get_jwks("https://x"))
+                )
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+        assert calls == ["https://x/auth/v1/.well-known/jwks.json"]
+        assert results == [{"keys": []}] * 8
+        assert SecurityManager.get_jwks("https://x") == self.JWKS
+
+    def test_cold_cache_does_not_wait_for_fetch(self):
+        calls: list = []
+        with patch(
+            "app.core.security.httpx.get", side_effect=self._slow_get(calls, seconds=0.5)
+        ):
+            started = time.perf_counter()
+            assert SecurityManager.get_jwks("https://x") == {"keys": []}
+            assert SecurityManager._find_jwks_key("https://x", "key-1") is None
+            assert time.perf_counter() - started < 0.1
+
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+        assert SecurityManager._find_jwks_key("https://x", "key-1") == self.JWKS["keys"][0]
+
+    def test_fresh_cache_does_not_fetch(self):
+        SecurityManager._jwks_cache = self.JWKS
+        SecurityManager._jwks_cache_time = time.time()
+
+        with patch("app.core.security.httpx.get") as mock_get:
+            assert SecurityManager.get_jwks("https://x") == self.JWKS
+
+        mock_get.assert_not_called()
+
+    def test_stale_cache_returned_while_refreshing_in_background(self):
+        SecurityManager._jwks_cache = self.JWKS
+        SecurityManager._jwks_cache_time = time.time() - SecurityManager.JWKS_CACHE_TTL - 1
+        rotated = {"keys": [{"kid": "key-2", "kty": "EC"}]}
+        calls: list = []
+
+        with patch(
+            "app.core.security.httpx.get",
+            side_effect=self._slow_get(calls, seconds=0.1, jwks=rotated),
+        ):
+            started = time.perf_counter()
+            assert SecurityManager.get_jwks("https://x") == self.JWKS
+            assert SecurityManager.get_jwks("https://x") == self.JWKS
+            assert time.perf_counter() - started < 0.05
+
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+        assert len(calls) == 1
+        assert SecurityManager.get_jwks("https://x") == rotated
+
+    def test_fetch_failure_keeps_expired_cache(self):
+        SecurityManager._jwks_cache = self.JWKS
+        SecurityManager._jwks_cache_time = 0
+
+        with patch("app.core.security.httpx.get", side_effect=Exception("timeout")):
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+        assert SecurityManager.get_jwks("https://x") == self.JWKS
+
+    def test_fetch_failure_with_empty_cache_returns_no_keys(self):
+        with patch("app.core.security.httpx.get", side_effect=Exception("timeout")):
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+            assert SecurityManager.get_jwks("https://x") == {"keys": []}
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+    def test_unknown_kid_refreshes_in_background_once(self):
+        SecurityManager._jwks_cache = self.JWKS
+        SecurityManager._jwks_cache_time = time.time()
+        rotated = {"keys": [{"kid": "key-2", "kty": "EC"}]}
+        calls: list = []
+
+        with patch(
+            "app.core.security.httpx.get",
+            side_effect=self._slow_get(calls, seconds=0.5, jwks=rotated),
+        ):
+            started = time.perf_counter()
+            # Rejected now rather than blocking the caller on the fetch
+            assert SecurityManager._find_jwks_key("https://x", "key-2") is None
+            assert time.perf_counter() - started < 0.1
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+            assert SecurityManager._find_jwks_key("https://x", "key-2") == rotated["keys"][0]
+            # Within JWKS_MIN_REFRESH_INTERVAL: no further fetch
+            assert SecurityManager._find_jwks_key("https://x", "key-3") is None
+
+        assert len(calls) == 1
+
+
+class TestJwksAsyncVerification:
+    """Tests for verify_supabase_jwt_async waiting for an uncached JWKS key."""
+
+    def setup_method(self):
+        SecurityManager._jwks_cache = None
+        SecurityManager._jwks_cache_time = 0
+        SecurityManager._jwks_last_attempt = 0
+        SecurityManager.clear_token_cache()
+
+    def teardown_method(self):
+        self.setup_method()
+
+    @staticmethod
+    def _es256(kid: str = "key-1") -> tuple[str, dict]:
+        """An ES256 token and the JWKS holding its public key."""
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        token = jwt.encode(
+            {"sub": "user-123", "aud": "authenticated", "exp": int(time.time()) + 3600},
+            private_pem,
+            algorithm="ES256",
+            headers={"kid": kid},
+        )
+        return token, {"keys": [{**jwk.construct(public_pem, "ES256").to_dict(), "kid": kid}]}
+
+    @pytest.mark.asyncio
+    async def test_first_token_before_warm_up_finishes(self):
+        token, jwks = self._es256()
+        calls: list = []
+        ticks: list = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        with patch("app.core.security.get_config", return_value=MagicMock(supabase_url="https://x")), \
+             patch(
+                 "app.core.security.httpx.get",
+                 side_effect=TestJwksCache._slow_get(calls, seconds=0.2, jwks=jwks),
+             ):
+            # The startup warm-up is still fetching when the first request arrives
+            SecurityManager.refresh_jwks_in_background("https://x")
+            payload, _ = await asyncio.gather(
+                verify_supabase_jwt_async(token), ticker()
+            )
+
+        assert payload is not None
+        assert payload["sub"] == "user-123"
+        assert len(calls) == 1
+        # The event loop kept running while the request waited for the fetch
+        assert len(ticks) == 5
+
+    @pytest.mark.asyncio
+    async def test_wait_for_fetch_is_bounded(self):
+        token, jwks = self._es256()
+        calls: list = []
+
+        with patch("app.core.security.get_config", return_value=MagicMock(supabase_url="https://x")), \
+             patch(
+                 "app.core.security.httpx.get",
+                 side_effect=TestJwksCache._slow_get(calls, seconds=0.5, jwks=jwks),
+             ), \
+             patch.object(SecurityManager, "JWKS_WAIT_TIMEOUT", 0.05):
+            started = time.perf_counter()
+            assert await SecurityManager.verify_supabase_jwt_async(token) is None
+            assert time.perf_counter() - started < 0.3
+
+            SecurityManager.refresh_jwks_in_background("https://x").wait(1)
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_on_warm_cache_waits_for_refresh(self):
+        token, rotated = self._es256(kid="key-2")
+        SecurityManager._jwks_cache = TestJwksCache.JWKS
+        SecurityManager._jwks_cache_time = time.time()
+        calls: list = []
+
+        with patch("app.core.security.get_config", return_value=MagicMock(supabase_url="https://x")), \
+             patch(
+                 "app.core.security.httpx.get",
+                 side_effect=TestJwksCache._slow_get(calls, seconds=0.05, jwks=rotated),
+             ):
+            payload = await SecurityManager.verify_supabase_jwt_async(token)
+
+            assert payload["sub"] == "user-123"
+            # Within JWKS_MIN_REFRESH_INTERVAL another unknown kid is rejected at once
+            other, _ = self._es256(kid="key-3")
+            started = time.perf_counter()
+            assert await SecurityManager.verify_supabase_jwt_async(other) is None
+            assert time.perf_counter() - started < 0.05
+
+        assert len(calls) == 1
+
+
+class TestTokenCache:
+    """Tests for the verified-token claims cache."""
+
+    SECRET = "test-secret"
+
+    def setup_method(self):
+        SecurityManager.clear_token_cache()
+
+    def teardown_method(self):
+        SecurityManager.clear_token_cache()
+
+    def _token(self, sub: str = "user-123", exp_in: int = 3600) -> str:
+        claims = {"sub": sub, "aud": "authenticated", "exp": int(time.time()) + exp_in}
+        return jwt.encode(claims, self.SECRET, algorithm="HS256")
+
+    @pytest.fixture
+    def config(self):
+        with patch("app.core.security.get_config") as mock_config:
+            mock_config.return_value = MagicMock(supabase_jwt_secret=self.SECRET)
+            yield
+
+    def test_repeat_verification_served_from_cache(self, config):
+        token = self._token()
+
+        with patch("app.core.security.jwt.decode", wraps=jwt.decode) as mock_decode:
+            first = SecurityManager.verify_supabase_jwt(token)
+            second = SecurityManager.verify_supabase_jwt(token)
+
+        assert first == second
+        assert first["sub"] == "user-123"
+        assert mock_decode.call_count == 1
+        stats = SecurityManager.token_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_cached_claims_are_copies(self, config):
+        token = self._token()
+        SecurityManager.verify_supabase_jwt(token)["sub"] = "tampered"
+
+        assert SecurityManager.verify_supabase_jwt(token)["sub"] == "user-123"
+
+    def test_entry_expires_with_token(self, config):
+        token = self._token(exp_in=1)
+        SecurityManager.verify_supabase_jwt(token)
+
+        with patch("app.core.security.time.time", return_value=time.time() + 5), \
+             patch("app.core.security.jwt.decode", side_effect=JWTError("expired")):
+            assert SecurityManager.verify_supabase_jwt(token) is None
+
+        assert SecurityManager.token_cache_stats()["size"] == 0
+
+    def test_invalid_token_not_cached(self, config):
+        assert SecurityManager.verify_supabase_jwt("not-a-jwt") is None
+
+        assert SecurityManager.token_cache_stats()["size"] == 0
+
+    def test_cache_is_bounded(self, config):
+        with patch.object(SecurityManager, "TOKEN_CACHE_MAX_SIZE", 3):
+            tokens = [self._token(sub=f"user-{i}") for i in range(5)]
+            for token in tokens:
+                SecurityManager.verify_supabase_jwt(token)
+
+            assert SecurityManager.token_cache_stats()["size"] == 3
+            with patch("app.core.security.jwt.decode", wraps=jwt.decode) as mock_decode:
+                SecurityManager.verify_supabase_jwt(tokens[0])
+                SecurityManager.verify_supabase_jwt(tokens[4])
+
+            assert mock_decode.call_count == 1
+
+
+class TestBulkCrypto:
+    """Tests for bulk encryption, decryption and key rotation."""
+
+    def setup_method(self):
+        SecurityManager._fernet = None
+        SecurityManager._primary_fernet = None
+
+    def teardown_method(self):
+        self.setup_method()
+        SecurityManager.shutdown_crypto_executor()
+
+    @pytest.fixture
+    def keys(self):
+        return Fernet.generate_key().decode(), Fernet.generate_key().decode()
+
+    @staticmethod
+    def _configure(*keys: str, debug: bool = False):
+        SecurityManager._fernet = None
+        SecurityManager._primary_fernet = None
+        return patch(
+            "app.core.security.get_config",
+            return_value=MagicMock(
+                encryption_key=",".join(keys), debug=debug, crypto_max_workers=2
+            ),
+        )
+
+    def test_round_trip_preserves_order(self, keys):
+        sins = [f"{i:09d}" for i in range(50)]
+        with self._configure(keys[0]):
+            encrypted = encrypt_sins(sins)
+            assert decrypt_sins(encrypted) == sins
+
+    def test_large_lists_use_thread_pool(self, keys):
+        sins = [f"{i:09d}" for i in range(25)]
+        with self._configure(keys[0]), \
+             patch.object(SecurityManager, "BULK_PARALLEL_THRESHOLD", 10), \
+             patch.object(SecurityManager, "BULK_CHUNK_SIZE", 4):
+            encrypted = SecurityManager.encrypt_many(sins)
+            decrypted = SecurityManager.decrypt_many(encrypted)
+
+            assert SecurityManager._crypto_executor is not None
+        assert decrypted == sins
+
+    def test_failed_and_empty_values_are_none(self, keys):
+        with self._configure(keys[0]):
+            token = SecurityManager.encrypt("123456789")
+            assert SecurityManager.decrypt_many([token, "garbage", "", None]) == [
+                "123456789", None, None, None,
+            ]
+
+    def test_no_key_returns_none_for_each(self):
+        with patch("app.core.security.get_config") as mock_config:
+            mock_config.return_value = MagicMock(encryption_key=None)
+
+            assert SecurityManager.encrypt_many(["1", "2"]) == [None, None]
+            assert SecurityManager.decrypt_many(["1", "2"]) == [None, None]
+
+    def test_decrypt_sins_plain_text_fallback_in_debug(self, keys):
+        with self._configure(keys[0], debug=True):
+            assert decrypt_sins(["123-456-789", "nope", ""]) == ["123456789", None, None]
+
+    def test_multiple_keys_decrypt_old_and_encrypt_with_first(self, keys):
+        new_key, old_key = keys
+        with self._configure(old_key):
+            old_token = SecurityManager.encrypt("123456789")
+
+        with self._configure(new_key, old_key):
+            assert SecurityManager.decrypt(old_token) == "123456789"
+            new_token = SecurityManager.encrypt("987654321")
+
+        assert Fernet(new_key.encode()).decrypt(new_token.encode()) == b"987654321"
+
+    def test_rotate_many(self, keys):
+        new_key, old_key = keys
+        with self._configure(old_key):
+            old_token = SecurityManager.encrypt("123456789")
+        current = Fernet(new_key.encode()).encrypt(b"111111118").decode()
+        foreign = Fernet.generate_key()
+        unknown = Fernet(foreign).encrypt(b"000000000").decode()
+
+        with self._configure(new_key, old_key):
+            rotated, unchanged, failed = SecurityManager.rotate_many(
+                [old_token, current, unknown]
+            )
+
+        assert Fernet(new_key.encode()).decrypt(rotated.encode()) == b"123456789"
+        assert unchanged == current
+        assert failed is None
+
+
 class TestConvenienceFunctions:
     """Tests for convenience functions."""
 
@@ -1,13 +1,16 @@
 """
 Tests for Supabase client singleton and authentication helpers.
 
-Tests for client initialization, token management, and admin client access.
+Tests for client initialization, token management, admin client access,
+and the shared connection pool.
 """
 
 from __future__ import annotations
 
+import contextvars
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from supabase import Client
 
@@ -18,6 +21,15 @@ from app.core.supabase_client import (
 )
 
 
+@pytest.fixture(autouse=True)
+def shared_http_client():
+    """Provide a ready connection pool so tests mocking get_config don't build one."""
+    SupabaseClient.close_http_client()
+    SupabaseClient._http_client = httpx.Client()
+    yield
+    SupabaseClient.close_http_client()
+
+
 class TestSupabaseClient:
     """Tests for SupabaseClient singleton."""
 
@@ -269,3 +281,91 @@ class TestConvenienceFunctions:
             admin_client = get_supabase_admin_client()
 
             assert admin_client is None
+
+
+class TestConnectionPool:
+    """Tests for the connection pool shared by authenticated clients."""
+
+    @pytest.fixture
+    def pool_config(self):
+        SupabaseClient.close_http_client()
+        with patch("app.core.supabase_client.get_config") as mock_config:
+            mock_cfg = MagicMock()
+            mock_cfg.supabase_url = "https://test.supabase.co"
+            mock_cfg.supabase_key = "test-key"
+            mock_cfg.supabase_pool_max_connections = 7
+            mock_cfg.supabase_pool_max_keepalive = 3
+            mock_cfg.supabase_pool_keepalive_expiry = 12.5
+            mock_config.return_value = mock_cfg
+            yield mock_cfg
+
+    @pytest.fixture
+    def sent_requests(self, pool_config):
+        """Route the shared pool to an in-memory transport recording requests."""
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=[])
+
+        SupabaseClient.get_http_client()._transport = httpx.MockTransport(handler)
+        return requests
+
+    @staticmethod
+    def _client_for(token: str) -> Client:
+        def build() -> Client:
+            SupabaseClient.set_user_token(token)
+            return SupabaseClient.get_authenticated_client()
+
+        return contextvars.copy_context().run(build)
+
+    def test_pool_limits_from_config(self, pool_config):
+        pool = SupabaseClient.get_http_client()._transport._pool
+
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert pool._keepalive_expiry == 12.5
+
+    def test_authenticated_clients_share_pool(self, sent_requests):
+        client_a = self._client_for("token-a")
+        client_b = self._client_for("token-b")
+
+        assert client_a is not client_b
+        assert client_a.postgrest.session is SupabaseClient.get_http_client()
+        assert client_b.postgrest.session is SupabaseClient.get_http_client()
+
+    def test_each_request_carries_its_own_token(self, sent_requests):
+        client_a = self._client_for("token-a")
+        client_b = self._client_for("token-b")
+
+        client_a.table("employees").select("id").execute()
+        client_b.table("employees").select("id").execute()
+        client_a.table("employees").select("id").execute()
+
+        assert [r.headers["Authorization"] for r in sent_requests] == [
+            "Bearer token-a", "Bearer token-b", "Bearer token-a",
+        ]
+        assert "Authorization" not in SupabaseClient.get_http_client().headers
+
+    def test_pool_stats(self, sent_requests):
+        before = SupabaseClient.pool_stats()
+        client = self._client_for("token-a")
+        client.table("employees").select("id").execute()
+
+        stats = SupabaseClient.pool_stats()
+
+        assert stats["max_connections"] == 7
+        assert stats["max_keepalive_connections"] == 3
+        assert stats["requests"] == before["requests"] + 1
+        assert (
+            stats["authenticated_clients_created"]
+            == before["authenticated_clients_created"] + 1
+        )
+        assert {"open_connections", "idle_connections", "active_connections"} <= stats.keys()
+
+    def test_close_http_client_creates_new_pool_on_next_use(self, pool_config):
+        first = SupabaseClient.get_http_client()
+        SupabaseClient.close_http_client()
+
+        assert first.is_closed
+        assert SupabaseClient.get_http_client() is not first
@@ -0,0 +1,166 @@
+"""
+Tests for the NumPy columnar batch path (columnar_batch.py).
+
+Every comparison is field by field against PayrollEngine.calculate, which
+stays the reference implementation.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import fields
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.payroll import PayFrequency, Province
+from app.services.payroll.payroll_engine import (
+    EmployeePayrollInput,
+    PayrollCalculationResult,
+    PayrollEngine,
+)
+from tests.payroll.pdoc.conftest import FIXTURES_BASE_DIR, PDOCTestCase, build_payroll_input
+
+pytest.importorskip("numpy")
+
+from app.services.payroll import columnar_batch  # noqa: E402
+
+COMPARED_FIELDS = [
+    f.name for f in fields(PayrollCalculationResult) if f.name != "calculation_details"
+]
+
+
+def _fixture_inputs(year: int) -> list[EmployeePayrollInput]:
+    inputs = []
+    for path in sorted((FIXTURES_BASE_DIR / str(year)).rglob("*.json")):
+        with open(path) as f:
+            data = json.load(f)
+        for case in data.get("test_cases", []):
+            inputs.append(build_payroll_input(PDOCTestCase.from_dict(case)))
+    return inputs
+
+
+def _money(rng: random.Random, high: int) -> Decimal:
+    return Decimal(rng.randint(0, high * 100)).scaleb(-2)
+
+
+def _sometimes(rng: random.Random, chance: float, high: int) -> Decimal:
+    return _money(rng, high) if rng.random() < chance else Decimal("0")
+
+
+def _random_inputs(year: int, n: int, seed: int) -> list[EmployeePayrollInput]:
+    """Random inputs biased towards CPP/EI maximums and partial years."""
+    rng = random.Random(seed)
+    inputs = []
+    for i in range(n):
+        frequency = rng.choice(list(PayFrequency))
+        gross = _money(rng, rng.choice([500, 3000, 10000, 60000]))
+        ytd_pe = (gross * frequency.periods_per_year * Decimal(rng.random())).quantize(
+            Decimal("0.01")
+        )
+        inputs.append(
+            EmployeePayrollInput(
+                employee_id=f"emp-{i}",
+                province=rng.choice(list(Province)),
+                pay_frequency=frequency,
+                pay_date=date(year, rng.randint(1, 12), rng.randint(1, 28)),
+                gross_regular=gross,
+                gross_overtime=_sometimes(rng, 0.3, 500),
+                vacation_pay=_sometimes(rng, 0.2, 300),
+                taxable_benefits_pensionable=_sometimes(rng, 0.2, 100),
+                federal_claim_amount=_money(rng, 30000),
+                provincial_claim_amount=_money(rng, 30000),
+                rrsp_per_period=_sometimes(rng, 0.2, 300),
+                union_dues_per_period=_sometimes(rng, 0.2, 50),
+                ytd_pensionable_earnings=ytd_pe,
+                ytd_insurable_earnings=ytd_pe,
+                ytd_cpp_base=rng.choice(
+                    [Decimal("0"), _money(rng, 4500), Decimal("4034.10"), Decimal("4230.45")]
+                ),
+                ytd_cpp_additional=rng.choice([Decimal("0"), _money(rng, 450)]),
+                ytd_ei=rng.choice([Decimal("0"), _money(rng, 1200), Decimal("1077.48")]),
+                pensionable_months=rng.choice([None, 12, rng.randint(1, 12)]),
+                is_cpp_exempt=rng.random() < 0.05,
+                is_ei_exempt=rng.random() < 0.05,
+                cpp2_exempt=rng.random() < 0.05,
+            )
+        )
+    return inputs
+
+
+def _assert_identical(engine: PayrollEngine, inputs: list[EmployeePayrollInput]) -> None:
+    results = engine.calculate_batch(inputs, columnar=True)
+
+    assert len(results) == len(inputs)
+    for input_data, actual in zip(inputs, results, strict=True):
+        expected = engine.calculate(input_data)
+        for name in COMPARED_FIELDS:
+            assert getattr(actual, name) == getattr(expected, name), (
+                f"{input_data.employee_id}: {name}"
+            )
+
+
+class TestColumnarBatch:
+    """Columnar results must equal the Decimal path."""
+
+    @pytest.mark.parametrize("year", [2025, 2026])
+    def test_pdoc_fixtures_identical(self, year: int):
+        engine = PayrollEngine(year=year)
+        _assert_identical(engine, _fixture_inputs(year))
+
+    @pytest.mark.parametrize("year", [2025, 2026])
+    def test_random_inputs_identical(self, year: int):
+        engine = PayrollEngine(year=year)
+        _assert_identical(engine, _random_inputs(year, 2000, seed=year))
+
+    def test_preserves_order_and_routes_unsupported_rows(self):
+        engine = PayrollEngine(year=2025)
+        regular = EmployeePayrollInput(
+            employee_id="regular",
+            province=Province.ON,
+            pay_frequency=PayFrequency.BIWEEKLY,
+            pay_date=date(2025, 8, 15),
+            gross_regular=Decimal("2500.00"),
+        )
+        bonus = EmployeePayrollInput(
+            employee_id="bonus",
+            province=Province.BC,
+            pay_frequency=PayFrequency.BIWEEKLY,
+            pay_date=date(2025, 8, 15),
+            gross_regular=Decimal("2500.00"),
+            bonus_earnings=Decimal("5000.00"),
+        )
+        sub_cent = EmployeePayrollInput(
+            employee_id="sub_cent",
+            province=Province.ON,
+            pay_frequency=PayFrequency.BIWEEKLY,
+            pay_date=date(2025, 8, 15),
+            gross_regular=Decimal("2500.005"),
+        )
+
+        results = engine.calculate_batch([bonus, regular, sub_cent], columnar=True)
+
+        assert [r.employee_id for r in results] == ["bonus", "regular", "sub_cent"]
+        assert results[1].calculation_details["method"] == "columnar"
+        assert "method" not in results[0].calculation_details
+        assert "method" not in results[2].calculation_details
+        _assert_identical(engine, [bonus, regular, sub_cent])
+
+    def test_empty_batch(self):
+        assert PayrollEngine(year=2025).calculate_batch([], columnar=True) == []
+
+    def test_falls_back_without_numpy(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(columnar_batch, "NUMPY_AVAILABLE", False)
+        engine = PayrollEngine(year=2025)
+        input_data = EmployeePayrollInput(
+            employee_id="emp-1",
+            province=Province.ON,
+            pay_frequency=PayFrequency.BIWEEKLY,
+            gross_regular=Decimal("2500.00"),
+        )
+
+        [result] = engine.calculate_batch([input_data], columnar=True)
+
+        assert result.calculation_details["federal_tax"]["method"] == "annualization"
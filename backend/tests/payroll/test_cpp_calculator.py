@@ -511,3 +511,24 @@ class TestCPPCalculatorEmployerMethod:
         employer_cpp = self.calc.get_employer_contribution(employee_cpp=employee_cpp)
 
         assert employer_cpp == Decimal("4034.10")
+
+
+class TestCPPCalculatorPrecomputed:
+    """Test the per-frequency constants precomputed at construction."""
+
+    def test_half_cent_rounds_up(self):
+        """Test: 5.95% × $10.00 = 59.5 cents rounds up."""
+        calc = CPPCalculator(pay_periods_per_year=26, year=2025)
+        earnings = calc.exemption_per_period + Decimal("10.00")
+
+        assert calc.calculate_base_cpp(earnings) == Decimal("0.60")
+
+    def test_prorated_tables_match_formula(self):
+        """Test: Precomputed prorated maxima equal the per-call formula."""
+        calc = CPPCalculator(pay_periods_per_year=26, year=2025)
+
+        for months in range(1, 12):
+            assert calc.get_prorated_max(months) == calc.get_prorated_max(
+                months, calc.max_base_contribution
+            )
+            assert calc._prorated_ympe[months] == calc.ympe * Decimal(str(months)) / 12
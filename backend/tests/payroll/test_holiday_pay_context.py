@@ -0,0 +1,406 @@
+"""
+Tests for run-level holiday pay prefetch (HolidayPayContext).
+
+Tests:
+- Same results with and without the prefetched context, per formula
+- Query count independent of the number of employees
+- Falling back to per-employee queries outside the prefetched window
+- Falling back to per-employee queries when the prefetch fails
+- WorkDayTracker lookups answered from the timesheet index without queries
+- Per-employee digest of the prefetched rows
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.models.holiday_pay_config import HolidayPayConfig, HolidayPayFormulaParams
+from app.services.payroll_run.holiday_pay import HolidayPayCalculator, HolidayPayContext
+from app.services.payroll_run.holiday_pay.context import CONTEXT_PAGE_SIZE, HOLIDAY_LOOKBACK_DAYS
+from tests.payroll.conftest import (
+    MockConfigLoader,
+    make_ab_config,
+    make_bc_15_30_config,
+    make_on_config,
+    make_pe_config,
+    make_sk_config,
+)
+
+HOLIDAY = date(2025, 7, 1)
+PERIOD_START = date(2025, 6, 28)
+PERIOD_END = date(2025, 7, 11)
+CURRENT_RUN_ID = "run-current"
+
+
+def _value(row: dict[str, Any], column: str) -> Any:
+    if "." in column:
+        relation, field = column.split(".", 1)
+        return (row.get(relation) or {}).get(field)
+    return row.get(column)
+
+
+class FakeQuery:
+    """Chainable query applying filters, ordering and limits to in-memory rows."""
+
+    def __init__(self, db: FakeDatabase, table: str):
+        self.db = db
+        self.table = table
+        self.rows = list(db.tables.get(table, []))
+        self._range: tuple[int, int] | None = None
+        self._limit: int | None = None
+
+    def _filter(self, column: str, predicate: Any) -> FakeQuery:
+        self.rows = [r for r in self.rows if predicate(_value(r, column))]
+        return self
+
+    def select(self, *_: Any) -> FakeQuery:
+        return self
+
+    def eq(self, column: str, value: Any) -> FakeQuery:
+        return self._filter(column, lambda v: v == value)
+
+    def neq(self, column: str, value: Any) -> FakeQuery:
+        return self._filter(column, lambda v: v != value)
+
+    def in_(self, column: str, values: list[Any]) -> FakeQuery:
+        return self._filter(column, lambda v: v in values)
+
+    def gte(self, column: str, value: Any) -> FakeQuery:
+        return self._filter(column, lambda v: v is not None and v >= value)
+
+    def gt(self, column: str, value: Any) -> FakeQuery:
+        return self._filter(column, lambda v: v is not None and v > value)
+
+    def lte(self, column: str, value: Any) -> FakeQuery:
+        return self._filter(column, lambda v: v is not None and v <= value)
+
+    def lt(self, column: str, value: Any) -> FakeQuery:
+        return self._filter(column, lambda v: v is not None and v < value)
+
+    def order(self, column: str, desc: bool = False) -> FakeQuery:
+        self.rows.sort(key=lambda r: _value(r, column), reverse=desc)
+        return self
+
+    def limit(self, count: int) -> FakeQuery:
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int) -> FakeQuery:
+        self._range = (start, end)
+        return self
+
+    def execute(self) -> MagicMock:
+        self.db.queries.append(self.table)
+        rows = self.rows
+        if self._range is not None:
+            rows = rows[self._range[0] : self._range[1] + 1]
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return MagicMock(data=rows)
+
+
+class FakeDatabase:
+    """Supabase client stand-in recording the tables queried."""
+
+    def __init__(self, tables: dict[str, list[dict[str, Any]]]):
+        self.tables = tables
+        self.queries: list[str] = []
+        self.error: Exception | None = None
+
+    def table(self, name: str) -> FakeQuery:
+        if self.error:
+            raise self.error
+        return FakeQuery(self, name)
+
+
+def _employee(index: int, province: str) -> dict[str, Any]:
+    return {
+        "id": f"emp-{index:03d}",
+        "first_name": f"E{index}",
+        "last_name": "Test",
+        "hourly_rate": 20 + index,
+        "annual_salary": None,
+        "compensation_type": "hourly",
+        "hire_date": "2024-01-01",
+        "province_of_employment": province,
+    }
+
+
+def _history(employees: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Timesheets, payroll records and sick leave around HOLIDAY."""
+    timesheets: list[dict[str, Any]] = []
+    records: list[dict[str, Any]] = []
+    sick_leave: list[dict[str, Any]] = []
+
+    for n, emp in enumerate(employees):
+        emp_id = emp["id"]
+        day = HOLIDAY - timedelta(days=120)
+        while day <= HOLIDAY + timedelta(days=30):
+            offset = (day - HOLIDAY).days
+            if day.weekday() < 5 and day != HOLIDAY and (offset + n) % 11:
+                timesheets.append({
+                    "id": f"ts-{emp_id}-{day}",
+                    "employee_id": emp_id,
+                    "work_date": day.isoformat(),
+                    "regular_hours": str(8 - (offset + n) % 3),
+                    "overtime_hours": "1.5" if (offset + n) % 7 == 0 else "0",
+                })
+            if offset < 0 and (offset + n) % 17 == 0:
+                sick_leave.append({
+                    "id": f"sl-{emp_id}-{day}",
+                    "employee_id": emp_id,
+                    "usage_date": day.isoformat(),
+                    "is_paid": (offset + n) % 2 == 0,
+                    "sick_pay_amount": "150.00",
+                })
+            day += timedelta(days=1)
+
+        for period in range(8):
+            pay_date = HOLIDAY - timedelta(days=3 + 14 * period)
+            for run_id, status in ((f"run-{period}", "paid"), (f"draft-{period}", "draft")):
+                records.append({
+                    "id": f"rec-{emp_id}-{run_id}",
+                    "employee_id": emp_id,
+                    "payroll_run_id": run_id,
+                    "gross_regular": str(1600 + 10 * n + period),
+                    "gross_overtime": "45.00",
+                    "vacation_pay_paid": "64.00",
+                    "holiday_pay": "160.00" if period == 3 else "0",
+                    "commission_pay": "250.00",
+                    "payroll_runs": {"id": run_id, "pay_date": pay_date.isoformat(), "status": status},
+                })
+        records.append({
+            "id": f"rec-{emp_id}-current",
+            "employee_id": emp_id,
+            "payroll_run_id": CURRENT_RUN_ID,
+            "gross_regular": "9999.00",
+            "gross_overtime": "0",
+            "vacation_pay_paid": "0",
+            "holiday_pay": "0",
+            "commission_pay": "0",
+            "payroll_runs": {"id": CURRENT_RUN_ID, "pay_date": HOLIDAY.isoformat(), "status": "approved"},
+        })
+
+    return {
+        "timesheet_entries": timesheets,
+        "payroll_records": records,
+        "sick_leave_usage_history": sick_leave,
+    }
+
+
+def _make_config(province: str, formula_type: str, **params: Any) -> HolidayPayConfig:
+    config = make_on_config()
+    config.province_code = province
+    config.formula_type = formula_type
+    config.formula_params = HolidayPayFormulaParams(new_employee_fallback="pro_rated", **params)
+    return config
+
+
+CONFIGS = {
+    "BC": make_bc_15_30_config(),
+    "ON": make_on_config(),
+    "AB": make_ab_config(),
+    "SK": make_sk_config(),
+    "PE": make_pe_config(),
+    "NL": _make_config("NL", "3_week_average_nl", lookback_weeks_nl=3, divisor=15),
+    "YT": _make_config(
+        "YT", "irregular_hours", percentage=Decimal("0.10"), irregular_hours_lookback_weeks=2
+    ),
+    "QC": _make_config("QC", "commission", divisor=60, commission_lookback_weeks=12),
+}
+
+
+def _calculator(db: FakeDatabase, configs: dict[str, HolidayPayConfig] | None = None):
+    return HolidayPayCalculator(
+        supabase=db,
+        user_id="test-user-id",
+        company_id="test-company-id",
+        config_loader=MockConfigLoader(configs or CONFIGS),
+    )
+
+
+def _calculate(calculator: HolidayPayCalculator, employee: dict[str, Any]):
+    province = employee["province_of_employment"]
+    return calculator.calculate_holiday_pay(
+        employee=employee,
+        province=province,
+        pay_frequency="bi_weekly",
+        period_start=PERIOD_START,
+        period_end=PERIOD_END,
+        holidays_in_period=[
+            {"holiday_date": HOLIDAY.isoformat(), "name": "Canada Day", "province": province}
+        ],
+        holiday_work_entries=[],
+        current_period_gross=Decimal("1800"),
+        current_run_id=CURRENT_RUN_ID,
+    )
+
+
+def _holidays() -> list[dict[str, Any]]:
+    return [{"holiday_date": HOLIDAY.isoformat(), "name": "Canada Day", "province": p} for p in CONFIGS]
+
+
+class TestHolidayPayContextResults:
+    """Prefetched lookups must reproduce the per-employee queries."""
+
+    @pytest.mark.parametrize("province", sorted(CONFIGS))
+    def test_matches_per_employee_queries(self, province):
+        employees = [_employee(i, province) for i in range(4)]
+        db = FakeDatabase(_history(employees))
+
+        expected = [_calculate(_calculator(db), emp) for emp in employees]
+
+        calculator = _calculator(db)
+        assert calculator.prefetch([e["id"] for e in employees], _holidays()) is not None
+        actual = [_calculate(calculator, emp) for emp in employees]
+
+        assert actual == expected
+        assert any(result.regular_holiday_pay > 0 for result in expected)
+
+    def test_excludes_current_and_incomplete_runs(self):
+        [employee] = [_employee(0, "ON")]
+        db = FakeDatabase(_history([employee]))
+
+        context = HolidayPayContext.load(db, [employee["id"]], [HOLIDAY])
+        records = context.payroll_records(
+            employee["id"], HOLIDAY - timedelta(days=28), HOLIDAY, CURRENT_RUN_ID
+        )
+
+        assert records
+        assert {r["payroll_runs"]["status"] for r in records} == {"paid"}
+
+    def test_lookups_outside_window_return_none(self):
+        db = FakeDatabase(_history([_employee(0, "ON")]))
+
+        context = HolidayPayContext.load(db, ["emp-000"], [HOLIDAY])
+
+        before_window = HOLIDAY - timedelta(days=HOLIDAY_LOOKBACK_DAYS + 1)
+        assert context.timesheet_entries("emp-000", before_window, HOLIDAY) is None
+        assert context.sick_leave("emp-999", HOLIDAY, HOLIDAY, is_paid=True) is None
+        assert context.timesheet_entries("emp-000", HOLIDAY, HOLIDAY) == []
+
+    def test_employee_digest_tracks_holiday_inputs(self):
+        tables = _history([_employee(0, "ON"), _employee(1, "ON")])
+
+        def digests() -> tuple[str, str]:
+            context = HolidayPayContext.load(FakeDatabase(tables), ["emp-000", "emp-001"], [HOLIDAY])
+            return context.employee_digest("emp-000"), context.employee_digest("emp-001")
+
+        baseline = digests()
+        assert digests() == baseline
+
+        week_before = (HOLIDAY - timedelta(days=7)).isoformat()
+        entry = next(
+            e for e in tables["timesheet_entries"]
+            if e["employee_id"] == "emp-000" and e["work_date"] >= week_before
+        )
+        entry["regular_hours"] = "7.25"
+        edited = digests()
+        assert edited[0] != baseline[0]
+        assert edited[1] == baseline[1]
+
+        tables["sick_leave_usage_history"].append({
+            "id": "sl-new",
+            "employee_id": "emp-000",
+            "usage_date": (HOLIDAY - timedelta(days=30)).isoformat(),
+            "is_paid": True,
+            "sick_pay_amount": "150.00",
+        })
+        assert digests()[0] != edited[0]
+
+class TestHolidayPayContextQueries:
+    """Query counts with the run-level prefetch."""
+
+    @pytest.mark.parametrize("employee_count", [1, 10, 50])
+    def test_query_count_independent_of_employees(self, employee_count):
+        employees = [
+            _employee(i, sorted(CONFIGS)[i % len(CONFIGS)]) for i in range(employee_count)
+        ]
+        db = FakeDatabase(_history(employees))
+        calculator = _calculator(db)
+
+        calculator.prefetch([e["id"] for e in employees], _holidays())
+        prefetch_queries = list(db.queries)
+        for emp in employees:
+            _calculate(calculator, emp)
+
+        # One query per table, plus one per extra page of timesheet rows
+        timesheet_rows = employee_count * 100
+        assert set(prefetch_queries) == {
+            "payroll_records", "sick_leave_usage_history", "timesheet_entries",
+        }
+        assert len(prefetch_queries) <= 3 + timesheet_rows // CONTEXT_PAGE_SIZE
+        assert db.queries == prefetch_queries
+
+    def test_queries_outside_prefetched_window(self):
+        configs = {"QC": _make_config("QC", "commission", divisor=60, commission_lookback_weeks=20)}
+        employee = _employee(0, "QC")
+        db = FakeDatabase(_history([employee]))
+        calculator = _calculator(db, configs)
+
+        calculator.prefetch([employee["id"]], _holidays())
+        db.queries.clear()
+        result = _calculate(calculator, employee)
+
+        assert db.queries == ["payroll_records"]
+        assert result == _calculate(_calculator(FakeDatabase(db.tables), configs), employee)
+
+    def test_prefetch_failure_queries_per_employee(self):
+        employee = _employee(0, "ON")
+        db = FakeDatabase(_history([employee]))
+        calculator = _calculator(db)
+
+        db.error = RuntimeError("connection reset")
+        assert calculator.prefetch([employee["id"]], _holidays()) is None
+        db.error = None
+
+        assert calculator.formula_calculators.context is None
+        assert _calculate(calculator, employee) == _calculate(_calculator(db), employee)
+        assert db.queries
+
+    def test_no_holidays_skips_prefetch(self):
+        db = FakeDatabase({})
+        calculator = _calculator(db)
+
+        assert calculator.prefetch(["emp-000"], []) is None
+        assert db.queries == []
+
+
+class TestWorkDayTrackerWithContext:
+    """WorkDayTracker answers from the context's timesheet index."""
+
+    @pytest.mark.parametrize("index", range(3))
+    def test_matches_per_employee_queries(self, index):
+        employee = _employee(index, "AB")
+        db = FakeDatabase(_history([employee]))
+        expected_tracker = _calculator(db).work_day_tracker
+        tracker = _calculator(db).work_day_tracker
+        tracker.context = HolidayPayContext.load(db, [employee["id"]], [HOLIDAY])
+        db.queries.clear()
+
+        for method, args in (
+            ("find_nearest_work_day", (employee["id"], HOLIDAY, "before", 28)),
+            ("find_nearest_work_day", (employee["id"], HOLIDAY, "after", 28)),
+            ("get_days_worked_in_4_weeks", (employee["id"], HOLIDAY)),
+            ("count_work_days_for_eligibility", (employee["id"], HOLIDAY - timedelta(days=60), HOLIDAY)),
+            ("is_regular_work_day_5_of_9", (employee["id"], HOLIDAY, date(2024, 1, 1))),
+        ):
+            actual = getattr(tracker, method)(*args)
+            assert db.queries == [], method
+            assert actual == getattr(expected_tracker, method)(*args), method
+            db.queries.clear()
+
+        entries = tracker.get_timesheet_entries_for_eligibility(
+            employee["id"], HOLIDAY - timedelta(days=30), HOLIDAY + timedelta(days=28)
+        )
+        start, end = HOLIDAY - timedelta(days=30), HOLIDAY - timedelta(days=1)
+        assert tracker.count_days_worked_in_period(
+            entries, start, end, employee_id=employee["id"]
+        ) == expected_tracker.count_days_worked_in_period(
+            entries, start, end, employee_id=employee["id"]
+        )
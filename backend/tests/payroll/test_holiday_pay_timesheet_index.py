@@ -0,0 +1,136 @@
+"""
+Tests for TimesheetIndex.
+
+Tests:
+- Days worked, hours and weekday counts match a scan of the entries
+- Nearest scheduled work day before/after a date
+- Days with entries but no hours, and days with several entries
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.services.payroll_run.holiday_pay.timesheet_index import TimesheetIndex
+
+START = date(2025, 3, 1)
+
+
+def _entry(day: date, regular: str, overtime: str = "0") -> dict:
+    return {"work_date": day.isoformat(), "regular_hours": regular, "overtime_hours": overtime}
+
+
+def _random_entries(seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    entries = []
+    for offset in range(120):
+        for _ in range(rng.choice([0, 0, 1, 1, 1, 2])):
+            entries.append(_entry(
+                START + timedelta(days=offset),
+                rng.choice(["0", "4", "7.5", "8"]),
+                rng.choice(["0", "0", "1.25"]),
+            ))
+    rng.shuffle(entries)
+    return entries
+
+
+def _scan_worked_days(entries: list[dict], start: date, end: date) -> set[date]:
+    hours: dict[date, Decimal] = {}
+    for e in entries:
+        day = date.fromisoformat(e["work_date"])
+        if start <= day <= end:
+            hours[day] = hours.get(day, Decimal("0")) + Decimal(e["regular_hours"]) + Decimal(
+                e["overtime_hours"]
+            )
+    return {day for day, total in hours.items() if total > 0}
+
+
+class TestTimesheetIndexRanges:
+    """Range answers against a brute-force scan."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_scan(self, seed):
+        entries = _random_entries(seed)
+        index = TimesheetIndex(entries)
+        rng = random.Random(seed)
+
+        for _ in range(50):
+            start = START + timedelta(days=rng.randint(-10, 120))
+            end = start + timedelta(days=rng.randint(0, 60))
+            worked = _scan_worked_days(entries, start, end)
+            in_range = [
+                e for e in entries if start <= date.fromisoformat(e["work_date"]) <= end
+            ]
+
+            assert index.days_worked(start, end) == len(worked)
+            assert index.has_work(start, end) == bool(worked)
+            assert index.hours(start, end) == (
+                sum((Decimal(e["regular_hours"]) for e in in_range), Decimal("0")),
+                sum((Decimal(e["overtime_hours"]) for e in in_range), Decimal("0")),
+            )
+            assert [e["work_date"] for e in index.entries(start, end)] == sorted(
+                e["work_date"] for e in in_range
+            )
+            for weekday in range(7):
+                assert index.days_worked_on_weekday(weekday, start, end) == sum(
+                    1 for day in worked if day.weekday() == weekday
+                )
+
+    def test_empty_index(self):
+        index = TimesheetIndex([])
+
+        assert index.days_worked(START, START + timedelta(days=30)) == 0
+        assert index.hours(START, START) == (Decimal("0"), Decimal("0"))
+        assert index.worked_on(START) is None
+        assert index.nearest_work_day(START, "before", 28) is None
+
+    def test_days_with_several_entries_count_once(self):
+        index = TimesheetIndex([
+            _entry(START, "0"),
+            _entry(START, "4", "1"),
+            _entry(START + timedelta(days=1), "0"),
+        ])
+
+        assert index.days_worked(START, START + timedelta(days=1)) == 1
+        assert index.hours(START, START + timedelta(days=1)) == (Decimal("4"), Decimal("1"))
+        assert index.worked_on(START) is True
+        assert index.worked_on(START + timedelta(days=1)) is False
+
+    def test_skips_entries_without_valid_date(self):
+        index = TimesheetIndex([{"work_date": None, "regular_hours": "8"}, _entry(START, "8")])
+
+        assert index.days_worked(START, START) == 1
+
+
+class TestTimesheetIndexNearestWorkDay:
+    """Nearest scheduled work day before/after a holiday."""
+
+    holiday = date(2025, 7, 1)
+
+    def test_nearest_before_and_after(self):
+        index = TimesheetIndex([
+            _entry(self.holiday - timedelta(days=5), "8"),
+            _entry(self.holiday - timedelta(days=2), "8"),
+            _entry(self.holiday + timedelta(days=3), "8"),
+            _entry(self.holiday + timedelta(days=6), "8"),
+        ])
+
+        assert index.nearest_work_day(self.holiday, "before", 28) == self.holiday - timedelta(days=2)
+        assert index.nearest_work_day(self.holiday, "after", 28) == self.holiday + timedelta(days=3)
+
+    def test_nearest_scheduled_day_not_worked(self):
+        index = TimesheetIndex([
+            _entry(self.holiday - timedelta(days=3), "8"),
+            _entry(self.holiday - timedelta(days=1), "0"),
+        ])
+
+        assert index.nearest_work_day(self.holiday, "before", 28) is None
+
+    def test_outside_search_window(self):
+        index = TimesheetIndex([_entry(self.holiday + timedelta(days=10), "8")])
+
+        assert index.nearest_work_day(self.holiday, "after", 7) is None
+        assert index.nearest_work_day(self.holiday, "after", 10) == self.holiday + timedelta(days=10)
+        assert index.nearest_work_day(self.holiday, "before", 28) is None
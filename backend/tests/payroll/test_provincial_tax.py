@@ -11,6 +11,7 @@ Special features tested:
 - Manitoba/Nova Scotia/Yukon: Dynamic BPA
 """
 
+import dataclasses
 from decimal import Decimal
 
 import pytest
@@ -862,25 +863,19 @@ class TestOntarioHealthPremiumEmptyBrackets:
         """Test: Ontario health premium returns 0 when brackets config is empty (line 397)."""
         calc = ProvincialTaxCalculator("ON", 26, 2025)
 
-        # Create a calculator with modified config (empty brackets)
-        # This tests the edge case where brackets list is empty
-        original_config = calc._config.copy()
-        try:
-            # Simulate empty brackets by clearing the health_premium_config
-            calc._config["health_premium_config"] = {}
-
-            result = calc.calculate_provincial_tax(
-                annual_taxable_income=Decimal("100000"),
-                total_claim_amount=Decimal("12747"),
-                cpp_per_period=Decimal("140"),
-                ei_per_period=Decimal("40"),
-            )
+        # Swap in a compiled table whose health premium brackets are empty.
+        # Calculators read the compiled snapshot, not the raw config dict.
+        calc.table = dataclasses.replace(calc.table, health_premium_brackets=())
 
-            # Should return 0 when brackets are empty
-            assert result.health_premium_v2 == Decimal("0")
-        finally:
-            # Restore original config
-            calc._config = original_config
+        result = calc.calculate_provincial_tax(
+            annual_taxable_income=Decimal("100000"),
+            total_claim_amount=Decimal("12747"),
+            cpp_per_period=Decimal("140"),
+            ei_per_period=Decimal("40"),
+        )
+
+        # Should return 0 when brackets are empty
+        assert result.health_premium_v2 == Decimal("0")
 
 
 class TestNonOntarioSurtaxDirectMethodCalls:
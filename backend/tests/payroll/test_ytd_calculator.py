@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from app.services.payroll_run import ytd_calculator as ytd_calculator_module
 from app.services.payroll_run.ytd_calculator import YtdCalculator
 
 
@@ -28,7 +29,8 @@ class TestYtdCalculatorInitialYtd:
         return YtdCalculator(
             supabase=mock_supabase,
             user_id="test-user",
-            company_id="test-company"
+            company_id="test-company",
+            use_ledger=False,
         )
 
     def test_get_initial_ytd_for_employees_empty_list(self, calculator):
@@ -491,7 +493,8 @@ class TestYtdCalculatorGetYtdRecords:
         return YtdCalculator(
             supabase=mock_supabase,
             user_id="test-user",
-            company_id="test-company"
+            company_id="test-company",
+            use_ledger=False,
         )
 
     @pytest.mark.asyncio
@@ -596,6 +599,122 @@ class TestYtdCalculatorGetYtdRecords:
         assert str(result[0].payroll_run_id) == TEST_RUN_ID
 
 
+def _prior_record(employee_id: str, record_id: str) -> dict:
+    """Minimal payroll_records row from a prior completed run."""
+    return {
+        "id": record_id,
+        "employee_id": employee_id,
+        "payroll_run_id": TEST_RUN_ID,
+        "gross_regular": "2000.00",
+        "cpp_employee": "115.00",
+        "ei_employee": "32.80",
+        "federal_tax": "200.00",
+        "provincial_tax": "100.00",
+        "net_pay": "1552.20",
+        "payroll_runs": {"id": TEST_RUN_ID, "pay_date": "2025-06-15", "status": "paid"},
+    }
+
+
+class RecordingPayrollRecordsQuery:
+    """Chainable payroll_records query that serves rows and counts requests."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.executed = 0
+        self._employee_ids: list[str] = []
+        self._range = (0, len(rows))
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def in_(self, field, values):
+        if field == "employee_id":
+            self._employee_ids = values
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def execute(self):
+        self.executed += 1
+        matching = [r for r in self.rows if r["employee_id"] in self._employee_ids]
+        start, end = self._range
+        return MagicMock(data=matching[start : end + 1])
+
+
+class TestYtdCalculatorGetYtdRecordsBulk:
+    """Tests for get_ytd_records_for_employees method"""
+
+    @staticmethod
+    def _calculator(rows: list[dict]) -> tuple[YtdCalculator, RecordingPayrollRecordsQuery]:
+        query = RecordingPayrollRecordsQuery(rows)
+        supabase = MagicMock()
+        supabase.table.return_value = query
+        return YtdCalculator(supabase, user_id="test-user", company_id="test-company"), query
+
+    @staticmethod
+    def _employee_ids(count: int) -> list[str]:
+        return [f"00000000-0000-0000-0000-{i:012d}" for i in range(count)]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("employee_count", [1, 10, 150])
+    async def test_query_count_independent_of_employee_count(self, employee_count):
+        """One query regardless of how many employees are in the run"""
+        employee_ids = self._employee_ids(employee_count)
+        rows = [
+            _prior_record(emp_id, f"11111111-1111-1111-{i:04d}-{j:012d}")
+            for i, emp_id in enumerate(employee_ids)
+            for j in range(2)
+        ]
+        calculator, query = self._calculator(rows)
+
+        result = await calculator.get_ytd_records_for_employees(employee_ids, 2025, "run-current")
+
+        assert query.executed == 1
+        assert set(result) == set(employee_ids)
+        assert all(len(records) == 2 for records in result.values())
+        assert str(result[employee_ids[-1]][0].employee_id) == employee_ids[-1]
+
+    @pytest.mark.asyncio
+    async def test_employees_without_records_get_empty_list(self):
+        """Every requested employee has an entry"""
+        employee_ids = self._employee_ids(2)
+        calculator, _ = self._calculator([_prior_record(employee_ids[0], TEST_RECORD_ID)])
+
+        result = await calculator.get_ytd_records_for_employees(employee_ids, 2025, "run-current")
+
+        assert len(result[employee_ids[0]]) == 1
+        assert result[employee_ids[1]] == []
+
+    @pytest.mark.asyncio
+    async def test_chunks_employee_ids_and_pages_rows(self, monkeypatch):
+        """Large runs split into ID chunks, and full pages are followed"""
+        monkeypatch.setattr(ytd_calculator_module, "YTD_EMPLOYEE_CHUNK_SIZE", 2)
+        monkeypatch.setattr(ytd_calculator_module, "YTD_PAGE_SIZE", 3)
+        employee_ids = self._employee_ids(3)
+        rows = [
+            _prior_record(emp_id, f"11111111-1111-1111-{i:04d}-{j:012d}")
+            for i, emp_id in enumerate(employee_ids)
+            for j in range(2)
+        ]
+        calculator, query = self._calculator(rows)
+
+        result = await calculator.get_ytd_records_for_employees(employee_ids, 2025, "run-current")
+
+        # Chunk 1: 4 rows -> pages of 3 and 1; chunk 2: 2 rows -> 1 page
+        assert query.executed == 3
+        assert all(len(records) == 2 for records in result.values())
+
+    @pytest.mark.asyncio
+    async def test_empty_employee_list(self):
+        """No query for an empty employee list"""
+        calculator, query = self._calculator([])
+
+        assert await calculator.get_ytd_records_for_employees([], 2025, "run-current") == {}
+        assert query.executed == 0
+
+
 class TestYtdCalculatorYearEndScenarios:
     """Tests for year-end scenarios where pay_date and period_end are in different years.
 
@@ -614,7 +733,8 @@ class TestYtdCalculatorYearEndScenarios:
         return YtdCalculator(
             supabase=mock_supabase,
             user_id="test-user",
-            company_id="test-company"
+            company_id="test-company",
+            use_ledger=False,
         )
 
     @pytest.mark.asyncio
@@ -703,7 +823,8 @@ class TestYtdCalculatorEdgeCases:
         return YtdCalculator(
             supabase=mock_supabase,
             user_id="test-user",
-            company_id="test-company"
+            company_id="test-company",
+            use_ledger=False,
         )
 
     def test_get_prior_ytd_skips_unknown_employee_records(self, calculator, mock_supabase):
@@ -757,3 +878,25 @@ class TestYtdCalculatorEdgeCases:
         # Should only return data for emp-1 (empty in this case)
         assert "emp-1" in result
         assert "emp-unknown" not in result
+
+
+class TestYtdCalculatorPriorRunVersions:
+    """Tests for get_prior_run_versions"""
+
+    def test_lists_completed_runs_of_the_year(self):
+        """Test the query filters to the company's other completed runs in the year"""
+        mock_supabase = MagicMock()
+        query = mock_supabase.table.return_value.select.return_value
+        for method in ("eq", "in_", "gte", "lte", "neq", "order"):
+            getattr(query, method).return_value = query
+        versions = [{"id": "run-1", "status": "paid", "updated_at": "2025-06-16T10:00:00"}]
+        query.execute.return_value = MagicMock(data=versions)
+        calculator = YtdCalculator(mock_supabase, "test-user", "test-company", use_ledger=False)
+
+        assert calculator.get_prior_run_versions(TEST_RUN_ID, year=2025) == versions
+
+        mock_supabase.table.assert_called_once_with("payroll_runs")
+        query.in_.assert_called_once_with("status", ["approved", "paid"])
+        query.gte.assert_called_once_with("pay_date", "2025-01-01")
+        query.lte.assert_called_once_with("pay_date", "2025-12-31")
+        query.neq.assert_called_once_with("id", TEST_RUN_ID)
@@ -0,0 +1 @@
+"""Tests for background job services."""
@@ -0,0 +1,167 @@
+"""
+Tests for Job Queue Backends
+
+The Supabase backend's queries against a mocked client: inserts and key
+conflicts, claiming via RPC, saves, lease renewal and cancellation.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.models.jobs import Job, JobStatus
+from app.services.jobs.backends import InMemoryJobBackend, SupabaseJobBackend
+
+TEST_USER_ID = "test-user-id-12345"
+NOW = datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _job(**overrides) -> Job:
+    fields = {
+        "id": "job-1",
+        "kind": "payroll.approve_run",
+        "user_id": TEST_USER_ID,
+        "params": {"run_id": "run-1"},
+        "run_after": NOW,
+        "created_at": NOW,
+    }
+    fields.update(overrides)
+    return Job(**fields)
+
+
+def _row(job: Job, **overrides) -> dict:
+    return {**job.model_dump(mode="json"), "user_id": job.user_id, **overrides}
+
+
+@pytest.fixture
+def supabase():
+    client = MagicMock()
+    query = client.table.return_value
+    for method in ("insert", "update", "select", "eq", "in_", "limit", "maybe_single"):
+        getattr(query, method).return_value = query
+    return client
+
+
+class TestSupabaseJobBackend:
+    """Tests for SupabaseJobBackend."""
+
+    async def test_create_inserts_row_with_user_id(self, supabase):
+        job = _job()
+        supabase.table.return_value.execute.return_value = MagicMock(data=[_row(job)])
+
+        stored, created = await SupabaseJobBackend(supabase).create(job)
+
+        assert created is True
+        assert stored.id == job.id
+        row = supabase.table.return_value.insert.call_args.args[0]
+        assert row["user_id"] == TEST_USER_ID
+        assert row["status"] == "queued"
+        supabase.table.assert_called_with("background_jobs")
+
+    async def test_create_returns_existing_job_on_key_conflict(self, supabase):
+        job = _job(id="job-2", idempotency_key="key-1")
+        existing = _job(idempotency_key="key-1", status=JobStatus.RUNNING)
+        query = supabase.table.return_value
+        query.execute.side_effect = [
+            APIError({"code": "23505", "message": "duplicate key"}),
+            MagicMock(data=[_row(existing)]),
+        ]
+
+        stored, created = await SupabaseJobBackend(supabase).create(job)
+
+        assert created is False
+        assert stored.id == "job-1"
+        assert stored.status == JobStatus.RUNNING
+        query.eq.assert_any_call("idempotency_key", "key-1")
+
+    async def test_create_reraises_other_errors(self, supabase):
+        supabase.table.return_value.execute.side_effect = APIError(
+            {"code": "42501", "message": "permission denied"}
+        )
+
+        with pytest.raises(APIError):
+            await SupabaseJobBackend(supabase).create(_job())
+
+    async def test_claim_calls_rpc(self, supabase):
+        job = _job(status=JobStatus.RUNNING, attempts=1)
+        supabase.rpc.return_value.execute.return_value = MagicMock(data=[_row(job)])
+
+        claimed = await SupabaseJobBackend(supabase).claim(["payroll.approve_run"], "worker-1", 300)
+
+        assert claimed.status == JobStatus.RUNNING
+        supabase.rpc.assert_called_once_with(
+            "claim_background_job",
+            {"p_kinds": ["payroll.approve_run"], "p_worker": "worker-1", "p_lease_seconds": 300},
+        )
+
+    async def test_claim_nothing_due(self, supabase):
+        supabase.rpc.return_value.execute.return_value = MagicMock(data=[])
+
+        assert await SupabaseJobBackend(supabase).claim(["x"], "worker-1", 300) is None
+
+    async def test_save_releases_lock_when_finished(self, supabase):
+        supabase.table.return_value.execute.return_value = MagicMock(data=[])
+        job = _job(status=JobStatus.SUCCEEDED, result={"sent": 3}, finished_at=NOW)
+
+        await SupabaseJobBackend(supabase).save(job)
+
+        row = supabase.table.return_value.update.call_args.args[0]
+        assert row["status"] == "succeeded"
+        assert row["result"] == {"sent": 3}
+        assert row["locked_by"] is None
+        assert "cancel_requested" not in row
+
+    async def test_touch_reports_cancel_request(self, supabase):
+        supabase.table.return_value.execute.return_value = MagicMock(
+            data=[{"id": "job-1", "cancel_requested": True}]
+        )
+
+        assert await SupabaseJobBackend(supabase).touch("job-1", "worker-1") is True
+        supabase.table.return_value.eq.assert_any_call("locked_by", "worker-1")
+
+    async def test_request_cancel(self, supabase):
+        cancelled = _job(status=JobStatus.CANCELLED)
+        supabase.table.return_value.execute.side_effect = [
+            MagicMock(data=[]),
+            MagicMock(data=[]),
+            MagicMock(data=_row(cancelled)),
+        ]
+
+        job = await SupabaseJobBackend(supabase).request_cancel("job-1")
+
+        assert job.status == JobStatus.CANCELLED
+        updates = [c.args[0] for c in supabase.table.return_value.update.call_args_list]
+        assert updates[0]["status"] == "cancelled"
+        assert updates[1] == {"cancel_requested": True}
+
+
+class TestInMemoryJobBackend:
+    """Tests for InMemoryJobBackend."""
+
+    async def test_claims_due_jobs_in_order(self):
+        backend = InMemoryJobBackend()
+        later = _job(id="later", created_at=NOW.replace(minute=5))
+        earlier = _job(id="earlier")
+        await backend.create(later)
+        await backend.create(earlier)
+
+        first = await backend.claim(["payroll.approve_run"], "w", 300)
+        second = await backend.claim(["payroll.approve_run"], "w", 300)
+
+        assert [first.id, second.id] == ["earlier", "later"]
+        assert first.attempts == 1
+        assert await backend.claim(["payroll.approve_run"], "w", 300) is None
+
+    async def test_prunes_oldest_finished_jobs(self):
+        backend = InMemoryJobBackend(max_finished=2)
+        for i in range(3):
+            await backend.create(
+                _job(id=f"done-{i}", status=JobStatus.SUCCEEDED, finished_at=NOW.replace(minute=i))
+            )
+
+        assert await backend.get("done-0") is None
+        assert await backend.get("done-2") is not None
@@ -0,0 +1,143 @@
+"""
+Tests for Background Job Handlers
+
+Each handler calls its service with the job's user, company and params.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.models.jobs import Job
+from app.services.jobs import handlers
+from app.services.jobs.backends import InMemoryJobBackend
+from app.services.jobs.queue import JobContext
+
+TEST_USER_ID = "test-user-id-12345"
+TEST_COMPANY_ID = str(uuid4())
+TEST_RUN_ID = str(uuid4())
+MODULE = "app.services.jobs.handlers"
+NOW = datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _context(kind: str, params: dict, attempts: int = 1) -> JobContext:
+    job = Job(
+        id="job-1",
+        kind=kind,
+        user_id=TEST_USER_ID,
+        company_id=TEST_COMPANY_ID,
+        params=params,
+        attempts=attempts,
+        run_after=NOW,
+        created_at=NOW,
+        started_at=NOW,
+    )
+    return JobContext(job, InMemoryJobBackend())
+
+
+@pytest.fixture
+def run_service():
+    service = MagicMock()
+    service.recalculate_run = AsyncMock(return_value={"id": TEST_RUN_ID, "status": "draft"})
+    service.approve_run = AsyncMock(return_value={"id": TEST_RUN_ID, "status": "approved"})
+    service.send_paystubs = AsyncMock(return_value={"sent": 4})
+    with patch(f"{MODULE}.get_payroll_run_service", return_value=service) as factory:
+        yield service, factory
+
+
+class TestPayrollRunHandlers:
+    """Tests for the payroll run handlers."""
+
+    async def test_approve_run(self, run_service):
+        service, factory = run_service
+
+        result = await handlers.approve_run(
+            _context(handlers.APPROVE_RUN, {"run_id": TEST_RUN_ID})
+        )
+
+        assert result["status"] == "approved"
+        factory.assert_called_once_with(TEST_USER_ID, TEST_COMPANY_ID)
+        service.approve_run.assert_awaited_once()
+        assert str(service.approve_run.call_args.args[0]) == TEST_RUN_ID
+        assert service.approve_run.call_args.kwargs == {"approved_by": TEST_USER_ID}
+
+    async def test_recalculate_run(self, run_service):
+        service, _ = run_service
+
+        await handlers.recalculate_run(_context(handlers.RECALCULATE_RUN, {"run_id": TEST_RUN_ID}))
+
+        assert str(service.recalculate_run.call_args.args[0]) == TEST_RUN_ID
+
+    async def test_send_paystubs(self, run_service):
+        result = await handlers.send_paystubs(
+            _context(handlers.SEND_PAYSTUBS, {"run_id": TEST_RUN_ID})
+        )
+
+        assert result == {"sent": 4}
+
+    def test_send_paystubs_not_retried(self):
+        queue = MagicMock()
+        handlers.register_default_handlers(queue)
+
+        attempts = {c.args[0]: c.kwargs["max_attempts"] for c in queue.register.call_args_list}
+        assert attempts[handlers.SEND_PAYSTUBS] == 1
+        assert attempts[handlers.APPROVE_RUN] > 1
+
+
+class TestGenerateT4Slips:
+    """Tests for the T4 generation handler."""
+
+    @pytest.fixture
+    def t4(self):
+        company = MagicMock(company_name="Test Company")
+        with patch(f"{MODULE}.get_supabase_client"), \
+             patch(f"{MODULE}.get_t4_storage", side_effect=Exception("No storage")), \
+             patch(f"{MODULE}.T4AggregationService") as aggregation_cls, \
+             patch(f"{MODULE}.T4SlipGenerationService") as service_cls:
+            aggregation_cls.return_value.get_company = AsyncMock(return_value=company)
+            service = service_cls.return_value
+            progress = MagicMock()
+            progress.model_dump.return_value = {"saved": 2}
+            service.new_progress.return_value = progress
+            service.generate = AsyncMock(return_value=progress)
+            yield aggregation_cls, service, company
+
+    async def test_generates_with_params(self, t4):
+        _, service, company = t4
+        employee_id = str(uuid4())
+
+        result = await handlers.generate_t4_slips(_context(
+            handlers.GENERATE_T4_SLIPS,
+            {"tax_year": 2025, "employee_ids": [employee_id], "regenerate": True},
+        ))
+
+        assert result == {"saved": 2}
+        args = service.generate.call_args.args
+        assert args[0] is company
+        assert args[1] == 2025
+        assert [str(e) for e in args[2]] == [employee_id]
+        assert args[3] is True
+        assert args[4] is None
+
+    async def test_retried_regeneration_resumes(self, t4):
+        _, service, _ = t4
+
+        await handlers.generate_t4_slips(_context(
+            handlers.GENERATE_T4_SLIPS, {"tax_year": 2025, "regenerate": True}, attempts=2
+        ))
+
+        assert service.generate.call_args.args[4] == NOW
+
+    async def test_missing_company_fails(self, t4):
+        aggregation_cls, service, _ = t4
+        aggregation_cls.return_value.get_company = AsyncMock(return_value=None)
+
+        with pytest.raises(ValueError, match="Company not found"):
+            await handlers.generate_t4_slips(
+                _context(handlers.GENERATE_T4_SLIPS, {"tax_year": 2025})
+            )
+        service.generate.assert_not_called()
@@ -0,0 +1,402 @@
+"""
+Tests for the Background Job Queue
+
+Runs the queue's workers against the in-memory backend: completion,
+idempotency and concurrency keys, retry with backoff, cancellation,
+progress and shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from jose import jwt
+
+from app.core import supabase_client as supabase_client_module
+from app.core.exceptions import ConfigurationError
+from app.models.jobs import Job, JobStatus
+from app.services.jobs import queue as queue_module
+from app.services.jobs.backends import InMemoryJobBackend
+from app.services.jobs.queue import JobContext, JobQueue
+
+TEST_USER_ID = "test-user-id-12345"
+TEST_COMPANY_ID = "test-company-id"
+
+
+def _jwt(expires_in: float | None) -> str:
+    """A user JWT expiring expires_in seconds from now (no exp claim if None)."""
+    claims: dict[str, Any] = {"sub": TEST_USER_ID, "aud": "authenticated"}
+    if expires_in is not None:
+        claims["exp"] = int(time.time() + expires_in)
+    return jwt.encode(claims, "test-jwt-secret", algorithm="HS256")
+
+
+@pytest.fixture
+async def queue():
+    job_queue = JobQueue(
+        InMemoryJobBackend(),
+        workers=2,
+        poll_interval=0.01,
+        retry_base_delay=0.01,
+        retry_max_delay=0.05,
+    )
+    yield job_queue
+    await job_queue.stop()
+
+
+async def _wait_finished(queue: JobQueue, job_id: str, timeout: float = 2.0) -> Job:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get(job_id)
+        assert job is not None
+        if job.status.is_finished:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"job still {job.status}"
+        await asyncio.sleep(0.01)
+
+
+class TestSubmitAndRun:
+    """Tests for running submitted jobs."""
+
+    async def test_job_succeeds_with_result(self, queue: JobQueue):
+        seen: list[dict[str, Any]] = []
+
+        async def handler(ctx: JobContext) -> dict[str, Any]:
+            seen.append(ctx.params)
+            return {"doubled": ctx.params["n"] * 2}
+
+        queue.register("test.double", handler)
+        await queue.start()
+        job = await queue.submit("test.double", TEST_USER_ID, TEST_COMPANY_ID, {"n": 21})
+
+        assert job.status == JobStatus.QUEUED
+        finished = await _wait_finished(queue, job.id)
+        assert finished.status == JobStatus.SUCCEEDED
+        assert finished.result == {"doubled": 42}
+        assert finished.attempts == 1
+        assert finished.started_at is not None and finished.finished_at is not None
+        assert seen == [{"n": 21}]
+        assert queue.stats()["succeeded"] == 1
+
+    async def test_unknown_kind_rejected(self, queue: JobQueue):
+        with pytest.raises(ValueError, match="Unknown job kind"):
+            await queue.submit("test.missing", TEST_USER_ID)
+
+    async def test_jobs_wait_until_started(self, queue: JobQueue):
+        async def handler(ctx: JobContext) -> None:
+            return None
+
+        queue.register("test.noop", handler)
+        job = await queue.submit("test.noop", TEST_USER_ID)
+        await asyncio.sleep(0.05)
+        assert (await queue.get(job.id)).status == JobStatus.QUEUED
+
+        await queue.start()
+        assert (await _wait_finished(queue, job.id)).status == JobStatus.SUCCEEDED
+
+    async def test_user_id_not_serialized(self, queue: JobQueue):
+        async def handler(ctx: JobContext) -> None:
+            return None
+
+        queue.register("test.noop", handler)
+        job = await queue.submit("test.noop", TEST_USER_ID)
+
+        assert "user_id" not in job.model_dump()
+        assert job.user_id == TEST_USER_ID
+
+
+class TestDeduplication:
+    """Tests for idempotency and concurrency keys."""
+
+    @pytest.fixture(autouse=True)
+    def register(self, queue: JobQueue):
+        async def handler(ctx: JobContext) -> None:
+            return None
+
+        queue.register("test.noop", handler)
+
+    async def test_idempotency_key_returns_same_job(self, queue: JobQueue):
+        first = await queue.submit("test.noop", TEST_USER_ID, idempotency_key="key-1")
+        second = await queue.submit("test.noop", TEST_USER_ID, idempotency_key="key-1")
+        other_user = await queue.submit("test.noop", "other-user", idempotency_key="key-1")
+
+        assert second.id == first.id
+        assert other_user.id != first.id
+        assert queue.stats()["deduplicated"] == 1
+
+    async def test_idempotency_key_survives_completion(self, queue: JobQueue):
+        await queue.start()
+        first = await queue.submit("test.noop", TEST_USER_ID, idempotency_key="key-1")
+        await _wait_finished(queue, first.id)
+
+        again = await queue.submit("test.noop", TEST_USER_ID, idempotency_key="key-1")
+        assert again.id == first.id
+        assert again.status == JobStatus.SUCCEEDED
+
+    async def test_concurrency_key_only_while_unfinished(self, queue: JobQueue):
+        first = await queue.submit("test.noop", TEST_USER_ID, concurrency_key="run:1")
+        second = await queue.submit("test.noop", TEST_USER_ID, concurrency_key="run:1")
+        assert second.id == first.id
+
+        await queue.start()
+        await _wait_finished(queue, first.id)
+        third = await queue.submit("test.noop", TEST_USER_ID, concurrency_key="run:1")
+        assert third.id != first.id
+
+
+class TestRetry:
+    """Tests for failures and retry with backoff."""
+
+    async def test_unexpected_error_retried_until_success(self, queue: JobQueue):
+        calls = 0
+
+        async def flaky(ctx: JobContext) -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            if calls < 3:
+                raise RuntimeError("connection reset")
+            return {"ok": True}
+
+        queue.register("test.flaky", flaky, max_attempts=3)
+        await queue.start()
+        job = await queue.submit("test.flaky", TEST_USER_ID)
+
+        finished = await _wait_finished(queue, job.id)
+        assert finished.status == JobStatus.SUCCEEDED
+        assert finished.attempts == 3
+        assert finished.error is None
+        assert queue.stats()["retried"] == 2
+
+    async def test_fails_after_max_attempts(self, queue: JobQueue):
+        async def broken(ctx: JobContext) -> None:
+            raise RuntimeError("storage down")
+
+        queue.register("test.broken", broken, max_attempts=2)
+        await queue.start()
+        job = await queue.submit("test.broken", TEST_USER_ID)
+
+        finished = await _wait_finished(queue, job.id)
+        assert finished.status == JobStatus.FAILED
+        assert finished.attempts == 2
+        assert finished.error == "storage down"
+
+    async def test_value_error_not_retried(self, queue: JobQueue):
+        async def invalid(ctx: JobContext) -> None:
+            raise ValueError("Payroll run is not in draft status")
+
+        queue.register("test.invalid", invalid, max_attempts=3)
+        await queue.start()
+        job = await queue.submit("test.invalid", TEST_USER_ID)
+
+        finished = await _wait_finished(queue, job.id)
+        assert finished.status == JobStatus.FAILED
+        assert finished.attempts == 1
+        assert finished.error == "Payroll run is not in draft status"
+
+    def test_retry_delay_doubles_up_to_max(self):
+        queue = JobQueue(InMemoryJobBackend(), retry_base_delay=5, retry_max_delay=30)
+        assert [queue.retry_delay(n) for n in (1, 2, 3, 4)] == [5, 10, 20, 30]
+
+    async def test_retry_waits_for_backoff(self):
+        queue = JobQueue(
+            InMemoryJobBackend(), workers=1, poll_interval=0.01, retry_base_delay=60
+        )
+
+        async def broken(ctx: JobContext) -> None:
+            raise RuntimeError("timeout")
+
+        queue.register("test.broken", broken, max_attempts=2)
+        await queue.start()
+        try:
+            job = await queue.submit("test.broken", TEST_USER_ID)
+            await asyncio.sleep(0.1)
+            retrying = await queue.get(job.id)
+        finally:
+            await queue.stop()
+
+        assert retrying.status == JobStatus.QUEUED
+        assert retrying.attempts == 1
+        assert (retrying.run_after - datetime.now(timezone.utc)).total_seconds() > 50
+
+
+class TestCancel:
+    """Tests for cancellation."""
+
+    async def test_cancel_queued_job(self, queue: JobQueue):
+        async def handler(ctx: JobContext) -> None:
+            raise AssertionError("cancelled job must not run")
+
+        queue.register("test.never", handler)
+        job = await queue.submit("test.never", TEST_USER_ID)
+
+        cancelled = await queue.cancel(job.id)
+        await queue.start()
+        await asyncio.sleep(0.05)
+
+        assert cancelled.status == JobStatus.CANCELLED
+        assert (await queue.get(job.id)).status == JobStatus.CANCELLED
+
+    async def test_cancel_running_job(self, queue: JobQueue):
+        started = asyncio.Event()
+
+        async def slow(ctx: JobContext) -> None:
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register("test.slow", slow)
+        await queue.start()
+        job = await queue.submit("test.slow", TEST_USER_ID)
+        await asyncio.wait_for(started.wait(), 1)
+
+        await queue.cancel(job.id)
+        finished = await _wait_finished(queue, job.id)
+
+        assert finished.status == JobStatus.CANCELLED
+        assert queue.stats()["cancelled"] == 1
+
+    async def test_cancel_requested_elsewhere_seen_by_heartbeat(self, queue: JobQueue):
+        started = asyncio.Event()
+
+        async def slow(ctx: JobContext) -> None:
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register("test.slow", slow)
+        queue.heartbeat_interval = 0.01
+        await queue.start()
+        job = await queue.submit("test.slow", TEST_USER_ID)
+        await asyncio.wait_for(started.wait(), 1)
+
+        # Another instance flags the job; this worker's task is not cancelled directly
+        await queue.backend.request_cancel(job.id)
+
+        assert (await _wait_finished(queue, job.id)).status == JobStatus.CANCELLED
+
+
+class TestProgressAndShutdown:
+    """Tests for progress reports and stopping the workers."""
+
+    async def test_track_publishes_progress(self, queue: JobQueue):
+        state = {"done": 0}
+        snapshots: list[dict[str, Any]] = []
+
+        async def work() -> str:
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                state["done"] += 1
+            return "finished"
+
+        async def handler(ctx: JobContext) -> dict[str, Any]:
+            outcome = await ctx.track(work(), lambda: dict(state), interval=0.005)
+            snapshots.append(ctx.job.progress or {})
+            return {"outcome": outcome}
+
+        queue.register("test.progress", handler)
+        await queue.start()
+        job = await queue.submit("test.progress", TEST_USER_ID)
+
+        finished = await _wait_finished(queue, job.id)
+        assert finished.result == {"outcome": "finished"}
+        assert finished.progress is not None and finished.progress["done"] >= 1
+        assert snapshots
+
+    async def test_stop_requeues_running_job(self):
+        queue = JobQueue(InMemoryJobBackend(), workers=1, poll_interval=0.01)
+        started = asyncio.Event()
+
+        async def slow(ctx: JobContext) -> None:
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register("test.slow", slow)
+        await queue.start()
+        job = await queue.submit("test.slow", TEST_USER_ID)
+        await asyncio.wait_for(started.wait(), 1)
+
+        await queue.stop()
+
+        requeued = await queue.get(job.id)
+        assert requeued.status == JobStatus.QUEUED
+        assert requeued.attempts == 0
+
+    async def test_handler_runs_with_submitters_token(self, queue: JobQueue):
+        tokens: list[str | None] = []
+
+        async def handler(ctx: JobContext) -> None:
+            tokens.append(queue_module.SupabaseClient.get_user_token())
+
+        queue.register("test.token", handler)
+        await queue.start()
+        token = _jwt(expires_in=3600)
+        with patch.object(queue_module.SupabaseClient, "get_user_token", return_value=token):
+            job = await queue.submit("test.token", TEST_USER_ID)
+        await _wait_finished(queue, job.id)
+
+        assert tokens == [token]
+        assert job.id not in queue._tokens
+
+    async def test_expired_token_falls_back_to_service_role(self, queue: JobQueue):
+        seen: list[tuple[str | None, bool]] = []
+
+        async def handler(ctx: JobContext) -> None:
+            seen.append((
+                queue_module.SupabaseClient.get_user_token(),
+                supabase_client_module._service_role_context.get(),
+            ))
+            if ctx.job.attempts == 1:
+                raise RuntimeError("transient")
+
+        queue.register("test.token", handler)
+        # Still valid at submit, expired (within the margin) by the first attempt
+        token = _jwt(expires_in=queue_module.TOKEN_EXPIRY_MARGIN / 2)
+        with patch.object(queue_module.SupabaseClient, "get_user_token", return_value=token):
+            job = await queue.submit("test.token", TEST_USER_ID)
+        await queue.start()
+        finished = await _wait_finished(queue, job.id)
+
+        assert finished.status == JobStatus.SUCCEEDED
+        assert seen == [(None, True), (None, True)]
+        assert job.id not in queue._tokens
+
+    def test_token_usable(self):
+        assert queue_module._token_usable(_jwt(expires_in=3600))
+        assert not queue_module._token_usable(_jwt(expires_in=-10))
+        assert not queue_module._token_usable(_jwt(expires_in=None))
+        assert not queue_module._token_usable("not-a-jwt")
+
+
+class TestSingleton:
+    """Tests for the process-wide queue."""
+
+    async def test_default_handlers_registered(self):
+        await queue_module.shutdown_job_queue()
+        with patch.object(queue_module, "get_config") as mock_config:
+            mock_config.return_value.job_backend = "memory"
+            mock_config.return_value.job_workers = 1
+            mock_config.return_value.job_poll_interval = 1.0
+            mock_config.return_value.job_retry_base_delay = 5.0
+            mock_config.return_value.job_retry_max_delay = 300.0
+            mock_config.return_value.job_lease_seconds = 300.0
+            job_queue = queue_module.get_job_queue()
+            try:
+                assert queue_module.get_job_queue() is job_queue
+                assert set(job_queue.stats()["kinds"]) == {
+                    "payroll.recalculate_run",
+                    "payroll.approve_run",
+                    "payroll.send_paystubs",
+                    "t4.generate_slips",
+                }
+            finally:
+                await queue_module.shutdown_job_queue()
+
+    def test_supabase_backend_requires_service_role(self):
+        with patch.object(queue_module, "get_config") as mock_config, \
+             patch.object(queue_module, "get_supabase_admin_client", return_value=None):
+            mock_config.return_value.job_backend = "supabase"
+            with pytest.raises(ConfigurationError, match="SUPABASE_SERVICE_ROLE_KEY"):
+                queue_module._create_backend()
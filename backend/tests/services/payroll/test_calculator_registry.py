@@ -0,0 +1,127 @@
+"""
+Tests for calculator_registry.py module.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.payroll import PayFrequency, Province
+from app.services.payroll.calculator_registry import (
+    CalculatorRegistry,
+    get_calculator_registry,
+)
+from app.services.payroll.payroll_engine import EmployeePayrollInput, PayrollEngine
+from app.services.payroll.result_cache import PayrollResultCache
+
+
+@pytest.fixture
+def registry() -> CalculatorRegistry:
+    return CalculatorRegistry(max_size=8)
+
+
+class TestCalculatorRegistry:
+    """Tests for CalculatorRegistry caching behaviour."""
+
+    def test_same_key_returns_same_instance(self, registry: CalculatorRegistry):
+        first = registry.get_cpp(2025, 26)
+        second = registry.get_cpp(2025, 26)
+
+        assert first is second
+        stats = registry.stats()
+        assert stats["by_kind"]["cpp"]["hits"] == 1
+        assert stats["by_kind"]["cpp"]["misses"] == 1
+
+    def test_pay_dates_in_same_edition_share_calculator(self, registry: CalculatorRegistry):
+        feb = registry.get_federal(2025, 26, date(2025, 2, 14))
+        may = registry.get_federal(2025, 26, date(2025, 5, 30))
+        aug = registry.get_federal(2025, 26, date(2025, 8, 15))
+
+        assert feb is may
+        assert feb is not aug
+
+    def test_province_code_is_case_insensitive(self, registry: CalculatorRegistry):
+        upper = registry.get_provincial("ON", 2025, 26, date(2025, 8, 15))
+        lower = registry.get_provincial("on", 2025, 26, date(2025, 8, 15))
+
+        assert upper is lower
+
+    def test_evicts_least_recently_used(self):
+        registry = CalculatorRegistry(max_size=2)
+        weekly = registry.get_ei(2025, 52)
+        registry.get_ei(2025, 26)
+        registry.get_ei(2025, 52)  # refresh weekly
+        registry.get_ei(2025, 24)  # evicts biweekly
+
+        stats = registry.stats()
+        assert stats["size"] == 2
+        assert stats["by_kind"]["ei"]["evictions"] == 1
+        assert registry.get_ei(2025, 52) is weekly
+        assert registry.stats()["by_kind"]["ei"]["misses"] == 3
+
+    def test_clear_resets_entries_and_counters(self, registry: CalculatorRegistry):
+        registry.get_cpp(2025, 26)
+        registry.get_cpp(2025, 26)
+        registry.clear()
+
+        stats = registry.stats()
+        assert stats["size"] == 0
+        assert stats["hits"] == 0
+        assert stats["misses"] == 0
+
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            CalculatorRegistry(max_size=0)
+
+    def test_concurrent_access_returns_single_instance(self, registry: CalculatorRegistry):
+        results = []
+
+        def worker():
+            results.append(registry.get_provincial("BC", 2025, 26, date(2025, 8, 15)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert all(r is results[0] for r in results)
+
+    def test_singleton(self):
+        assert get_calculator_registry() is get_calculator_registry()
+
+
+class TestPayrollEngineRegistry:
+    """Tests for PayrollEngine drawing calculators from a shared registry."""
+
+    def test_engines_share_calculators(self, registry: CalculatorRegistry):
+        engine_a = PayrollEngine(year=2025, registry=registry)
+        engine_b = PayrollEngine(year=2025, registry=registry)
+
+        assert engine_a._get_federal_calculator(26) is engine_b._get_federal_calculator(26)
+
+    def test_repeated_calculations_hit_cache(self, registry: CalculatorRegistry):
+        input_data = EmployeePayrollInput(
+            employee_id="emp-1",
+            province=Province.ON,
+            pay_frequency=PayFrequency.BIWEEKLY,
+            gross_regular=Decimal("2500.00"),
+            pay_date=date(2025, 8, 15),
+        )
+        # Without a result cache, so the second calculation runs the calculators
+        no_results = PayrollResultCache(max_size=0)
+        first = PayrollEngine(year=2025, registry=registry, result_cache=no_results).calculate(
+            input_data
+        )
+        misses = registry.stats()["misses"]
+        second = PayrollEngine(year=2025, registry=registry, result_cache=no_results).calculate(
+            input_data
+        )
+
+        assert second.net_pay == first.net_pay
+        assert registry.stats()["misses"] == misses
+        assert registry.stats()["hits"] > 0
@@ -0,0 +1,148 @@
+"""
+Tests for parallel_engine.py module.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.payroll import PayFrequency, Province
+from app.services.payroll import parallel_engine
+from app.services.payroll.parallel_engine import (
+    ParallelPayrollEngine,
+    shutdown_payroll_process_pool,
+)
+from app.services.payroll.payroll_engine import EmployeePayrollInput, PayrollEngine
+from app.services.payroll.result_cache import PayrollResultCache
+
+
+def _inputs(n: int) -> list[EmployeePayrollInput]:
+    provinces = [Province.ON, Province.BC, Province.AB, Province.SK, Province.NS]
+    return [
+        EmployeePayrollInput(
+            employee_id=f"emp-{i}",
+            province=provinces[i % len(provinces)],
+            pay_frequency=PayFrequency.BIWEEKLY,
+            pay_date=date(2025, 8, 15),
+            gross_regular=Decimal(1500 + 37 * i),
+            federal_claim_amount=Decimal("16129.00"),
+            provincial_claim_amount=Decimal("12747.00"),
+        )
+        for i in range(n)
+    ]
+
+
+def _engine(result_cache: PayrollResultCache | None = None) -> PayrollEngine:
+    """Engine with its own result cache, so other tests' results are not hits."""
+    return PayrollEngine(year=2025, result_cache=result_cache or PayrollResultCache(max_size=1000))
+
+
+@pytest.fixture
+def shared_pool():
+    yield
+    shutdown_payroll_process_pool()
+
+
+class TestParallelPayrollEngine:
+    """Tests for sharding, ordering and fallbacks."""
+
+    def test_small_batch_runs_in_process(self):
+        engine = ParallelPayrollEngine(_engine(), threshold=100)
+        inputs = _inputs(10)
+
+        results = engine.calculate_batch(inputs)
+
+        assert [r.employee_id for r in results] == [i.employee_id for i in inputs]
+        assert engine.last_timing is not None
+        assert engine.last_timing.mode == "in_process"
+        assert engine.last_timing.shards[0].pid == os.getpid()
+
+    def test_shards_cover_inputs_in_order(self):
+        engine = ParallelPayrollEngine(_engine(), max_workers=3)
+        inputs = _inputs(1000)
+
+        shards = engine._shards(inputs)
+
+        assert len(shards) == 3 * parallel_engine.SHARDS_PER_WORKER
+        assert [i for shard in shards for i in shard] == inputs
+
+    def test_small_pool_batch_uses_min_shard_size(self):
+        engine = ParallelPayrollEngine(_engine(), max_workers=8)
+
+        assert len(engine._shards(_inputs(120))) == 120 // parallel_engine.MIN_SHARD_SIZE
+
+    def test_process_pool_matches_sequential(self, shared_pool, caplog: pytest.LogCaptureFixture):
+        inputs = _inputs(200)
+        expected = _engine().calculate_batch(inputs)
+        engine = ParallelPayrollEngine(_engine(), threshold=100, max_workers=2)
+
+        with caplog.at_level(logging.INFO, logger=parallel_engine.__name__):
+            results = engine.calculate_batch(inputs)
+
+        assert [r.employee_id for r in results] == [r.employee_id for r in expected]
+        assert [r.net_pay for r in results] == [r.net_pay for r in expected]
+        assert engine.last_timing.mode == "process_pool"
+        assert sum(s.size for s in engine.last_timing.shards) == 200
+        assert all(s.pid != os.getpid() for s in engine.last_timing.shards)
+        # Per-shard timings are logged, not only the batch total
+        assert all(f"#{s.index} {s.size} in " in caplog.text for s in engine.last_timing.shards)
+
+    async def test_async_process_pool_matches_sequential(self, shared_pool):
+        inputs = _inputs(120)
+        expected = _engine().calculate_batch(inputs)
+        engine = ParallelPayrollEngine(_engine(), threshold=100, max_workers=2)
+
+        results = await engine.calculate_batch_async(inputs)
+
+        assert [r.federal_tax for r in results] == [r.federal_tax for r in expected]
+        assert engine.last_timing.to_dict()["mode"] == "process_pool"
+
+    async def test_async_small_batch_runs_in_process(self):
+        engine = ParallelPayrollEngine(_engine(), threshold=100)
+
+        results = await engine.calculate_batch_async(_inputs(5))
+
+        assert len(results) == 5
+        assert engine.last_timing.mode == "in_process"
+
+    def test_threshold_zero_disables_pool(self):
+        engine = ParallelPayrollEngine(_engine(), threshold=0)
+
+        engine.calculate_batch(_inputs(60))
+
+        assert engine.last_timing.mode == "in_process"
+
+    def test_broken_pool_falls_back_in_process(self, monkeypatch: pytest.MonkeyPatch):
+        engine = ParallelPayrollEngine(_engine(), threshold=10)
+
+        def broken(_inputs):
+            raise BrokenProcessPool("worker died")
+
+        monkeypatch.setattr(engine, "_submit", broken)
+
+        results = engine.calculate_batch(_inputs(20))
+
+        assert len(results) == 20
+        assert engine.last_timing.mode == "in_process"
+
+    def test_process_pool_calculates_only_cache_misses(self, shared_pool):
+        cache = PayrollResultCache(max_size=1000)
+        inputs = _inputs(150)
+        _engine(cache).calculate_batch(inputs[:100])
+        engine = ParallelPayrollEngine(_engine(cache), threshold=100, max_workers=2)
+
+        results = engine.calculate_batch(inputs)
+
+        assert [r.employee_id for r in results] == [i.employee_id for i in inputs]
+        assert sum(s.size for s in engine.last_timing.shards) == 50
+        assert cache.stats()["hits"] == 100
+
+        engine.calculate_batch(inputs)
+
+        assert engine.last_timing.shards == []
@@ -0,0 +1,164 @@
+"""
+Tests for result_cache.py module.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models.payroll import PayFrequency, Province
+from app.services.payroll import result_cache
+from app.services.payroll.payroll_engine import EmployeePayrollInput, PayrollEngine
+from app.services.payroll.result_cache import (
+    PayrollResultCache,
+    get_payroll_result_cache,
+    input_fingerprint,
+)
+from app.services.payroll.tax_config_repository import TaxConfigRepository
+
+
+def _input(employee_id: str = "emp-1", **overrides) -> EmployeePayrollInput:
+    fields = {
+        "employee_id": employee_id,
+        "province": Province.ON,
+        "pay_frequency": PayFrequency.BIWEEKLY,
+        "gross_regular": Decimal("2500.00"),
+        "pay_date": date(2025, 8, 15),
+    }
+    fields.update(overrides)
+    return EmployeePayrollInput(**fields)
+
+
+@pytest.fixture
+def cache() -> PayrollResultCache:
+    return PayrollResultCache(max_size=8)
+
+
+class TestInputFingerprint:
+    """Tests for the canonical input hash."""
+
+    def test_ignores_employee_id(self):
+        assert input_fingerprint(_input("emp-1")) == input_fingerprint(_input("emp-2"))
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"gross_regular": Decimal("2500.01")},
+            {"province": Province.BC},
+            {"pay_date": date(2025, 2, 14)},
+            {"ytd_cpp_base": Decimal("100")},
+            {"is_ei_exempt": True},
+            {"pensionable_months": 6},
+        ],
+    )
+    def test_changes_with_any_input(self, overrides):
+        assert input_fingerprint(_input(**overrides)) != input_fingerprint(_input())
+
+    def test_equal_decimal_values_share_key(self):
+        assert input_fingerprint(_input(gross_regular=Decimal("2500"))) == input_fingerprint(
+            _input(gross_regular=Decimal("2500.00"))
+        )
+
+
+class TestPayrollResultCache:
+    """Tests for PayrollResultCache lookups, eviction and invalidation."""
+
+    def test_hit_returns_copy_for_requesting_employee(self, cache: PayrollResultCache):
+        result = PayrollEngine(year=2025, result_cache=PayrollResultCache(0)).calculate(_input())
+        key = cache.key(2025, _input())
+        cache.put(key, result)
+
+        hit = cache.get(key, "emp-2")
+
+        assert hit is not result
+        assert hit.employee_id == "emp-2"
+        assert hit.net_pay == result.net_pay
+        assert result.employee_id == "emp-1"
+        assert cache.stats()["hits"] == 1
+
+    def test_key_includes_tax_table_version(self, cache: PayrollResultCache):
+        key = cache.key(2025, _input())
+
+        with patch.object(TaxConfigRepository, "snapshot_version", return_value="other"):
+            assert cache.key(2025, _input()) != key
+        assert cache.key(2026, _input()) != key
+
+    def test_evicts_least_recently_used(self):
+        cache = PayrollResultCache(max_size=2)
+        result = PayrollEngine(year=2025, result_cache=PayrollResultCache(0)).calculate(_input())
+        keys = [(2025, "v1", (i,)) for i in range(3)]
+        cache.put(keys[0], result)
+        cache.put(keys[1], result)
+        cache.get(keys[0], "emp-1")  # refresh
+        cache.put(keys[2], result)  # evicts keys[1]
+
+        assert cache.get(keys[1], "emp-1") is None
+        assert cache.get(keys[0], "emp-1") is not None
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+    def test_invalidate_clears_entries(self, cache: PayrollResultCache):
+        result = PayrollEngine(year=2025, result_cache=PayrollResultCache(0)).calculate(_input())
+        cache.put((2025, "v1", ("x",)), result)
+
+        cache.invalidate()
+
+        assert cache.get((2025, "v1", ("x",)), "emp-1") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_negative_size_rejected(self):
+        with pytest.raises(ValueError):
+            PayrollResultCache(max_size=-1)
+
+    def test_singleton_invalidated_on_tax_table_reload(self, monkeypatch: pytest.MonkeyPatch):
+        repository = TaxConfigRepository()
+        monkeypatch.setattr(result_cache, "_cache", None)
+        monkeypatch.setattr(result_cache, "get_tax_config_repository", lambda: repository)
+        cache = get_payroll_result_cache()
+        cache.put((2025, "v1", ("x",)), PayrollEngine(year=2025).calculate(_input()))
+
+        repository.reload(compile_tables=False)
+
+        assert get_payroll_result_cache() is cache
+        assert cache.stats()["size"] == 0
+        assert cache.stats()["invalidations"] == 1
+
+
+class TestPayrollEngineResultCache:
+    """Tests for PayrollEngine memoizing results."""
+
+    def test_identical_inputs_calculated_once(self, cache: PayrollResultCache):
+        engine = PayrollEngine(year=2025, result_cache=cache)
+
+        with patch.object(engine, "_calculate", wraps=engine._calculate) as calculate:
+            first = engine.calculate(_input("emp-1"))
+            second = PayrollEngine(year=2025, result_cache=cache).calculate(_input("emp-2"))
+            engine.calculate(_input("emp-3", gross_regular=Decimal("3000.00")))
+
+        assert calculate.call_count == 2
+        assert second.employee_id == "emp-2"
+        assert replace(second, employee_id="emp-1") == first
+
+    def test_cached_matches_uncached(self, cache: PayrollResultCache):
+        inputs = [_input(f"emp-{i}", gross_regular=Decimal(1500 + 250 * (i % 3))) for i in range(9)]
+        uncached = PayrollEngine(year=2025, result_cache=PayrollResultCache(0)).calculate_batch(inputs)
+
+        cached = PayrollEngine(year=2025, result_cache=cache).calculate_batch(inputs)
+
+        assert cached == uncached
+        assert cache.stats()["hits"] == 6
+
+    def test_disabled_cache_is_bypassed(self):
+        cache = PayrollResultCache(max_size=0)
+
+        PayrollEngine(year=2025, result_cache=cache).calculate(_input())
+
+        assert cache.stats()["misses"] == 0
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,157 @@
+"""
+Tests for tax_config_repository.py module.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.services.payroll import tax_tables
+from app.services.payroll.tax_config_repository import (
+    TaxConfigRepository,
+    clear_tax_table_caches,
+    get_tax_config_repository,
+)
+from app.services.payroll.tax_tables import TaxConfigError
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    clear_tax_table_caches()
+    yield
+    clear_tax_table_caches()
+
+
+def _write_year(base: Path, year: int, bpaf: int) -> None:
+    year_dir = base / str(year)
+    year_dir.mkdir(parents=True)
+    (year_dir / "cpp_ei.json").write_text(
+        json.dumps({"cpp": {"ympe": 71300}, "ei": {"mie": 65700}})
+    )
+    (year_dir / "federal.json").write_text(json.dumps({"bpaf": bpaf}))
+    (year_dir / "provinces.json").write_text(json.dumps({"provinces": {"ON": {"bpa": 12747}}}))
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    _write_year(tmp_path, 2025, 16129)
+    _write_year(tmp_path, 2026, 16452)
+    (tmp_path / "schemas").mkdir()
+    monkeypatch.setattr(tax_tables, "CONFIG_BASE_PATH", tmp_path)
+    return tmp_path
+
+
+class TestTaxConfigRepository:
+    """Tests for TaxConfigRepository loading, keying and reloading."""
+
+    def test_available_years_ignores_non_year_dirs(self, config_dir: Path):
+        assert TaxConfigRepository().available_years() == [2025, 2026]
+
+    def test_preload_loads_every_year_and_edition(self, config_dir: Path):
+        repo = TaxConfigRepository()
+        stats = repo.preload(compile_tables=False)
+
+        assert stats["loaded_years"] == [2025, 2026]
+        # cpp_ei + federal/provinces for both editions, per year
+        assert stats["load_count"] == 10
+        assert set(stats["year_load_seconds"]) == {2025, 2026}
+        assert repo.get_federal(2025, "jan") == {"bpaf": 16129}
+        assert repo.get_federal(2026, "jul") == {"bpaf": 16452}
+        assert repo.get_provinces(2026, "jan") == {"ON": {"bpa": 12747}}
+        assert repo.get_cpp_ei(2025)["ei"] == {"mie": 65700}
+
+    def test_preload_skips_loaded_years(self, config_dir: Path):
+        repo = TaxConfigRepository()
+        repo.preload([2025], compile_tables=False)
+        repo.preload([2025], compile_tables=False)
+
+        assert repo.stats()["load_count"] == 5
+
+    def test_lazy_get_loads_only_that_year(self, config_dir: Path):
+        repo = TaxConfigRepository()
+
+        assert repo.get_federal(2026, "jan") == {"bpaf": 16452}
+        assert repo.loaded_years == [2026]
+
+    def test_missing_year_raises(self, config_dir: Path):
+        with pytest.raises(TaxConfigError):
+            TaxConfigRepository().get_cpp_ei(2030)
+
+    def test_reload_picks_up_changed_files(self, config_dir: Path):
+        repo = TaxConfigRepository()
+        repo.preload([2025], compile_tables=False)
+        (config_dir / "2025" / "federal.json").write_text(json.dumps({"bpaf": 99999}))
+
+        # Still served from cache until reload
+        assert repo.get_federal(2025, "jul") == {"bpaf": 16129}
+
+        repo.reload(compile_tables=False)
+
+        assert repo.get_federal(2025, "jul") == {"bpaf": 99999}
+        assert tax_tables.get_federal_config(2025) == {"bpaf": 99999}
+        assert repo.stats()["reload_count"] == 1
+
+    def test_reload_notifies_listeners(self, config_dir: Path):
+        repo = TaxConfigRepository()
+        calls: list[str] = []
+        repo.add_reload_listener(lambda: calls.append("reloaded"))
+
+        repo.reload()
+
+        assert calls == ["reloaded"]
+
+    def test_snapshot_version_changes_with_tables(self, config_dir: Path):
+        repo = TaxConfigRepository()
+        version = repo.snapshot_version(2025)
+
+        assert repo.snapshot_version(2025) == version
+        assert repo.snapshot_version(2026) != version
+
+        (config_dir / "2025" / "federal.json").write_text(json.dumps({"bpaf": 99999}))
+        assert repo.snapshot_version(2025) == version
+
+        repo.reload(compile_tables=False)
+
+        assert repo.snapshot_version(2025) != version
+
+    def test_singleton(self):
+        assert get_tax_config_repository() is get_tax_config_repository()
+
+
+class TestTaxConfigRepositoryRealTables:
+    """Tests against the shipped config/tax_tables/ files."""
+
+    def test_preload_compiles_all_years(self):
+        repo = TaxConfigRepository()
+        stats = repo.preload()
+
+        assert 2025 in stats["loaded_years"]
+        assert tax_tables._compile_province_table.cache_info().currsize == (
+            len(stats["loaded_years"]) * 2 * len(tax_tables.SUPPORTED_PROVINCES)
+        )
+
+    def test_getters_share_repository_entries(self):
+        repo = TaxConfigRepository()
+
+        assert tax_tables.get_federal_config(2025) is repo.get_federal(2025, "jul")
+        assert tax_tables.get_cpp_config(2025) is repo.get_cpp_ei(2025)["cpp"]
+        assert tax_tables.get_province_config("ON", 2025, date(2025, 3, 1)) is (
+            repo.get_provinces(2025, "jan")["ON"]
+        )
+
+    def test_multi_year_workload_does_not_evict(self):
+        repo = TaxConfigRepository()
+        years = repo.preload(compile_tables=False)["loaded_years"]
+        misses = tax_tables._load_json_file.cache_info().misses
+
+        for year in years:
+            tax_tables.get_cpp_config(year)
+            for edition in ("jan", "jul"):
+                tax_tables._get_federal_config_with_edition(year, edition)
+                tax_tables._get_provinces_config_with_edition(year, edition)
+
+        assert tax_tables._load_json_file.cache_info().misses == misses
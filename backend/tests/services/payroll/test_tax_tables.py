@@ -34,6 +34,16 @@ from app.services.payroll.tax_tables import (
     _has_versioned_federal_config,
     _has_versioned_provinces_config,
     validate_tax_tables,
+    BracketIndex,
+    CompiledBracket,
+    CompiledFederalTable,
+    CompiledProvincialTable,
+    TaxTableSnapshot,
+    clear_compiled_tables,
+    get_cpp_table,
+    get_federal_table,
+    get_province_table,
+    get_tax_snapshot,
 )
 
 
@@ -1385,3 +1395,125 @@ class TestModuleInitExceptionHandling:
             # Should log error
             mock_logger.error.assert_called()
             assert "Failed to validate" in str(mock_logger.error.call_args)
+
+
+class TestCompiledTables:
+    """Tests for compiled (pre-parsed) tax table snapshots."""
+
+    def setup_method(self):
+        """Clear compiled caches before each test."""
+        clear_compiled_tables()
+
+    def test_federal_table_matches_raw_config(self):
+        """Compiled federal values equal Decimal(str(raw)) values."""
+        raw = get_federal_config(2025)
+        table = get_federal_table(2025)
+
+        assert isinstance(table, CompiledFederalTable)
+        assert table.bpaf == Decimal(str(raw["bpaf"]))
+        assert table.cea == Decimal(str(raw["cea"]))
+        assert table.k1_rate == Decimal(str(raw["k1_rate"]))
+        assert [b.threshold for b in table.brackets] == [
+            Decimal(str(b["threshold"])) for b in raw["brackets"]
+        ]
+
+    def test_edition_follows_pay_date(self):
+        """January edition is used before July 1, July edition otherwise."""
+        assert get_federal_table(2025, date(2025, 3, 15)).edition == "jan"
+        assert get_federal_table(2025, date(2025, 7, 1)).edition == "jul"
+        assert get_federal_table(2025).edition == "jul"
+
+    def test_tables_are_cached(self):
+        """Same (year, edition, province) returns the same object."""
+        assert get_province_table("ON", 2025) is get_province_table("on", 2025, date(2025, 9, 1))
+        assert get_cpp_table(2025) is get_cpp_table(2025)
+
+    def test_tables_are_frozen_and_slotted(self):
+        """Compiled tables cannot be mutated and carry no __dict__."""
+        table = get_province_table("ON", 2025)
+
+        with pytest.raises(AttributeError):
+            table.bpa = Decimal("1")  # type: ignore[misc]
+        assert not hasattr(table, "__dict__")
+
+    def test_find_bracket_matches_find_tax_bracket(self):
+        """Compiled bracket lookup matches the dict-based lookup."""
+        raw = get_province_config("ON", 2025)
+        table = get_province_table("ON", 2025)
+
+        for income in ["0", "52885.99", "52886", "105775", "150000.01", "500000"]:
+            assert table.find_bracket(Decimal(income)) == find_tax_bracket(
+                Decimal(income), raw["brackets"]
+            )
+
+    @pytest.mark.parametrize("province,income", [
+        ("MB", "150000"), ("MB", "300000"), ("MB", "450000"),
+        ("NS", "20000"), ("NS", "50000"), ("NS", "90000"),
+        ("YT", "80000"), ("ON", "60000"),
+    ])
+    def test_dynamic_bpa_matches_calculate_dynamic_bpa(self, province: str, income: str):
+        """Compiled BPA formulas match calculate_dynamic_bpa."""
+        table = get_province_table(province, 2025)
+
+        assert table.basic_personal_amount(Decimal(income)) == calculate_dynamic_bpa(
+            province, Decimal(income), year=2025
+        )
+
+    def test_unsupported_province_raises(self):
+        """Quebec is rejected like get_province_config."""
+        with pytest.raises(TaxConfigError, match="not supported"):
+            get_province_table("QC", 2025)
+
+    def test_snapshot_bundles_all_tables(self):
+        """Snapshot combines federal, provincial, CPP and EI for one edition."""
+        snapshot = get_tax_snapshot("BC", 2025, date(2025, 2, 1))
+
+        assert isinstance(snapshot, TaxTableSnapshot)
+        assert isinstance(snapshot.provincial, CompiledProvincialTable)
+        assert snapshot.edition == "jan"
+        assert snapshot.federal is get_federal_table(2025, date(2025, 2, 1))
+        assert snapshot.cpp.ympe == Decimal(str(get_cpp_config(2025)["ympe"]))
+        assert snapshot.ei.mie == Decimal(str(get_ei_config(2025)["mie"]))
+
+
+class TestBracketIndex:
+    """Tests for the bisect-based BracketIndex."""
+
+    def _index(self) -> BracketIndex:
+        return BracketIndex.from_brackets((
+            CompiledBracket(Decimal("0"), Decimal("0.14"), Decimal("0")),
+            CompiledBracket(Decimal("57375"), Decimal("0.205"), Decimal("3729")),
+            CompiledBracket(Decimal("114750"), Decimal("0.26"), Decimal("10041")),
+        ))
+
+    def test_threshold_is_inclusive(self):
+        """Income equal to a threshold falls in that bracket."""
+        index = self._index()
+
+        assert index.rate_and_constant(Decimal("57374.99")) == (Decimal("0.14"), Decimal("0"))
+        assert index.rate_and_constant(Decimal("57375")) == (Decimal("0.205"), Decimal("3729"))
+        assert index.rate_and_constant(Decimal("1000000")) == (Decimal("0.26"), Decimal("10041"))
+
+    def test_below_first_threshold_returns_zero(self):
+        """Negative income returns (0, 0) like find_tax_bracket."""
+        assert self._index().rate_and_constant(Decimal("-1")) == (Decimal("0"), Decimal("0"))
+
+    def test_many_preserves_order(self):
+        """Vectorized lookup matches single lookups in input order."""
+        index = self._index()
+        incomes = [Decimal("200000"), Decimal("0"), Decimal("60000"), Decimal("-5")]
+
+        assert index.rate_and_constant_many(incomes) == [
+            index.rate_and_constant(i) for i in incomes
+        ]
+
+    @pytest.mark.parametrize("year", [2024, 2025, 2026])
+    def test_matches_linear_scan_for_all_provinces(self, year: int):
+        """Bisect lookup agrees with find_tax_bracket around every threshold."""
+        for code in SUPPORTED_PROVINCES:
+            raw = get_province_config(code, year)["brackets"]
+            index = get_province_table(code, year).bracket_index
+            for bracket in raw:
+                t = Decimal(str(bracket["threshold"]))
+                for income in (t - Decimal("0.01"), t, t + Decimal("0.01")):
+                    assert index.rate_and_constant(income) == find_tax_bracket(income, raw)
@@ -221,11 +221,21 @@ def make_payroll_record(
     other_deductions: float = 0.0,
     cpp_employer: float = 100.0,
     ei_employer: float = 52.99,
+    calculated_net_pay: float | None = None,
     is_modified: bool = False,
     paystub_storage_key: str | None = None,
     paystub_generated_at: str | None = None,
 ) -> dict[str, Any]:
     """Factory for creating payroll record test data."""
+    total_gross = (
+        gross_regular + gross_overtime + holiday_pay + holiday_premium_pay
+        + vacation_pay_paid + other_earnings
+    )
+    # Generated columns of payroll_records
+    net_pay = total_gross - (
+        cpp_employee + cpp_additional + ei_employee + federal_tax + provincial_tax
+        + other_deductions
+    )
     return {
         "id": record_id or str(uuid4()),
         "payroll_run_id": payroll_run_id,
@@ -252,6 +262,9 @@ def make_payroll_record(
         "other_deductions": other_deductions,
         "cpp_employer": cpp_employer,
         "ei_employer": ei_employer,
+        "total_gross": total_gross,
+        "net_pay": net_pay,
+        "calculated_net_pay": net_pay if calculated_net_pay is None else calculated_net_pay,
         "ytd_gross": gross_regular + gross_overtime,
         "ytd_cpp": cpp_employee,
         "ytd_ei": ei_employee,
@@ -330,6 +343,7 @@ class MockSupabaseClient:
     def __init__(self):
         self._tables: dict[str, list[dict[str, Any]]] = {}
         self._table_mocks: dict[str, MagicMock] = {}
+        self.rpc_calls: list[tuple[str, dict[str, Any]]] = []
 
     def set_table_data(self, table_name: str, data: list[dict[str, Any]]) -> None:
         """Set mock data for a specific table."""
@@ -345,6 +359,11 @@ class MockSupabaseClient:
         """Return a mock table with configured data."""
         return self.get_table_mock(name)
 
+    def rpc(self, name: str, params: dict[str, Any]) -> MagicMock:
+        """Record an RPC call and return a chainable mock."""
+        self.rpc_calls.append((name, params))
+        return MagicMock()
+
 
 @pytest.fixture
 def mock_supabase() -> MockSupabaseClient:
@@ -362,11 +381,13 @@ def mock_ytd_calculator() -> MagicMock:
     """Create a mock YtdCalculator."""
     calculator = MagicMock()
 
-    # Default: return empty YTD data
+    # Default: return empty YTD data and no completed runs
     calculator.get_prior_ytd_for_employees.return_value = {}
+    calculator.get_prior_run_versions.return_value = []
 
-    # Async method for getting YTD records
+    # Async methods for getting YTD records
     calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+    calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
     return calculator
 
@@ -454,9 +475,14 @@ def make_payroll_result(
     ei_employee: Decimal = Decimal("37.85"),
     federal_tax: Decimal = Decimal("200.00"),
     provincial_tax: Decimal = Decimal("150.00"),
+    rrsp: Decimal = Decimal("0"),
+    union_dues: Decimal = Decimal("0"),
+    garnishments: Decimal = Decimal("0"),
     other_deductions: Decimal = Decimal("0"),
     cpp_employer: Decimal = Decimal("100.00"),
     ei_employer: Decimal = Decimal("52.99"),
+    taxable_benefits: Decimal = Decimal("0"),
+    retroactive_pay: Decimal = Decimal("0"),
 ) -> MagicMock:
     """Factory for creating mock PayrollResult objects."""
     result = MagicMock()
@@ -473,13 +499,20 @@ def make_payroll_result(
     result.ei_employee = ei_employee
     result.federal_tax = federal_tax
     result.provincial_tax = provincial_tax
+    result.rrsp = rrsp
+    result.union_dues = union_dues
+    result.garnishments = garnishments
     result.other_deductions = other_deductions
     result.cpp_employer = cpp_employer
     result.ei_employer = ei_employer
 
     total_gross = gross_regular + gross_overtime + holiday_pay + holiday_premium_pay + vacation_pay + other_earnings
-    total_deductions = cpp_base + cpp_additional + ei_employee + federal_tax + provincial_tax + other_deductions
-    net_pay = total_gross - total_deductions
+    total_deductions = (
+        cpp_base + cpp_additional + ei_employee + federal_tax + provincial_tax
+        + rrsp + union_dues + garnishments + other_deductions
+    )
+    # Like the engine: taxable benefits and retroactive pay are paid out in net pay
+    net_pay = total_gross + taxable_benefits + retroactive_pay - total_deductions
 
     result.total_gross = total_gross
     result.net_pay = net_pay
@@ -220,7 +220,7 @@ class TestApproveRunSuccess:
         mock_supabase.table = MagicMock(return_value=mock_table)
 
         # Mock YTD calculator
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
@@ -247,6 +247,10 @@ class TestApproveRunSuccess:
             result = await run_operations.approve_run(sample_run_id)
 
         assert "paystubs_generated" in result
+        # Approved run is added to the YTD ledger
+        assert mock_supabase.rpc_calls == [
+            ("apply_payroll_run_to_ytd_ledger", {"p_run_id": str(sample_run_id)})
+        ]
 
     @pytest.mark.asyncio
     async def test_approve_with_logo_download(
@@ -296,7 +300,7 @@ class TestApproveRunSuccess:
         mock_table.execute.side_effect = mock_execute
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
@@ -345,7 +349,7 @@ class TestApproveRunSuccess:
         mock_table.single.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
@@ -409,7 +413,7 @@ class TestApproveRunSuccess:
         mock_table.single.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
@@ -472,7 +476,7 @@ class TestApproveRunWithApprovedBy:
         mock_table.single.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
@@ -535,7 +539,7 @@ class TestApproveRunPaystubErrors:
         mock_table.update.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
@@ -579,7 +583,7 @@ class TestApproveRunPaystubErrors:
         mock_table.update.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         # Mock PaystubDataBuilder to raise exception (now in paystub_orchestrator)
         mock_builder = MagicMock()
@@ -645,7 +649,7 @@ class TestApproveRunPaystubErrors:
         mock_table.update.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         mock_builder = MagicMock()
         mock_builder.build.return_value = MagicMock()
@@ -699,7 +703,7 @@ class TestApproveRunPaystubErrors:
         mock_table.single.return_value = mock_table
         mock_supabase.table = MagicMock(return_value=mock_table)
 
-        mock_ytd_calculator.get_ytd_records_for_employee = AsyncMock(return_value=[])
+        mock_ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
 
         patches = patch_paystub_services()
 
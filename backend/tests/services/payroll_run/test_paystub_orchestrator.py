@@ -0,0 +1,217 @@
+"""
+Tests for PaystubOrchestrator.generate_all_paystubs.
+
+Covers:
+- Upload concurrency bounded by PAYSTUB_CONCURRENCY
+- Rendered paystubs waiting for upload bounded by the pipeline cap
+- Per-stage timing
+- One bulk YTD lookup for the whole run
+- Per-record errors without stopping other paystubs
+- Process pool rendering and in-process fallback
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import get_config
+from app.services.payroll_run import paystub_orchestrator as orchestrator_module
+from app.services.payroll_run.paystub_orchestrator import PaystubOrchestrator
+
+from .conftest import MockSupabaseClient, make_employee, make_payroll_record, make_payroll_run
+
+
+class TrackingStorage:
+    """PaystubStorage stand-in that records peak concurrent uploads."""
+
+    def __init__(self, fail_record_ids: set[str] | None = None):
+        self.fail_record_ids = fail_record_ids or set()
+        self.in_flight = 0
+        self.peak = 0
+        self.saved: list[str] = []
+
+    async def save_paystub(self, *, pdf_bytes: bytes, record_id: str, **_: Any) -> str:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if record_id in self.fail_record_ids:
+                raise RuntimeError("upload failed")
+            self.saved.append(record_id)
+            return f"paystubs/{record_id}.pdf"
+        finally:
+            self.in_flight -= 1
+
+
+def _records(count: int) -> list[dict[str, Any]]:
+    records = []
+    for i in range(count):
+        employee_id = str(uuid4())
+        employee = make_employee(employee_id=employee_id, first_name=f"E{i}")
+        records.append(make_payroll_record(employee_id=employee_id, employee=employee))
+    return records
+
+
+@pytest.fixture
+def paystub_config(monkeypatch: pytest.MonkeyPatch):
+    config = get_config()
+    monkeypatch.setattr(config, "paystub_concurrency", 3)
+    monkeypatch.setattr(config, "paystub_render_pool_threshold", 0)
+    return config
+
+
+@pytest.fixture
+def make_orchestrator(mock_supabase: MockSupabaseClient):
+    ytd_calculator = MagicMock()
+    ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value={})
+
+    def _make(storage: TrackingStorage) -> PaystubOrchestrator:
+        with (
+            patch.object(orchestrator_module, "PaystubDataBuilder"),
+            patch.object(orchestrator_module, "PaystubGenerator") as generator_cls,
+        ):
+            generator_cls.return_value.generate_paystub_bytes.return_value = b"%PDF"
+            return PaystubOrchestrator(mock_supabase, ytd_calculator, storage)  # type: ignore[arg-type]
+
+    return _make
+
+
+class TestGenerateAllPaystubs:
+    """Tests for the concurrent paystub pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_uploads_bounded_by_concurrency(self, paystub_config, make_orchestrator):
+        storage = TrackingStorage()
+        orchestrator = make_orchestrator(storage)
+        records = _records(10)
+
+        generated, errors = await orchestrator.generate_all_paystubs(make_payroll_run(), records)
+
+        assert (generated, errors) == (10, [])
+        assert sorted(storage.saved) == sorted(r["id"] for r in records)
+        assert 1 < storage.peak <= 3
+
+    @pytest.mark.asyncio
+    async def test_rendered_paystubs_in_flight_bounded(self, paystub_config, make_orchestrator):
+        storage = TrackingStorage()
+        orchestrator = make_orchestrator(storage)
+        rendered: list[int] = []
+
+        def render(_paystub_data: Any) -> bytes:
+            # Paystubs rendered but not yet uploaded when this one renders
+            rendered.append(len(rendered) - len(storage.saved))
+            return b"%PDF"
+
+        orchestrator.paystub_generator.generate_paystub_bytes.side_effect = render
+
+        generated, _ = await orchestrator.generate_all_paystubs(make_payroll_run(), _records(40))
+
+        assert generated == 40
+        assert max(rendered) <= 3 * 4
+
+    @pytest.mark.asyncio
+    async def test_records_storage_key(
+        self, paystub_config, make_orchestrator, mock_supabase: MockSupabaseClient
+    ):
+        orchestrator = make_orchestrator(TrackingStorage())
+        [record] = _records(1)
+
+        await orchestrator.generate_all_paystubs(make_payroll_run(), [record])
+
+        table = mock_supabase.get_table_mock("payroll_records")
+        assert table.update.call_args.args[0]["paystub_storage_key"] == (
+            f"paystubs/{record['id']}.pdf"
+        )
+        table.update.return_value.eq.assert_called_once_with("id", record["id"])
+
+    @pytest.mark.asyncio
+    async def test_reports_stage_timing(self, paystub_config, make_orchestrator):
+        orchestrator = make_orchestrator(TrackingStorage())
+
+        await orchestrator.generate_all_paystubs(make_payroll_run(), _records(4))
+
+        timing = orchestrator.last_timing.to_dict()
+        assert timing["paystubs"] == 4
+        assert timing["render_mode"] == "in_process"
+        assert timing["concurrency"] == 3
+        assert timing["upload_seconds"] >= 4 * 0.01
+        assert timing["total_seconds"] >= timing["prefetch_seconds"]
+
+    @pytest.mark.asyncio
+    async def test_failures_reported_per_record(self, paystub_config, make_orchestrator):
+        records = _records(4)
+        records[1]["employees"]["companies"] = None
+        storage = TrackingStorage(fail_record_ids={records[2]["id"]})
+        orchestrator = make_orchestrator(storage)
+
+        generated, errors = await orchestrator.generate_all_paystubs(make_payroll_run(), records)
+
+        assert generated == 2
+        assert errors == [
+            f"Record {records[1]['id']}: missing company data",
+            f"Record {records[2]['id']}: upload failed",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_ytd_records_in_one_call(self, paystub_config, make_orchestrator):
+        orchestrator = make_orchestrator(TrackingStorage())
+        records = _records(5)
+        prior = {records[0]["employee_id"]: [MagicMock()]}
+        ytd_calculator = orchestrator.ytd_calculator
+        ytd_calculator.get_ytd_records_for_employees = AsyncMock(return_value=prior)
+
+        await orchestrator.generate_all_paystubs(make_payroll_run(pay_date="2026-01-09"), records)
+
+        ytd_calculator.get_ytd_records_for_employees.assert_awaited_once()
+        employee_ids, year, _ = ytd_calculator.get_ytd_records_for_employees.call_args.args
+        assert employee_ids == [r["employee_id"] for r in records]
+        assert year == 2026
+        build_calls = orchestrator.paystub_builder.build.call_args_list
+        assert build_calls[0].kwargs["ytd_records"] == prior[records[0]["employee_id"]]
+        assert build_calls[1].kwargs["ytd_records"] == []
+
+    @pytest.mark.asyncio
+    async def test_large_runs_render_on_pool(self, paystub_config, make_orchestrator):
+        paystub_config.paystub_render_pool_threshold = 2
+        orchestrator = make_orchestrator(TrackingStorage())
+
+        with (
+            ThreadPoolExecutor(max_workers=2) as pool,
+            patch.object(orchestrator_module, "get_payroll_process_pool", return_value=pool),
+            patch.object(orchestrator_module, "_render_paystub", return_value=(b"%PDF", 0.5)),
+        ):
+            generated, _ = await orchestrator.generate_all_paystubs(
+                make_payroll_run(), _records(3)
+            )
+
+        assert generated == 3
+        assert orchestrator.last_timing.render_mode == "process_pool"
+        assert orchestrator.last_timing.render_seconds == pytest.approx(1.5)
+        orchestrator.paystub_generator.generate_paystub_bytes.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_falls_back_in_process(self, paystub_config, make_orchestrator):
+        paystub_config.paystub_render_pool_threshold = 1
+        orchestrator = make_orchestrator(TrackingStorage())
+        pool = MagicMock()
+        pool.submit.side_effect = BrokenProcessPool()
+
+        with (
+            patch.object(orchestrator_module, "get_payroll_process_pool", return_value=pool),
+            patch.object(orchestrator_module, "shutdown_payroll_process_pool") as shutdown,
+        ):
+            generated, errors = await orchestrator.generate_all_paystubs(
+                make_payroll_run(), _records(2)
+            )
+
+        assert (generated, errors) == (2, [])
+        assert orchestrator.last_timing.render_mode == "in_process"
+        assert orchestrator.paystub_generator.generate_paystub_bytes.call_count == 2
+        shutdown.assert_called()
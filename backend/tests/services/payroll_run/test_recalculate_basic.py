@@ -76,8 +76,10 @@ class TestRecalculateRunBasic:
 
         # Verify run was returned
         assert result is not None
-        # Verify update was called on payroll_records
-        assert mock_table.update.called
+        # The record is staged and applied with the run totals in one RPC
+        assert mock_table.insert.called
+        [(_, params)] = mock_supabase.rpc_calls
+        assert params["p_run_totals"]["total_employees"] == 1
 
     @pytest.mark.asyncio
     async def test_hourly_employee(
@@ -186,5 +188,19 @@ class TestRecalculateRunBasic:
             result = await run_operations.recalculate_run(sample_run_id)
 
         assert result is not None
-        # Verify update was called for each employee record
-        assert mock_table.update.call_count >= 2
+        # Both employee records are staged together and applied in one RPC
+        staged = mock_table.insert.call_args.args[0]
+        assert {row["record_id"] for row in staged} == {r["id"] for r in records}
+        assert mock_supabase.rpc_calls == [
+            (
+                "apply_payroll_record_updates",
+                {
+                    "p_run_id": str(sample_run_id),
+                    "p_batch_id": staged[0]["batch_id"],
+                    "p_expected_count": 2,
+                    "p_run_totals": run_operations.result_persister.run_totals(
+                        payroll_results
+                    ),
+                },
+            )
+        ]
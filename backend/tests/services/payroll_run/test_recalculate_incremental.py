@@ -0,0 +1,398 @@
+"""
+Tests for PayrollRunOperations.recalculate_run incremental recalculation.
+
+Covers:
+- Records with unchanged inputs are skipped
+- Modified records and records whose inputs changed are recalculated
+- Run totals are adjusted by delta on a partial recalculation
+- full=True recalculates every record and re-sums the totals in the apply RPC
+- Holiday pay data (timesheets, earnings, sick leave) changes are detected
+- Prior YTD and holiday data are only loaded where they are needed
+- Inputs hash inputs
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.services.payroll.tax_config_repository import TaxConfigRepository
+from app.services.payroll_run.input_preparation import (
+    compute_inputs_hash,
+    run_inputs_context,
+)
+from app.services.payroll_run.run_operations import PayrollRunOperations
+
+from .conftest import (
+    make_employee,
+    make_payroll_record,
+    make_payroll_result,
+    make_payroll_run,
+)
+
+SK_HOLIDAYS = [{"holiday_date": "2025-01-10", "name": "Test Day", "province": "SK"}]
+
+
+def _hashed(
+    record: dict[str, Any],
+    run: dict[str, Any],
+    holidays: list[dict[str, Any]] | None = None,
+    holiday_inputs: str | None = None,
+) -> dict[str, Any]:
+    """Mark a record as calculated from its current inputs."""
+    record["inputs_hash"] = compute_inputs_hash(
+        record, run_inputs_context(run, 2025, holidays or []), holiday_inputs
+    )
+    return record
+
+
+@pytest.fixture
+def run(
+    sample_run_id: UUID,
+    mock_get_run_func: AsyncMock,
+    mock_supabase: MagicMock,
+) -> dict[str, Any]:
+    run = make_payroll_run(run_id=str(sample_run_id), status="draft")
+    mock_get_run_func.return_value = run
+
+    mock_table = MagicMock()
+    for method in ("select", "gte", "lte", "eq", "in_", "update", "insert"):
+        getattr(mock_table, method).return_value = mock_table
+    mock_table.execute.return_value = MagicMock(data=[])
+    mock_supabase.table = MagicMock(return_value=mock_table)
+    return run
+
+
+@pytest.fixture
+def holiday_digests(run_operations: PayrollRunOperations) -> dict[str, str]:
+    """The period holds an SK holiday; employee_digest answers from this dict."""
+    digests: dict[str, str] = {}
+    context = MagicMock()
+    context.employee_digest.side_effect = lambda employee_id: digests.get(
+        employee_id, "unchanged"
+    )
+    run_operations.input_preparer.get_holidays_in_period = AsyncMock(return_value=SK_HOLIDAYS)
+    run_operations.holiday_calculator.load_context.return_value = context
+    return digests
+
+
+def _records(sample_run_id: UUID, count: int) -> list[dict[str, Any]]:
+    records = []
+    for _ in range(count):
+        employee_id = str(uuid4())
+        records.append(make_payroll_record(
+            payroll_run_id=str(sample_run_id),
+            employee_id=employee_id,
+            employee=make_employee(employee_id=employee_id),
+            input_data={"regularHours": 80},
+        ))
+    return records
+
+
+class TestRecalculateIncremental:
+    """Tests for recalculating only the records whose inputs changed."""
+
+    @pytest.mark.asyncio
+    async def test_up_to_date_run_is_not_recalculated(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        patch_payroll_engine,
+    ):
+        records = [_hashed(r, run) for r in _records(sample_run_id, 3)]
+        mock_get_run_records_func.return_value = records
+
+        with patch_payroll_engine([]) as engine_cls:
+            result = await run_operations.recalculate_run(sample_run_id)
+
+        assert result == run
+        engine_cls.return_value.calculate_batch.assert_not_called()
+        assert mock_supabase.rpc_calls == []
+
+    @pytest.mark.asyncio
+    async def test_only_changed_records_recalculated(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        patch_payroll_engine,
+    ):
+        records = [_hashed(r, run) for r in _records(sample_run_id, 3)]
+        records[0]["is_modified"] = True
+        records[1]["input_data"] = {"regularHours": 72}
+        mock_get_run_records_func.return_value = records
+
+        results = [
+            make_payroll_result(employee_id=records[0]["employee_id"]),
+            make_payroll_result(employee_id=records[1]["employee_id"]),
+        ]
+        with patch_payroll_engine(results) as engine_cls:
+            await run_operations.recalculate_run(sample_run_id)
+
+        inputs = engine_cls.return_value.calculate_batch.call_args.args[0]
+        assert {i.employee_id for i in inputs} == {
+            records[0]["employee_id"], records[1]["employee_id"]
+        }
+        staged = mock_supabase.table.return_value.insert.call_args.args[0]
+        assert {row["record_id"] for row in staged} == {records[0]["id"], records[1]["id"]}
+        assert staged[1]["payload"]["inputs_hash"] == compute_inputs_hash(
+            records[1], run_inputs_context(run, 2025, [])
+        )
+        # Prior YTD is loaded for the recalculated records only
+        ytd_calculator = run_operations.ytd_calculator
+        assert ytd_calculator.get_prior_ytd_for_employees.call_args.args[0] == [
+            records[0]["employee_id"], records[1]["employee_id"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_partial_recalculation_applies_total_deltas(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        patch_payroll_engine,
+    ):
+        records = [_hashed(r, run) for r in _records(sample_run_id, 2)]
+        records[0]["is_modified"] = True
+        mock_get_run_records_func.return_value = records
+
+        # Stored record: gross 2307.69, tax 200 + 150; recalculated: +100 gross, +20 tax
+        result = make_payroll_result(
+            employee_id=records[0]["employee_id"],
+            gross_regular=Decimal("2407.69"),
+            federal_tax=Decimal("220.00"),
+        )
+        result.bonus_earnings = Decimal("0")
+        with patch_payroll_engine([result]):
+            await run_operations.recalculate_run(sample_run_id)
+
+        ((name, params),) = mock_supabase.rpc_calls
+        assert name == "apply_payroll_record_updates"
+        assert params["p_expected_count"] == 1
+        deltas = params["p_total_deltas"]
+        assert deltas["total_gross"] == pytest.approx(100.0)
+        assert deltas["total_federal_tax"] == pytest.approx(20.0)
+        assert deltas["total_net_pay"] == pytest.approx(80.0)
+        assert deltas["total_cpp_employee"] == 0
+        # Totals are not re-summed from the recalculated subset
+        run_updates = [
+            c.args[0] for c in mock_supabase.table.return_value.update.call_args_list
+            if "total_employees" in c.args[0]
+        ]
+        assert run_updates == []
+
+    @pytest.mark.asyncio
+    async def test_full_recalculates_every_record(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        patch_payroll_engine,
+    ):
+        records = [_hashed(r, run) for r in _records(sample_run_id, 2)]
+        mock_get_run_records_func.return_value = records
+
+        results = [make_payroll_result(employee_id=r["employee_id"]) for r in records]
+        with patch_payroll_engine(results):
+            updated = await run_operations.recalculate_run(sample_run_id, full=True)
+
+        assert updated["calculation_timing"]["mode"] == "in_process"
+        assert updated["calculation_timing"]["size"] == 2
+        ((_, params),) = mock_supabase.rpc_calls
+        assert params["p_expected_count"] == 2
+        assert "p_total_deltas" not in params
+        # Totals are re-summed and written by the apply RPC, in the same transaction
+        assert params["p_run_totals"]["total_employees"] == 2
+        assert params["p_run_totals"]["total_gross"] == pytest.approx(
+            float(sum(r.total_gross for r in results))
+        )
+        run_updates = [
+            c.args[0] for c in mock_supabase.table.return_value.update.call_args_list
+            if "total_employees" in c.args[0]
+        ]
+        assert run_updates == []
+
+    @pytest.mark.asyncio
+    async def test_pay_date_change_recalculates_every_record(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        patch_payroll_engine,
+    ):
+        records = [_hashed(r, run) for r in _records(sample_run_id, 2)]
+        mock_get_run_records_func.return_value = records
+        run["pay_date"] = "2025-01-24"
+
+        results = [make_payroll_result(employee_id=r["employee_id"]) for r in records]
+        with patch_payroll_engine(results):
+            await run_operations.recalculate_run(sample_run_id)
+
+        assert mock_supabase.rpc_calls[0][1]["p_expected_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_prior_run_change_recalculates_every_record(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        patch_payroll_engine,
+    ):
+        records = [_hashed(r, run) for r in _records(sample_run_id, 2)]
+        mock_get_run_records_func.return_value = records
+        # An earlier run of the year was approved since the last calculation
+        run_operations.ytd_calculator.get_prior_run_versions.return_value = [
+            {"id": str(uuid4()), "status": "approved", "updated_at": "2025-01-03T10:00:00"}
+        ]
+
+        results = [make_payroll_result(employee_id=r["employee_id"]) for r in records]
+        with patch_payroll_engine(results):
+            await run_operations.recalculate_run(sample_run_id)
+
+        assert mock_supabase.rpc_calls[0][1]["p_expected_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_holiday_data_loaded_for_holiday_province_only(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        holiday_digests: dict[str, str],
+        patch_payroll_engine,
+    ):
+        records = _records(sample_run_id, 2)
+        records[1]["employees"]["province_of_employment"] = "ON"
+        _hashed(records[0], run, SK_HOLIDAYS, "unchanged")
+        _hashed(records[1], run, SK_HOLIDAYS)
+        mock_get_run_records_func.return_value = records
+
+        with patch_payroll_engine([]):
+            await run_operations.recalculate_run(sample_run_id)
+
+        load_context = run_operations.holiday_calculator.load_context
+        assert load_context.call_args.args[0] == [records[0]["employee_id"]]
+        run_operations.ytd_calculator.get_prior_ytd_for_employees.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_holiday_data_change_recalculates_employee(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        holiday_digests: dict[str, str],
+        patch_payroll_engine,
+    ):
+        records = [
+            _hashed(r, run, SK_HOLIDAYS, "unchanged") for r in _records(sample_run_id, 3)
+        ]
+        mock_get_run_records_func.return_value = records
+        # A sick day inside the holiday lookback was recorded since the last calculation
+        holiday_digests[records[1]["employee_id"]] = "sick leave added"
+
+        with patch_payroll_engine([make_payroll_result(employee_id=records[1]["employee_id"])]) \
+                as engine_cls:
+            await run_operations.recalculate_run(sample_run_id)
+
+        inputs = engine_cls.return_value.calculate_batch.call_args.args[0]
+        assert [i.employee_id for i in inputs] == [records[1]["employee_id"]]
+        # The holiday data loaded for the hash is reused for the calculation
+        run_operations.holiday_calculator.prefetch.assert_not_called()
+        run_operations.holiday_calculator.load_context.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_unloadable_holiday_data_recalculates_holiday_employees(
+        self,
+        run_operations: PayrollRunOperations,
+        mock_get_run_records_func: AsyncMock,
+        mock_supabase: MagicMock,
+        sample_run_id: UUID,
+        run: dict[str, Any],
+        holiday_digests: dict[str, str],
+        patch_payroll_engine,
+    ):
+        records = _records(sample_run_id, 2)
+        records[1]["employees"]["province_of_employment"] = "ON"
+        records = [_hashed(r, run, SK_HOLIDAYS, "unchanged") for r in records]
+        _hashed(records[1], run, SK_HOLIDAYS)
+        mock_get_run_records_func.return_value = records
+        run_operations.holiday_calculator.load_context.return_value = None
+
+        with patch_payroll_engine([make_payroll_result(employee_id=records[0]["employee_id"])]) \
+                as engine_cls:
+            await run_operations.recalculate_run(sample_run_id)
+
+        inputs = engine_cls.return_value.calculate_batch.call_args.args[0]
+        assert [i.employee_id for i in inputs] == [records[0]["employee_id"]]
+
+
+class TestComputeInputsHash:
+    """Tests for compute_inputs_hash."""
+
+    def test_stable_for_same_inputs(self):
+        record = make_payroll_record(input_data={"regularHours": 80, "overtimeHours": 2})
+        reordered = {**record, "input_data": {"overtimeHours": 2, "regularHours": 80}}
+        context = run_inputs_context(make_payroll_run(), 2025, [])
+
+        assert compute_inputs_hash(record, context) == compute_inputs_hash(reordered, context)
+
+    def test_changes_with_employee_and_prior_runs(self):
+        record = make_payroll_record()
+        run = make_payroll_run()
+        context = run_inputs_context(run, 2025, [])
+        baseline = compute_inputs_hash(record, context)
+
+        raised = {**record, "employees": {**record["employees"], "annual_salary": 99000}}
+        assert compute_inputs_hash(raised, context) != baseline
+        prior_run = [{"id": str(uuid4()), "status": "approved", "updated_at": "2025-01-03"}]
+        assert compute_inputs_hash(
+            record, run_inputs_context(run, 2025, [], prior_run)
+        ) != baseline
+
+    def test_ignores_other_provinces_holidays(self):
+        record = make_payroll_record(employee=make_employee(province="ON"))
+        run = make_payroll_run()
+        baseline = compute_inputs_hash(record, run_inputs_context(run, 2025, []))
+
+        bc_holiday = [{"holiday_date": "2025-01-06", "province": "BC"}]
+        on_holiday = [{"holiday_date": "2025-01-06", "province": "ON"}]
+        assert compute_inputs_hash(record, run_inputs_context(run, 2025, bc_holiday)) == baseline
+        assert compute_inputs_hash(record, run_inputs_context(run, 2025, on_holiday)) != baseline
+
+    def test_changes_with_tax_tables(self):
+        record = make_payroll_record()
+        run = make_payroll_run()
+        baseline = compute_inputs_hash(record, run_inputs_context(run, 2025, []))
+
+        with patch.object(TaxConfigRepository, "snapshot_version", return_value="reloaded"):
+            reloaded = compute_inputs_hash(record, run_inputs_context(run, 2025, []))
+
+        assert reloaded != baseline
+
+    def test_changes_with_holiday_inputs(self):
+        record = make_payroll_record()
+        context = run_inputs_context(make_payroll_run(), 2025, SK_HOLIDAYS)
+        baseline = compute_inputs_hash(record, context, "digest-a")
+
+        assert compute_inputs_hash(record, context, "digest-a") == baseline
+        assert compute_inputs_hash(record, context, "digest-b") != baseline
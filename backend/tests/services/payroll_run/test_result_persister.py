@@ -0,0 +1,192 @@
+"""
+Tests for PayrollResultPersister.persist_results.
+
+Covers:
+- Chunked staging plus a single apply RPC
+- Discarding the staged batch when staging or applying fails
+- Per-record updates when chunking is disabled
+- Run totals re-summed in the apply RPC for a full recalculation
+- Run total deltas for a partial recalculation, equal to re-summing the run
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.payroll_run.result_persister import STAGING_TABLE, PayrollResultPersister
+
+from .conftest import MockSupabaseClient, make_payroll_record, make_payroll_result
+
+RUN_ID = "d1e2f3a4-b5c6-7890-defa-234567890123"
+
+
+def _run(count: int) -> tuple[list[Any], dict[str, dict[str, Any]]]:
+    employee_ids = [str(uuid4()) for _ in range(count)]
+    results = [make_payroll_result(employee_id=emp_id) for emp_id in employee_ids]
+    record_map = {
+        emp_id: make_payroll_record(employee_id=emp_id, input_data={"regularHours": 80})
+        for emp_id in employee_ids
+    }
+    return results, record_map
+
+
+class TestPersistResults:
+    """Tests for bulk persistence of calculation results."""
+
+    def test_stages_in_chunks_and_applies_once(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=2)
+        results, record_map = _run(5)
+
+        persister.persist_results(RUN_ID, results, record_map, {})
+
+        staging = mock_supabase.get_table_mock(STAGING_TABLE)
+        chunks = [call.args[0] for call in staging.insert.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        staged = [row for chunk in chunks for row in chunk]
+        assert [row["record_id"] for row in staged] == [
+            record_map[r.employee_id]["id"] for r in results
+        ]
+        assert {row["batch_id"] for row in staged} == {staged[0]["batch_id"]}
+        assert mock_supabase.rpc_calls == [
+            (
+                "apply_payroll_record_updates",
+                {"p_run_id": RUN_ID, "p_batch_id": staged[0]["batch_id"], "p_expected_count": 5},
+            )
+        ]
+        assert not mock_supabase.get_table_mock("payroll_records").update.called
+
+    def test_payload_matches_record_columns(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=10)
+        results, record_map = _run(1)
+
+        persister.persist_results(RUN_ID, results, record_map, {})
+
+        [row] = mock_supabase.get_table_mock(STAGING_TABLE).insert.call_args.args[0]
+        assert row["payroll_run_id"] == RUN_ID
+        assert row["user_id"] == record_map[results[0].employee_id]["user_id"]
+        assert row["payload"]["gross_regular"] == float(results[0].gross_regular)
+        assert row["payload"]["regular_hours_worked"] == 80
+        assert row["payload"]["is_modified"] is False
+
+    def test_failed_apply_discards_batch(self, mock_supabase: MockSupabaseClient):
+        mock_supabase.rpc = MagicMock(side_effect=RuntimeError("updated 1 of 2 records"))
+        persister = PayrollResultPersister(mock_supabase, chunk_size=10)
+        results, record_map = _run(2)
+
+        with pytest.raises(RuntimeError):
+            persister.persist_results(RUN_ID, results, record_map, {})
+
+        staging = mock_supabase.get_table_mock(STAGING_TABLE)
+        batch_id = staging.insert.call_args.args[0][0]["batch_id"]
+        staging.delete.return_value.eq.assert_called_once_with("batch_id", batch_id)
+
+    def test_chunk_size_zero_updates_each_record(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=0)
+        results, record_map = _run(3)
+
+        persister.persist_results(RUN_ID, results, record_map, {})
+
+        assert mock_supabase.get_table_mock("payroll_records").update.call_count == 3
+        assert mock_supabase.rpc_calls == []
+
+    def test_chunk_size_zero_applies_total_deltas(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=0)
+        results, record_map = _run(1)
+        results[0].bonus_earnings = 0
+        employee_id = results[0].employee_id
+        record_map[employee_id] = make_payroll_record(employee_id=employee_id, federal_tax=180.0)
+
+        persister.persist_results(RUN_ID, results, record_map, {}, adjust_run_totals=True)
+
+        [(name, params)] = mock_supabase.rpc_calls
+        assert name == "apply_payroll_run_total_deltas"
+        assert params["p_run_id"] == RUN_ID
+        assert params["p_deltas"]["total_federal_tax"] == pytest.approx(20.0)
+        assert params["p_deltas"]["total_net_pay"] == pytest.approx(-20.0)
+
+
+    def test_replace_run_totals_passes_totals_to_apply(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=10)
+        results, record_map = _run(2)
+
+        persister.persist_results(RUN_ID, results, record_map, {}, replace_run_totals=True)
+
+        [(name, params)] = mock_supabase.rpc_calls
+        assert name == "apply_payroll_record_updates"
+        assert params["p_run_totals"] == persister.run_totals(results)
+        assert params["p_run_totals"]["total_employees"] == 2
+        assert not mock_supabase.get_table_mock("payroll_runs").update.called
+
+
+class TestRunTotals:
+    """Tests for run totals of full and partial recalculations."""
+
+    @staticmethod
+    def _stored(record: dict[str, Any], result: Any, persister: PayrollResultPersister) -> dict:
+        """The record as stored after persisting result (generated columns included)."""
+        payload = persister._build_record_update(result, record, {})
+        stored = {**record, **payload}
+        stored["total_gross"] = float(result.total_gross)
+        stored["net_pay"] = stored["total_gross"] - sum(
+            stored[column]
+            for column in (
+                "cpp_employee", "cpp_additional", "ei_employee", "federal_tax",
+                "provincial_tax", "other_deductions",
+            )
+        )
+        return stored
+
+    def test_partial_totals_equal_full_totals(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=10)
+        plain_id, benefits_id = str(uuid4()), str(uuid4())
+        plain = make_payroll_result(employee_id=plain_id)
+        first = make_payroll_result(
+            employee_id=benefits_id,
+            taxable_benefits=Decimal("250.00"),
+            retroactive_pay=Decimal("400.00"),
+            rrsp=Decimal("75.00"),
+            union_dues=Decimal("20.00"),
+        )
+        second = make_payroll_result(
+            employee_id=benefits_id,
+            federal_tax=Decimal("260.00"),
+            taxable_benefits=Decimal("300.00"),
+            retroactive_pay=Decimal("100.00"),
+            rrsp=Decimal("75.00"),
+            garnishments=Decimal("50.00"),
+        )
+        for result in (plain, first, second):
+            result.bonus_earnings = Decimal("0")
+        stored = self._stored(make_payroll_record(employee_id=benefits_id), first, persister)
+
+        persister.update_run_totals(RUN_ID, [plain, first])
+        before = mock_supabase.get_table_mock("payroll_runs").update.call_args.args[0]
+        persister.persist_results(
+            RUN_ID, [second], {benefits_id: stored}, {}, adjust_run_totals=True
+        )
+        [(_, params)] = mock_supabase.rpc_calls
+        persister.update_run_totals(RUN_ID, [plain, second])
+        full = mock_supabase.get_table_mock("payroll_runs").update.call_args.args[0]
+
+        for column, delta in params["p_total_deltas"].items():
+            assert before[column] + delta == pytest.approx(full[column])
+        assert params["p_total_deltas"]["total_net_pay"] == pytest.approx(-340.0)
+
+    def test_stages_engine_net_pay_and_deductions(self, mock_supabase: MockSupabaseClient):
+        persister = PayrollResultPersister(mock_supabase, chunk_size=10)
+        results, record_map = _run(1)
+        results[0].rrsp = Decimal("75.00")
+        results[0].net_pay = Decimal("1500.00")
+
+        persister.persist_results(RUN_ID, results, record_map, {})
+
+        [row] = mock_supabase.get_table_mock(STAGING_TABLE).insert.call_args.args[0]
+        assert row["payload"]["rrsp"] == 75.0
+        assert row["payload"]["union_dues"] == 0.0
+        assert row["payload"]["garnishments"] == 0.0
+        assert row["payload"]["calculated_net_pay"] == 1500.0
@@ -0,0 +1,275 @@
+"""
+Tests for the employee YTD ledger.
+
+Covers:
+- Applying missing completed runs before reading the ledger
+- Prior YTD from ledger rows, excluding the current run when it is applied
+- Query count independent of the number of prior pay periods
+- Falling back to summing payroll records when the ledger fails
+- Drift verification and repair
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.payroll_run.ytd_calculator import YtdCalculator
+from app.services.payroll_run.ytd_ledger import LEDGER_RUNS_TABLE, LEDGER_TABLE, YtdLedger
+
+USER_ID = "c1d2e3f4-a5b6-7890-cdef-123456789012"
+COMPANY_ID = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
+EMP_1 = "e1f2a3b4-c5d6-7890-efab-345678901234"
+EMP_2 = "e2f2a3b4-c5d6-7890-efab-345678901234"
+
+
+class FakeQuery:
+    """Chainable query over in-memory rows; nested (payroll_runs.*) filters are ignored."""
+
+    def __init__(self, db: FakeDatabase, table: str):
+        self.db = db
+        self.table = table
+        self.rows = list(db.tables.get(table, []))
+        self._range: tuple[int, int] | None = None
+
+    def select(self, *_: Any) -> FakeQuery:
+        return self
+
+    def eq(self, column: str, value: Any) -> FakeQuery:
+        if "." not in column:
+            self.rows = [r for r in self.rows if r.get(column) == value]
+        return self
+
+    def neq(self, column: str, value: Any) -> FakeQuery:
+        self.rows = [r for r in self.rows if r.get(column) != value]
+        return self
+
+    def in_(self, column: str, values: list[Any]) -> FakeQuery:
+        if "." not in column:
+            self.rows = [r for r in self.rows if r.get(column) in values]
+        return self
+
+    def gte(self, *_: Any) -> FakeQuery:
+        return self
+
+    def lte(self, *_: Any) -> FakeQuery:
+        return self
+
+    def order(self, *_: Any) -> FakeQuery:
+        return self
+
+    def range(self, start: int, end: int) -> FakeQuery:
+        self._range = (start, end)
+        return self
+
+    def upsert(self, rows: list[dict[str, Any]], **_: Any) -> FakeQuery:
+        self.db.upserts.append((self.table, rows))
+        return self
+
+    def execute(self) -> MagicMock:
+        self.db.queries.append(self.table)
+        rows = self.rows
+        if self._range is not None:
+            rows = rows[self._range[0] : self._range[1] + 1]
+        return MagicMock(data=rows)
+
+
+class FakeDatabase:
+    """Supabase client stand-in recording queries and RPC calls."""
+
+    def __init__(self, tables: dict[str, list[dict[str, Any]]]):
+        self.tables = tables
+        self.queries: list[str] = []
+        self.upserts: list[tuple[str, list[dict[str, Any]]]] = []
+        self.rpc_calls: list[tuple[str, dict[str, Any]]] = []
+        self.ledger_error: Exception | None = None
+
+    def table(self, name: str) -> FakeQuery:
+        if self.ledger_error and name == LEDGER_RUNS_TABLE:
+            raise self.ledger_error
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict[str, Any]) -> MagicMock:
+        self.rpc_calls.append((name, params))
+        return MagicMock(execute=MagicMock(return_value=MagicMock(data=1)))
+
+
+def _ledger_row(employee_id: str, **totals: float) -> dict[str, Any]:
+    row: dict[str, Any] = {
+        "employee_id": employee_id,
+        "company_id": COMPANY_ID,
+        "tax_year": 2025,
+        "record_count": 1,
+    }
+    row.update(totals)
+    return row
+
+
+def _record(employee_id: str, run_id: str, **amounts: float) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "id": f"rec-{employee_id[:4]}-{run_id}",
+        "employee_id": employee_id,
+        "payroll_run_id": run_id,
+        "user_id": USER_ID,
+        "company_id": COMPANY_ID,
+    }
+    record.update(amounts)
+    return record
+
+
+def _run(run_id: str) -> dict[str, Any]:
+    return {"id": run_id, "user_id": USER_ID, "company_id": COMPANY_ID, "status": "approved"}
+
+
+def _applied(run_id: str) -> dict[str, Any]:
+    return {"payroll_run_id": run_id, "company_id": COMPANY_ID, "tax_year": 2025}
+
+
+def _calculator(db: FakeDatabase) -> YtdCalculator:
+    return YtdCalculator(db, USER_ID, COMPANY_ID, use_ledger=True)
+
+
+class TestPriorYtdFromLedger:
+    """Tests for YtdCalculator.get_prior_ytd_for_employees with the ledger."""
+
+    def test_reads_ledger_rows(self):
+        db = FakeDatabase({
+            "payroll_runs": [_run("run-1")],
+            LEDGER_RUNS_TABLE: [_applied("run-1")],
+            LEDGER_TABLE: [
+                _ledger_row(
+                    EMP_1, gross=2000, bonus_earnings=500, sick_pay_paid=100,
+                    cpp_employee=115, cpp_additional=10, ei_employee=32.8,
+                    federal_tax=200, provincial_tax=100, net_pay=1542.2,
+                )
+            ],
+        })
+
+        result = _calculator(db).get_prior_ytd_for_employees([EMP_1, EMP_2], "run-draft", 2025)
+
+        assert result[EMP_1]["ytd_gross"] == Decimal("2000")
+        assert result[EMP_1]["ytd_bonus_earnings"] == Decimal("500")
+        assert result[EMP_1]["ytd_pensionable_earnings"] == Decimal("2600")
+        assert result[EMP_1]["ytd_insurable_earnings"] == Decimal("2600")
+        assert result[EMP_1]["ytd_cpp"] == Decimal("115")
+        assert result[EMP_1]["ytd_cpp_additional"] == Decimal("10")
+        assert result[EMP_1]["ytd_ei"] == Decimal("32.8")
+        assert result[EMP_1]["ytd_net_pay"] == Decimal("1542.2")
+        assert all(value == 0 for value in result[EMP_2].values())
+        assert db.rpc_calls == []
+
+    def test_merges_initial_ytd(self):
+        db = FakeDatabase({
+            "employees": [{
+                "id": EMP_1, "user_id": USER_ID, "company_id": COMPANY_ID,
+                "initial_ytd_cpp": "1000.00", "initial_ytd_cpp2": "50.00",
+                "initial_ytd_ei": "300.00", "initial_ytd_year": 2025,
+            }],
+            LEDGER_TABLE: [_ledger_row(EMP_1, cpp_employee=115, cpp_additional=10, ei_employee=32.8)],
+        })
+
+        result = _calculator(db).get_prior_ytd_for_employees([EMP_1], "run-draft", 2025)
+
+        assert result[EMP_1]["ytd_cpp"] == Decimal("1115.00")
+        assert result[EMP_1]["ytd_cpp_additional"] == Decimal("60.00")
+        assert result[EMP_1]["ytd_ei"] == Decimal("332.80")
+
+    def test_applies_missing_completed_runs(self):
+        db = FakeDatabase({
+            "payroll_runs": [_run("run-1"), _run("run-2")],
+            LEDGER_RUNS_TABLE: [_applied("run-1")],
+        })
+
+        _calculator(db).get_prior_ytd_for_employees([EMP_1], "run-draft", 2025)
+
+        assert db.rpc_calls == [("apply_payroll_run_to_ytd_ledger", {"p_run_id": "run-2"})]
+
+    def test_excludes_current_run_when_applied(self):
+        db = FakeDatabase({
+            "payroll_runs": [_run("run-1"), _run("run-2")],
+            LEDGER_RUNS_TABLE: [_applied("run-1"), _applied("run-2")],
+            LEDGER_TABLE: [_ledger_row(EMP_1, gross=5000, cpp_employee=250, federal_tax=500)],
+            "payroll_records": [
+                _record(EMP_1, "run-1", gross_regular=2000, cpp_employee=100, federal_tax=200),
+                _record(EMP_1, "run-2", gross_regular=2500, holiday_pay=500,
+                        cpp_employee=150, federal_tax=300),
+            ],
+        })
+
+        result = _calculator(db).get_prior_ytd_for_employees([EMP_1], "run-2", 2025)
+
+        assert result[EMP_1]["ytd_gross"] == Decimal("2000")
+        assert result[EMP_1]["ytd_cpp"] == Decimal("100")
+        assert result[EMP_1]["ytd_federal_tax"] == Decimal("200")
+
+    @pytest.mark.parametrize("periods", [1, 26, 52])
+    def test_query_count_independent_of_periods(self, periods):
+        run_ids = [f"run-{i}" for i in range(periods)]
+        db = FakeDatabase({
+            "payroll_runs": [_run(run_id) for run_id in run_ids],
+            LEDGER_RUNS_TABLE: [_applied(run_id) for run_id in run_ids],
+            LEDGER_TABLE: [_ledger_row(EMP_1, gross=2000 * periods)],
+            "payroll_records": [_record(EMP_1, run_id, gross_regular=2000) for run_id in run_ids],
+        })
+
+        result = _calculator(db).get_prior_ytd_for_employees([EMP_1], "run-draft", 2025)
+
+        assert result[EMP_1]["ytd_gross"] == Decimal(2000 * periods)
+        assert "payroll_records" not in db.queries
+        assert len(db.queries) == 4  # employees, payroll_runs, ytd_ledger_runs, ledger
+
+    def test_falls_back_to_records_when_ledger_fails(self):
+        db = FakeDatabase({
+            "payroll_records": [
+                _record(EMP_1, "run-1", gross_regular=2000, sick_pay_paid=100, net_pay=1500),
+            ],
+        })
+        db.ledger_error = RuntimeError('relation "ytd_ledger_runs" does not exist')
+
+        result = _calculator(db).get_prior_ytd_for_employees([EMP_1], "run-draft", 2025)
+
+        assert result[EMP_1]["ytd_gross"] == Decimal("2000")
+        assert result[EMP_1]["ytd_pensionable_earnings"] == Decimal("2100")
+        assert result[EMP_1]["ytd_net_pay"] == Decimal("1500")
+
+
+class TestVerifyLedger:
+    """Tests for YtdLedger.verify."""
+
+    def test_no_drift(self):
+        db = FakeDatabase({
+            "payroll_runs": [_run("run-1")],
+            LEDGER_RUNS_TABLE: [_applied("run-1")],
+            LEDGER_TABLE: [_ledger_row(EMP_1, gross=2500, cpp_employee=100)],
+            "payroll_records": [
+                _record(EMP_1, "run-1", gross_regular=2000, gross_overtime=500, cpp_employee=100),
+            ],
+        })
+
+        report = YtdLedger(db, USER_ID, COMPANY_ID).verify(2025)
+
+        assert report.employees_checked == 1
+        assert not report.has_drift
+        assert db.upserts == []
+
+    def test_reports_and_repairs_drift(self):
+        db = FakeDatabase({
+            "payroll_runs": [_run("run-1")],
+            LEDGER_RUNS_TABLE: [_applied("run-1")],
+            LEDGER_TABLE: [_ledger_row(EMP_1, gross=2400), _ledger_row(EMP_2, gross=100)],
+            "payroll_records": [_record(EMP_1, "run-1", gross_regular=2500)],
+        })
+
+        report = YtdLedger(db, USER_ID, COMPANY_ID).verify(2025, repair=True)
+
+        drifts = {(d.employee_id, d.field): d.to_dict() for d in report.drifts}
+        assert set(drifts) == {(EMP_1, "gross"), (EMP_2, "gross"), (EMP_2, "record_count")}
+        assert drifts[(EMP_1, "gross")]["difference"] == -100.0
+        assert report.repaired == 2
+        [(table, rows)] = db.upserts
+        assert table == LEDGER_TABLE
+        assert {row["employee_id"]: row["gross"] for row in rows} == {EMP_1: 2500.0, EMP_2: 0.0}
+        assert report.to_dict()["has_drift"] is True
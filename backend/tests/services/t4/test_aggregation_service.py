@@ -14,7 +14,7 @@ from uuid import UUID, uuid4
 import pytest
 
 from app.models.payroll import Company, Employee, Province
-from app.services.t4.aggregation_service import T4AggregationService
+from app.services.t4.aggregation_service import T4AggregationService, T4YearTotals
 
 
 # =============================================================================
@@ -593,7 +593,7 @@ class TestGenerateAllT4Slips:
 
     @pytest.mark.asyncio
     async def test_generate_all_handles_aggregate_exception(self, service, mock_supabase, sample_company_data):
-        """Test that exceptions during aggregate_employee_year are handled gracefully (lines 300-302)."""
+        """Test that an exception building one employee's slip is handled gracefully."""
         company_response = MagicMock()
         company_response.data = sample_company_data
 
@@ -629,8 +629,11 @@ class TestGenerateAllT4Slips:
             updated_at="2024-01-01T00:00:00Z",
         )
 
-        with patch.object(service, "get_employees_with_payroll", return_value=[employee]), \
-             patch.object(service, "aggregate_employee_year", side_effect=Exception("Aggregation failed")):
+        year = T4YearTotals(by_employee={TEST_EMPLOYEE_ID: service._aggregate_records([])})
+
+        with patch.object(service, "aggregate_year", return_value=year), \
+             patch.object(service, "get_employees", return_value=[employee]), \
+             patch.object(service, "_build_slip", side_effect=Exception("Aggregation failed")):
             # Should handle exception and return empty list
             slips = await service.generate_all_t4_slips(TEST_TAX_YEAR)
 
@@ -707,6 +710,128 @@ class TestGenerateAllT4Slips:
         assert len(slips) == 0
 
 
+# =============================================================================
+# Test: single-pass year aggregation
+# =============================================================================
+
+
+class _YearSupabase:
+    """Supabase stand-in: range-paginated payroll_records, employees by id."""
+
+    def __init__(self, company: dict, employees: list[dict], records: list[dict]):
+        self.company = company
+        self.employees = {e["id"]: e for e in employees}
+        self.records = records
+        self.queries: list[str] = []
+
+    def table(self, name):
+        query = MagicMock()
+        state: dict = {}
+        for method in ("select", "eq", "gte", "lte", "order", "maybe_single"):
+            getattr(query, method).return_value = query
+        query.in_.side_effect = lambda col, values: state.update({col: values}) or query
+        query.range.side_effect = lambda lo, hi: state.update(range=(lo, hi)) or query
+
+        def execute():
+            self.queries.append(name)
+            if name == "companies":
+                return MagicMock(data=self.company)
+            if name == "employees":
+                return MagicMock(data=[self.employees[i] for i in state["id"] if i in self.employees])
+            lo, hi = state["range"]
+            return MagicMock(data=self.records[lo : hi + 1])
+
+        query.execute.side_effect = execute
+        return query
+
+
+class TestAggregateYear:
+    """Tests for aggregate_year and bulk generate_all_t4_slips."""
+
+    @pytest.fixture
+    def year_data(self, sample_company_data, sample_employee_data, sample_payroll_record):
+        employee_ids = [str(uuid4()) for _ in range(3)]
+        employees = [
+            {**sample_employee_data, "id": eid, "first_name": f"Emp{i}"}
+            for i, eid in enumerate(employee_ids)
+        ]
+        # Employee i has i + 1 records; 6 records in all
+        records = [
+            {**sample_payroll_record, "id": f"rec-{i}-{n}", "employee_id": eid}
+            for i, eid in enumerate(employee_ids)
+            for n in range(i + 1)
+        ]
+        return _YearSupabase(sample_company_data, employees, records), employee_ids
+
+    @pytest.fixture
+    def bulk_service(self, year_data):
+        db, _ = year_data
+        with patch("app.services.t4.aggregation_service.AGGREGATION_PAGE_SIZE", 4), \
+             patch(
+                 "app.services.t4.aggregation_service.decrypt_sins",
+                 side_effect=lambda values: ["046454286"] * len(values),
+             ) as mock_decrypt:
+            service = T4AggregationService(db, TEST_USER_ID, TEST_COMPANY_ID)
+            service.mock_decrypt = mock_decrypt
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_aggregate_year_pages_records_once(self, bulk_service, year_data, sample_payroll_record):
+        db, employee_ids = year_data
+
+        year = await bulk_service.aggregate_year(TEST_TAX_YEAR)
+
+        assert year.record_count == 6
+        assert year.query_count == 2
+        assert list(year.by_employee) == employee_ids
+        single = bulk_service._aggregate_records([sample_payroll_record])
+        assert year.by_employee[employee_ids[2]]["employment_income"] == single["employment_income"] * 3
+        assert year.cpp_employer == single["cpp_employer"] * 6
+        assert year.ei_employer == single["ei_employer"] * 6
+
+        await bulk_service.aggregate_year(TEST_TAX_YEAR)
+        assert db.queries.count("payroll_records") == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_all_query_count_independent_of_employees(self, bulk_service, year_data):
+        db, employee_ids = year_data
+
+        slips = await bulk_service.generate_all_t4_slips(TEST_TAX_YEAR)
+        summary = await bulk_service.generate_t4_summary(TEST_TAX_YEAR, slips)
+
+        assert [str(s.employee_id) for s in slips] == employee_ids
+        assert [s.box_14_employment_income for s in slips] == [
+            Decimal("2650.00") * n for n in (1, 2, 3)
+        ]
+        bulk_service.mock_decrypt.assert_called_once()
+        # 2 record pages, 1 employee chunk, company lookups; no per-employee queries
+        assert db.queries.count("payroll_records") == 2
+        assert db.queries.count("employees") == 1
+        assert summary.total_number_of_t4_slips == 3
+        assert summary.total_cpp_employer == Decimal("900.00")
+        assert summary.total_ei_employer == Decimal("336.00")
+
+    @pytest.mark.asyncio
+    async def test_generate_all_filters_employee_ids(self, bulk_service, year_data):
+        _, employee_ids = year_data
+
+        slips = await bulk_service.generate_all_t4_slips(
+            TEST_TAX_YEAR, employee_ids=[UUID(employee_ids[1])]
+        )
+
+        assert [str(s.employee_id) for s in slips] == [employee_ids[1]]
+
+    @pytest.mark.asyncio
+    async def test_generate_all_skips_missing_employee_and_failed_sin(self, bulk_service, year_data):
+        db, employee_ids = year_data
+        del db.employees[employee_ids[0]]
+        bulk_service.mock_decrypt.side_effect = lambda values: [None] + ["046454286"] * (len(values) - 1)
+
+        slips = await bulk_service.generate_all_t4_slips(TEST_TAX_YEAR)
+
+        assert [str(s.employee_id) for s in slips] == [employee_ids[2]]
+
+
 # =============================================================================
 # Test: generate_t4_summary
 # =============================================================================
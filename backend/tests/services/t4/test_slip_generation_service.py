@@ -0,0 +1,240 @@
+"""
+Tests for T4 Slip Generation Service
+
+Tests for the render/upload/save pipeline, skipping and resuming.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.models.t4 import T4GenerationJobStatus, T4SlipData
+from app.services.t4.slip_generation_service import T4SlipGenerationService
+
+TEST_USER_ID = "test-user-id-12345"
+TEST_COMPANY_ID = str(uuid4())
+TEST_TAX_YEAR = 2025
+MODULE = "app.services.t4.slip_generation_service"
+
+
+def _slip(employee_id: UUID) -> T4SlipData:
+    return T4SlipData(
+        employee_id=employee_id,
+        tax_year=TEST_TAX_YEAR,
+        sin="046454286",
+        employee_first_name="John",
+        employee_last_name="Doe",
+        employer_name="Test Company",
+        employer_account_number="123456789RP0001",
+        province_of_employment="ON",
+        box_14_employment_income=Decimal("50000.00"),
+        box_22_income_tax_deducted=Decimal("8500.00"),
+    )
+
+
+class _SlipTable:
+    """Supabase stand-in for t4_slips: paginated reads, recorded upserts."""
+
+    def __init__(self, stored: dict[str, str | None] | None = None, fail_upsert: bool = False):
+        self.stored = stored or {}
+        self.fail_upsert = fail_upsert
+        self.upserts: list[list[dict]] = []
+
+    def table(self, name):
+        assert name == "t4_slips"
+        query = MagicMock()
+        state: dict = {}
+        for method in ("select", "eq", "order"):
+            getattr(query, method).return_value = query
+        query.range.side_effect = lambda lo, hi: state.update(range=(lo, hi)) or query
+
+        def upsert(rows, on_conflict):
+            assert on_conflict == "company_id,employee_id,tax_year,amendment_number"
+            state["upsert"] = rows
+            return query
+
+        query.upsert.side_effect = upsert
+
+        def execute():
+            if "upsert" in state:
+                if self.fail_upsert:
+                    raise RuntimeError("upsert failed")
+                self.upserts.append(state["upsert"])
+                return MagicMock(data=state["upsert"])
+            lo, hi = state["range"]
+            rows = [
+                {"employee_id": eid, "pdf_generated_at": at}
+                for eid, at in sorted(self.stored.items())
+            ]
+            return MagicMock(data=rows[lo : hi + 1])
+
+        query.execute.side_effect = execute
+        return query
+
+
+class _Storage:
+    """Storage stand-in that tracks uploads in flight."""
+
+    def __init__(self, fail_for: set[str] | None = None):
+        self.fail_for = fail_for or set()
+        self.active = 0
+        self.peak = 0
+        self.keys: list[str] = []
+
+    async def save_t4_slip(self, pdf_bytes, company_name, tax_year, employee_id):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        if str(employee_id) in self.fail_for:
+            raise RuntimeError("upload failed")
+        key = f"t4/{tax_year}/T4_{employee_id}.pdf"
+        self.keys.append(key)
+        return key
+
+
+@pytest.fixture
+def config():
+    with patch(f"{MODULE}.get_config") as mock_config:
+        mock_config.return_value = MagicMock(t4_concurrency=3, t4_render_pool_threshold=0)
+        yield mock_config.return_value
+
+
+def _service(slips, db, storage=None):
+    aggregation = MagicMock()
+    aggregation.generate_all_t4_slips = AsyncMock(return_value=slips)
+    pdf_generator = MagicMock()
+    pdf_generator.generate_t4_slip_pdf.return_value = b"%PDF-1.4 test"
+    return T4SlipGenerationService(
+        supabase=db,
+        user_id=TEST_USER_ID,
+        company_id=TEST_COMPANY_ID,
+        aggregation=aggregation,
+        storage=storage,
+        pdf_generator=pdf_generator,
+    )
+
+
+COMPANY = MagicMock(company_name="Test Company")
+
+
+class TestGenerate:
+    """Tests for T4SlipGenerationService.generate."""
+
+    async def test_saves_in_chunks_with_bounded_uploads(self, config):
+        slips = [_slip(uuid4()) for _ in range(25)]
+        db, storage = _SlipTable(), _Storage()
+
+        with patch(f"{MODULE}.T4_SLIP_WRITE_CHUNK", 10):
+            progress = await _service(slips, db, storage).generate(COMPANY, TEST_TAX_YEAR)
+
+        assert progress.status == T4GenerationJobStatus.COMPLETED
+        assert (progress.slips, progress.total) == (25, 25)
+        assert progress.rendered == progress.uploaded == progress.saved == 25
+        assert [len(rows) for rows in db.upserts] == [10, 10, 5]
+        assert storage.peak <= 3
+        row = db.upserts[0][0]
+        assert row["status"] == "generated"
+        assert row["amendment_number"] == 0
+        assert row["pdf_storage_key"].startswith("t4/2025/")
+        assert "employee_full_name" not in row["slip_data"]
+
+    async def test_no_slips(self, config):
+        progress = await _service([], _SlipTable()).generate(COMPANY, TEST_TAX_YEAR)
+
+        assert progress.slips == 0
+        assert progress.status == T4GenerationJobStatus.COMPLETED
+
+    async def test_skips_stored_slips_unless_regenerating(self, config):
+        slips = [_slip(uuid4()) for _ in range(4)]
+        stored = {str(slips[0].employee_id): None, str(slips[1].employee_id): None}
+
+        progress = await _service(slips, _SlipTable(stored)).generate(COMPANY, TEST_TAX_YEAR)
+        assert (progress.skipped, progress.saved) == (2, 2)
+
+        progress = await _service(slips, _SlipTable(stored)).generate(
+            COMPANY, TEST_TAX_YEAR, regenerate=True
+        )
+        assert (progress.skipped, progress.saved) == (0, 4)
+
+    async def test_resume_skips_slips_generated_since(self, config):
+        slips = [_slip(uuid4()) for _ in range(3)]
+        interrupted_at = datetime(2026, 2, 1, 9, 0, tzinfo=timezone.utc)
+        stored = {
+            str(slips[0].employee_id): (interrupted_at + timedelta(minutes=5)).isoformat(),
+            str(slips[1].employee_id): (interrupted_at - timedelta(days=30)).isoformat(),
+        }
+        db = _SlipTable(stored)
+
+        progress = await _service(slips, db).generate(
+            COMPANY, TEST_TAX_YEAR, regenerate=True, resume_from=interrupted_at
+        )
+
+        assert progress.skipped == 1
+        saved = {row["employee_id"] for rows in db.upserts for row in rows}
+        assert saved == {str(slips[1].employee_id), str(slips[2].employee_id)}
+
+    async def test_failed_upload_is_reported_per_employee(self, config):
+        slips = [_slip(uuid4()) for _ in range(3)]
+        failing = str(slips[1].employee_id)
+
+        progress = await _service(slips, _SlipTable(), _Storage({failing})).generate(
+            COMPANY, TEST_TAX_YEAR
+        )
+
+        assert (progress.saved, progress.failed) == (2, 1)
+        assert progress.errors == [{"employee_id": failing, "message": "upload failed"}]
+
+    async def test_failed_chunk_counts_each_slip(self, config):
+        slips = [_slip(uuid4()) for _ in range(3)]
+
+        progress = await _service(slips, _SlipTable(fail_upsert=True)).generate(
+            COMPANY, TEST_TAX_YEAR
+        )
+
+        assert (progress.saved, progress.failed) == (0, 3)
+        assert len(progress.errors) == 3
+
+    async def test_aggregation_error_marks_failed(self, config):
+        service = _service([], _SlipTable())
+        service.aggregation.generate_all_t4_slips.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await service.generate(COMPANY, TEST_TAX_YEAR)
+
+    async def test_renders_on_pool_above_threshold(self, config):
+        config.t4_render_pool_threshold = 2
+        slips = [_slip(uuid4()) for _ in range(3)]
+        service = _service(slips, _SlipTable())
+
+        with ThreadPoolExecutor(2) as pool, \
+             patch(f"{MODULE}.get_payroll_process_pool", return_value=pool), \
+             patch(f"{MODULE}._render_t4_slip", return_value=b"%PDF pooled"):
+            progress = await service.generate(COMPANY, TEST_TAX_YEAR)
+
+        assert progress.render_mode == "process_pool"
+        assert progress.saved == 3
+        service.pdf_generator.generate_t4_slip_pdf.assert_not_called()
+
+    async def test_broken_pool_falls_back_in_process(self, config):
+        config.t4_render_pool_threshold = 1
+        slips = [_slip(uuid4()) for _ in range(2)]
+        service = _service(slips, _SlipTable())
+        pool = MagicMock()
+        pool.submit.side_effect = BrokenProcessPool("worker died")
+
+        with patch(f"{MODULE}.get_payroll_process_pool", return_value=pool), \
+             patch(f"{MODULE}.shutdown_payroll_process_pool"):
+            progress = await service.generate(COMPANY, TEST_TAX_YEAR)
+
+        assert progress.render_mode == "in_process"
+        assert progress.saved == 2
+
@@ -319,6 +319,28 @@ class TestSaveT4XML:
         service.s3_client.put_object.assert_called_once()
 
 
+    @pytest.mark.asyncio
+    async def test_save_t4_xml_file(self, service: T4StorageService, tmp_path):
+        """Test uploading one submission of a split T4 XML from disk."""
+        path = tmp_path / "T4_123456789RP0001_2025_2.xml"
+        path.write_text('<?xml version="1.0"?><T4>test</T4>')
+
+        result = await service.save_t4_xml_file(
+            path,
+            company_name="Acme Corp",
+            tax_year=2025,
+            payroll_account="123456789RP0001",
+            part=2,
+        )
+
+        assert result == "payroll/Acme_Corp/t4/2025/T4_123456789RP0001_2025_2.xml"
+        service.s3_client.upload_file.assert_called_once()
+        args, kwargs = service.s3_client.upload_file.call_args
+        assert args == (str(path), "bucket", result)
+        assert kwargs["ExtraArgs"]["Metadata"]["part"] == "2"
+        service.s3_client.put_object.assert_not_called()
+
+
 class TestGeneratePresignedUrl:
     """Tests for generate_presigned_url method."""
 
@@ -461,6 +483,19 @@ class TestGetFileContent:
         assert result == b"file content"
         service.s3_client.get_object.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_iter_file_content(self, service: T4StorageService):
+        """Test streaming file content in chunks."""
+        mock_body = MagicMock()
+        mock_body.read.side_effect = [b"<Return>", b"</Return>", b""]
+        service.s3_client.get_object.return_value = {"Body": mock_body}
+
+        chunks = [c async for c in service.iter_file_content("test/key.xml", chunk_size=8)]
+
+        assert chunks == [b"<Return>", b"</Return>"]
+        mock_body.read.assert_called_with(8)
+        mock_body.close.assert_called_once()
+
 
 class TestFileExistsErrorHandling:
     """Tests for file_exists error handling."""
@@ -6,7 +6,10 @@ Tests for generating CRA T619 XML format for T4 electronic filing.
 
 from __future__ import annotations
 
+import io
+import xml.etree.ElementTree as ET
 from decimal import Decimal
+from unittest.mock import patch
 from uuid import UUID, uuid4
 
 import pytest
@@ -332,28 +335,110 @@ class TestGenerateXmlFilename:
 
 
 # =============================================================================
-# Test: _prettify
+# Test: Streaming and splitting
 # =============================================================================
 
 
-class TestPrettify:
-    """Tests for XML prettification."""
+def _many_slips(sample_slip: T4SlipData, count: int) -> list[T4SlipData]:
+    return [
+        sample_slip.model_copy(update={"employee_id": uuid4(), "sin": f"{100000000 + i}"})
+        for i in range(count)
+    ]
 
-    def test_prettify_adds_declaration(self, generator):
-        """Test prettify adds XML declaration."""
-        simple_xml = "<root><child>test</child></root>"
-        result = generator._prettify(simple_xml)
 
-        assert '<?xml version="1.0"' in result
-        assert "encoding=" in result
+def _elements(xml: str | bytes) -> list[tuple[str, str]]:
+    return [(el.tag, (el.text or "").strip()) for el in ET.fromstring(xml).iter()]
 
-    def test_prettify_indents(self, generator):
-        """Test prettify adds indentation."""
-        simple_xml = "<root><child>test</child></root>"
-        result = generator._prettify(simple_xml)
 
-        # Should have newlines and indentation
-        assert "\n" in result
+class TestStreamingXml:
+    """Tests for streamed XML output."""
+
+    def test_pretty_output_is_indented(self, generator, sample_summary, sample_slip):
+        xml = generator.generate_xml(sample_summary, [sample_slip])
+
+        assert xml.startswith('<?xml version="1.0" encoding="UTF-8"?>\n')
+        assert "\n      <T4Slip>\n        <SlipNumber>1</SlipNumber>" in xml
+
+    def test_compact_output_matches_pretty(self, generator, sample_summary, sample_slip):
+        pretty = generator.generate_xml(sample_summary, [sample_slip])
+        compact = generator.generate_xml(sample_summary, [sample_slip], pretty=False)
+
+        assert "\n" not in compact
+        assert _elements(compact.encode()) == _elements(pretty.encode())
+
+    def test_iter_xml_yields_chunks(self, generator, sample_summary, sample_slip):
+        slips = _many_slips(sample_slip, 20)
+
+        with patch("app.services.t4.xml_generator.XML_CHUNK_SIZE", 2048):
+            chunks = list(generator.iter_xml(sample_summary, slips))
+
+        assert len(chunks) > 1
+        assert b"".join(chunks).decode() == generator.generate_xml(sample_summary, slips)
+
+    def test_write_xml_returns_bytes_written(self, generator, sample_summary, sample_slip):
+        out = io.BytesIO()
+
+        written = generator.write_xml(sample_summary, [sample_slip], out)
+
+        assert written == len(out.getvalue())
+        assert out.getvalue().decode() == generator.generate_xml(sample_summary, [sample_slip])
+
+    async def test_aiter_xml(self, generator, sample_summary, sample_slip):
+        chunks = [c async for c in generator.aiter_xml(sample_summary, [sample_slip])]
+
+        assert b"".join(chunks).decode() == generator.generate_xml(sample_summary, [sample_slip])
+
+
+class TestSplitSubmissions:
+    """Tests for splitting a return across submissions."""
+
+    def test_fits_in_one_submission(self, generator, sample_summary, sample_slip):
+        parts = generator.split_submissions(sample_summary, [sample_slip], 1024 * 1024)
+
+        assert parts == [(sample_summary, [sample_slip])]
+
+    def test_splits_by_size(self, generator, sample_summary, sample_slip):
+        slips = _many_slips(sample_slip, 10)
+        max_bytes = 6000
+
+        parts = generator.split_submissions(sample_summary, slips, max_bytes)
+
+        assert len(parts) > 1
+        assert [s for _, part in parts for s in part] == slips
+        for part_summary, part in parts:
+            assert part_summary.total_number_of_t4_slips == len(part)
+            assert len(b"".join(generator.iter_xml(part_summary, part))) <= max_bytes
+
+    def test_part_totals_add_up(self, generator, sample_summary, sample_slip):
+        slips = _many_slips(sample_slip, 7)
+
+        parts = generator.split_submissions(sample_summary, slips, 6000)
+        summaries = [part_summary for part_summary, _ in parts]
+
+        assert sum(s.total_employment_income for s in summaries) == Decimal("350000.00")
+        assert sum(s.total_cpp_employer for s in summaries) == sample_summary.total_cpp_employer
+        assert sum(s.total_ei_employer for s in summaries) == sample_summary.total_ei_employer
+
+    def test_slip_larger_than_limit(self, generator, sample_summary, sample_slip):
+        with pytest.raises(ValueError):
+            generator.split_submissions(sample_summary, [sample_slip], 2000)
+
+    def test_write_submissions(self, generator, sample_summary, sample_slip, tmp_path):
+        slips = _many_slips(sample_slip, 10)
+
+        paths = generator.write_submissions(sample_summary, slips, tmp_path, max_bytes=6000)
+
+        assert len(paths) > 1
+        assert paths[0].name == f"T4_123456789RP0001_{TEST_TAX_YEAR}_1.xml"
+        total = sum(len(ET.parse(path).getroot().findall(".//{*}T4Slip")) for path in paths)
+        assert total == 10
+
+    def test_write_single_submission(self, generator, sample_summary, sample_slip, tmp_path):
+        with patch("app.services.t4.xml_generator.get_config") as mock_config:
+            mock_config.return_value.t4_xml_max_bytes = 1024 * 1024
+            paths = generator.write_submissions(sample_summary, [sample_slip], tmp_path)
+
+        assert [p.name for p in paths] == [f"T4_123456789RP0001_{TEST_TAX_YEAR}.xml"]
 
 
 # =============================================================================
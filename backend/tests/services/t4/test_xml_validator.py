@@ -1201,3 +1201,86 @@ class TestAdditionalScenarios:
         # InvalidOperation is now caught - validation should complete gracefully
         result = validator.validate(xml)
         assert result is not None
+
+
+# =============================================================================
+# Test: Streaming Validation
+# =============================================================================
+
+
+def _many_slips_xml(count: int, bad_slip: int | None = None) -> str:
+    """Namespaced T4 XML with `count` identical slips, one optionally with a bad SIN."""
+    current_year = datetime.now().year
+    slips = "".join(
+        f"""<T4Slip><Employee><SIN>{"123456789" if i == bad_slip else "046454286"}</SIN>
+<FirstName>John</FirstName><LastName>Doe</LastName></Employee>
+<T4Amounts><Box14>100</Box14><Box22>10</Box22></T4Amounts></T4Slip>"""
+        for i in range(1, count + 1)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Return xmlns="http://www.cra-arc.gc.ca/xmlns/t4">
+<Transmitter><TransmitterNumber>MM123456</TransmitterNumber><TransmitterName>Test</TransmitterName></Transmitter>
+<T4><T4Summary><BusinessNumber>123456789</BusinessNumber><EmployerName>Test</EmployerName>
+<TotalSlips>{count}</TotalSlips><TotalEmploymentIncome>{count * 100}</TotalEmploymentIncome>
+<TotalIncomeTaxDeducted>{count * 10}</TotalIncomeTaxDeducted><TaxYear>{current_year}</TaxYear></T4Summary>
+<T4Slips>{slips}</T4Slips></T4></Return>"""
+
+
+class TestStreamingValidation:
+    """Tests for chunked, single-pass validation."""
+
+    def test_chunked_matches_whole_document(self, validator):
+        xml = _many_slips_xml(50, bad_slip=37)
+        data = xml.encode()
+
+        whole = validator.validate(xml)
+        chunked = validator.validate_chunks(data[i : i + 7] for i in range(0, len(data), 7))
+
+        assert chunked == whole
+        assert [e.field for e in chunked.errors] == ["T4Slip[37]/Employee/SIN"]
+        assert chunked.warnings == []
+
+    async def test_validate_async(self, validator, valid_xml):
+        async def chunks():
+            data = valid_xml.encode()
+            for i in range(0, len(data), 100):
+                yield data[i : i + 100]
+
+        result = await validator.validate_async(chunks())
+
+        assert result.is_valid is True
+
+    def test_processed_slips_are_freed(self, validator):
+        stream = validator.stream()
+        xml = _many_slips_xml(20)
+
+        split = xml.index("</T4Slips>")
+        stream.feed(xml[:split])
+
+        slips_section = stream._elements[-1]
+        assert len(slips_section) == 0
+        assert stream._slip_count == 20
+
+        stream.feed(xml[split:])
+        assert stream.close().is_valid is True
+
+    def test_summary_after_slips(self, validator, simple_valid_xml):
+        summary = simple_valid_xml[
+            simple_valid_xml.index("<T4Summary>") : simple_valid_xml.index("</T4Summary>") + 12
+        ]
+        xml = simple_valid_xml.replace(summary, "").replace("</T4Slips>", "</T4Slips>" + summary)
+
+        result = validator.validate(xml)
+
+        assert result.is_valid is True
+        assert result.warnings == []
+
+    def test_parse_error_mid_stream(self, validator):
+        stream = validator.stream()
+        stream.feed("<Return><T4>")
+        stream.feed("</Return>")
+        stream.feed("<more/>")
+
+        result = stream.close()
+
+        assert [e.code for e in result.errors] == ["XML_PARSE_ERROR"]
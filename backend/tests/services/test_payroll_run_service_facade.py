@@ -428,7 +428,7 @@ class TestDelegatedMethods:
 
         result = await service.recalculate_run(run_id)
 
-        service._run_ops.recalculate_run.assert_called_once_with(run_id)
+        service._run_ops.recalculate_run.assert_called_once_with(run_id, full=False)
 
     @pytest.mark.asyncio
     async def test_finalize_run_delegates(self, service):
@@ -0,0 +1,176 @@
+"""
+Tests for SIN key rotation service.
+
+Tests that employees are streamed page by page, that only SINs under an old
+key are written back, that a run can be resumed, and that the
+tools.rotate_sin_keys CLI runs a rotation end to end.
+"""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cryptography.fernet import Fernet
+
+from app.core.security import SecurityManager
+from app.services.sin_key_rotation_service import SinKeyRotationService
+from tools import rotate_sin_keys
+
+NEW_KEY = Fernet.generate_key()
+OLD_KEY = Fernet.generate_key()
+
+
+class _Employees:
+    """Supabase stand-in: keyset-paginated employees and the rotation RPC."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = {row["id"]: dict(row) for row in rows}
+        self.pages = 0
+        self.rpc_calls: list[list[dict]] = []
+
+    def table(self, _name):
+        query = MagicMock()
+        state: dict = {}
+        query.select.return_value = query
+        query.not_.is_.return_value = query
+        query.neq.return_value = query
+        query.order.return_value = query
+        query.gt.side_effect = lambda _col, value: state.update(after=value) or query
+        query.limit.side_effect = lambda n: state.update(limit=n) or query
+
+        def execute():
+            self.pages += 1
+            ids = sorted(i for i in self.rows if i > state.get("after", ""))
+            return MagicMock(data=[dict(self.rows[i]) for i in ids[: state["limit"]]])
+
+        query.execute.side_effect = execute
+        return query
+
+    def rpc(self, name, params):
+        assert name == "rotate_employee_sins"
+        updates = params["p_updates"]
+        self.rpc_calls.append(updates)
+
+        def execute():
+            applied = 0
+            for u in updates:
+                row = self.rows[u["id"]]
+                if row["sin_encrypted"] == u["old_sin"]:
+                    row["sin_encrypted"] = u["new_sin"]
+                    applied += 1
+            return MagicMock(data=applied)
+
+        return MagicMock(execute=execute)
+
+
+@pytest.fixture
+def rotation_keys():
+    SecurityManager._fernet = None
+    SecurityManager._primary_fernet = None
+    config = MagicMock(
+        encryption_key=f"{NEW_KEY.decode()},{OLD_KEY.decode()}", crypto_max_workers=2
+    )
+    with patch("app.core.security.get_config", return_value=config):
+        yield
+    SecurityManager._fernet = None
+    SecurityManager._primary_fernet = None
+
+
+def _employees(n: int, current_every: int = 0) -> list[dict]:
+    rows = []
+    for i in range(n):
+        key = NEW_KEY if current_every and i % current_every == 0 else OLD_KEY
+        rows.append({
+            "id": f"emp-{i:04d}",
+            "sin_encrypted": Fernet(key).encrypt(f"{i:09d}".encode()).decode(),
+        })
+    return rows
+
+
+class TestSinKeyRotationService:
+    """Tests for SinKeyRotationService.rotate_all."""
+
+    async def test_rotates_all_pages(self, rotation_keys):
+        db = _Employees(_employees(25, current_every=5))
+
+        stats = await SinKeyRotationService(db, page_size=10).rotate_all()
+
+        assert stats["scanned"] == 25
+        assert stats["rotated"] == 20
+        assert stats["already_current"] == 5
+        assert stats["failed"] == 0
+        assert stats["last_id"] == "emp-0024"
+        assert db.pages == 3
+        assert len(db.rpc_calls) == 3
+        new = Fernet(NEW_KEY)
+        for i, row in enumerate(sorted(db.rows.values(), key=lambda r: r["id"])):
+            assert new.decrypt(row["sin_encrypted"].encode()) == f"{i:09d}".encode()
+
+    async def test_second_run_writes_nothing(self, rotation_keys):
+        db = _Employees(_employees(12))
+        service = SinKeyRotationService(db, page_size=5)
+        await service.rotate_all()
+        db.rpc_calls.clear()
+
+        stats = await service.rotate_all()
+
+        assert stats["already_current"] == 12
+        assert stats["rotated"] == 0
+        assert db.rpc_calls == []
+
+    async def test_resumes_after_id(self, rotation_keys):
+        db = _Employees(_employees(10))
+
+        stats = await SinKeyRotationService(db, page_size=4).rotate_all(start_after="emp-0005")
+
+        assert stats["scanned"] == 4
+        assert stats["rotated"] == 4
+
+    async def test_undecryptable_and_conflicting_sins_are_counted(self, rotation_keys):
+        rows = _employees(4)
+        rows[1]["sin_encrypted"] = Fernet(Fernet.generate_key()).encrypt(b"x").decode()
+        db = _Employees(rows)
+        original_rpc = db.rpc
+
+        def rpc_with_concurrent_edit(name, params):
+            db.rows["emp-0002"]["sin_encrypted"] = "edited-meanwhile"
+            return original_rpc(name, params)
+
+        db.rpc = rpc_with_concurrent_edit
+
+        stats = await SinKeyRotationService(db, page_size=10).rotate_all()
+
+        assert stats["failed"] == 1
+        assert stats["rotated"] == 2
+        assert stats["conflicts"] == 1
+        assert db.rows["emp-0002"]["sin_encrypted"] == "edited-meanwhile"
+
+
+class TestRotateSinKeysCli:
+    """Tests for the tools.rotate_sin_keys entry point."""
+
+    def test_rotates_paged_employees_end_to_end(self, rotation_keys, capsys):
+        db = _Employees(_employees(23, current_every=4))
+
+        with patch.object(rotate_sin_keys, "get_supabase_admin_client", return_value=db):
+            code = rotate_sin_keys.main(["--page-size", "5"])
+
+        assert code == 0
+        stats = json.loads(capsys.readouterr().out)
+        assert stats["scanned"] == 23
+        assert stats["rotated"] == 17
+        assert stats["already_current"] == 6
+        assert stats["last_id"] == "emp-0022"
+        assert db.pages == 5
+        new = Fernet(NEW_KEY)
+        for i, row in enumerate(sorted(db.rows.values(), key=lambda r: r["id"])):
+            assert new.decrypt(row["sin_encrypted"].encode()) == f"{i:09d}".encode()
+
+    def test_requires_service_role_client(self, rotation_keys, capsys):
+        with patch.object(rotate_sin_keys, "get_supabase_admin_client", return_value=None):
+            code = rotate_sin_keys.main([])
+
+        assert code == 1
+        assert "SUPABASE_SERVICE_ROLE_KEY" in capsys.readouterr().err
@@ -21,3 +21,19 @@ def test_health_check(client: TestClient):
     assert data["success"] is True
     assert data["data"]["status"] == "healthy"
     assert "version" in data["data"]
+
+
+def test_health_metrics(client: TestClient):
+    """Test metrics endpoint exposes cache counters and connection pool usage"""
+    response = client.get("/health/metrics")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["success"] is True
+    registry = data["data"]["calculator_registry"]
+    assert {"size", "max_size", "hits", "misses", "hit_rate", "by_kind"} <= registry.keys()
+    assert {"size", "max_size", "hits", "misses", "hit_rate", "invalidations"} <= data["data"]["result_cache"].keys()
+    assert {"load_count", "reload_count", "loaded_years"} <= data["data"]["tax_config"].keys()
+    assert {"max_connections", "open_connections", "requests"} <= data["data"]["supabase_pool"].keys()
+    assert {"size", "max_size", "hits", "misses"} <= data["data"]["token_cache"].keys()
+    assert {"backend", "workers", "running", "submitted", "failed"} <= data["data"]["jobs"].keys()
@@ -0,0 +1,151 @@
+"""Tests for business day and statutory holiday utilities."""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.payroll_run.holiday_pay.work_day_tracker import WorkDayTracker
+from app.utils.business_days import HolidayCalendar, count_business_days, count_weekday
+
+ORIGIN = date(2025, 1, 1)
+
+HOLIDAYS = [
+    {"holiday_date": "2025-01-01", "province": "ON"},
+    {"holiday_date": "2025-07-01", "province": "ON"},
+    {"holiday_date": "2025-11-11", "province": "ON"},
+    {"holiday_date": "2025-12-25", "province": "ON"},
+    {"holiday_date": "2025-12-27", "province": "ON"},  # Saturday
+    {"holiday_date": "2026-01-01", "province": "ON"},
+    {"holiday_date": "2025-07-01", "province": "bc"},
+    {"holiday_date": "2025-08-04", "province": "BC"},
+    {"holiday_date": "2025-08-04", "province": "BC"},  # Duplicate row
+    {"holiday_date": None, "province": "BC"},
+    {"holiday_date": "2025-09-01", "province": None},
+]
+
+
+def _ranges():
+    for start_offset in range(0, 15):
+        for length in range(0, 40):
+            start = ORIGIN + timedelta(days=start_offset)
+            yield start, start + timedelta(days=length)
+
+
+def _days(start: date, end: date) -> list[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days)]
+
+
+class TestCountWeekdays:
+    """Closed-form counts against a day-by-day loop."""
+
+    def test_business_days_match_loop(self):
+        for start, end in _ranges():
+            expected = sum(1 for d in _days(start, end) if d.weekday() < 5)
+            assert count_business_days(start, end) == expected
+
+    @pytest.mark.parametrize("weekday", range(7))
+    def test_weekday_matches_loop(self, weekday):
+        for start, end in _ranges():
+            expected = sum(1 for d in _days(start, end) if d.weekday() == weekday)
+            assert count_weekday(weekday, start, end) == expected
+
+    def test_empty_and_reversed_ranges(self):
+        assert count_business_days(ORIGIN, ORIGIN) == 0
+        assert count_business_days(ORIGIN, ORIGIN - timedelta(days=10)) == 0
+        assert count_weekday(0, ORIGIN, ORIGIN - timedelta(days=10)) == 0
+
+    def test_full_year(self):
+        assert count_business_days(date(2025, 1, 1), date(2026, 1, 1)) == 261
+
+
+class TestHolidayCalendar:
+    """Per-province holiday range queries."""
+
+    @pytest.fixture
+    def calendar(self):
+        return HolidayCalendar(HOLIDAYS)
+
+    def test_provinces_normalized(self, calendar):
+        assert calendar.provinces == ["BC", "ON"]
+
+    def test_holidays_between(self, calendar):
+        assert calendar.holidays_between("on", date(2025, 7, 1), date(2025, 12, 26)) == [
+            date(2025, 7, 1), date(2025, 11, 11), date(2025, 12, 25),
+        ]
+        assert calendar.holidays_between("BC", date(2025, 1, 1), date(2026, 1, 1)) == [
+            date(2025, 7, 1), date(2025, 8, 4),
+        ]
+        assert calendar.holidays_between("AB", date(2025, 1, 1), date(2026, 1, 1)) == []
+
+    def test_end_is_exclusive(self, calendar):
+        assert calendar.count_holidays("ON", date(2025, 6, 1), date(2025, 7, 1)) == 0
+        assert calendar.count_holidays("ON", date(2025, 7, 1), date(2025, 7, 2)) == 1
+
+    def test_business_days_only(self, calendar):
+        start, end = date(2025, 12, 1), date(2026, 1, 1)
+
+        assert calendar.count_holidays("ON", start, end) == 1
+        assert calendar.count_holidays("ON", start, end, business_days_only=False) == 2
+
+    def test_is_holiday(self, calendar):
+        assert calendar.is_holiday("BC", date(2025, 8, 4))
+        assert not calendar.is_holiday("ON", date(2025, 8, 4))
+
+    def test_count_work_days_matches_loop(self, calendar):
+        holidays = {date.fromisoformat(h["holiday_date"]) for h in HOLIDAYS[:6]}
+        for start_offset in range(0, 365, 11):
+            start = ORIGIN + timedelta(days=start_offset)
+            end = start + timedelta(days=45)
+            expected = sum(
+                1 for d in _days(start, end) if d.weekday() < 5 and d not in holidays
+            )
+            assert calendar.count_work_days("ON", start, end) == expected
+
+    def test_reversed_range(self, calendar):
+        assert calendar.count_holidays("ON", date(2026, 1, 2), date(2025, 1, 1)) == 0
+
+
+class TestWorkDayTrackerHolidayCalendar:
+    """WorkDayTracker counts statutory holidays from a per-year calendar."""
+
+    @staticmethod
+    def _tracker(rows_by_year):
+        supabase = MagicMock()
+
+        def execute_for(year):
+            return MagicMock(data=rows_by_year.get(year, []))
+
+        query = supabase.table.return_value.select.return_value.eq.return_value
+        query.gte.side_effect = lambda _col, value: MagicMock(
+            lte=MagicMock(return_value=MagicMock(
+                execute=MagicMock(return_value=execute_for(int(value[:4])))
+            ))
+        )
+        return WorkDayTracker(supabase), supabase
+
+    def test_counts_across_years_with_one_query_per_year(self):
+        tracker, supabase = self._tracker({
+            2025: [h for h in HOLIDAYS if (h["holiday_date"] or "").startswith("2025")],
+            2026: [{"holiday_date": "2026-01-01", "province": "ON"}],
+        })
+
+        assert tracker._count_statutory_holidays_in_period(
+            "ON", date(2025, 12, 1), date(2026, 1, 15)
+        ) == 2
+        assert tracker._count_statutory_holidays_in_period(
+            "on", date(2025, 6, 1), date(2026, 1, 1)
+        ) == 3
+        assert tracker._count_statutory_holidays_in_period(
+            "BC", date(2025, 1, 1), date(2025, 12, 31)
+        ) == 2
+        assert supabase.table.call_count == 2
+
+    def test_query_failure_returns_zero(self):
+        supabase = MagicMock()
+        supabase.table.side_effect = Exception("connection lost")
+        tracker = WorkDayTracker(supabase)
+
+        assert tracker._count_statutory_holidays_in_period(
+            "ON", date(2025, 1, 1), date(2025, 2, 1)
+        ) == 0
@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for payroll hot paths.
+
+Run a benchmark as a module from the backend directory, e.g.:
+    uv run python -m tools.benchmarks.bracket_lookup
+"""
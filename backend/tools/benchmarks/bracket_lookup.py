@@ -0,0 +1,73 @@
+"""
+Bracket lookup micro-benchmark.
+
+Compares the dict-based linear scan (find_tax_bracket, which re-parses
+thresholds with Decimal(str(...)) on every call) against the compiled
+BracketIndex (bisect over pre-parsed Decimals), single and vectorized.
+
+Usage:
+    uv run python -m tools.benchmarks.bracket_lookup [--n 200000] [--year 2025]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from decimal import Decimal
+
+from app.services.payroll.tax_tables import (
+    find_tax_bracket,
+    get_federal_config,
+    get_federal_table,
+)
+
+
+def _time(label: str, n: int, fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<38} {rate:>14,.0f} lookups/s  ({elapsed:.3f}s)")
+    return rate
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=200_000, help="Number of lookups")
+    parser.add_argument("--year", type=int, default=2025, help="Tax year")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    incomes = [Decimal(rng.randint(0, 40_000_000)) / 100 for _ in range(args.n)]
+
+    brackets = get_federal_config(args.year)["brackets"]
+    index = get_federal_table(args.year).bracket_index
+
+    # Sanity check: both paths agree before timing them
+    for income in incomes[:1000]:
+        assert find_tax_bracket(income, brackets) == index.rate_and_constant(income)
+
+    print(f"Federal bracket lookup, {args.n:,} incomes, year {args.year}")
+    before = _time(
+        "before: find_tax_bracket (dicts)",
+        args.n,
+        lambda: [find_tax_bracket(i, brackets) for i in incomes],
+    )
+    after = _time(
+        "after: BracketIndex.rate_and_constant",
+        args.n,
+        lambda: [index.rate_and_constant(i) for i in incomes],
+    )
+    many = _time(
+        "after: rate_and_constant_many",
+        args.n,
+        lambda: index.rate_and_constant_many(incomes),
+    )
+    print(f"  speedup: {after / before:.1f}x single, {many / before:.1f}x vectorized")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""
+Batch payroll micro-benchmark.
+
+Compares PayrollEngine.calculate_batch on the Decimal path against the
+NumPy columnar path, end to end and for the integer kernel alone (inputs
+already in columns, no Decimal conversion). Requires numpy (``.[fast]``).
+
+Usage:
+    uv run python -m tools.benchmarks.columnar_batch [--n 50000] [--year 2025]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from datetime import date
+from decimal import Decimal
+
+from app.models.payroll import PayFrequency, Province
+from app.services.payroll import columnar_batch
+from app.services.payroll.payroll_engine import EmployeePayrollInput, PayrollEngine
+
+
+def _time(label: str, n: int, fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<38} {rate:>14,.0f} calcs/s  ({elapsed:.3f}s)")
+    return rate
+
+
+def _inputs(n: int, year: int) -> list[EmployeePayrollInput]:
+    rng = random.Random(42)
+    provinces = list(Province)
+    frequencies = [PayFrequency.BIWEEKLY, PayFrequency.SEMI_MONTHLY, PayFrequency.WEEKLY]
+    inputs = []
+    for i in range(n):
+        frequency = rng.choice(frequencies)
+        gross = Decimal(rng.randint(50_000, 1_200_000)) / 100
+        periods_paid = rng.randint(0, frequency.periods_per_year - 1)
+        ytd = gross * periods_paid
+        inputs.append(
+            EmployeePayrollInput(
+                employee_id=f"emp-{i}",
+                province=rng.choice(provinces),
+                pay_frequency=frequency,
+                pay_date=date(year, rng.randint(1, 12), 15),
+                gross_regular=gross,
+                federal_claim_amount=Decimal("16129.00"),
+                provincial_claim_amount=Decimal("12747.00"),
+                rrsp_per_period=Decimal(rng.choice([0, 5000, 10000])) / 100,
+                ytd_pensionable_earnings=ytd,
+                ytd_insurable_earnings=ytd,
+                ytd_cpp_base=(ytd * Decimal("0.0595")).quantize(Decimal("0.01")),
+            )
+        )
+    return inputs
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=50_000, help="Number of employees")
+    parser.add_argument("--year", type=int, default=2025, help="Tax year")
+    args = parser.parse_args(argv)
+
+    if not columnar_batch.NUMPY_AVAILABLE:
+        print("numpy is not installed (pip install .[fast])")
+        return 1
+
+    engine = PayrollEngine(year=args.year)
+    inputs = _inputs(args.n, args.year)
+
+    # Sanity check: both paths agree before timing them
+    sample = inputs[:1000]
+    for expected, actual in zip(
+        engine.calculate_batch(sample), engine.calculate_batch(sample, columnar=True), strict=True
+    ):
+        assert expected.net_pay == actual.net_pay
+        assert expected.federal_tax == actual.federal_tax
+        assert expected.provincial_tax == actual.provincial_tax
+
+    # Kernel only: one (province, P, edition) group already in columns
+    province, periods, pay_date = "ON", 26, date(args.year, 8, 15)
+    federal_calc = engine._get_federal_calculator(periods, pay_date)
+    constants = columnar_batch._GroupConstants.build(
+        periods,
+        args.year,
+        "jul",
+        federal_calc.cpp_table,
+        federal_calc.ei_table,
+        federal_calc.table,
+        engine._get_provincial_calculator(province, periods, pay_date).table,
+    )
+    rows = [columnar_batch._row(inp) for inp in inputs]
+    money = [row[0] for row in rows]
+    flags = [row[1] for row in rows]
+
+    print(f"Batch payroll, {args.n:,} employees, year {args.year}")
+    before = _time(
+        "before: calculate_batch (Decimal)",
+        args.n,
+        lambda: engine.calculate_batch(inputs),
+    )
+    after = _time(
+        "after: calculate_batch(columnar=True)",
+        args.n,
+        lambda: engine.calculate_batch(inputs, columnar=True),
+    )
+    kernel = _time(
+        "after: integer kernel only",
+        args.n,
+        lambda: columnar_batch._calculate_group(constants, columnar_batch._Columns(money, flags)),
+    )
+    print(f"  speedup: {after / before:.1f}x end to end, {kernel / before:.0f}x kernel")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
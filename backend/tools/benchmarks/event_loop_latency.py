@@ -0,0 +1,230 @@
+"""
+Event loop latency under a large recalculation.
+
+Runs PayrollRunOperations.recalculate_run for a draft run of N employees
+against an in-memory Supabase stand-in whose every execute() blocks for
+--db-ms (an HTTP round-trip), while a probe plays an unrelated in-memory
+endpoint served every --probe-ms. Reports how long the probe waited for the
+loop (p50/p99/max) with database calls on the event loop (before) and on the
+database thread pool (after).
+
+Runs of PAYROLL_PARALLEL_THRESHOLD employees or more calculate on the payroll
+process pool, whose result unpickling also competes with the loop for the
+GIL; set PAYROLL_PARALLEL_THRESHOLD=0 to isolate the database effect.
+
+Usage:
+    uv run python -m tools.benchmarks.event_loop_latency [--n 2000] [--db-ms 15] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import Executor, Future
+from typing import Any
+from uuid import UUID
+
+os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "bench-key")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-jwt-secret")
+
+from app.core import async_db  # noqa: E402
+from app.core.async_db import execute, shutdown_db_executor  # noqa: E402
+from app.services.payroll.parallel_engine import shutdown_payroll_process_pool  # noqa: E402
+from app.services.payroll_run.run_operations import PayrollRunOperations  # noqa: E402
+from app.services.payroll_run.ytd_calculator import YtdCalculator  # noqa: E402
+
+RUN_ID = "00000000-0000-0000-0000-000000000001"
+PROVINCES = ["ON", "BC", "AB", "MB", "SK", "NS", "NB", "NL"]
+
+
+class _Response:
+    def __init__(self, data: list[dict[str, Any]]):
+        self.data = data
+        self.count = len(data)
+
+
+class _Query:
+    """Chainable query whose execute() blocks like a PostgREST round-trip."""
+
+    def __init__(self, db: _BlockingSupabase, table: str):
+        self.db = db
+        self.table = table
+
+    def __getattr__(self, _name: str) -> Any:
+        return lambda *args, **kwargs: self
+
+    def execute(self) -> _Response:
+        time.sleep(self.db.latency)
+        self.db.queries += 1
+        return _Response(self.db.rows.get(self.table, []))
+
+
+class _BlockingSupabase:
+    def __init__(self, latency: float, rows: dict[str, list[dict[str, Any]]]):
+        self.latency = latency
+        self.rows = rows
+        self.queries = 0
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def rpc(self, name: str, _params: dict[str, Any]) -> _Query:
+        return _Query(self, name)
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted calls on the caller's thread: the pre-offload behaviour."""
+
+    def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _records(n: int) -> list[dict[str, Any]]:
+    records = []
+    for i in range(n):
+        salaried = i % 3 != 0
+        records.append({
+            "id": f"rec-{i}",
+            "employee_id": f"emp-{i}",
+            "user_id": "bench-user",
+            "input_data": {} if salaried else {"regularHours": 80},
+            "employees": {
+                "id": f"emp-{i}",
+                "first_name": "Bench",
+                "last_name": f"Employee{i}",
+                "province_of_employment": PROVINCES[i % len(PROVINCES)],
+                "pay_frequency": "bi_weekly",
+                "annual_salary": 52_000 + (i % 50) * 1_000 if salaried else None,
+                "hourly_rate": None if salaried else 22 + i % 15,
+                "federal_additional_claims": 0,
+                "provincial_additional_claims": 0,
+                "is_cpp_exempt": False,
+                "is_ei_exempt": False,
+                "cpp2_exempt": False,
+                "vacation_config": {"payout_method": "accrual", "vacation_rate": "0.04"},
+                "vacation_balance": 0,
+                "hire_date": "2020-01-06",
+                "pay_group_id": "pg-1",
+                "pay_groups": {
+                    "id": "pg-1",
+                    "name": "Bench",
+                    "pay_frequency": "bi_weekly",
+                    "employment_type": "full_time",
+                    "group_benefits": {},
+                },
+            },
+        })
+    return records
+
+
+async def _probe(interval: float, stop: asyncio.Event) -> list[float]:
+    """An unrelated, in-memory endpoint: the time until the loop serves it."""
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        latencies.append(time.perf_counter() - started - interval)
+    return latencies
+
+
+async def _measure(n: int, latency: float, interval: float) -> tuple[list[float], float, int]:
+    run = {
+        "id": RUN_ID,
+        "status": "draft",
+        "pay_date": "2025-06-20",
+        "period_start": "2025-06-02",
+        "period_end": "2025-06-13",
+    }
+    records = _records(n)
+    db = _BlockingSupabase(latency, {"payroll_runs": [run]})
+
+    async def get_run(_run_id: UUID) -> dict[str, Any]:
+        result = await execute(db.table("payroll_runs").select("*"))
+        return result.data[0]
+
+    async def get_run_records(_run_id: UUID) -> list[dict[str, Any]]:
+        await execute(db.table("payroll_records").select("*"))
+        return records
+
+    async def create_records(*_args: Any, **_kwargs: Any) -> tuple[list, list]:
+        return [], []
+
+    ops = PayrollRunOperations(
+        supabase=db,
+        user_id="bench-user",
+        company_id="bench-company",
+        ytd_calculator=YtdCalculator(db, "bench-user", "bench-company"),
+        get_run_func=get_run,
+        get_run_records_func=get_run_records,
+        create_records_func=create_records,
+    )
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(interval, stop))
+    started = time.perf_counter()
+    await ops.recalculate_run(UUID(RUN_ID))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return await probe, elapsed, db.queries
+
+
+def _report(label: str, latencies: list[float], elapsed: float, queries: int) -> float:
+    ms = sorted(max(0.0, x) * 1000 for x in latencies)
+    p50 = statistics.median(ms)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(
+        f"  {label:<28} p50 {p50:7.1f}ms  p99 {p99:7.1f}ms  max {ms[-1]:7.1f}ms  "
+        f"({len(ms)} probes, recalc {elapsed:.2f}s, {queries} queries/run)"
+    )
+    return p99
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=2_000, help="Employees in the run")
+    parser.add_argument("--db-ms", type=float, default=15.0, help="Latency per query")
+    parser.add_argument("--probe-ms", type=float, default=5.0, help="Probe interval")
+    parser.add_argument("--repeat", type=int, default=3, help="Recalculations per mode")
+    args = parser.parse_args(argv)
+    latency, interval = args.db_ms / 1000, args.probe_ms / 1000
+    # The stand-in returns no YTD ledger rows, which the services log about
+    logging.getLogger("app").setLevel(logging.ERROR)
+
+    def measure_all() -> tuple[list[float], float, int]:
+        latencies: list[float] = []
+        elapsed, queries = 0.0, 0
+        for _ in range(args.repeat):
+            run_latencies, run_elapsed, queries = asyncio.run(_measure(args.n, latency, interval))
+            latencies.extend(run_latencies)
+            elapsed += run_elapsed / args.repeat
+        return latencies, elapsed, queries
+
+    print(f"Recalculation of {args.n:,} employees, {args.db_ms:g}ms per query, x{args.repeat}")
+    try:
+        # Warm up the payroll process pool and tax tables outside the timings
+        asyncio.run(_measure(min(args.n, 600), 0.0, interval))
+
+        async_db._executor = _InlineExecutor()  # type: ignore[assignment]
+        before = _report("before: queries on loop", *measure_all())
+        async_db._executor = None
+
+        after = _report("after: db thread pool", *measure_all())
+        print(f"  p99 improvement: {before / max(after, 0.1):.1f}x")
+    finally:
+        shutdown_db_executor()
+        shutdown_payroll_process_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+"""
+Incremental recalculation benchmark.
+
+Recalculates a draft run of N employees in full, then edits one record and
+recalculates again: before, every record is recalculated and the run totals
+re-summed; after, only the edited record is recalculated (the others are
+skipped by their inputs_hash) and the totals adjusted by its delta.
+
+Uses the in-memory Supabase stand-in of event_loop_latency, which stores
+the inputs_hash of each staged record back on the run's records.
+
+Usage:
+    uv run python -m tools.benchmarks.incremental_recalc [--n 3000] [--db-ms 0] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any
+from uuid import UUID
+
+from app.core.async_db import shutdown_db_executor
+from app.services.payroll.parallel_engine import shutdown_payroll_process_pool
+from app.services.payroll_run.result_persister import STAGING_TABLE
+from app.services.payroll_run.run_operations import PayrollRunOperations
+from app.services.payroll_run.ytd_calculator import YtdCalculator
+from tools.benchmarks.event_loop_latency import (
+    RUN_ID,
+    _BlockingSupabase,
+    _Query,
+    _records,
+)
+
+
+class _StagingQuery(_Query):
+    """Staging insert that records each row's inputs_hash on its record."""
+
+    def insert(self, rows: list[dict[str, Any]]) -> _StagingQuery:
+        for row in rows:
+            self.db.records_by_id[row["record_id"]].update(
+                inputs_hash=row["payload"]["inputs_hash"], is_modified=False
+            )
+        return self
+
+
+class _RecordingSupabase(_BlockingSupabase):
+    def __init__(self, latency: float, rows: dict[str, list[dict[str, Any]]], records: list[dict[str, Any]]):
+        super().__init__(latency, rows)
+        self.records_by_id = {record["id"]: record for record in records}
+
+    def table(self, name: str) -> _Query:
+        return _StagingQuery(self, name) if name == STAGING_TABLE else _Query(self, name)
+
+
+def _operations(db: _RecordingSupabase, run: dict[str, Any], records: list[dict[str, Any]]) -> PayrollRunOperations:
+    async def get_run(_run_id: UUID) -> dict[str, Any]:
+        return run
+
+    async def get_run_records(_run_id: UUID) -> list[dict[str, Any]]:
+        return records
+
+    async def create_records(*_args: Any, **_kwargs: Any) -> tuple[list, list]:
+        return [], []
+
+    return PayrollRunOperations(
+        supabase=db,
+        user_id="bench-user",
+        company_id="bench-company",
+        ytd_calculator=YtdCalculator(db, "bench-user", "bench-company"),
+        get_run_func=get_run,
+        get_run_records_func=get_run_records,
+        create_records_func=create_records,
+    )
+
+
+async def _measure(n: int, latency: float, repeat: int) -> tuple[list[float], list[float]]:
+    run = {
+        "id": RUN_ID,
+        "status": "draft",
+        "pay_date": "2025-06-20",
+        "period_start": "2025-06-02",
+        "period_end": "2025-06-13",
+    }
+    records = _records(n)
+    db = _RecordingSupabase(latency, {}, records)
+    ops = _operations(db, run, records)
+    await ops.recalculate_run(UUID(RUN_ID), full=True)
+
+    before, after = [], []
+    for i in range(repeat):
+        edited = records[i % n]
+        edited["input_data"] = {**edited["input_data"], "overtimeHours": i + 1}
+        edited["is_modified"] = True
+
+        started = time.perf_counter()
+        await ops.recalculate_run(UUID(RUN_ID), full=True)
+        before.append(time.perf_counter() - started)
+
+        edited["input_data"] = {**edited["input_data"], "overtimeHours": i + 2}
+        edited["is_modified"] = True
+        started = time.perf_counter()
+        await ops.recalculate_run(UUID(RUN_ID))
+        after.append(time.perf_counter() - started)
+    return before, after
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=3_000, help="Employees in the run")
+    parser.add_argument("--db-ms", type=float, default=0.0, help="Latency per query")
+    parser.add_argument("--repeat", type=int, default=5, help="Single-record edits")
+    args = parser.parse_args(argv)
+    # The stand-in returns no YTD ledger rows, which the services log about
+    logging.getLogger("app").setLevel(logging.ERROR)
+
+    print(f"Single-record edit on a run of {args.n:,} employees, {args.db_ms:g}ms per query")
+    try:
+        before, after = asyncio.run(_measure(args.n, args.db_ms / 1000, args.repeat))
+    finally:
+        shutdown_db_executor()
+        shutdown_payroll_process_pool()
+    before_ms = statistics.median(before) * 1000
+    after_ms = statistics.median(after) * 1000
+    print(f"  {'before: full recalculation':<34} {before_ms:9.1f}ms")
+    print(f"  {'after: changed records only':<34} {after_ms:9.1f}ms")
+    print(f"  speedup: {before_ms / after_ms:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
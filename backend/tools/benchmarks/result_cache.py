@@ -0,0 +1,84 @@
+"""
+Payroll result cache micro-benchmark.
+
+Calculates a run of N employees drawn from --distinct input profiles (same
+salary, province, claims and frequency at the same YTD position) without the
+result cache (before), then with it: a first run, where repeated profiles
+hit, and a rerun of the same run, where every employee hits.
+
+Usage:
+    uv run python -m tools.benchmarks.result_cache [--n 3000] [--distinct 300] [--year 2025]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from datetime import date
+from decimal import Decimal
+
+from app.models.payroll import PayFrequency, Province
+from app.services.payroll.payroll_engine import EmployeePayrollInput, PayrollEngine
+from app.services.payroll.result_cache import PayrollResultCache
+
+
+def _time(label: str, n: int, fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<38} {rate:>14,.0f} calcs/s  ({elapsed:.3f}s)")
+    return rate
+
+
+def _inputs(n: int, distinct: int, year: int) -> list[EmployeePayrollInput]:
+    rng = random.Random(42)
+    provinces = [Province.ON, Province.BC, Province.AB, Province.SK, Province.NS]
+    profiles = [
+        {
+            "province": rng.choice(provinces),
+            "pay_frequency": PayFrequency.BIWEEKLY,
+            "pay_date": date(year, 1, 17),
+            "gross_regular": Decimal(rng.randint(150_000, 600_000)) / 100,
+            "federal_claim_amount": Decimal("16129.00"),
+            "provincial_claim_amount": Decimal("12747.00"),
+        }
+        for _ in range(distinct)
+    ]
+    return [
+        EmployeePayrollInput(employee_id=f"emp-{i}", **rng.choice(profiles))
+        for i in range(n)
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=3_000, help="Employees in the run")
+    parser.add_argument("--distinct", type=int, default=300, help="Distinct input profiles")
+    parser.add_argument("--year", type=int, default=2025, help="Tax year")
+    args = parser.parse_args(argv)
+
+    inputs = _inputs(args.n, args.distinct, args.year)
+    uncached = PayrollEngine(year=args.year, result_cache=PayrollResultCache(0))
+    cache = PayrollResultCache(max_size=10_000)
+    cached = PayrollEngine(year=args.year, result_cache=cache)
+
+    # Warm up the tax tables and calculators outside the timings
+    uncached.calculate_batch(inputs[:100])
+    assert cached.calculate_batch(inputs[:100]) == uncached.calculate_batch(inputs[:100])
+    cache.invalidate()
+
+    print(f"{args.n:,} employees, {args.distinct:,} distinct inputs, year {args.year}")
+    before = _time("before: no result cache", args.n, lambda: uncached.calculate_batch(inputs))
+    first = _time("after: first run", args.n, lambda: cached.calculate_batch(inputs))
+    print(f"    hit rate {cache.stats()['hit_rate']:.1%}")
+    rerun = _time("after: rerun", args.n, lambda: cached.calculate_batch(inputs))
+    print(f"    hit rate {cache.stats()['hit_rate']:.1%}")
+    print(f"  speedup: {first / before:.1f}x first run, {rerun / before:.1f}x rerun")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""
+SIN decryption and key rotation throughput.
+
+Decrypts N Fernet-encrypted SINs one call per employee (decrypt_sin, the
+pre-bulk T4 path) and with one decrypt_sins call, then rotates them from an
+old key to a new one with SecurityManager.rotate_many. Reports values/second.
+
+Bulk calls of SecurityManager.BULK_PARALLEL_THRESHOLD values or more are
+chunked across CRYPTO_MAX_WORKERS threads; how much that adds depends on the
+CPU count and on how much of Fernet runs outside the GIL.
+
+Usage:
+    uv run python -m tools.benchmarks.sin_crypto [--n 50000] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from cryptography.fernet import Fernet
+
+NEW_KEY = Fernet.generate_key().decode()
+OLD_KEY = Fernet.generate_key().decode()
+
+os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "bench-key")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-jwt-secret")
+
+from app.core.config import get_config  # noqa: E402
+from app.core.security import SecurityManager, decrypt_sin, decrypt_sins  # noqa: E402
+
+
+def _use_keys(*keys: str) -> None:
+    get_config().encryption_key = ",".join(keys)
+    SecurityManager._fernet = None
+    SecurityManager._primary_fernet = None
+
+
+def _timed(label: str, n: int, func: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<32} {elapsed:6.2f}s  {n / elapsed:10,.0f}/s")
+    return elapsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=50_000, help="Employees")
+    parser.add_argument("--workers", type=int, default=4, help="CRYPTO_MAX_WORKERS")
+    args = parser.parse_args(argv)
+    get_config().crypto_max_workers = args.workers
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    sins = [f"{100_000_000 + i * 7:09d}" for i in range(args.n)]
+    _use_keys(OLD_KEY)
+    tokens = SecurityManager.encrypt_many(sins)
+
+    print(f"{args.n:,} SINs, {args.workers} crypto threads, {os.cpu_count()} CPUs")
+    try:
+        before = _timed("before: decrypt_sin per employee", args.n,
+                        lambda: [decrypt_sin(t) for t in tokens])
+        after = _timed("after: decrypt_sins", args.n, lambda: decrypt_sins(tokens))
+        print(f"  speedup: {before / after:.1f}x")
+
+        _use_keys(NEW_KEY, OLD_KEY)
+        _timed("rotate_many (old -> new key)", args.n,
+               lambda: SecurityManager.rotate_many(tokens))
+    finally:
+        SecurityManager.shutdown_crypto_executor()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""
+T4 XML generation and validation time and peak memory.
+
+Builds a T619 return for N synthetic slips the pre-streaming way (one
+ElementTree, tostring, then a minidom re-parse to pretty-print) and with
+T4XMLGenerator.write_xml streaming to a temporary file. Then validates the
+file: loading the whole document with fromstring (what the pre-streaming
+validator did before its checks) against T4XMLValidator.validate_chunks
+reading it in 64 KiB pieces. Reports seconds and tracemalloc peak for each.
+
+Usage:
+    uv run python -m tools.benchmarks.t4_xml [--n 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+from uuid import uuid4
+from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement, fromstring, tostring
+
+os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "bench-key")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-jwt-secret")
+
+from app.models.payroll import Province  # noqa: E402
+from app.models.t4 import T4SlipData, T4Summary  # noqa: E402
+from app.services.t4.xml_generator import T4XMLGenerator  # noqa: E402
+from app.services.t4.xml_validator import T4XMLValidator  # noqa: E402
+
+
+def _slips(n: int) -> list[T4SlipData]:
+    return [
+        T4SlipData(
+            employee_id=uuid4(),
+            tax_year=2025,
+            sin=f"{100_000_000 + i:09d}",
+            employee_first_name="Employee",
+            employee_last_name=f"Number{i}",
+            employee_address_line1=f"{i} Main St",
+            employee_city="Toronto",
+            employee_province=Province.ON,
+            employee_postal_code="M4K 2A1",
+            employer_name="Bench Co",
+            employer_account_number="123456789RP0001",
+            province_of_employment=Province.ON,
+            box_14_employment_income=Decimal("61234.56"),
+            box_16_cpp_contributions=Decimal("3754.45"),
+            box_18_ei_premiums=Decimal("1049.12"),
+            box_22_income_tax_deducted=Decimal("9876.54"),
+            box_24_ei_insurable_earnings=Decimal("61234.56"),
+            box_26_cpp_pensionable_earnings=Decimal("61234.56"),
+        )
+        for i in range(n)
+    ]
+
+
+def _tree_then_minidom(generator: T4XMLGenerator, summary: T4Summary, slips: list[T4SlipData]) -> str:
+    root = Element("Return")
+    root.set("xmlns", generator.T4_NAMESPACE)
+    root.set("xmlns:sdte", generator.SDTE_NAMESPACE)
+    root.set("version", generator.SCHEMA_VERSION)
+    generator._add_transmitter(root)
+    t4_element = SubElement(root, "T4")
+    generator._add_t4_summary(t4_element, summary)
+    slips_element = SubElement(t4_element, "T4Slips")
+    for i, slip in enumerate(slips, start=1):
+        generator._add_t4_slip(slips_element, slip, i)
+    xml_string = tostring(root, encoding="unicode")
+    return minidom.parseString(xml_string).toprettyxml(indent="  ", encoding="UTF-8").decode("UTF-8")
+
+
+def _measure(label: str, func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34} {elapsed:6.2f}s  peak {peak / 1024 / 1024:8.1f} MiB")
+    return elapsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=20_000, help="Slips")
+    args = parser.parse_args(argv)
+
+    generator = T4XMLGenerator()
+    slips = _slips(args.n)
+    summary = T4Summary(
+        company_id=uuid4(),
+        user_id="bench",
+        tax_year=2025,
+        employer_name="Bench Co",
+        employer_account_number="123456789RP0001",
+        total_number_of_t4_slips=args.n,
+    )
+
+    print(f"{args.n:,} T4 slips")
+    before = _measure("before: tree + minidom", lambda: _tree_then_minidom(generator, summary, slips))
+    with tempfile.TemporaryFile() as out:
+        after = _measure("after: write_xml to file", lambda: generator.write_xml(summary, slips, out))
+        size = out.tell()
+        print(f"  {size / 1024 / 1024:.1f} MiB written, speedup: {before / after:.1f}x")
+
+        out.seek(0)
+        _measure("before: fromstring whole file", lambda: fromstring(out.read()))
+        out.seek(0)
+        _measure(
+            "after: validate_chunks",
+            lambda: T4XMLValidator().validate_chunks(iter(lambda: out.read(64 * 1024), b"")),
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
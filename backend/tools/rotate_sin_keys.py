@@ -0,0 +1,55 @@
+"""
+Re-encrypt every employee SIN under the current encryption key.
+
+Run after deploying ENCRYPTION_KEY="new-key,old-key" and before dropping the
+old key. Uses the service-role (admin) Supabase client, so it needs
+SUPABASE_SERVICE_ROLE_KEY; it is not exposed through the API or job queue.
+Prints the run's stats as JSON; a stopped run can be resumed with
+--start-after set to the last_id it reported.
+
+Usage:
+    uv run python -m tools.rotate_sin_keys [--page-size 1000] [--start-after ID]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.core.security import SecurityManager
+from app.core.supabase_client import get_supabase_admin_client
+from app.services.sin_key_rotation_service import DEFAULT_PAGE_SIZE, SinKeyRotationService
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Employees per round-trip"
+    )
+    parser.add_argument("--start-after", default=None, help="Resume after this employee id")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    supabase = get_supabase_admin_client()
+    if supabase is None:
+        print("SUPABASE_SERVICE_ROLE_KEY is not configured", file=sys.stderr)
+        return 1
+    if SecurityManager.get_fernet() is None:
+        print("ENCRYPTION_KEY is not configured", file=sys.stderr)
+        return 1
+
+    service = SinKeyRotationService(supabase, page_size=args.page_size)
+    try:
+        stats = asyncio.run(service.rotate_all(start_after=args.start_after))
+    finally:
+        SecurityManager.shutdown_crypto_executor()
+
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["failed"] or stats["conflicts"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())